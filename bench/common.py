@@ -0,0 +1,132 @@
+# common.py - Shared helpers for the benchmark suite
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+import math
+import os
+from typing import Dict, Any, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+SITE_DIR = os.path.join(REPO_DIR, 'site')
+
+# Every seeded account shares this password so the load generator can log in
+# as anyone without storing per-user secrets.
+BENCH_PASSWORD = 'bench-password-1!'
+
+
+
+# -----------------------------------------------------------------------------
+# Environment
+# -----------------------------------------------------------------------------
+
+def load_env() -> Dict[str, str]:
+    """
+    Return the benchmark database settings: bench/bench.env, overridden by
+    anything already set in the process environment.
+    """
+
+    env = {
+        'DB_HOST': '127.0.0.1',
+        'DB_PORT': '3307'
+    }
+    with open(os.path.join(BENCH_DIR, 'bench.env')) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                key, value = line.split('=', 1)
+                env[key] = value
+
+    for key in list(env):
+        env[key] = os.environ.get(key, env[key])
+    return env
+
+# -----------------------------------------------------------------------------
+
+def root_connection(**kwargs):
+    """
+    Connect to the benchmark database as root. Seeding and plan checks need
+    table access, which the scav_* roles deliberately do not have.
+    """
+
+    import mysql.connector
+
+    env = load_env()
+    return mysql.connector.connect(
+        host=env['DB_HOST'],
+        port=int(env['DB_PORT']),
+        user='root',
+        password=env['DB_PASS_ROOT'],
+        database='scavengers',
+        **kwargs
+    )
+
+
+
+# -----------------------------------------------------------------------------
+# Statistics
+# -----------------------------------------------------------------------------
+
+def percentile(samples: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list (q in 0..100).
+    """
+
+    if not samples:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(samples)))
+    return samples[rank - 1]
+
+# -----------------------------------------------------------------------------
+
+def summarise(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'mean': sum(ordered) / len(ordered) if ordered else 0.0,
+        'p50': percentile(ordered, 50),
+        'p95': percentile(ordered, 95),
+        'p99': percentile(ordered, 99),
+        'max': ordered[-1] if ordered else 0.0
+    }
+
+
+
+# -----------------------------------------------------------------------------
+# Baselines
+# -----------------------------------------------------------------------------
+
+def save_json(path: str, data: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+def load_json(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+# -----------------------------------------------------------------------------
+
+def regression(baseline: float, current: float, higher_is_better: bool = False) -> float:
+    """
+    Percentage by which current is worse than baseline (negative = better).
+    """
+
+    if baseline <= 0:
+        return 0.0
+    change = (current - baseline) / baseline * 100
+    return -change if higher_is_better else change
@@ -0,0 +1,348 @@
+# load.py - Concurrent HTTP load generator for the web application
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Drive the app with concurrent logged-in clients and report latency.
+
+    python bench/load.py --boot --clients 32 --duration 60 --save bench/results/main.json
+    python bench/load.py --boot --compare bench/results/main.json
+
+--boot starts gunicorn from site/ against the benchmark database (see
+bench/compose.yml and bench/seed.py); without it --url must point at a
+running instance whose accounts were created by bench/seed.py.
+"""
+
+import argparse
+import http.cookiejar
+import os
+import random
+import re
+import secrets
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from common import (
+    BENCH_PASSWORD,
+    SITE_DIR,
+    load_env,
+    summarise,
+    save_json,
+    load_json,
+    regression
+)
+from seed import active_ids, username
+
+# (scenario, path) per role. Placeholders: {page} random page, {status} a
+# request status filter, {tags} two of the most used tag ids.
+SCENARIOS = {
+    'social': [
+        ('announcements', '/social/announcements'),
+        ('chat', '/social/chat')
+    ],
+    'user': [
+        ('announcements', '/social/announcements'),
+        ('chat', '/social/chat'),
+        ('requests', '/users/requests'),
+        ('requests.page', '/users/requests?page={page}'),
+        ('requests.status', '/users/requests?status={status}'),
+        ('requests.tags', '/users/requests?tags={tags}&match=any'),
+        ('requests.tags.all', '/users/requests?tags={tags}&match=all')
+    ],
+    'admin': [
+        ('announcements', '/social/announcements'),
+        ('requests', '/users/requests?page={page}'),
+        ('admin.system', '/admin/system'),
+        ('admin.health', '/admin/health')
+    ]
+}
+
+REQUEST_STATUSES = ['pending', 'in progress', 'completed', 'rejected']
+
+CSRF_PATTERN = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+
+
+
+# -----------------------------------------------------------------------------
+# Client
+# -----------------------------------------------------------------------------
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+class Client:
+    """
+    One simulated browser: its own cookie jar, logged in as one account.
+    """
+
+    def __init__(self, base_url: str, role: str, user_id: int):
+        self.base_url = base_url.rstrip('/')
+        self.role = role
+        self.user_id = user_id
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()),
+            _NoRedirect()
+        )
+
+    def request(self, path: str, data: Optional[Dict[str, str]] = None) -> Tuple[int, str]:
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        try:
+            with self.opener.open(self.base_url + path, data=body, timeout=30) as response:
+                return response.status, response.read().decode('utf-8', 'replace')
+        except urllib.error.HTTPError as e:
+            return e.code, ''
+        except (urllib.error.URLError, OSError):
+            return 599, ''
+
+    def login(self) -> int:
+        status, html = self.request('/login')
+        match = CSRF_PATTERN.search(html)
+        if status != 200 or not match:
+            return status or 599
+        status, _ = self.request('/login', {
+            'csrf_token': match.group(1),
+            'username': username(self.user_id),
+            'password': BENCH_PASSWORD
+        })
+
+        # a successful login redirects to the announcements page
+        return 200 if status == 302 else (status if status >= 400 else 401)
+
+
+
+# -----------------------------------------------------------------------------
+# Runner
+# -----------------------------------------------------------------------------
+
+class Results:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, scenario: str, ms: float, status: int) -> None:
+        with self.lock:
+            if 200 <= status < 300:
+                self.samples[scenario].append(ms)
+            else:
+                self.errors[scenario] += 1
+
+# -----------------------------------------------------------------------------
+
+def _client_loop(client: Client, args, results: Results, measure_from: float, stop_at: float) -> None:
+    rng = random.Random(client.user_id)
+
+    def timed(scenario, func):
+        started = time.perf_counter()
+        status = func()
+        if started >= measure_from:
+            results.record(scenario, (time.perf_counter() - started) * 1000, status)
+        return status
+
+    timed('login', client.login)
+    while time.perf_counter() < stop_at:
+        if rng.random() < args.relogin:
+            timed('login', client.login)
+            continue
+
+        scenario, path = rng.choice(SCENARIOS[client.role])
+        path = path.format(
+            page=rng.randint(1, args.max_page),
+            status=urllib.parse.quote(rng.choice(REQUEST_STATUSES)),
+            tags=','.join(str(tag_id) for tag_id in rng.sample(range(1, 21), 2))
+        )
+        timed(scenario, lambda: client.request(path)[0])
+
+# -----------------------------------------------------------------------------
+
+def _pick_clients(args) -> List[Client]:
+    rng = random.Random(args.seed)
+    pools = {role: active_ids(args.seeded_users, [role]) for role in SCENARIOS}
+    mix = dict(part.split('=') for part in args.mix.split(','))
+    weights = [float(mix.get(role, 0)) for role in SCENARIOS]
+
+    clients = []
+    for _ in range(args.clients):
+        role = rng.choices(list(SCENARIOS), weights=weights)[0]
+        clients.append(Client(args.url, role, rng.choice(pools[role])))
+    return clients
+
+# -----------------------------------------------------------------------------
+
+def run(args) -> Dict:
+    clients = _pick_clients(args)
+    results = Results()
+
+    started = time.perf_counter()
+    measure_from = started + args.warmup
+    stop_at = measure_from + args.duration
+
+    threads = [
+        threading.Thread(target=_client_loop, args=(c, args, results, measure_from, stop_at), daemon=True)
+        for c in clients
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    elapsed = max(time.perf_counter() - measure_from, 1e-9)
+    scenarios = {}
+    for name in sorted(set(results.samples) | set(results.errors)):
+        summary = summarise(results.samples[name])
+        summary['errors'] = results.errors[name]
+        summary['rps'] = summary['count'] / elapsed
+        scenarios[name] = summary
+
+    everything = [ms for samples in results.samples.values() for ms in samples]
+    total = summarise(everything)
+    total['errors'] = sum(results.errors.values())
+    total['rps'] = total['count'] / elapsed
+
+    return {
+        'meta': {
+            'clients': args.clients,
+            'duration': args.duration,
+            'mix': args.mix,
+            'workers': args.workers if args.boot else None,
+            'time': time.strftime('%Y-%m-%d %H:%M:%S')
+        },
+        'scenarios': scenarios,
+        'total': total
+    }
+
+
+
+# -----------------------------------------------------------------------------
+# Reporting
+# -----------------------------------------------------------------------------
+
+def report(result: Dict) -> None:
+    print(f"\n{'scenario':<18} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'errors':>7}")
+    rows = list(result['scenarios'].items()) + [('TOTAL', result['total'])]
+    for name, s in rows:
+        print(f"{name:<18} {s['rps']:>8.1f} {s['p50']:>8.1f} {s['p95']:>8.1f} {s['p99']:>8.1f} {s['max']:>8.1f} {s['errors']:>7}")
+    print('(latencies in ms)')
+
+# -----------------------------------------------------------------------------
+
+def compare(baseline: Dict, result: Dict, threshold: float) -> bool:
+    """
+    Print per-scenario changes against a baseline run. Returns False if any
+    scenario's p95 or throughput regressed by more than threshold percent, or
+    if a scenario that was error-free now has errors.
+    """
+
+    ok = True
+    print(f"\n{'scenario':<18} {'p95 base':>9} {'p95 now':>9} {'change':>8} {'rps change':>11}")
+    for name, base in baseline['scenarios'].items():
+        now = result['scenarios'].get(name)
+        if now is None:
+            continue
+        p95_change = regression(base['p95'], now['p95'])
+        rps_change = regression(base['rps'], now['rps'], higher_is_better=True)
+        failed = p95_change > threshold or rps_change > threshold or (now['errors'] and not base['errors'])
+        ok = ok and not failed
+        print(f"{name:<18} {base['p95']:>9.1f} {now['p95']:>9.1f} {p95_change:>+7.1f}% {-rps_change:>+10.1f}%{'  REGRESSED' if failed else ''}")
+    return ok
+
+
+
+# -----------------------------------------------------------------------------
+# Server
+# -----------------------------------------------------------------------------
+
+def boot(args) -> subprocess.Popen:
+    """
+    Start gunicorn from site/ against the benchmark database, with rate
+    limiting off so the load generator is not throttled.
+    """
+
+    env = dict(os.environ)
+    env.update(load_env())
+    env.update({
+        'FLASK_SECRET_KEY': secrets.token_hex(32),
+        'FLASK_RATELIMIT_ENABLED': '0',
+        'SCAV_RUNTIME_DIR': os.path.join('/tmp', f"scavengers-bench-{os.getpid()}")
+    })
+
+    port = urllib.parse.urlparse(args.url).port or 80
+    server = subprocess.Popen(
+        ['gunicorn', '-w', str(args.workers), '-b', f"127.0.0.1:{port}", '--log-level', 'warning', 'app:app'],
+        cwd=SITE_DIR,
+        env=env
+    )
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(args.url.rstrip('/') + '/login', timeout=1).close()
+            return server
+        except (urllib.error.URLError, ConnectionError):
+            if server.poll() is not None:
+                sys.exit('gunicorn exited during startup')
+            time.sleep(0.25)
+
+    server.terminate()
+    sys.exit('gunicorn did not become ready within 30s')
+
+
+
+# -----------------------------------------------------------------------------
+# Entry Point
+# -----------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5055')
+    parser.add_argument('--boot', action='store_true', help='start gunicorn against the benchmark database')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn workers when booting')
+    parser.add_argument('--clients', type=int, default=16, help='concurrent simulated clients')
+    parser.add_argument('--duration', type=float, default=30, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=5, help='unmeasured seconds before measuring')
+    parser.add_argument('--mix', default='social=50,user=40,admin=10', help='client role weights')
+    parser.add_argument('--relogin', type=float, default=0.02, help='chance a client logs in again per iteration')
+    parser.add_argument('--max-page', type=int, default=50, help='highest page number requested')
+    parser.add_argument('--seeded-users', type=int, default=100_000, help='--users value given to seed.py')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--save', help='write results as JSON to this path')
+    parser.add_argument('--compare', help='baseline JSON to compare against; exits 1 on regression')
+    parser.add_argument('--threshold', type=float, default=10.0, help='allowed regression in percent')
+    args = parser.parse_args()
+
+    server = boot(args) if args.boot else None
+    try:
+        result = run(args)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report(result)
+    if args.save:
+        save_json(args.save, result)
+    if args.compare and not compare(load_json(args.compare), result, args.threshold):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,273 @@
+# micro.py - Micro-benchmarks for rendering and utility hot paths
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Time individual hot paths in-process, without a database or HTTP server.
+
+    python bench/micro.py --save bench/results/micro.json
+    python bench/micro.py --compare bench/results/micro.json --threshold 15
+    python bench/micro.py --filter scene
+
+Each benchmark is calibrated so one round takes at least --min-time seconds,
+then run for --rounds rounds; the fastest round (per call) is the figure
+that is saved and compared, as it is the least affected by scheduler noise.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+from common import SITE_DIR, save_json, load_json, regression
+
+os.environ.setdefault('FLASK_SECRET_KEY', 'micro-benchmark')
+os.environ.setdefault('SCAV_RUNTIME_DIR', os.path.join(tempfile.gettempdir(), 'scavengers-micro'))
+sys.path.insert(0, SITE_DIR)
+
+# name -> setup function returning the zero-argument callable to time
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+
+# -----------------------------------------------------------------------------
+# Fixtures
+# -----------------------------------------------------------------------------
+
+POST_TEXT = '\n'.join([
+    'Scheduled maintenance on the media server this weekend.',
+    'See [the changelog](https://scavengers.io/notes/(2026)/maintenance) for details,',
+    'and report anything odd via [reports](/users/report).',
+    ''
+] * 12 + ['<script>alert(1)</script> should be escaped & shown as text.'] * 4)
+
+PASSWORDS = [
+    'short1!',
+    'NoDigitsOrSymbols',
+    'Valid-Passw0rd',
+    'a-very-long-passphrase-that-skips-complexity-checks',
+    'x' * 200
+]
+
+def _announcements(count: int = 10) -> List[dict]:
+    return [{
+        'id': i,
+        'title': f'Announcement {i}',
+        'subtitle': 'Infrastructure update',
+        'username': 'admin',
+        'created_at': '2026-01-01 12:00:00',
+        'footnote': 'posted by the admin team',
+        'content': POST_TEXT
+    } for i in range(count)]
+
+def _tickets(count: int = 10) -> Tuple[List[dict], Dict[int, List[dict]]]:
+    tickets = [{
+        'id': i,
+        'title': f'Request {i}: season 2 of something',
+        'description': 'Please add the full season in 1080p, subtitles if possible. ' * 4,
+        'status': 'pending',
+        'username': f'user{i}',
+        'created_at': '2026-01-01 12:00:00',
+        'total_records': 500
+    } for i in range(count)]
+    messages = {
+        t['id']: [{
+            'created_at': '2026-01-02 12:00:00',
+            'old_status': 'pending',
+            'new_status': 'in progress',
+            'status_message': 'Found a source, downloading now.'
+        }] * 3
+        for t in tickets
+    }
+    return tickets, messages
+
+def _tags(count: int = 30) -> List[dict]:
+    return [{'id': i, 'name': f'tag-{i}'} for i in range(count)]
+
+
+
+# -----------------------------------------------------------------------------
+# Benchmarks
+# -----------------------------------------------------------------------------
+
+@benchmark('utils.format_post')
+def _format_post():
+    from utils import format_post
+    return lambda: format_post(POST_TEXT)
+
+@benchmark('utils.validate_password')
+def _validate_password():
+    from utils import validate_password
+    return lambda: [validate_password(p) for p in PASSWORDS]
+
+@benchmark('utils.get_pagination_metadata')
+def _pagination():
+    from utils import get_pagination_metadata
+    return lambda: get_pagination_metadata(5, 10, 10_000, 'users.requests', status='pending', tags='3,17', match='all', my_requests='1')
+
+@benchmark('factory.build_page')
+def _build_page():
+    from factory import build_page
+    from components.widgets import WidgetText
+    return lambda: build_page(content=[WidgetText(content='hello')], title='bench')
+
+@benchmark('scene.announcements')
+def _announcement_scene():
+    from blueprints.social import _build_announcement_scene
+    posts = _announcements()
+    return lambda: _build_announcement_scene(posts)
+
+@benchmark('scene.requests')
+def _requests_scene():
+    from blueprints.users import _build_requests_scene, RequestForm, RequestFilterForm, RequestSearchForm
+    from utils import get_pagination_metadata
+
+    tickets, messages = _tickets()
+    tags = _tags()
+    request_form = RequestForm()
+    filter_form = RequestFilterForm(meta={'csrf': False})
+    filter_form.tags.data = '3,17'
+    search_form = RequestSearchForm(meta={'csrf': False})
+    pagination = get_pagination_metadata(1, 10, 500, 'users.requests')
+
+    return lambda: _build_requests_scene(request_form, filter_form, search_form, tickets, pagination, tags, messages)
+
+@benchmark('render.announcements')
+def _render_announcements():
+    from flask import render_template
+    from blueprints.social import _build_announcement_scene
+    page = _build_announcement_scene(_announcements())
+    return lambda: render_template(page.template, this=page)
+
+@benchmark('render.requests')
+def _render_requests():
+    from flask import render_template
+    page = _requests_scene()()
+    return lambda: render_template(page.template, this=page)
+
+
+
+# -----------------------------------------------------------------------------
+# Harness
+# -----------------------------------------------------------------------------
+
+def measure(func: Callable[[], object], rounds: int, min_time: float) -> Dict[str, float]:
+    """
+    Return per-call timings in microseconds over several calibrated rounds.
+    """
+
+    # calibrate: grow the loop count until one round takes min_time
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(2, int(min_time / elapsed * 1.2))
+
+    per_call = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        per_call.append((time.perf_counter() - started) / loops * 1e6)
+
+    return {
+        'min': min(per_call),
+        'median': statistics.median(per_call),
+        'stdev': statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        'loops': loops,
+        'rounds': rounds
+    }
+
+# -----------------------------------------------------------------------------
+
+def run(args) -> Dict[str, Dict[str, float]]:
+    """
+    Run every selected benchmark inside a request context with a logged-in
+    admin session, so url_for, session and CSRF behave as in a real request.
+    """
+
+    from flask import session
+    from app import create_app
+
+    app = create_app()
+    results = {}
+
+    with app.test_request_context('/users/requests'):
+        session.update({'user_id': 1, 'username': 'bench', 'role': 'admin'})
+        for name, setup in BENCHMARKS.items():
+            if args.filter and args.filter not in name:
+                continue
+            results[name] = measure(setup(), args.rounds, args.min_time)
+            print(f"{name:<32} {results[name]['min']:>10.1f} us  (median {results[name]['median']:.1f}, {results[name]['loops']} loops)")
+
+    return results
+
+# -----------------------------------------------------------------------------
+
+def compare(baseline: Dict, results: Dict, threshold: float) -> bool:
+    ok = True
+    print(f"\n{'benchmark':<32} {'base us':>10} {'now us':>10} {'change':>8}")
+    for name, now in results.items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if base is None:
+            print(f"{name:<32} {'-':>10} {now['min']:>10.1f}      new")
+            continue
+        change = regression(base['min'], now['min'])
+        failed = change > threshold
+        ok = ok and not failed
+        print(f"{name:<32} {base['min']:>10.1f} {now['min']:>10.1f} {change:>+7.1f}%{'  REGRESSED' if failed else ''}")
+    return ok
+
+
+
+# -----------------------------------------------------------------------------
+# Entry Point
+# -----------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--filter', help='only run benchmarks whose name contains this')
+    parser.add_argument('--rounds', type=int, default=7)
+    parser.add_argument('--min-time', type=float, default=0.1, help='minimum seconds per round')
+    parser.add_argument('--save', help='write results as a baseline to this path')
+    parser.add_argument('--compare', help='baseline to compare against; exits 1 on regression')
+    parser.add_argument('--threshold', type=float, default=15.0, help='allowed slowdown in percent')
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.save:
+        save_json(args.save, {
+            'python': sys.version.split()[0],
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'benchmarks': results
+        })
+    if args.compare and not compare(load_json(args.compare), results, args.threshold):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
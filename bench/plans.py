@@ -0,0 +1,211 @@
+# plans.py - Query-plan regression checks for the list procedures
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Fail if a list procedure filesorts or table-scans on seeded data.
+
+    python bench/seed.py --scale 0.1 --reset
+    python bench/plans.py
+
+A CALL cannot be EXPLAINed, and the interesting statements are inside the
+procedures (some built with PREPARE), so each case is executed for real and
+judged by the session status counters it moves: Sort_scan/Sort_range count
+filesorts, Handler_read_rnd_next counts rows read by table scans and
+Select_full_join counts joins without a usable index. This sees the plan of
+every statement in the procedure exactly as the server ran it.
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+from common import root_connection
+
+COUNTERS = [
+    'Sort_scan',
+    'Sort_range',
+    'Select_scan',
+    'Select_full_join',
+    'Handler_read_rnd_next',
+    'Handler_read_key',
+    'Handler_read_next',
+    'Handler_read_prev',
+    'Created_tmp_tables'
+]
+
+# Table scans under this many rows are tolerated (tiny lookup tables).
+SCAN_BUDGET = 1000
+
+# Tables below this size get plans the optimizer would never pick on real data.
+MIN_TICKETS = 10_000
+
+
+
+# -----------------------------------------------------------------------------
+# Cases
+# -----------------------------------------------------------------------------
+
+def cases(conn) -> List[Tuple[str, str, list, bool]]:
+    """
+    (label, procedure, args, sort_allowed) for every list procedure, using
+    ids/names that exist in the seeded data.
+    """
+
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, name FROM TicketTags WHERE is_deleted = FALSE ORDER BY id LIMIT 2")
+    rows = cursor.fetchall()
+    hot_tag = rows[0][1] if rows else 'none'
+    hot_tag_ids = json.dumps([row[0] for row in rows])
+    cursor.execute("SELECT u_id FROM Tickets ORDER BY id LIMIT 1")
+    row = cursor.fetchone()
+    author = row[0] if row else 1
+    cursor.close()
+
+    return [
+        ('announcements feed', 'sp_fetch_announcements', [], False),
+        ('admin announcements by date', 'sp_admin_fetch_announcements', [25, 0, 'created_at', 'desc'], False),
+        ('admin announcements by id', 'sp_admin_fetch_announcements', [25, 0, 'id', 'asc'], False),
+        ('admin users by id', 'sp_admin_fetch_users', [25, 0, 'id', 'desc'], False),
+        ('admin users by username', 'sp_admin_fetch_users', [25, 0, 'username', 'asc'], False),
+        ('admin users by role', 'sp_admin_fetch_users', [25, 0, 'role', 'asc'], False),
+        ('admin users by status', 'sp_admin_fetch_users', [25, 0, 'status', 'desc'], False),
+        ('requests default', 'sp_fetch_tickets', ['request', None, None, 10, 0], False),
+        ('requests by status', 'sp_fetch_tickets', ['request', 'pending', None, 10, 0], False),
+        ('requests by hot tag', 'sp_fetch_tickets', ['request', None, hot_tag, 10, 0], False),
+        ('reports deep page', 'sp_fetch_tickets', ['report', None, None, 10, 500], False),
+        ('my requests', 'sp_fetch_tickets_by_user', [author, 'request', None, None, 10, 0], False),
+        ('admin requests', 'sp_admin_fetch_tickets', ['request', None, None, None, 25, 0], False),
+        ('admin reports assigned', 'sp_admin_fetch_tickets', ['report', 'open', 1, None, 25, 0], False),
+        # relevance ordering always sorts, but only the FULLTEXT matches
+        # several tags: the newest-first order is sorted over the candidates
+        ('requests any of 2 tags', 'sp_fetch_tickets_by_tags', [None, 'request', None, hot_tag_ids, False, 10, 0], True),
+        ('requests all of 2 tags', 'sp_fetch_tickets_by_tags', [None, 'request', 'pending', hot_tag_ids, True, 10, 0], True),
+        ('my requests any of 2 tags', 'sp_fetch_tickets_by_tags', [author, 'request', None, hot_tag_ids, False, 10, 0], True),
+        ('search requests', 'sp_search_tickets', ['+season*', None, 'request', None, '[]', False, 10, 0], True),
+        ('search my requests by tags', 'sp_search_tickets', ['+season*', author, 'request', None, hot_tag_ids, True, 10, 0], True),
+        ('admin search reports', 'sp_admin_search_tickets', ['+disk*', 'report', 'open', 25, 0], True),
+        ('search announcements', 'sp_search_announcements', ['+server*', 25, 0], True),
+        ('feed timeline', 'sp_feed_fetch_timeline', [None, 20], False),
+        ('feed timeline older', 'sp_feed_fetch_timeline', [1_000_000, 20], False),
+        ('board index', 'sp_board_fetch_index', [], True),
+        ('board threads', 'sp_board_fetch_threads', [1, 25, 0], False),
+        ('board posts first page', 'sp_board_fetch_posts', [1, None, None, 25], False),
+        ('board posts latest page', 'sp_board_fetch_posts', [1, None, 2 ** 31 - 1, 25], False),
+        ('media browse all', 'sp_media_browse', [None, 'newest', None, None, 50], False),
+        ('media browse video longest', 'sp_media_browse', ['video', 'longest', None, None, 50], False),
+        ('media browse audio a-z deep', 'sp_media_browse', ['audio', 'title', 'm', 0, 50], False)
+    ]
+
+
+
+# -----------------------------------------------------------------------------
+# Measurement
+# -----------------------------------------------------------------------------
+
+def _status(cursor) -> Dict[str, int]:
+    cursor.execute(
+        "SHOW SESSION STATUS WHERE Variable_name IN (" + ', '.join(['%s'] * len(COUNTERS)) + ")",
+        COUNTERS
+    )
+    return {name: int(value) for name, value in cursor.fetchall()}
+
+def _delta(before: Dict[str, int], after: Dict[str, int], overhead: Dict[str, int]) -> Dict[str, int]:
+    return {name: after[name] - before[name] - overhead.get(name, 0) for name in COUNTERS}
+
+# -----------------------------------------------------------------------------
+
+def measure(conn, proc: str, args: list, overhead: Dict[str, int]) -> Dict[str, int]:
+    cursor = conn.cursor()
+    before = _status(cursor)
+    cursor.callproc(proc, args)
+    for result in cursor.stored_results():
+        result.fetchall()
+    after = _status(cursor)
+    cursor.close()
+    return _delta(before, after, overhead)
+
+def status_overhead(conn) -> Dict[str, int]:
+    """
+    SHOW STATUS materialises a temporary table and scans it, which moves
+    the counters it reports; measure that so it can be subtracted.
+    """
+
+    cursor = conn.cursor()
+    first = _status(cursor)
+    second = _status(cursor)
+    cursor.close()
+    return {name: second[name] - first[name] for name in COUNTERS}
+
+# -----------------------------------------------------------------------------
+
+def verdict(counters: Dict[str, int], sort_allowed: bool) -> List[str]:
+    problems = []
+    sorts = counters['Sort_scan'] + counters['Sort_range']
+    if sorts and not sort_allowed:
+        problems.append(f"{sorts} filesort(s)")
+    if counters['Handler_read_rnd_next'] > SCAN_BUDGET:
+        problems.append(f"table scan ({counters['Handler_read_rnd_next']:,} rows)")
+    if counters['Select_full_join']:
+        problems.append('join without index')
+    return problems
+
+
+
+# -----------------------------------------------------------------------------
+# Entry Point
+# -----------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--filter', help='only run cases whose label contains this')
+    parser.add_argument('--verbose', action='store_true', help='print every counter')
+    args = parser.parse_args()
+
+    conn = root_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM Tickets")
+    if cursor.fetchone()[0] < MIN_TICKETS:
+        print(f"warning: fewer than {MIN_TICKETS:,} tickets; seed more data for meaningful plans")
+    cursor.close()
+
+    overhead = status_overhead(conn)
+    failures = 0
+
+    print(f"{'case':<30} {'sorts':>5} {'scan rows':>10} {'idx reads':>10}  result")
+    for label, proc, proc_args, sort_allowed in cases(conn):
+        if args.filter and args.filter not in label:
+            continue
+
+        counters = measure(conn, proc, proc_args, overhead)
+        problems = verdict(counters, sort_allowed)
+        failures += bool(problems)
+
+        index_reads = counters['Handler_read_key'] + counters['Handler_read_next'] + counters['Handler_read_prev']
+        print(
+            f"{label:<30} {counters['Sort_scan'] + counters['Sort_range']:>5} "
+            f"{counters['Handler_read_rnd_next']:>10,} {index_reads:>10,}  "
+            f"{'FAIL: ' + ', '.join(problems) if problems else 'ok'}"
+        )
+        if args.verbose:
+            print('    ' + ', '.join(f"{k}={v}" for k, v in counters.items()))
+
+    conn.close()
+    if failures:
+        sys.exit(f"\n{failures} case(s) regressed")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,465 @@
+# seed.py - Bulk-load synthetic data into the benchmark database
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Seed the benchmark database with synthetic rows.
+
+    python bench/seed.py                                # 100k users, 1M tickets
+    python bench/seed.py --scale 0.01 --reset           # small developer data set
+    python bench/seed.py --method load-data --tag-skew 1.3 --history-alpha 1.1
+
+Rows are written as root with explicit ids, so foreign keys can be generated
+without reading anything back. Account roles/statuses are a pure function of
+the user id (see account()) so the load generator can pick valid logins
+without querying the database.
+
+Skew: tag popularity follows a Zipf distribution (--tag-skew, 0 = uniform),
+so a handful of hot tags sit on most tickets, and status history lengths
+follow a Pareto distribution (--history-alpha, lower = longer tails) capped
+at --max-history messages per ticket.
+"""
+
+import argparse
+import bisect
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from common import BENCH_PASSWORD, root_connection
+
+TABLES = [
+    'TicketStatusMessages',
+    'TicketAssignments',
+    'TicketTagLinks',
+    'TicketTags',
+    'Tickets',
+    'Announcements',
+    'Users'
+]
+
+# counts at --scale 1
+BASE_COUNTS = {
+    'users': 100_000,
+    'tickets': 1_000_000,
+    'announcements': 2_000,
+    'tags': 200
+}
+
+REQUEST_STATUSES = ['pending', 'in progress', 'completed', 'rejected']
+REPORT_STATUSES = ['open', 'in progress', 'closed', 'wontfix']
+PRIORITIES = ['very low', 'low', 'medium', 'high', 'very high']
+
+WORDS = (
+    'archive backup bandwidth cache codec container disk drive episode film '
+    'library mirror network playlist queue release season server share '
+    'stream subtitle torrent upload video volume'
+).split()
+
+NOW = datetime.now().replace(microsecond=0)
+
+
+
+# -----------------------------------------------------------------------------
+# Deterministic Accounts
+# -----------------------------------------------------------------------------
+
+def username(user_id: int) -> str:
+    return f"bench{user_id:07d}"
+
+# -----------------------------------------------------------------------------
+
+def account(user_id: int) -> Tuple[str, str]:
+    """
+    Return (role, status) for a seeded user id. User 1 is always an active
+    admin; roughly 1% admins, 30% users, the rest social, and ~10% of
+    accounts are requested/suspended/banned.
+    """
+
+    if user_id == 1 or user_id % 100 == 0:
+        role = 'admin'
+    elif user_id % 100 < 30:
+        role = 'user'
+    else:
+        role = 'social'
+
+    if user_id != 1 and user_id % 20 == 7:
+        status = 'requested'
+    elif user_id % 50 == 13:
+        status = 'suspended'
+    elif user_id % 50 == 29:
+        status = 'banned'
+    else:
+        status = 'active'
+
+    return role, status
+
+# -----------------------------------------------------------------------------
+
+def active_ids(users: int, roles: Sequence[str]) -> List[int]:
+    """
+    Every active seeded user id whose role is in roles.
+    """
+
+    return [
+        user_id for user_id in range(1, users + 1)
+        if account(user_id)[0] in roles and account(user_id)[1] == 'active'
+    ]
+
+
+
+# -----------------------------------------------------------------------------
+# Distributions
+# -----------------------------------------------------------------------------
+
+class Zipf:
+    """
+    Draw ids 1..n with P(k) proportional to 1 / k^s (s = 0 is uniform).
+    """
+
+    def __init__(self, n: int, s: float):
+        self.cum = list(itertools.accumulate(1 / (k ** s) for k in range(1, n + 1)))
+
+    def draw(self, rng: random.Random) -> int:
+        return bisect.bisect_left(self.cum, rng.random() * self.cum[-1]) + 1
+
+    def distinct(self, rng: random.Random, count: int) -> List[int]:
+        count = min(count, len(self.cum))
+        picked = set()
+        while len(picked) < count:
+            picked.add(self.draw(rng))
+        return list(picked)
+
+# -----------------------------------------------------------------------------
+
+def history_length(rng: random.Random, alpha: float, cap: int) -> int:
+    """
+    Pareto-distributed status history length: most tickets have 0-2
+    messages, a few have hundreds.
+    """
+
+    return min(cap, int(rng.paretovariate(alpha)) - 1)
+
+# -----------------------------------------------------------------------------
+
+class TextPool:
+    """
+    Pre-generated sentences, so generating millions of rows does not spend
+    most of its time picking words.
+    """
+
+    def __init__(self, rng: random.Random, min_words: int, max_words: int, size: int = 2000):
+        self.items = [
+            ' '.join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words)))
+            for _ in range(size)
+        ]
+
+    def pick(self, rng: random.Random) -> str:
+        return self.items[rng.randrange(len(self.items))]
+
+# -----------------------------------------------------------------------------
+
+def _timestamp(rng: random.Random, days: int = 365) -> str:
+    return (NOW - timedelta(seconds=rng.randrange(days * 86400))).strftime('%Y-%m-%d %H:%M:%S')
+
+
+
+# -----------------------------------------------------------------------------
+# Row Generators
+# -----------------------------------------------------------------------------
+
+def gen_users(rng: random.Random, count: int, password_hash: str) -> Iterator[tuple]:
+    suspended_until = (NOW + timedelta(days=7)).strftime('%Y-%m-%d %H:%M:%S')
+    for user_id in range(1, count + 1):
+        role, status = account(user_id)
+        yield (
+            user_id, username(user_id), password_hash, f"{username(user_id)}@bench.invalid",
+            role, status, suspended_until if status == 'suspended' else None, _timestamp(rng, 730)
+        )
+
+# -----------------------------------------------------------------------------
+
+def gen_announcements(rng: random.Random, count: int, admin_ids: List[int]) -> Iterator[tuple]:
+    titles = TextPool(rng, 3, 6, 200)
+    bodies = TextPool(rng, 40, 200, 200)
+    for post_id in range(1, count + 1):
+        yield (
+            post_id, rng.choice(admin_ids), titles.pick(rng).title(), titles.pick(rng),
+            bodies.pick(rng), None, rng.random() < 0.9, _timestamp(rng)
+        )
+
+# -----------------------------------------------------------------------------
+
+def gen_tickets(rng: random.Random, count: int, author_ids: List[int]) -> Iterator[tuple]:
+    titles = TextPool(rng, 3, 8)
+    bodies = TextPool(rng, 10, 60)
+    for ticket_id in range(1, count + 1):
+        ticket_type = 'request' if rng.random() < 0.5 else 'report'
+        statuses = REQUEST_STATUSES if ticket_type == 'request' else REPORT_STATUSES
+        yield (
+            ticket_id, rng.choice(author_ids), ticket_type, titles.pick(rng),
+            bodies.pick(rng), rng.choice(statuses), rng.choice(PRIORITIES),
+            rng.random() < 0.03, _timestamp(rng)
+        )
+
+# -----------------------------------------------------------------------------
+
+def gen_tags(count: int) -> Iterator[tuple]:
+    for tag_id in range(1, count + 1):
+        yield (tag_id, f"{WORDS[tag_id % len(WORDS)]}-{tag_id}")
+
+# -----------------------------------------------------------------------------
+
+def gen_tag_links(rng: random.Random, tickets: int, tags: Zipf) -> Iterator[tuple]:
+    for ticket_id in range(1, tickets + 1):
+        for tag_id in tags.distinct(rng, rng.randint(0, 3)):
+            yield (ticket_id, tag_id, rng.random() < 0.02)
+
+# -----------------------------------------------------------------------------
+
+def gen_assignments(rng: random.Random, tickets: int, admin_ids: List[int], ratio: float) -> Iterator[tuple]:
+    for ticket_id in range(1, tickets + 1):
+        if rng.random() >= ratio:
+            continue
+        for admin_id in rng.sample(admin_ids, min(len(admin_ids), rng.randint(1, 2))):
+            yield (ticket_id, admin_id, rng.choice(admin_ids), _timestamp(rng))
+
+# -----------------------------------------------------------------------------
+
+def gen_status_messages(rng: random.Random, tickets: int, admin_ids: List[int], alpha: float, cap: int) -> Iterator[tuple]:
+    messages = TextPool(rng, 5, 25)
+    for ticket_id in range(1, tickets + 1):
+        old_status = None
+        for _ in range(history_length(rng, alpha, cap)):
+            new_status = rng.choice(REQUEST_STATUSES)
+            yield (ticket_id, rng.choice(admin_ids), old_status, new_status, messages.pick(rng), _timestamp(rng))
+            old_status = new_status
+
+
+
+# -----------------------------------------------------------------------------
+# Writers
+# -----------------------------------------------------------------------------
+
+def _chunks(rows: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# -----------------------------------------------------------------------------
+
+def insert_rows(conn, table: str, columns: Sequence[str], rows: Iterable[tuple], chunk_size: int = 2000) -> int:
+    """
+    Write rows with one multi-row INSERT per chunk and commit per chunk.
+
+    :return: Number of rows written.
+    """
+
+    placeholders = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    prefix = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+    cursor = conn.cursor()
+    written = 0
+
+    for chunk in _chunks(rows, chunk_size):
+        cursor.execute(prefix + ', '.join([placeholders] * len(chunk)), [v for row in chunk for v in row])
+        conn.commit()
+        written += len(chunk)
+
+    cursor.close()
+    return written
+
+# -----------------------------------------------------------------------------
+
+def _tsv_field(value) -> str:
+    if value is None:
+        return '\\N'
+    if value is True or value is False:
+        return '1' if value else '0'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+def load_data_rows(conn, table: str, columns: Sequence[str], rows: Iterable[tuple], chunk_size: int = 250_000) -> int:
+    """
+    Write rows through LOAD DATA LOCAL INFILE, one temporary TSV file per
+    chunk. Needs local_infile enabled on the server (bench/compose.yml does)
+    and a connection opened with allow_local_infile=True.
+
+    :return: Number of rows written.
+    """
+
+    sql = (
+        f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+        f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(columns)})"
+    )
+    cursor = conn.cursor()
+    written = 0
+
+    for chunk in _chunks(rows, chunk_size):
+        with tempfile.NamedTemporaryFile('w', suffix='.tsv', delete=False, encoding='utf-8') as f:
+            for row in chunk:
+                f.write('\t'.join(_tsv_field(v) for v in row))
+                f.write('\n')
+        try:
+            cursor.execute(sql, (f.name,))
+            conn.commit()
+        finally:
+            os.remove(f.name)
+        written += len(chunk)
+
+    cursor.close()
+    return written
+
+# -----------------------------------------------------------------------------
+
+def reset(conn) -> None:
+    cursor = conn.cursor()
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    for table in TABLES:
+        cursor.execute(f"TRUNCATE TABLE {table}")
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+    cursor.close()
+
+
+
+# -----------------------------------------------------------------------------
+# Entry Point
+# -----------------------------------------------------------------------------
+
+def seed(
+    users: int = BASE_COUNTS['users'],
+    tickets: int = BASE_COUNTS['tickets'],
+    announcements: int = BASE_COUNTS['announcements'],
+    tags: int = BASE_COUNTS['tags'],
+    tag_skew: float = 1.1,
+    history_alpha: float = 1.5,
+    max_history: int = 200,
+    assigned_ratio: float = 0.3,
+    method: str = 'insert',
+    random_seed: int = 1,
+    reset_tables: bool = False,
+    conn=None
+) -> None:
+    """
+    Load a complete synthetic data set. Importable so other tools (the load
+    generator, plan checks) can build their own fixtures.
+    """
+
+    from argon2 import PasswordHasher
+
+    rng = random.Random(random_seed)
+    own_conn = conn is None
+    if own_conn:
+        conn = root_connection(allow_local_infile=(method == 'load-data'))
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT COUNT(*) FROM Users")
+    if cursor.fetchone()[0] and not reset_tables:
+        sys.exit("Users is not empty; pass --reset to truncate the seeded tables first.")
+    if reset_tables:
+        reset(conn)
+
+    # the load is ordered by primary key, so relax per-row checks for speed
+    cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+
+    admin_ids = active_ids(users, ['admin'])
+    author_ids = active_ids(users, ['admin', 'user'])
+    password_hash = PasswordHasher().hash(BENCH_PASSWORD)
+    write = load_data_rows if method == 'load-data' else insert_rows
+
+    plan = [
+        ('Users',
+            ['id', 'username', 'password_hash', 'email', 'role', 'status', 'suspended_until', 'created_at'],
+            gen_users(rng, users, password_hash)),
+        ('Announcements',
+            ['id', 'u_id', 'title', 'subtitle', 'content', 'footnote', 'is_visible', 'created_at'],
+            gen_announcements(rng, announcements, admin_ids)),
+        ('Tickets',
+            ['id', 'u_id', 'ticket_type', 'title', 'description', 'status', 'priority', 'is_deleted', 'created_at'],
+            gen_tickets(rng, tickets, author_ids)),
+        ('TicketTags', ['id', 'name'], gen_tags(tags)),
+        ('TicketTagLinks', ['ticket_id', 'tag_id', 'is_deleted'],
+            gen_tag_links(rng, tickets, Zipf(tags, tag_skew))),
+        ('TicketAssignments', ['ticket_id', 'assigned_admin_u_id', 'assigned_by_u_id', 'created_at'],
+            gen_assignments(rng, tickets, admin_ids, assigned_ratio)),
+        ('TicketStatusMessages',
+            ['ticket_id', 'changed_by_u_id', 'old_status', 'new_status', 'status_message', 'created_at'],
+            gen_status_messages(rng, tickets, admin_ids, history_alpha, max_history))
+    ]
+
+    started = time.perf_counter()
+    print(f"Seeding {users:,} users / {tickets:,} tickets via {method} (seed {random_seed})")
+
+    for table, columns, rows in plan:
+        table_started = time.perf_counter()
+        written = write(conn, table, columns, rows)
+        elapsed = time.perf_counter() - table_started
+        print(f"  {table:<22} {written:>11,} rows  {elapsed:7.1f}s  ({written / elapsed if elapsed else 0:,.0f} rows/s)")
+
+    cursor.execute("SET SESSION unique_checks = 1, foreign_key_checks = 1")
+    for table in TABLES:
+        cursor.execute(f"ANALYZE TABLE {table}")
+        cursor.fetchall()
+
+    cursor.close()
+    if own_conn:
+        conn.close()
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+# -----------------------------------------------------------------------------
+
+def _scaled(value: Optional[int], key: str, scale: float) -> int:
+    return value if value is not None else max(1, int(BASE_COUNTS[key] * scale))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier for every default count')
+    parser.add_argument('--users', type=int)
+    parser.add_argument('--tickets', type=int)
+    parser.add_argument('--announcements', type=int)
+    parser.add_argument('--tags', type=int)
+    parser.add_argument('--tag-skew', type=float, default=1.1, help='Zipf exponent for tag popularity (0 = uniform)')
+    parser.add_argument('--history-alpha', type=float, default=1.5, help='Pareto shape for status history length')
+    parser.add_argument('--max-history', type=int, default=200, help='cap on status messages per ticket')
+    parser.add_argument('--assigned', type=float, default=0.3, help='fraction of tickets assigned to admins')
+    parser.add_argument('--method', choices=['insert', 'load-data'], default='insert')
+    parser.add_argument('--seed', type=int, default=1, help='random seed, for repeatable data sets')
+    parser.add_argument('--reset', action='store_true', help='truncate seeded tables before loading')
+    args = parser.parse_args()
+
+    seed(
+        users=_scaled(args.users, 'users', args.scale),
+        tickets=_scaled(args.tickets, 'tickets', args.scale),
+        announcements=_scaled(args.announcements, 'announcements', args.scale),
+        tags=_scaled(args.tags, 'tags', args.scale),
+        tag_skew=args.tag_skew,
+        history_alpha=args.history_alpha,
+        max_history=args.max_history,
+        assigned_ratio=args.assigned,
+        method=args.method,
+        random_seed=args.seed,
+        reset_tables=args.reset
+    )
+
+if __name__ == '__main__':
+    main()
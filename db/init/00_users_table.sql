@@ -28,5 +28,7 @@ CREATE TABLE IF NOT EXISTS Users (
     status ENUM('active', 'requested', 'suspended', 'banned') NOT NULL DEFAULT 'requested',
     suspended_until TIMESTAMP NULL DEFAULT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_users_role (role),
+    INDEX idx_users_status (status)
 );
@@ -25,6 +25,10 @@ DELIMITER //
 -- Notes:
 --      This function updates status for all users to remove suspended status
 --      if past the suspension_until timestamp.
+--      The sort column and direction are whitelisted and spliced into a
+--      prepared statement so the ORDER BY can be served by an index (id,
+--      uq username, idx_users_role, idx_users_status) instead of a filesort
+--      over every user. id breaks ties, matching the secondary index order.
 
 CREATE PROCEDURE sp_admin_fetch_users(
     IN p_limit INT,
@@ -34,13 +38,26 @@ CREATE PROCEDURE sp_admin_fetch_users(
 )
 BEGIN
 
+    DECLARE v_total INT DEFAULT 0;
+    DECLARE v_dir VARCHAR(4);
+    DECLARE v_sql TEXT;
+
     -- Hard caps to ensure that there's no nonsense from the caller
     IF p_limit > 100 THEN
         SET p_limit = 100;
     END IF;
-    IF p_limit <= 0 THEN
+    IF p_limit IS NULL OR p_limit <= 0 THEN
         SET p_limit = 25;
     END IF;
+    IF p_offset IS NULL OR p_offset < 0 THEN
+        SET p_offset = 0;
+    END IF;
+
+    -- Only ever splice known identifiers into the statement
+    IF p_sort_col IS NULL OR p_sort_col NOT IN ('id', 'username', 'role', 'status') THEN
+        SET p_sort_col = 'id';
+    END IF;
+    SET v_dir = IF(UPPER(p_sort_dir) = 'ASC', 'ASC', 'DESC');
 
     -- This is the status update from Notes above
     UPDATE Users
@@ -48,35 +65,19 @@ BEGIN
     WHERE status = 'suspended'
         AND suspended_until <= NOW();
 
-    -- Fetch data with total count so caller can calculate number of pages
-    SELECT
-        id,
-        username,
-        email,
-        role,
-        status,
-        suspended_until,
-        created_at,
-        updated_at,
-        COUNT(*) OVER() as total_records
-    FROM Users
-    ORDER BY
-
-        -- Integer Sorting (id)
-        CASE WHEN p_sort_col = 'id' AND UPPER(p_sort_dir) = 'ASC' THEN id END ASC,
-        CASE WHEN p_sort_col = 'id' AND UPPER(p_sort_dir) = 'DESC' THEN id END DESC,
-        
-        -- String Sorting (username, role, status)
-        CASE WHEN p_sort_col = 'username' AND UPPER(p_sort_dir) = 'ASC' THEN username END ASC,
-        CASE WHEN p_sort_col = 'username' AND UPPER(p_sort_dir) = 'DESC' THEN username END DESC,
-        
-        CASE WHEN p_sort_col = 'role' AND UPPER(p_sort_dir) = 'ASC' THEN role END ASC,
-        CASE WHEN p_sort_col = 'role' AND UPPER(p_sort_dir) = 'DESC' THEN role END DESC,
-        
-        CASE WHEN p_sort_col = 'status' AND UPPER(p_sort_dir) = 'ASC' THEN status END ASC,
-        CASE WHEN p_sort_col = 'status' AND UPPER(p_sort_dir) = 'DESC' THEN status END DESC
-
-    LIMIT p_limit OFFSET p_offset;
+    -- Total count so caller can calculate number of pages
+    SELECT COUNT(*) INTO v_total FROM Users;
+
+    SET v_sql = CONCAT(
+        'SELECT id, username, email, role, status, suspended_until, created_at, updated_at, ',
+        '? AS total_records FROM Users ORDER BY ', p_sort_col, ' ', v_dir,
+        IF(p_sort_col IN ('id', 'username'), '', CONCAT(', id ', v_dir)),
+        ' LIMIT ? OFFSET ?'
+    );
+
+    PREPARE stmt FROM v_sql;
+    EXECUTE stmt USING v_total, p_limit, p_offset;
+    DEALLOCATE PREPARE stmt;
 
 END //
 
@@ -32,5 +32,7 @@ CREATE TABLE IF NOT EXISTS Announcements (
     CONSTRAINT fk_announce_u_id
         FOREIGN KEY (u_id)
         REFERENCES Users (id)
-        ON DELETE CASCADE
+        ON DELETE CASCADE,
+    INDEX idx_announcements_visible_created (is_visible, created_at),
+    INDEX idx_announcements_created (created_at)
 );
\ No newline at end of file
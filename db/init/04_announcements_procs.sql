@@ -22,6 +22,9 @@ DELIMITER //
 -- ----------------------------------------------------------------------------
 -- Desc:
 --      Fetch the public feed of visible announcements.
+-- Notes:
+--      Reads idx_announcements_visible_created in order, so only the 25 rows
+--      returned are touched.
 
 CREATE PROCEDURE sp_fetch_announcements()
 BEGIN
@@ -125,6 +125,10 @@ END //
 -- ----------------------------------------------------------------------------
 -- Desc:
 --      Fetch a paginated list of all announcements (including hidden).
+-- Notes:
+--      Sort column and direction are whitelisted and spliced into a prepared
+--      statement so id/created_at ordering is read from an index. Title and
+--      username ordering still sort, which is fine at announcement volumes.
 
 CREATE PROCEDURE sp_admin_fetch_announcements(
     IN p_limit INT,
@@ -134,37 +138,40 @@ CREATE PROCEDURE sp_admin_fetch_announcements(
 )
 BEGIN
 
+    DECLARE v_total INT DEFAULT 0;
+    DECLARE v_dir VARCHAR(4);
+    DECLARE v_sql TEXT;
+
     -- Hard caps to ensure that there's no nonsense from the caller
     IF p_limit > 100 THEN
         SET p_limit = 100;
     END IF;
-    IF p_limit <= 0 THEN
+    IF p_limit IS NULL OR p_limit <= 0 THEN
         SET p_limit = 25;
     END IF;
+    IF p_offset IS NULL OR p_offset < 0 THEN
+        SET p_offset = 0;
+    END IF;
 
-    SELECT
-        a.id,
-        a.title,
-        a.created_at,
-        a.updated_at,
-        a.is_visible,
-        u.username,
-        COUNT(*) OVER() as total_records
-    FROM Announcements a
-    JOIN Users u ON a.u_id = u.id
-    ORDER BY
-        CASE WHEN p_sort_col = 'id' AND UPPER(p_sort_dir) = 'ASC' THEN a.id END ASC,
-        CASE WHEN p_sort_col = 'id' AND UPPER(p_sort_dir) = 'DESC' THEN a.id END DESC,
-        
-        CASE WHEN p_sort_col = 'title' AND UPPER(p_sort_dir) = 'ASC' THEN a.title END ASC,
-        CASE WHEN p_sort_col = 'title' AND UPPER(p_sort_dir) = 'DESC' THEN a.title END DESC,
-
-        CASE WHEN p_sort_col = 'created_at' AND UPPER(p_sort_dir) = 'ASC' THEN a.created_at END ASC,
-        CASE WHEN p_sort_col = 'created_at' AND UPPER(p_sort_dir) = 'DESC' THEN a.created_at END DESC,
-
-        CASE WHEN p_sort_col = 'username' AND UPPER(p_sort_dir) = 'ASC' THEN u.username END ASC,
-        CASE WHEN p_sort_col = 'username' AND UPPER(p_sort_dir) = 'DESC' THEN u.username END DESC
-    LIMIT p_limit OFFSET p_offset;
+    -- Only ever splice known identifiers into the statement
+    IF p_sort_col IS NULL OR p_sort_col NOT IN ('id', 'title', 'created_at', 'username') THEN
+        SET p_sort_col = 'created_at';
+    END IF;
+    SET v_dir = IF(UPPER(p_sort_dir) = 'ASC', 'ASC', 'DESC');
+
+    SELECT COUNT(*) INTO v_total FROM Announcements;
+
+    SET v_sql = CONCAT(
+        'SELECT a.id, a.title, a.created_at, a.updated_at, a.is_visible, u.username, ',
+        '? AS total_records FROM Announcements a JOIN Users u ON a.u_id = u.id ',
+        'ORDER BY ', IF(p_sort_col = 'username', 'u.username', CONCAT('a.', p_sort_col)), ' ', v_dir,
+        IF(p_sort_col = 'id', '', CONCAT(', a.id ', v_dir)),
+        ' LIMIT ? OFFSET ?'
+    );
+
+    PREPARE stmt FROM v_sql;
+    EXECUTE stmt USING v_total, p_limit, p_offset;
+    DEALLOCATE PREPARE stmt;
 
 END //
 
@@ -46,7 +46,9 @@ CREATE TABLE IF NOT EXISTS Tickets (
     INDEX idx_tickets_u_id (u_id),
     INDEX idx_tickets_type_status (ticket_type, status),
     INDEX idx_tickets_priority (priority),
-    INDEX idx_tickets_deleted (is_deleted)
+    INDEX idx_tickets_deleted (is_deleted),
+    INDEX idx_tickets_list (is_deleted, ticket_type, created_at, status),
+    INDEX idx_tickets_user_list (u_id, is_deleted, ticket_type, created_at, status)
 );
 
 CREATE TABLE IF NOT EXISTS TicketTags (
@@ -55,6 +55,11 @@ END //
 -- ----------------------------------------------------------------------------
 -- Desc:
 --      Fetch active tickets with optional filtering by type, status, and tag.
+-- Notes:
+--      The total is counted separately (from idx_tickets_list alone) instead
+--      of COUNT(*) OVER(), which forced every matching row to be read and
+--      sorted before LIMIT applied. The page itself is then read in
+--      created_at order straight off idx_tickets_list.
 
 CREATE PROCEDURE sp_fetch_tickets(
     IN p_ticket_type VARCHAR(20),
@@ -65,12 +70,47 @@ CREATE PROCEDURE sp_fetch_tickets(
 )
 BEGIN
 
+    DECLARE v_total INT DEFAULT 0;
+    DECLARE v_tag_id INT DEFAULT NULL;
+
     IF p_limit > 100 THEN
         SET p_limit = 100;
     END IF;
-    IF p_limit <= 0 THEN
+    IF p_limit IS NULL OR p_limit <= 0 THEN
         SET p_limit = 25;
     END IF;
+    IF p_offset IS NULL OR p_offset < 0 THEN
+        SET p_offset = 0;
+    END IF;
+
+    -- Empty string means "no filter"; normalise so each test is a single IS NULL
+    SET p_ticket_type = NULLIF(p_ticket_type, '');
+    SET p_status = NULLIF(p_status, '');
+    SET p_tag_name = NULLIF(p_tag_name, '');
+
+    -- Resolve the tag once rather than joining TicketTags for every ticket
+    IF p_tag_name IS NOT NULL THEN
+        SELECT id INTO v_tag_id
+        FROM TicketTags
+        WHERE name = p_tag_name
+          AND is_deleted = FALSE;
+    END IF;
+
+    SELECT COUNT(*) INTO v_total
+    FROM Tickets t
+    WHERE t.is_deleted = FALSE
+      AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+      AND (p_status IS NULL OR t.status = p_status)
+      AND (
+            p_tag_name IS NULL
+            OR EXISTS (
+                SELECT 1
+                FROM TicketTagLinks ttl
+                WHERE ttl.ticket_id = t.id
+                  AND ttl.tag_id = v_tag_id
+                  AND ttl.is_deleted = FALSE
+            )
+        );
 
     SELECT
         t.id,
@@ -82,23 +122,20 @@ BEGIN
         t.created_at,
         t.updated_at,
         u.username,
-        COUNT(*) OVER() AS total_records
+        v_total AS total_records
     FROM Tickets t
     JOIN Users u ON t.u_id = u.id
     WHERE t.is_deleted = FALSE
-      AND (p_ticket_type IS NULL OR p_ticket_type = '' OR t.ticket_type = p_ticket_type)
-      AND (p_status IS NULL OR p_status = '' OR t.status = p_status)
+      AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+      AND (p_status IS NULL OR t.status = p_status)
       AND (
             p_tag_name IS NULL
-            OR p_tag_name = ''
             OR EXISTS (
                 SELECT 1
                 FROM TicketTagLinks ttl
-                JOIN TicketTags tt ON ttl.tag_id = tt.id
                 WHERE ttl.ticket_id = t.id
+                  AND ttl.tag_id = v_tag_id
                   AND ttl.is_deleted = FALSE
-                  AND tt.is_deleted = FALSE
-                  AND tt.name = p_tag_name
             )
         )
     ORDER BY t.created_at DESC
@@ -112,6 +149,8 @@ END //
 -- ----------------------------------------------------------------------------
 -- Desc:
 --      Fetch active tickets submitted by a specific user with optional filters.
+-- Notes:
+--      Same shape as sp_fetch_tickets, served by idx_tickets_user_list.
 
 CREATE PROCEDURE sp_fetch_tickets_by_user(
     IN p_u_id INT,
@@ -123,12 +162,46 @@ CREATE PROCEDURE sp_fetch_tickets_by_user(
 )
 BEGIN
 
+    DECLARE v_total INT DEFAULT 0;
+    DECLARE v_tag_id INT DEFAULT NULL;
+
     IF p_limit > 100 THEN
         SET p_limit = 100;
     END IF;
-    IF p_limit <= 0 THEN
+    IF p_limit IS NULL OR p_limit <= 0 THEN
         SET p_limit = 25;
     END IF;
+    IF p_offset IS NULL OR p_offset < 0 THEN
+        SET p_offset = 0;
+    END IF;
+
+    SET p_ticket_type = NULLIF(p_ticket_type, '');
+    SET p_status = NULLIF(p_status, '');
+    SET p_tag_name = NULLIF(p_tag_name, '');
+
+    IF p_tag_name IS NOT NULL THEN
+        SELECT id INTO v_tag_id
+        FROM TicketTags
+        WHERE name = p_tag_name
+          AND is_deleted = FALSE;
+    END IF;
+
+    SELECT COUNT(*) INTO v_total
+    FROM Tickets t
+    WHERE t.is_deleted = FALSE
+      AND t.u_id = p_u_id
+      AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+      AND (p_status IS NULL OR t.status = p_status)
+      AND (
+            p_tag_name IS NULL
+            OR EXISTS (
+                SELECT 1
+                FROM TicketTagLinks ttl
+                WHERE ttl.ticket_id = t.id
+                  AND ttl.tag_id = v_tag_id
+                  AND ttl.is_deleted = FALSE
+            )
+        );
 
     SELECT
         t.id,
@@ -139,23 +212,20 @@ BEGIN
         t.priority,
         t.created_at,
         t.updated_at,
-        COUNT(*) OVER() AS total_records
+        v_total AS total_records
     FROM Tickets t
     WHERE t.is_deleted = FALSE
       AND t.u_id = p_u_id
-      AND (p_ticket_type IS NULL OR p_ticket_type = '' OR t.ticket_type = p_ticket_type)
-      AND (p_status IS NULL OR p_status = '' OR t.status = p_status)
+      AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+      AND (p_status IS NULL OR t.status = p_status)
       AND (
             p_tag_name IS NULL
-            OR p_tag_name = ''
             OR EXISTS (
                 SELECT 1
                 FROM TicketTagLinks ttl
-                JOIN TicketTags tt ON ttl.tag_id = tt.id
                 WHERE ttl.ticket_id = t.id
+                  AND ttl.tag_id = v_tag_id
                   AND ttl.is_deleted = FALSE
-                  AND tt.is_deleted = FALSE
-                  AND tt.name = p_tag_name
             )
         )
     ORDER BY t.created_at DESC
@@ -223,6 +293,46 @@ END //
 
 
 
+-- sp_fetch_ticket_status_messages_batch(p_ticket_ids)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Active status message history of every ticket in the JSON array
+--      p_ticket_ids, grouped by ticket, newest first within each.
+-- Notes:
+--      One statement for a whole page of tickets: the ids are joined through
+--      JSON_TABLE, and each one is a range read on
+--      idx_ticketstatusmessages_ticket (ticket_id, is_deleted).
+
+CREATE PROCEDURE sp_fetch_ticket_status_messages_batch(
+    IN p_ticket_ids JSON
+)
+BEGIN
+
+    IF JSON_VALID(p_ticket_ids) THEN
+        SELECT
+            tsm.id,
+            tsm.ticket_id,
+            tsm.old_status,
+            tsm.new_status,
+            tsm.status_message,
+            tsm.created_at,
+            u.username AS changed_by_username
+        FROM (
+            SELECT DISTINCT j.ticket_id
+            FROM JSON_TABLE(p_ticket_ids, '$[*]' COLUMNS (ticket_id INT PATH '$' NULL ON ERROR)) AS j
+            WHERE j.ticket_id IS NOT NULL
+            LIMIT 1000
+        ) ids
+        JOIN TicketStatusMessages tsm ON tsm.ticket_id = ids.ticket_id
+        JOIN Users u ON tsm.changed_by_u_id = u.id
+        WHERE tsm.is_deleted = FALSE
+        ORDER BY tsm.ticket_id, tsm.created_at DESC;
+    END IF;
+
+END //
+
+
+
 -- sp_fetch_ticket_tags(p_ticket_id)
 -- ----------------------------------------------------------------------------
 -- Desc:
@@ -246,6 +356,7 @@ BEGIN
 END //
 
 
+
 -- sp_fetch_ticket_tag_list()
 -- ----------------------------------------------------------------------------
 -- Desc:
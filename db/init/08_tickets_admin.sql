@@ -22,6 +22,9 @@ DELIMITER //
 -- ----------------------------------------------------------------------------
 -- Desc:
 --      Fetch active tickets with optional filtering for admin workflows.
+-- Notes:
+--      Same shape as sp_fetch_tickets. Index-ordered when a ticket type is
+--      given, which is how the admin views call it.
 
 CREATE PROCEDURE sp_admin_fetch_tickets(
     IN p_ticket_type VARCHAR(20),
@@ -33,12 +36,55 @@ CREATE PROCEDURE sp_admin_fetch_tickets(
 )
 BEGIN
 
+    DECLARE v_total INT DEFAULT 0;
+    DECLARE v_tag_id INT DEFAULT NULL;
+
     IF p_limit > 100 THEN
         SET p_limit = 100;
     END IF;
-    IF p_limit <= 0 THEN
+    IF p_limit IS NULL OR p_limit <= 0 THEN
         SET p_limit = 25;
     END IF;
+    IF p_offset IS NULL OR p_offset < 0 THEN
+        SET p_offset = 0;
+    END IF;
+
+    SET p_ticket_type = NULLIF(p_ticket_type, '');
+    SET p_status = NULLIF(p_status, '');
+    SET p_tag_name = NULLIF(p_tag_name, '');
+
+    IF p_tag_name IS NOT NULL THEN
+        SELECT id INTO v_tag_id
+        FROM TicketTags
+        WHERE name = p_tag_name
+          AND is_deleted = FALSE;
+    END IF;
+
+    SELECT COUNT(*) INTO v_total
+    FROM Tickets t
+    WHERE t.is_deleted = FALSE
+        AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+        AND (p_status IS NULL OR t.status = p_status)
+        AND (
+            p_assigned_admin_u_id IS NULL
+            OR EXISTS (
+                SELECT 1
+                FROM TicketAssignments ta
+                WHERE ta.ticket_id = t.id
+                    AND ta.assigned_admin_u_id = p_assigned_admin_u_id
+                    AND ta.is_deleted = FALSE
+            )
+        )
+        AND (
+            p_tag_name IS NULL
+            OR EXISTS (
+                SELECT 1
+                FROM TicketTagLinks ttl
+                WHERE ttl.ticket_id = t.id
+                    AND ttl.tag_id = v_tag_id
+                    AND ttl.is_deleted = FALSE
+            )
+        );
 
     SELECT
         t.id,
@@ -49,12 +95,12 @@ BEGIN
         t.created_at,
         t.updated_at,
         u.username AS created_by_username,
-        COUNT(*) OVER() AS total_records
+        v_total AS total_records
     FROM Tickets t
     JOIN Users u ON t.u_id = u.id
     WHERE t.is_deleted = FALSE
-        AND (p_ticket_type IS NULL OR p_ticket_type = '' OR t.ticket_type = p_ticket_type)
-        AND (p_status IS NULL OR p_status = '' OR t.status = p_status)
+        AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+        AND (p_status IS NULL OR t.status = p_status)
         AND (
             p_assigned_admin_u_id IS NULL
             OR EXISTS (
@@ -67,15 +113,12 @@ BEGIN
         )
         AND (
             p_tag_name IS NULL
-            OR p_tag_name = ''
             OR EXISTS (
                 SELECT 1
                 FROM TicketTagLinks ttl
-                JOIN TicketTags tt ON ttl.tag_id = tt.id
                 WHERE ttl.ticket_id = t.id
+                    AND ttl.tag_id = v_tag_id
                     AND ttl.is_deleted = FALSE
-                    AND tt.is_deleted = FALSE
-                    AND tt.name = p_tag_name
             )
         )
     ORDER BY t.created_at DESC
@@ -369,6 +412,90 @@ END //
 
 
 
+-- sp_admin_fetch_ticket_bundle(p_id)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Fetch everything the admin ticket detail view needs in a single call.
+--      Returns four result sets: ticket, status messages, tags, assignments.
+-- Notes:
+--      Each result set mirrors the matching single-purpose procedure. All but
+--      the first are empty when the ticket does not exist or is deleted.
+
+CREATE PROCEDURE sp_admin_fetch_ticket_bundle(
+    IN p_id INT
+)
+BEGIN
+
+    DECLARE v_exists BOOLEAN DEFAULT FALSE;
+
+    SELECT COUNT(*) > 0 INTO v_exists
+    FROM Tickets
+    WHERE id = p_id
+        AND is_deleted = FALSE;
+
+    SELECT
+        t.id,
+        t.u_id,
+        t.ticket_type,
+        t.title,
+        t.description,
+        t.status,
+        t.priority,
+        t.created_at,
+        t.updated_at,
+        u.username
+    FROM Tickets t
+    JOIN Users u ON t.u_id = u.id
+    WHERE t.id = p_id
+        AND t.is_deleted = FALSE;
+
+    SELECT
+        tsm.id,
+        tsm.ticket_id,
+        tsm.old_status,
+        tsm.new_status,
+        tsm.status_message,
+        tsm.created_at,
+        u.username AS changed_by_username
+    FROM TicketStatusMessages tsm
+    JOIN Users u ON tsm.changed_by_u_id = u.id
+    WHERE v_exists
+        AND tsm.ticket_id = p_id
+        AND tsm.is_deleted = FALSE
+    ORDER BY tsm.created_at DESC;
+
+    SELECT
+        tt.id,
+        tt.name
+    FROM TicketTagLinks ttl
+    JOIN TicketTags tt ON ttl.tag_id = tt.id
+    WHERE v_exists
+        AND ttl.ticket_id = p_id
+        AND ttl.is_deleted = FALSE
+        AND tt.is_deleted = FALSE
+    ORDER BY tt.name ASC;
+
+    SELECT
+        ta.id,
+        ta.ticket_id,
+        ta.assigned_admin_u_id,
+        ua.username AS assigned_admin_username,
+        ta.assigned_by_u_id,
+        ub.username AS assigned_by_username,
+        ta.created_at,
+        ta.updated_at
+    FROM TicketAssignments ta
+    JOIN Users ua ON ta.assigned_admin_u_id = ua.id
+    LEFT JOIN Users ub ON ta.assigned_by_u_id = ub.id
+    WHERE v_exists
+        AND ta.ticket_id = p_id
+        AND ta.is_deleted = FALSE
+    ORDER BY ta.created_at DESC;
+
+END //
+
+
+
 -- sp_admin_delete_ticket(p_id)
 -- ----------------------------------------------------------------------------
 -- Desc:
@@ -91,6 +91,7 @@ GRANT EXECUTE ON PROCEDURE scavengers.sp_fetch_tickets TO 'scav_user'@'%';
 GRANT EXECUTE ON PROCEDURE scavengers.sp_fetch_tickets_by_user TO 'scav_user'@'%';
 GRANT EXECUTE ON PROCEDURE scavengers.sp_fetch_ticket TO 'scav_user'@'%';
 GRANT EXECUTE ON PROCEDURE scavengers.sp_fetch_ticket_status_messages TO 'scav_user'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_fetch_ticket_status_messages_batch TO 'scav_user'@'%';
 GRANT EXECUTE ON PROCEDURE scavengers.sp_fetch_ticket_tags TO 'scav_user'@'%';
 GRANT EXECUTE ON PROCEDURE scavengers.sp_fetch_ticket_tag_list TO 'scav_user'@'%';
 
@@ -109,6 +110,7 @@ GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_unlink_ticket_tag TO 'scav_admin'
 GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_assign_ticket TO 'scav_admin'@'%';
 GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_unassign_ticket TO 'scav_admin'@'%';
 GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_fetch_ticket_assignments TO 'scav_admin'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_fetch_ticket_bundle TO 'scav_admin'@'%';
 GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_delete_ticket TO 'scav_admin'@'%';
 
 
@@ -0,0 +1,502 @@
+-- 001_list_indexes.sql - Indexes for list procedures, count/page split
+-- Copyright (C) 2026 Aaron Reichenbach
+--
+-- This program is free software: you can redistribute it and/or modify
+-- it under the terms of the GNU Affero General Public License as
+-- published by the Free Software Foundation, either version 3 of the
+-- License, or (at your option) any later version.
+--
+-- This program is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+-- GNU Affero General Public License for more details.
+--
+-- You should have received a copy of the GNU Affero General Public License
+-- along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+-- Indexes
+-- ----------------------------------------------------------------------------
+-- Built online: INPLACE / LOCK=NONE keeps the tables readable and writable
+-- while the index builds. IF NOT EXISTS makes a re-run a no-op.
+
+ALTER TABLE Users
+    ADD INDEX IF NOT EXISTS idx_users_role (role),
+    ADD INDEX IF NOT EXISTS idx_users_status (status),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE Announcements
+    ADD INDEX IF NOT EXISTS idx_announcements_visible_created (is_visible, created_at),
+    ADD INDEX IF NOT EXISTS idx_announcements_created (created_at),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE Tickets
+    ADD INDEX IF NOT EXISTS idx_tickets_list (is_deleted, ticket_type, created_at, status),
+    ADD INDEX IF NOT EXISTS idx_tickets_user_list (u_id, is_deleted, ticket_type, created_at, status),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+
+
+-- Procedures
+-- ----------------------------------------------------------------------------
+-- Replaced in place; callers see the same parameters and columns.
+
+DELIMITER //
+
+-- sp_admin_fetch_users(p_limit, p_offset, p_sort_col, p_sort_dir)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Retrieve a paginated list of users.
+-- Notes:
+--      This function updates status for all users to remove suspended status
+--      if past the suspension_until timestamp.
+--      The sort column and direction are whitelisted and spliced into a
+--      prepared statement so the ORDER BY can be served by an index (id,
+--      uq username, idx_users_role, idx_users_status) instead of a filesort
+--      over every user. id breaks ties, matching the secondary index order.
+
+CREATE OR REPLACE PROCEDURE sp_admin_fetch_users(
+    IN p_limit INT,
+    IN p_offset INT,
+    IN p_sort_col VARCHAR(20),
+    IN p_sort_dir VARCHAR(4)
+)
+BEGIN
+
+    DECLARE v_total INT DEFAULT 0;
+    DECLARE v_dir VARCHAR(4);
+    DECLARE v_sql TEXT;
+
+    -- Hard caps to ensure that there's no nonsense from the caller
+    IF p_limit > 100 THEN
+        SET p_limit = 100;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 25;
+    END IF;
+    IF p_offset IS NULL OR p_offset < 0 THEN
+        SET p_offset = 0;
+    END IF;
+
+    -- Only ever splice known identifiers into the statement
+    IF p_sort_col IS NULL OR p_sort_col NOT IN ('id', 'username', 'role', 'status') THEN
+        SET p_sort_col = 'id';
+    END IF;
+    SET v_dir = IF(UPPER(p_sort_dir) = 'ASC', 'ASC', 'DESC');
+
+    -- This is the status update from Notes above
+    UPDATE Users
+    SET status = 'active', suspended_until = NULL
+    WHERE status = 'suspended'
+        AND suspended_until <= NOW();
+
+    -- Total count so caller can calculate number of pages
+    SELECT COUNT(*) INTO v_total FROM Users;
+
+    SET v_sql = CONCAT(
+        'SELECT id, username, email, role, status, suspended_until, created_at, updated_at, ',
+        '? AS total_records FROM Users ORDER BY ', p_sort_col, ' ', v_dir,
+        IF(p_sort_col IN ('id', 'username'), '', CONCAT(', id ', v_dir)),
+        ' LIMIT ? OFFSET ?'
+    );
+
+    PREPARE stmt FROM v_sql;
+    EXECUTE stmt USING v_total, p_limit, p_offset;
+    DEALLOCATE PREPARE stmt;
+
+END //
+
+
+
+-- sp_fetch_announcements()
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Fetch the public feed of visible announcements.
+-- Notes:
+--      Reads idx_announcements_visible_created in order, so only the 25 rows
+--      returned are touched.
+
+CREATE OR REPLACE PROCEDURE sp_fetch_announcements()
+BEGIN
+
+    SELECT
+        a.id,
+        a.title,
+        a.subtitle,
+        a.content,
+        a.footnote,
+        a.created_at,
+        u.username
+    FROM Announcements a
+    JOIN Users u ON a.u_id = u.id
+    WHERE a.is_visible = TRUE
+    ORDER BY a.created_at DESC
+    LIMIT 25;
+
+END //
+
+
+
+-- sp_admin_fetch_announcements(p_limit, p_offset, p_sort_col, p_sort_dir)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Fetch a paginated list of all announcements (including hidden).
+-- Notes:
+--      Sort column and direction are whitelisted and spliced into a prepared
+--      statement so id/created_at ordering is read from an index. Title and
+--      username ordering still sort, which is fine at announcement volumes.
+
+CREATE OR REPLACE PROCEDURE sp_admin_fetch_announcements(
+    IN p_limit INT,
+    IN p_offset INT,
+    IN p_sort_col VARCHAR(20),
+    IN p_sort_dir VARCHAR(4)
+)
+BEGIN
+
+    DECLARE v_total INT DEFAULT 0;
+    DECLARE v_dir VARCHAR(4);
+    DECLARE v_sql TEXT;
+
+    -- Hard caps to ensure that there's no nonsense from the caller
+    IF p_limit > 100 THEN
+        SET p_limit = 100;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 25;
+    END IF;
+    IF p_offset IS NULL OR p_offset < 0 THEN
+        SET p_offset = 0;
+    END IF;
+
+    -- Only ever splice known identifiers into the statement
+    IF p_sort_col IS NULL OR p_sort_col NOT IN ('id', 'title', 'created_at', 'username') THEN
+        SET p_sort_col = 'created_at';
+    END IF;
+    SET v_dir = IF(UPPER(p_sort_dir) = 'ASC', 'ASC', 'DESC');
+
+    SELECT COUNT(*) INTO v_total FROM Announcements;
+
+    SET v_sql = CONCAT(
+        'SELECT a.id, a.title, a.created_at, a.updated_at, a.is_visible, u.username, ',
+        '? AS total_records FROM Announcements a JOIN Users u ON a.u_id = u.id ',
+        'ORDER BY ', IF(p_sort_col = 'username', 'u.username', CONCAT('a.', p_sort_col)), ' ', v_dir,
+        IF(p_sort_col = 'id', '', CONCAT(', a.id ', v_dir)),
+        ' LIMIT ? OFFSET ?'
+    );
+
+    PREPARE stmt FROM v_sql;
+    EXECUTE stmt USING v_total, p_limit, p_offset;
+    DEALLOCATE PREPARE stmt;
+
+END //
+
+
+
+-- sp_fetch_tickets(p_ticket_type, p_status, p_tag_name, p_limit, p_offset)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Fetch active tickets with optional filtering by type, status, and tag.
+-- Notes:
+--      The total is counted separately (from idx_tickets_list alone) instead
+--      of COUNT(*) OVER(), which forced every matching row to be read and
+--      sorted before LIMIT applied. The page itself is then read in
+--      created_at order straight off idx_tickets_list.
+
+CREATE OR REPLACE PROCEDURE sp_fetch_tickets(
+    IN p_ticket_type VARCHAR(20),
+    IN p_status VARCHAR(20),
+    IN p_tag_name VARCHAR(64),
+    IN p_limit INT,
+    IN p_offset INT
+)
+BEGIN
+
+    DECLARE v_total INT DEFAULT 0;
+    DECLARE v_tag_id INT DEFAULT NULL;
+
+    IF p_limit > 100 THEN
+        SET p_limit = 100;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 25;
+    END IF;
+    IF p_offset IS NULL OR p_offset < 0 THEN
+        SET p_offset = 0;
+    END IF;
+
+    -- Empty string means "no filter"; normalise so each test is a single IS NULL
+    SET p_ticket_type = NULLIF(p_ticket_type, '');
+    SET p_status = NULLIF(p_status, '');
+    SET p_tag_name = NULLIF(p_tag_name, '');
+
+    -- Resolve the tag once rather than joining TicketTags for every ticket
+    IF p_tag_name IS NOT NULL THEN
+        SELECT id INTO v_tag_id
+        FROM TicketTags
+        WHERE name = p_tag_name
+          AND is_deleted = FALSE;
+    END IF;
+
+    SELECT COUNT(*) INTO v_total
+    FROM Tickets t
+    WHERE t.is_deleted = FALSE
+      AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+      AND (p_status IS NULL OR t.status = p_status)
+      AND (
+            p_tag_name IS NULL
+            OR EXISTS (
+                SELECT 1
+                FROM TicketTagLinks ttl
+                WHERE ttl.ticket_id = t.id
+                  AND ttl.tag_id = v_tag_id
+                  AND ttl.is_deleted = FALSE
+            )
+        );
+
+    SELECT
+        t.id,
+        t.ticket_type,
+        t.title,
+        t.description,
+        t.status,
+        t.priority,
+        t.created_at,
+        t.updated_at,
+        u.username,
+        v_total AS total_records
+    FROM Tickets t
+    JOIN Users u ON t.u_id = u.id
+    WHERE t.is_deleted = FALSE
+      AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+      AND (p_status IS NULL OR t.status = p_status)
+      AND (
+            p_tag_name IS NULL
+            OR EXISTS (
+                SELECT 1
+                FROM TicketTagLinks ttl
+                WHERE ttl.ticket_id = t.id
+                  AND ttl.tag_id = v_tag_id
+                  AND ttl.is_deleted = FALSE
+            )
+        )
+    ORDER BY t.created_at DESC
+    LIMIT p_limit OFFSET p_offset;
+
+END //
+
+
+
+-- sp_fetch_tickets_by_user(p_u_id, p_ticket_type, p_status, p_tag_name, p_limit, p_offset)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Fetch active tickets submitted by a specific user with optional filters.
+-- Notes:
+--      Same shape as sp_fetch_tickets, served by idx_tickets_user_list.
+
+CREATE OR REPLACE PROCEDURE sp_fetch_tickets_by_user(
+    IN p_u_id INT,
+    IN p_ticket_type VARCHAR(20),
+    IN p_status VARCHAR(20),
+    IN p_tag_name VARCHAR(64),
+    IN p_limit INT,
+    IN p_offset INT
+)
+BEGIN
+
+    DECLARE v_total INT DEFAULT 0;
+    DECLARE v_tag_id INT DEFAULT NULL;
+
+    IF p_limit > 100 THEN
+        SET p_limit = 100;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 25;
+    END IF;
+    IF p_offset IS NULL OR p_offset < 0 THEN
+        SET p_offset = 0;
+    END IF;
+
+    SET p_ticket_type = NULLIF(p_ticket_type, '');
+    SET p_status = NULLIF(p_status, '');
+    SET p_tag_name = NULLIF(p_tag_name, '');
+
+    IF p_tag_name IS NOT NULL THEN
+        SELECT id INTO v_tag_id
+        FROM TicketTags
+        WHERE name = p_tag_name
+          AND is_deleted = FALSE;
+    END IF;
+
+    SELECT COUNT(*) INTO v_total
+    FROM Tickets t
+    WHERE t.is_deleted = FALSE
+      AND t.u_id = p_u_id
+      AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+      AND (p_status IS NULL OR t.status = p_status)
+      AND (
+            p_tag_name IS NULL
+            OR EXISTS (
+                SELECT 1
+                FROM TicketTagLinks ttl
+                WHERE ttl.ticket_id = t.id
+                  AND ttl.tag_id = v_tag_id
+                  AND ttl.is_deleted = FALSE
+            )
+        );
+
+    SELECT
+        t.id,
+        t.ticket_type,
+        t.title,
+        t.description,
+        t.status,
+        t.priority,
+        t.created_at,
+        t.updated_at,
+        v_total AS total_records
+    FROM Tickets t
+    WHERE t.is_deleted = FALSE
+      AND t.u_id = p_u_id
+      AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+      AND (p_status IS NULL OR t.status = p_status)
+      AND (
+            p_tag_name IS NULL
+            OR EXISTS (
+                SELECT 1
+                FROM TicketTagLinks ttl
+                WHERE ttl.ticket_id = t.id
+                  AND ttl.tag_id = v_tag_id
+                  AND ttl.is_deleted = FALSE
+            )
+        )
+    ORDER BY t.created_at DESC
+    LIMIT p_limit OFFSET p_offset;
+
+END //
+
+
+
+-- sp_admin_fetch_tickets(p_ticket_type, p_status, p_assigned_admin_u_id, p_tag_name, p_limit, p_offset)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Fetch active tickets with optional filtering for admin workflows.
+-- Notes:
+--      Same shape as sp_fetch_tickets. Index-ordered when a ticket type is
+--      given, which is how the admin views call it.
+
+CREATE OR REPLACE PROCEDURE sp_admin_fetch_tickets(
+    IN p_ticket_type VARCHAR(20),
+    IN p_status VARCHAR(20),
+    IN p_assigned_admin_u_id INT,
+    IN p_tag_name VARCHAR(64),
+    IN p_limit INT,
+    IN p_offset INT
+)
+BEGIN
+
+    DECLARE v_total INT DEFAULT 0;
+    DECLARE v_tag_id INT DEFAULT NULL;
+
+    IF p_limit > 100 THEN
+        SET p_limit = 100;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 25;
+    END IF;
+    IF p_offset IS NULL OR p_offset < 0 THEN
+        SET p_offset = 0;
+    END IF;
+
+    SET p_ticket_type = NULLIF(p_ticket_type, '');
+    SET p_status = NULLIF(p_status, '');
+    SET p_tag_name = NULLIF(p_tag_name, '');
+
+    IF p_tag_name IS NOT NULL THEN
+        SELECT id INTO v_tag_id
+        FROM TicketTags
+        WHERE name = p_tag_name
+          AND is_deleted = FALSE;
+    END IF;
+
+    SELECT COUNT(*) INTO v_total
+    FROM Tickets t
+    WHERE t.is_deleted = FALSE
+        AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+        AND (p_status IS NULL OR t.status = p_status)
+        AND (
+            p_assigned_admin_u_id IS NULL
+            OR EXISTS (
+                SELECT 1
+                FROM TicketAssignments ta
+                WHERE ta.ticket_id = t.id
+                    AND ta.assigned_admin_u_id = p_assigned_admin_u_id
+                    AND ta.is_deleted = FALSE
+            )
+        )
+        AND (
+            p_tag_name IS NULL
+            OR EXISTS (
+                SELECT 1
+                FROM TicketTagLinks ttl
+                WHERE ttl.ticket_id = t.id
+                    AND ttl.tag_id = v_tag_id
+                    AND ttl.is_deleted = FALSE
+            )
+        );
+
+    SELECT
+        t.id,
+        t.ticket_type,
+        t.title,
+        t.status,
+        t.priority,
+        t.created_at,
+        t.updated_at,
+        u.username AS created_by_username,
+        v_total AS total_records
+    FROM Tickets t
+    JOIN Users u ON t.u_id = u.id
+    WHERE t.is_deleted = FALSE
+        AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+        AND (p_status IS NULL OR t.status = p_status)
+        AND (
+            p_assigned_admin_u_id IS NULL
+            OR EXISTS (
+                SELECT 1
+                FROM TicketAssignments ta
+                WHERE ta.ticket_id = t.id
+                    AND ta.assigned_admin_u_id = p_assigned_admin_u_id
+                    AND ta.is_deleted = FALSE
+            )
+        )
+        AND (
+            p_tag_name IS NULL
+            OR EXISTS (
+                SELECT 1
+                FROM TicketTagLinks ttl
+                WHERE ttl.ticket_id = t.id
+                    AND ttl.tag_id = v_tag_id
+                    AND ttl.is_deleted = FALSE
+            )
+        )
+    ORDER BY t.created_at DESC
+    LIMIT p_limit OFFSET p_offset;
+
+END //
+
+DELIMITER ;
+
+
+
+-- Permissions
+-- ----------------------------------------------------------------------------
+-- Replacing a procedure drops its routine-level grants, so restore them.
+
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_fetch_users TO 'scav_admin'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_fetch_announcements TO 'scav_social'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_fetch_announcements TO 'scav_admin'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_fetch_tickets TO 'scav_user'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_fetch_tickets_by_user TO 'scav_user'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_fetch_tickets TO 'scav_admin'@'%';
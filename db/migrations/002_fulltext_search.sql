@@ -0,0 +1,274 @@
+-- 002_fulltext_search.sql - FULLTEXT indexes and search procedures
+-- Copyright (C) 2026 Aaron Reichenbach
+--
+-- This program is free software: you can redistribute it and/or modify
+-- it under the terms of the GNU Affero General Public License as
+-- published by the Free Software Foundation, either version 3 of the
+-- License, or (at your option) any later version.
+--
+-- This program is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+-- GNU Affero General Public License for more details.
+--
+-- You should have received a copy of the GNU Affero General Public License
+-- along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+-- Indexes
+-- ----------------------------------------------------------------------------
+-- InnoDB cannot build a FULLTEXT index with LOCK=NONE: the table stays
+-- readable but writes wait for the build (seconds per million tickets).
+
+ALTER TABLE Tickets
+    ADD FULLTEXT INDEX IF NOT EXISTS ft_tickets_text (title, description),
+    ALGORITHM=INPLACE, LOCK=SHARED;
+
+ALTER TABLE Announcements
+    ADD FULLTEXT INDEX IF NOT EXISTS ft_announcements_text (title, content),
+    ALGORITHM=INPLACE, LOCK=SHARED;
+
+
+
+-- Procedures
+-- ----------------------------------------------------------------------------
+
+DELIMITER //
+
+-- sp_search_tickets(p_query, p_u_id, p_ticket_type, p_status, p_tag_name, p_limit, p_offset)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Full-text search over active ticket titles and descriptions, most
+--      relevant first, with the same optional filters as the list views
+--      (p_u_id NULL = every user).
+-- Notes:
+--      p_query is a BOOLEAN MODE expression built by utils.build_search_query.
+--      The FULLTEXT index drives the query; the other filters are checked
+--      on the matching rows only. The total is capped at 1000 so a common
+--      word cannot make the count walk the whole index.
+
+CREATE OR REPLACE PROCEDURE sp_search_tickets(
+    IN p_query VARCHAR(255),
+    IN p_u_id INT,
+    IN p_ticket_type VARCHAR(20),
+    IN p_status VARCHAR(20),
+    IN p_tag_name VARCHAR(64),
+    IN p_limit INT,
+    IN p_offset INT
+)
+BEGIN
+
+    DECLARE v_total INT DEFAULT 0;
+    DECLARE v_tag_id INT DEFAULT NULL;
+
+    IF p_limit > 100 THEN
+        SET p_limit = 100;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 25;
+    END IF;
+    IF p_offset IS NULL OR p_offset < 0 THEN
+        SET p_offset = 0;
+    END IF;
+
+    SET p_ticket_type = NULLIF(p_ticket_type, '');
+    SET p_status = NULLIF(p_status, '');
+    SET p_tag_name = NULLIF(p_tag_name, '');
+    SET p_query = IFNULL(p_query, '');
+
+    IF p_tag_name IS NOT NULL THEN
+        SELECT id INTO v_tag_id
+        FROM TicketTags
+        WHERE name = p_tag_name
+          AND is_deleted = FALSE;
+    END IF;
+
+    SELECT COUNT(*) INTO v_total
+    FROM (
+        SELECT t.id
+        FROM Tickets t
+        WHERE MATCH(t.title, t.description) AGAINST (p_query IN BOOLEAN MODE)
+          AND t.is_deleted = FALSE
+          AND (p_u_id IS NULL OR t.u_id = p_u_id)
+          AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+          AND (p_status IS NULL OR t.status = p_status)
+          AND (
+                p_tag_name IS NULL
+                OR EXISTS (
+                    SELECT 1
+                    FROM TicketTagLinks ttl
+                    WHERE ttl.ticket_id = t.id
+                      AND ttl.tag_id = v_tag_id
+                      AND ttl.is_deleted = FALSE
+                )
+            )
+        LIMIT 1000
+    ) matches;
+
+    SELECT
+        t.id,
+        t.ticket_type,
+        t.title,
+        t.description,
+        t.status,
+        t.priority,
+        t.created_at,
+        t.updated_at,
+        u.username,
+        MATCH(t.title, t.description) AGAINST (p_query IN BOOLEAN MODE) AS relevance,
+        v_total AS total_records
+    FROM Tickets t
+    JOIN Users u ON t.u_id = u.id
+    WHERE MATCH(t.title, t.description) AGAINST (p_query IN BOOLEAN MODE)
+      AND t.is_deleted = FALSE
+      AND (p_u_id IS NULL OR t.u_id = p_u_id)
+      AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+      AND (p_status IS NULL OR t.status = p_status)
+      AND (
+            p_tag_name IS NULL
+            OR EXISTS (
+                SELECT 1
+                FROM TicketTagLinks ttl
+                WHERE ttl.ticket_id = t.id
+                  AND ttl.tag_id = v_tag_id
+                  AND ttl.is_deleted = FALSE
+            )
+        )
+    ORDER BY relevance DESC, t.created_at DESC
+    LIMIT p_limit OFFSET p_offset;
+
+END //
+
+
+
+-- sp_admin_search_tickets(p_query, p_ticket_type, p_status, p_limit, p_offset)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Full-text search for the admin ticket lists. Same matching as
+--      sp_search_tickets with the columns of sp_admin_fetch_tickets.
+
+CREATE OR REPLACE PROCEDURE sp_admin_search_tickets(
+    IN p_query VARCHAR(255),
+    IN p_ticket_type VARCHAR(20),
+    IN p_status VARCHAR(20),
+    IN p_limit INT,
+    IN p_offset INT
+)
+BEGIN
+
+    DECLARE v_total INT DEFAULT 0;
+
+    IF p_limit > 100 THEN
+        SET p_limit = 100;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 25;
+    END IF;
+    IF p_offset IS NULL OR p_offset < 0 THEN
+        SET p_offset = 0;
+    END IF;
+
+    SET p_ticket_type = NULLIF(p_ticket_type, '');
+    SET p_status = NULLIF(p_status, '');
+    SET p_query = IFNULL(p_query, '');
+
+    SELECT COUNT(*) INTO v_total
+    FROM (
+        SELECT t.id
+        FROM Tickets t
+        WHERE MATCH(t.title, t.description) AGAINST (p_query IN BOOLEAN MODE)
+            AND t.is_deleted = FALSE
+            AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+            AND (p_status IS NULL OR t.status = p_status)
+        LIMIT 1000
+    ) matches;
+
+    SELECT
+        t.id,
+        t.ticket_type,
+        t.title,
+        t.status,
+        t.priority,
+        t.created_at,
+        t.updated_at,
+        u.username AS created_by_username,
+        MATCH(t.title, t.description) AGAINST (p_query IN BOOLEAN MODE) AS relevance,
+        v_total AS total_records
+    FROM Tickets t
+    JOIN Users u ON t.u_id = u.id
+    WHERE MATCH(t.title, t.description) AGAINST (p_query IN BOOLEAN MODE)
+        AND t.is_deleted = FALSE
+        AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+        AND (p_status IS NULL OR t.status = p_status)
+    ORDER BY relevance DESC, t.created_at DESC
+    LIMIT p_limit OFFSET p_offset;
+
+END //
+
+
+
+-- sp_search_announcements(p_query, p_limit, p_offset)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Full-text search over visible announcements, most relevant first.
+
+CREATE OR REPLACE PROCEDURE sp_search_announcements(
+    IN p_query VARCHAR(255),
+    IN p_limit INT,
+    IN p_offset INT
+)
+BEGIN
+
+    DECLARE v_total INT DEFAULT 0;
+
+    IF p_limit > 100 THEN
+        SET p_limit = 100;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 25;
+    END IF;
+    IF p_offset IS NULL OR p_offset < 0 THEN
+        SET p_offset = 0;
+    END IF;
+
+    SET p_query = IFNULL(p_query, '');
+
+    SELECT COUNT(*) INTO v_total
+    FROM (
+        SELECT a.id
+        FROM Announcements a
+        WHERE MATCH(a.title, a.content) AGAINST (p_query IN BOOLEAN MODE)
+          AND a.is_visible = TRUE
+        LIMIT 1000
+    ) matches;
+
+    SELECT
+        a.id,
+        a.title,
+        a.subtitle,
+        a.content,
+        a.footnote,
+        a.created_at,
+        u.username,
+        MATCH(a.title, a.content) AGAINST (p_query IN BOOLEAN MODE) AS relevance,
+        v_total AS total_records
+    FROM Announcements a
+    JOIN Users u ON a.u_id = u.id
+    WHERE MATCH(a.title, a.content) AGAINST (p_query IN BOOLEAN MODE)
+      AND a.is_visible = TRUE
+    ORDER BY relevance DESC, a.created_at DESC
+    LIMIT p_limit OFFSET p_offset;
+
+END //
+
+DELIMITER ;
+
+
+
+-- Permissions
+-- ----------------------------------------------------------------------------
+
+GRANT EXECUTE ON PROCEDURE scavengers.sp_search_tickets TO 'scav_user'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_search_tickets TO 'scav_admin'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_search_announcements TO 'scav_social'@'%';
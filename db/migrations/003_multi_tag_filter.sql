@@ -0,0 +1,276 @@
+-- 003_multi_tag_filter.sql - Multi-tag (AND/OR) ticket filtering
+-- Copyright (C) 2026 Aaron Reichenbach
+--
+-- This program is free software: you can redistribute it and/or modify
+-- it under the terms of the GNU Affero General Public License as
+-- published by the Free Software Foundation, either version 3 of the
+-- License, or (at your option) any later version.
+--
+-- This program is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+-- GNU Affero General Public License for more details.
+--
+-- You should have received a copy of the GNU Affero General Public License
+-- along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+-- Indexes
+-- ----------------------------------------------------------------------------
+-- (tag_id, is_deleted, ticket_id) answers "which live tickets carry tag X"
+-- from the index alone. It supersedes idx_tickettaglinks_tag, which also
+-- backed the tag_id foreign key; the new index takes over that role.
+
+ALTER TABLE TicketTagLinks
+    ADD INDEX IF NOT EXISTS idx_tickettaglinks_tag_ticket (tag_id, is_deleted, ticket_id),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE TicketTagLinks
+    DROP INDEX IF EXISTS idx_tickettaglinks_tag,
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+
+
+-- Procedures
+-- ----------------------------------------------------------------------------
+
+DELIMITER //
+
+-- sp_fetch_tickets_by_tags(p_u_id, p_ticket_type, p_status, p_tag_ids, p_match_all, p_limit, p_offset)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Fetch active tickets carrying all (p_match_all = TRUE) or any of the
+--      tags in p_tag_ids, a JSON array of tag ids, newest first. p_u_id NULL
+--      means every user.
+-- Notes:
+--      The tag ids are resolved against live tags once, up front. The
+--      candidate tickets then come from idx_tickettaglinks_tag_ticket: one
+--      index range per tag, grouped by ticket, keeping tickets that matched
+--      enough tags. Only those candidates touch Tickets. Because
+--      (ticket_id, tag_id) is unique, COUNT(*) per ticket is the number of
+--      distinct requested tags it carries.
+
+CREATE OR REPLACE PROCEDURE sp_fetch_tickets_by_tags(
+    IN p_u_id INT,
+    IN p_ticket_type VARCHAR(20),
+    IN p_status VARCHAR(20),
+    IN p_tag_ids JSON,
+    IN p_match_all BOOLEAN,
+    IN p_limit INT,
+    IN p_offset INT
+)
+BEGIN
+
+    DECLARE v_total INT DEFAULT 0;
+    DECLARE v_requested INT DEFAULT 0;
+    DECLARE v_live INT DEFAULT 0;
+    DECLARE v_required INT DEFAULT 1;
+
+    IF p_limit > 100 THEN
+        SET p_limit = 100;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 25;
+    END IF;
+    IF p_offset IS NULL OR p_offset < 0 THEN
+        SET p_offset = 0;
+    END IF;
+
+    SET p_ticket_type = NULLIF(p_ticket_type, '');
+    SET p_status = NULLIF(p_status, '');
+
+    SELECT COUNT(DISTINCT jt.id) INTO v_requested
+    FROM JSON_TABLE(IFNULL(p_tag_ids, '[]'), '$[*]' COLUMNS (id INT PATH '$')) jt;
+
+    DROP TEMPORARY TABLE IF EXISTS tmp_filter_tags;
+    CREATE TEMPORARY TABLE tmp_filter_tags (id INT PRIMARY KEY) ENGINE=MEMORY;
+
+    INSERT IGNORE INTO tmp_filter_tags (id)
+    SELECT tt.id
+    FROM JSON_TABLE(IFNULL(p_tag_ids, '[]'), '$[*]' COLUMNS (id INT PATH '$')) jt
+    JOIN TicketTags tt ON tt.id = jt.id
+    WHERE tt.is_deleted = FALSE;
+
+    SELECT COUNT(*) INTO v_live FROM tmp_filter_tags;
+
+    -- AND over a deleted/unknown tag can match nothing; OR just ignores it
+    IF p_match_all THEN
+        SET v_required = IF(v_live = v_requested, v_live, v_requested + 1);
+    END IF;
+
+    SELECT COUNT(*) INTO v_total
+    FROM (
+        SELECT ttl.ticket_id
+        FROM tmp_filter_tags f
+        JOIN TicketTagLinks ttl ON ttl.tag_id = f.id AND ttl.is_deleted = FALSE
+        GROUP BY ttl.ticket_id
+        HAVING COUNT(*) >= v_required
+    ) m
+    JOIN Tickets t ON t.id = m.ticket_id
+    WHERE t.is_deleted = FALSE
+      AND (p_u_id IS NULL OR t.u_id = p_u_id)
+      AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+      AND (p_status IS NULL OR t.status = p_status);
+
+    SELECT
+        t.id,
+        t.ticket_type,
+        t.title,
+        t.description,
+        t.status,
+        t.priority,
+        t.created_at,
+        t.updated_at,
+        u.username,
+        v_total AS total_records
+    FROM (
+        SELECT ttl.ticket_id
+        FROM tmp_filter_tags f
+        JOIN TicketTagLinks ttl ON ttl.tag_id = f.id AND ttl.is_deleted = FALSE
+        GROUP BY ttl.ticket_id
+        HAVING COUNT(*) >= v_required
+    ) m
+    JOIN Tickets t ON t.id = m.ticket_id
+    JOIN Users u ON t.u_id = u.id
+    WHERE t.is_deleted = FALSE
+      AND (p_u_id IS NULL OR t.u_id = p_u_id)
+      AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+      AND (p_status IS NULL OR t.status = p_status)
+    ORDER BY t.created_at DESC
+    LIMIT p_limit OFFSET p_offset;
+
+    DROP TEMPORARY TABLE IF EXISTS tmp_filter_tags;
+
+END //
+
+
+
+-- sp_search_tickets(p_query, p_u_id, p_ticket_type, p_status, p_tag_ids, p_match_all, p_limit, p_offset)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Full-text search over active ticket titles and descriptions, most
+--      relevant first, with the same optional filters as the list views
+--      (p_u_id NULL = every user, p_tag_ids a JSON array of tag ids).
+-- Notes:
+--      Replaces the single-tag version from 002. The FULLTEXT index drives
+--      the query; tags are checked per match through
+--      uq_tickettaglinks_ticket_tag. The total is capped at 1000.
+
+CREATE OR REPLACE PROCEDURE sp_search_tickets(
+    IN p_query VARCHAR(255),
+    IN p_u_id INT,
+    IN p_ticket_type VARCHAR(20),
+    IN p_status VARCHAR(20),
+    IN p_tag_ids JSON,
+    IN p_match_all BOOLEAN,
+    IN p_limit INT,
+    IN p_offset INT
+)
+BEGIN
+
+    DECLARE v_total INT DEFAULT 0;
+    DECLARE v_requested INT DEFAULT 0;
+    DECLARE v_live INT DEFAULT 0;
+    DECLARE v_required INT DEFAULT 0;
+
+    IF p_limit > 100 THEN
+        SET p_limit = 100;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 25;
+    END IF;
+    IF p_offset IS NULL OR p_offset < 0 THEN
+        SET p_offset = 0;
+    END IF;
+
+    SET p_ticket_type = NULLIF(p_ticket_type, '');
+    SET p_status = NULLIF(p_status, '');
+    SET p_query = IFNULL(p_query, '');
+
+    SELECT COUNT(DISTINCT jt.id) INTO v_requested
+    FROM JSON_TABLE(IFNULL(p_tag_ids, '[]'), '$[*]' COLUMNS (id INT PATH '$')) jt;
+
+    DROP TEMPORARY TABLE IF EXISTS tmp_filter_tags;
+    CREATE TEMPORARY TABLE tmp_filter_tags (id INT PRIMARY KEY) ENGINE=MEMORY;
+
+    INSERT IGNORE INTO tmp_filter_tags (id)
+    SELECT tt.id
+    FROM JSON_TABLE(IFNULL(p_tag_ids, '[]'), '$[*]' COLUMNS (id INT PATH '$')) jt
+    JOIN TicketTags tt ON tt.id = jt.id
+    WHERE tt.is_deleted = FALSE;
+
+    SELECT COUNT(*) INTO v_live FROM tmp_filter_tags;
+
+    -- v_required = 0 means no tag filter
+    IF v_requested > 0 THEN
+        SET v_required = IF(p_match_all, IF(v_live = v_requested, v_live, v_requested + 1), 1);
+    END IF;
+
+    SELECT COUNT(*) INTO v_total
+    FROM (
+        SELECT t.id
+        FROM Tickets t
+        WHERE MATCH(t.title, t.description) AGAINST (p_query IN BOOLEAN MODE)
+          AND t.is_deleted = FALSE
+          AND (p_u_id IS NULL OR t.u_id = p_u_id)
+          AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+          AND (p_status IS NULL OR t.status = p_status)
+          AND (
+                v_required = 0
+                OR (
+                    SELECT COUNT(*)
+                    FROM TicketTagLinks ttl
+                    JOIN tmp_filter_tags f ON f.id = ttl.tag_id
+                    WHERE ttl.ticket_id = t.id
+                      AND ttl.is_deleted = FALSE
+                ) >= v_required
+            )
+        LIMIT 1000
+    ) matches;
+
+    SELECT
+        t.id,
+        t.ticket_type,
+        t.title,
+        t.description,
+        t.status,
+        t.priority,
+        t.created_at,
+        t.updated_at,
+        u.username,
+        MATCH(t.title, t.description) AGAINST (p_query IN BOOLEAN MODE) AS relevance,
+        v_total AS total_records
+    FROM Tickets t
+    JOIN Users u ON t.u_id = u.id
+    WHERE MATCH(t.title, t.description) AGAINST (p_query IN BOOLEAN MODE)
+      AND t.is_deleted = FALSE
+      AND (p_u_id IS NULL OR t.u_id = p_u_id)
+      AND (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+      AND (p_status IS NULL OR t.status = p_status)
+      AND (
+            v_required = 0
+            OR (
+                SELECT COUNT(*)
+                FROM TicketTagLinks ttl
+                JOIN tmp_filter_tags f ON f.id = ttl.tag_id
+                WHERE ttl.ticket_id = t.id
+                  AND ttl.is_deleted = FALSE
+            ) >= v_required
+        )
+    ORDER BY relevance DESC, t.created_at DESC
+    LIMIT p_limit OFFSET p_offset;
+
+    DROP TEMPORARY TABLE IF EXISTS tmp_filter_tags;
+
+END //
+
+DELIMITER ;
+
+
+
+-- Permissions
+-- ----------------------------------------------------------------------------
+
+GRANT EXECUTE ON PROCEDURE scavengers.sp_fetch_tickets_by_tags TO 'scav_user'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_search_tickets TO 'scav_user'@'%';
@@ -0,0 +1,480 @@
+-- 004_ticket_archive.sql - Archive tables and archival job for tickets
+-- Copyright (C) 2026 Aaron Reichenbach
+--
+-- This program is free software: you can redistribute it and/or modify
+-- it under the terms of the GNU Affero General Public License as
+-- published by the Free Software Foundation, either version 3 of the
+-- License, or (at your option) any later version.
+--
+-- This program is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+-- GNU Affero General Public License for more details.
+--
+-- You should have received a copy of the GNU Affero General Public License
+-- along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+-- Archive Tables
+-- ----------------------------------------------------------------------------
+-- Same columns as the hot tables plus archived_at. No foreign keys: an
+-- archived ticket outlives its tags and may outlive its users, and rows are
+-- only ever inserted here by sp_admin_archive_tickets. Indexed for the
+-- admin read-through only.
+
+CREATE TABLE IF NOT EXISTS TicketsArchive (
+    id INT PRIMARY KEY,
+    u_id INT NOT NULL,
+    ticket_type ENUM('request', 'report') NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    description TEXT NOT NULL,
+    status ENUM(
+        'pending',
+        'in progress',
+        'completed',
+        'rejected',
+        'open',
+        'closed',
+        'wontfix'
+    ) NOT NULL,
+    priority ENUM('very low', 'low', 'medium', 'high', 'very high') NOT NULL,
+    is_deleted BOOLEAN NOT NULL,
+    created_at TIMESTAMP NULL,
+    updated_at TIMESTAMP NULL,
+    deleted_at TIMESTAMP NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_ticketsarchive_list (ticket_type, created_at),
+    INDEX idx_ticketsarchive_u_id (u_id)
+);
+
+CREATE TABLE IF NOT EXISTS TicketTagLinksArchive (
+    id INT PRIMARY KEY,
+    ticket_id INT NOT NULL,
+    tag_id INT NOT NULL,
+    is_deleted BOOLEAN NOT NULL,
+    deleted_at TIMESTAMP NULL,
+    created_at TIMESTAMP NULL,
+    updated_at TIMESTAMP NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_tickettaglinksarchive_ticket (ticket_id)
+);
+
+CREATE TABLE IF NOT EXISTS TicketAssignmentsArchive (
+    id INT PRIMARY KEY,
+    ticket_id INT NOT NULL,
+    assigned_admin_u_id INT NOT NULL,
+    assigned_by_u_id INT,
+    is_deleted BOOLEAN NOT NULL,
+    deleted_at TIMESTAMP NULL,
+    created_at TIMESTAMP NULL,
+    updated_at TIMESTAMP NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_ticketassignmentsarchive_ticket (ticket_id)
+);
+
+CREATE TABLE IF NOT EXISTS TicketStatusMessagesArchive (
+    id INT PRIMARY KEY,
+    ticket_id INT NOT NULL,
+    changed_by_u_id INT NOT NULL,
+    old_status ENUM(
+        'pending',
+        'in progress',
+        'completed',
+        'rejected',
+        'open',
+        'closed',
+        'wontfix'
+    ),
+    new_status ENUM(
+        'pending',
+        'in progress',
+        'completed',
+        'rejected',
+        'open',
+        'closed',
+        'wontfix'
+    ) NOT NULL,
+    status_message TEXT,
+    is_deleted BOOLEAN NOT NULL,
+    deleted_at TIMESTAMP NULL,
+    created_at TIMESTAMP NULL,
+    updated_at TIMESTAMP NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_ticketstatusmessagesarchive_ticket (ticket_id)
+);
+
+
+
+-- Indexes
+-- ----------------------------------------------------------------------------
+-- Let the archival job find its batches without scanning the hot tables.
+
+ALTER TABLE Tickets
+    ADD INDEX IF NOT EXISTS idx_tickets_deleted_at (is_deleted, deleted_at),
+    ADD INDEX IF NOT EXISTS idx_tickets_status_updated (status, updated_at),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE TicketTagLinks
+    ADD INDEX IF NOT EXISTS idx_tickettaglinks_deleted_at (is_deleted, deleted_at),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE TicketAssignments
+    ADD INDEX IF NOT EXISTS idx_ticketassignments_deleted_at (is_deleted, deleted_at),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE TicketStatusMessages
+    ADD INDEX IF NOT EXISTS idx_ticketstatusmessages_deleted_at (is_deleted, deleted_at),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+
+
+-- Procedures
+-- ----------------------------------------------------------------------------
+
+DELIMITER //
+
+-- sp_admin_archive_tickets(p_deleted_days, p_closed_days, p_batch_size)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Move one batch of old rows from the ticket tables into the archive
+--      tables. Returns one row with the number of rows moved per table.
+--      Archived are:
+--        - tickets soft deleted more than p_deleted_days ago,
+--        - tickets in a final status (completed, rejected, closed, wontfix)
+--          not updated for p_closed_days (NULL = never),
+--        - with those tickets, all their status messages, tag links and
+--          assignments,
+--        - status messages, tag links and assignments of live tickets that
+--          were soft deleted more than p_deleted_days ago.
+-- Notes:
+--      Each call is one short transaction of at most p_batch_size tickets
+--      (and p_batch_size rows per child table), so it never holds locks for
+--      long. Callers loop until every count is zero. Deleting a ticket
+--      cascades to its child rows, which have already been copied.
+
+CREATE OR REPLACE PROCEDURE sp_admin_archive_tickets(
+    IN p_deleted_days INT,
+    IN p_closed_days INT,
+    IN p_batch_size INT
+)
+BEGIN
+
+    DECLARE v_deleted_before TIMESTAMP;
+    DECLARE v_closed_before TIMESTAMP DEFAULT NULL;
+    DECLARE v_tickets INT DEFAULT 0;
+    DECLARE v_messages INT DEFAULT 0;
+    DECLARE v_links INT DEFAULT 0;
+    DECLARE v_assignments INT DEFAULT 0;
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    IF p_batch_size IS NULL OR p_batch_size <= 0 THEN
+        SET p_batch_size = 500;
+    END IF;
+    IF p_batch_size > 5000 THEN
+        SET p_batch_size = 5000;
+    END IF;
+
+    SET v_deleted_before = NOW() - INTERVAL GREATEST(IFNULL(p_deleted_days, 30), 0) DAY;
+    IF p_closed_days IS NOT NULL THEN
+        SET v_closed_before = NOW() - INTERVAL GREATEST(p_closed_days, 0) DAY;
+    END IF;
+
+    DROP TEMPORARY TABLE IF EXISTS tmp_archive_tickets;
+    DROP TEMPORARY TABLE IF EXISTS tmp_archive_rows;
+    CREATE TEMPORARY TABLE tmp_archive_tickets (id INT PRIMARY KEY) ENGINE=MEMORY;
+    CREATE TEMPORARY TABLE tmp_archive_rows (id INT PRIMARY KEY) ENGINE=MEMORY;
+
+    INSERT IGNORE INTO tmp_archive_tickets (id)
+    SELECT id
+    FROM Tickets
+    WHERE is_deleted = TRUE
+      AND deleted_at < v_deleted_before
+    LIMIT p_batch_size;
+
+    IF v_closed_before IS NOT NULL THEN
+        INSERT IGNORE INTO tmp_archive_tickets (id)
+        SELECT id
+        FROM Tickets
+        WHERE status IN ('completed', 'rejected', 'closed', 'wontfix')
+          AND updated_at < v_closed_before
+        LIMIT p_batch_size;
+    END IF;
+
+    START TRANSACTION;
+
+    -- Whole tickets, with every child row
+
+    INSERT INTO TicketStatusMessagesArchive (
+        id, ticket_id, changed_by_u_id, old_status, new_status, status_message,
+        is_deleted, deleted_at, created_at, updated_at
+    )
+    SELECT
+        tsm.id, tsm.ticket_id, tsm.changed_by_u_id, tsm.old_status, tsm.new_status, tsm.status_message,
+        tsm.is_deleted, tsm.deleted_at, tsm.created_at, tsm.updated_at
+    FROM TicketStatusMessages tsm
+    JOIN tmp_archive_tickets a ON a.id = tsm.ticket_id;
+    SET v_messages = ROW_COUNT();
+
+    INSERT INTO TicketTagLinksArchive (
+        id, ticket_id, tag_id, is_deleted, deleted_at, created_at, updated_at
+    )
+    SELECT
+        ttl.id, ttl.ticket_id, ttl.tag_id, ttl.is_deleted, ttl.deleted_at, ttl.created_at, ttl.updated_at
+    FROM TicketTagLinks ttl
+    JOIN tmp_archive_tickets a ON a.id = ttl.ticket_id;
+    SET v_links = ROW_COUNT();
+
+    INSERT INTO TicketAssignmentsArchive (
+        id, ticket_id, assigned_admin_u_id, assigned_by_u_id, is_deleted, deleted_at, created_at, updated_at
+    )
+    SELECT
+        ta.id, ta.ticket_id, ta.assigned_admin_u_id, ta.assigned_by_u_id, ta.is_deleted, ta.deleted_at, ta.created_at, ta.updated_at
+    FROM TicketAssignments ta
+    JOIN tmp_archive_tickets a ON a.id = ta.ticket_id;
+    SET v_assignments = ROW_COUNT();
+
+    INSERT INTO TicketsArchive (
+        id, u_id, ticket_type, title, description, status, priority,
+        is_deleted, created_at, updated_at, deleted_at
+    )
+    SELECT
+        t.id, t.u_id, t.ticket_type, t.title, t.description, t.status, t.priority,
+        t.is_deleted, t.created_at, t.updated_at, t.deleted_at
+    FROM Tickets t
+    JOIN tmp_archive_tickets a ON a.id = t.id;
+    SET v_tickets = ROW_COUNT();
+
+    DELETE t
+    FROM Tickets t
+    JOIN tmp_archive_tickets a ON a.id = t.id;
+
+    -- Long-deleted child rows of live tickets
+
+    DELETE FROM tmp_archive_rows;
+    INSERT INTO tmp_archive_rows (id)
+    SELECT id
+    FROM TicketStatusMessages
+    WHERE is_deleted = TRUE
+      AND deleted_at < v_deleted_before
+    LIMIT p_batch_size;
+
+    INSERT INTO TicketStatusMessagesArchive (
+        id, ticket_id, changed_by_u_id, old_status, new_status, status_message,
+        is_deleted, deleted_at, created_at, updated_at
+    )
+    SELECT
+        tsm.id, tsm.ticket_id, tsm.changed_by_u_id, tsm.old_status, tsm.new_status, tsm.status_message,
+        tsm.is_deleted, tsm.deleted_at, tsm.created_at, tsm.updated_at
+    FROM TicketStatusMessages tsm
+    JOIN tmp_archive_rows r ON r.id = tsm.id;
+    SET v_messages = v_messages + ROW_COUNT();
+
+    DELETE tsm
+    FROM TicketStatusMessages tsm
+    JOIN tmp_archive_rows r ON r.id = tsm.id;
+
+    DELETE FROM tmp_archive_rows;
+    INSERT INTO tmp_archive_rows (id)
+    SELECT id
+    FROM TicketTagLinks
+    WHERE is_deleted = TRUE
+      AND deleted_at < v_deleted_before
+    LIMIT p_batch_size;
+
+    INSERT INTO TicketTagLinksArchive (
+        id, ticket_id, tag_id, is_deleted, deleted_at, created_at, updated_at
+    )
+    SELECT
+        ttl.id, ttl.ticket_id, ttl.tag_id, ttl.is_deleted, ttl.deleted_at, ttl.created_at, ttl.updated_at
+    FROM TicketTagLinks ttl
+    JOIN tmp_archive_rows r ON r.id = ttl.id;
+    SET v_links = v_links + ROW_COUNT();
+
+    DELETE ttl
+    FROM TicketTagLinks ttl
+    JOIN tmp_archive_rows r ON r.id = ttl.id;
+
+    DELETE FROM tmp_archive_rows;
+    INSERT INTO tmp_archive_rows (id)
+    SELECT id
+    FROM TicketAssignments
+    WHERE is_deleted = TRUE
+      AND deleted_at < v_deleted_before
+    LIMIT p_batch_size;
+
+    INSERT INTO TicketAssignmentsArchive (
+        id, ticket_id, assigned_admin_u_id, assigned_by_u_id, is_deleted, deleted_at, created_at, updated_at
+    )
+    SELECT
+        ta.id, ta.ticket_id, ta.assigned_admin_u_id, ta.assigned_by_u_id, ta.is_deleted, ta.deleted_at, ta.created_at, ta.updated_at
+    FROM TicketAssignments ta
+    JOIN tmp_archive_rows r ON r.id = ta.id;
+    SET v_assignments = v_assignments + ROW_COUNT();
+
+    DELETE ta
+    FROM TicketAssignments ta
+    JOIN tmp_archive_rows r ON r.id = ta.id;
+
+    COMMIT;
+
+    DROP TEMPORARY TABLE IF EXISTS tmp_archive_tickets;
+    DROP TEMPORARY TABLE IF EXISTS tmp_archive_rows;
+
+    SELECT
+        v_tickets AS tickets,
+        v_messages AS status_messages,
+        v_links AS tag_links,
+        v_assignments AS assignments;
+
+END //
+
+
+
+-- sp_admin_fetch_archived_tickets(p_ticket_type, p_status, p_limit, p_offset)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Fetch archived tickets for admin review, newest first. Same columns
+--      as sp_admin_fetch_tickets plus is_deleted and archived_at.
+-- Notes:
+--      Authors may have been deleted since, hence the LEFT JOIN.
+
+CREATE OR REPLACE PROCEDURE sp_admin_fetch_archived_tickets(
+    IN p_ticket_type VARCHAR(20),
+    IN p_status VARCHAR(20),
+    IN p_limit INT,
+    IN p_offset INT
+)
+BEGIN
+
+    DECLARE v_total INT DEFAULT 0;
+
+    IF p_limit > 100 THEN
+        SET p_limit = 100;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 25;
+    END IF;
+    IF p_offset IS NULL OR p_offset < 0 THEN
+        SET p_offset = 0;
+    END IF;
+
+    SET p_ticket_type = NULLIF(p_ticket_type, '');
+    SET p_status = NULLIF(p_status, '');
+
+    SELECT COUNT(*) INTO v_total
+    FROM TicketsArchive t
+    WHERE (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+        AND (p_status IS NULL OR t.status = p_status);
+
+    SELECT
+        t.id,
+        t.ticket_type,
+        t.title,
+        t.status,
+        t.priority,
+        t.created_at,
+        t.updated_at,
+        t.is_deleted,
+        t.archived_at,
+        IFNULL(u.username, 'deleted user') AS created_by_username,
+        v_total AS total_records
+    FROM TicketsArchive t
+    LEFT JOIN Users u ON t.u_id = u.id
+    WHERE (p_ticket_type IS NULL OR t.ticket_type = p_ticket_type)
+        AND (p_status IS NULL OR t.status = p_status)
+    ORDER BY t.created_at DESC
+    LIMIT p_limit OFFSET p_offset;
+
+END //
+
+
+
+-- sp_admin_fetch_archived_ticket_bundle(p_id)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Archive counterpart of sp_admin_fetch_ticket_bundle: the same four
+--      result sets (ticket, status messages, tags, assignments), read from
+--      the archive tables.
+-- Notes:
+--      Soft-deleted child rows are left out as in the live bundle; archived
+--      tickets that had been deleted are included and flagged is_deleted.
+
+CREATE OR REPLACE PROCEDURE sp_admin_fetch_archived_ticket_bundle(
+    IN p_id INT
+)
+BEGIN
+
+    SELECT
+        t.id,
+        t.u_id,
+        t.ticket_type,
+        t.title,
+        t.description,
+        t.status,
+        t.priority,
+        t.created_at,
+        t.updated_at,
+        t.is_deleted,
+        t.archived_at,
+        IFNULL(u.username, 'deleted user') AS username
+    FROM TicketsArchive t
+    LEFT JOIN Users u ON t.u_id = u.id
+    WHERE t.id = p_id;
+
+    SELECT
+        tsm.id,
+        tsm.ticket_id,
+        tsm.old_status,
+        tsm.new_status,
+        tsm.status_message,
+        tsm.created_at,
+        IFNULL(u.username, 'deleted user') AS changed_by_username
+    FROM TicketStatusMessagesArchive tsm
+    LEFT JOIN Users u ON tsm.changed_by_u_id = u.id
+    WHERE tsm.ticket_id = p_id
+        AND tsm.is_deleted = FALSE
+    ORDER BY tsm.created_at DESC;
+
+    SELECT
+        tt.id,
+        tt.name
+    FROM TicketTagLinksArchive ttl
+    JOIN TicketTags tt ON ttl.tag_id = tt.id
+    WHERE ttl.ticket_id = p_id
+        AND ttl.is_deleted = FALSE
+    ORDER BY tt.name ASC;
+
+    SELECT
+        ta.id,
+        ta.ticket_id,
+        ta.assigned_admin_u_id,
+        ua.username AS assigned_admin_username,
+        ta.assigned_by_u_id,
+        ub.username AS assigned_by_username,
+        ta.created_at,
+        ta.updated_at
+    FROM TicketAssignmentsArchive ta
+    LEFT JOIN Users ua ON ta.assigned_admin_u_id = ua.id
+    LEFT JOIN Users ub ON ta.assigned_by_u_id = ub.id
+    WHERE ta.ticket_id = p_id
+        AND ta.is_deleted = FALSE
+    ORDER BY ta.created_at DESC;
+
+END //
+
+DELIMITER ;
+
+
+
+-- Permissions
+-- ----------------------------------------------------------------------------
+
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_archive_tickets TO 'scav_admin'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_fetch_archived_tickets TO 'scav_admin'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_fetch_archived_ticket_bundle TO 'scav_admin'@'%';
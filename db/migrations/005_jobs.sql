@@ -0,0 +1,345 @@
+-- 005_jobs.sql - Durable background job queue
+-- Copyright (C) 2026 Aaron Reichenbach
+--
+-- This program is free software: you can redistribute it and/or modify
+-- it under the terms of the GNU Affero General Public License as
+-- published by the Free Software Foundation, either version 3 of the
+-- License, or (at your option) any later version.
+--
+-- This program is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+-- GNU Affero General Public License for more details.
+--
+-- You should have received a copy of the GNU Affero General Public License
+-- along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+-- Tables
+-- ----------------------------------------------------------------------------
+-- One row per job. A job is claimed by setting status = 'running' with the
+-- worker's name and a lease (locked_at); a worker that dies mid-job leaves
+-- the lease to expire and the job is claimed again. idempotency_key is
+-- unique, so enqueueing the same side effect twice yields the same job.
+
+CREATE TABLE IF NOT EXISTS Jobs (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    kind VARCHAR(64) NOT NULL,
+    payload LONGTEXT NOT NULL CHECK (JSON_VALID(payload)),
+    idempotency_key VARCHAR(191) NULL,
+    status ENUM('queued', 'running', 'succeeded', 'dead') NOT NULL DEFAULT 'queued',
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 5,
+    run_after TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_by VARCHAR(64) NULL,
+    locked_at TIMESTAMP NULL,
+    last_error TEXT NULL,
+    result LONGTEXT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP NULL,
+    UNIQUE KEY uq_jobs_idempotency_key (idempotency_key),
+    INDEX idx_jobs_due (status, run_after),
+    INDEX idx_jobs_lease (status, locked_at),
+    INDEX idx_jobs_created (created_at)
+);
+
+
+
+-- Procedures
+-- ----------------------------------------------------------------------------
+
+DELIMITER //
+
+-- sp_admin_enqueue_job(p_kind, p_payload, p_idempotency_key, p_max_attempts, p_delay_seconds)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Queue a job, or find the existing one with the same idempotency key.
+--      Returns one row: id, status, created (FALSE when it already existed).
+-- Notes:
+--      A NULL key never collides, so keyless jobs are always queued. Two
+--      concurrent calls with the same key race on the unique index; the
+--      loser's duplicate-key error is caught and it returns the winner's job.
+
+CREATE OR REPLACE PROCEDURE sp_admin_enqueue_job(
+    IN p_kind VARCHAR(64),
+    IN p_payload LONGTEXT,
+    IN p_idempotency_key VARCHAR(191),
+    IN p_max_attempts INT,
+    IN p_delay_seconds INT
+)
+BEGIN
+
+    DECLARE v_id BIGINT DEFAULT NULL;
+    DECLARE v_created BOOLEAN DEFAULT FALSE;
+    DECLARE v_duplicate BOOLEAN DEFAULT FALSE;
+
+    DECLARE CONTINUE HANDLER FOR 1062
+        SET v_duplicate = TRUE;
+
+    SET p_idempotency_key = NULLIF(p_idempotency_key, '');
+
+    IF p_idempotency_key IS NOT NULL THEN
+        SELECT id INTO v_id
+        FROM Jobs
+        WHERE idempotency_key = p_idempotency_key;
+    END IF;
+
+    IF v_id IS NULL THEN
+        INSERT INTO Jobs (kind, payload, idempotency_key, max_attempts, run_after)
+        VALUES (
+            p_kind,
+            IFNULL(p_payload, '{}'),
+            p_idempotency_key,
+            GREATEST(IFNULL(p_max_attempts, 5), 1),
+            NOW() + INTERVAL GREATEST(IFNULL(p_delay_seconds, 0), 0) SECOND
+        );
+
+        IF v_duplicate THEN
+            SELECT id INTO v_id
+            FROM Jobs
+            WHERE idempotency_key = p_idempotency_key;
+        ELSE
+            SET v_id = LAST_INSERT_ID();
+            SET v_created = TRUE;
+        END IF;
+    END IF;
+
+    SELECT
+        id,
+        status,
+        v_created AS created
+    FROM Jobs
+    WHERE id = v_id;
+
+END //
+
+
+
+-- sp_worker_claim_job(p_worker, p_lease_seconds)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Claim the next due job for p_worker and return it (no row when the
+--      queue is empty). Jobs whose lease expired are put back first, or
+--      marked dead if that was their last attempt.
+-- Notes:
+--      A lost lease counts as a failed attempt (attempts is raised on
+--      claim), so a job that keeps crashing its worker ends up dead
+--      instead of being reclaimed forever. last_error is assigned first:
+--      MariaDB applies SET assignments in order, and it reads locked_by.
+--      FOR UPDATE SKIP LOCKED lets several workers claim concurrently
+--      without waiting on each other's candidate rows.
+
+CREATE OR REPLACE PROCEDURE sp_worker_claim_job(
+    IN p_worker VARCHAR(64),
+    IN p_lease_seconds INT
+)
+BEGIN
+
+    DECLARE v_id BIGINT DEFAULT NULL;
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    UPDATE Jobs
+    SET last_error = CONCAT('lease expired on ', IFNULL(locked_by, 'unknown worker')),
+        status = IF(attempts >= max_attempts, 'dead', 'queued'),
+        finished_at = IF(attempts >= max_attempts, NOW(), NULL),
+        locked_by = NULL,
+        locked_at = NULL
+    WHERE status = 'running'
+      AND locked_at < NOW() - INTERVAL GREATEST(IFNULL(p_lease_seconds, 300), 1) SECOND;
+
+    START TRANSACTION;
+
+    SELECT id INTO v_id
+    FROM Jobs
+    WHERE status = 'queued'
+      AND run_after <= NOW()
+    ORDER BY run_after, id
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED;
+
+    IF v_id IS NOT NULL THEN
+        UPDATE Jobs
+        SET status = 'running',
+            attempts = attempts + 1,
+            locked_by = p_worker,
+            locked_at = NOW()
+        WHERE id = v_id;
+    END IF;
+
+    COMMIT;
+
+    SELECT
+        id,
+        kind,
+        payload,
+        idempotency_key,
+        attempts,
+        max_attempts,
+        created_at
+    FROM Jobs
+    WHERE id = v_id;
+
+END //
+
+
+
+-- sp_worker_complete_job(p_id, p_worker, p_result)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Mark a claimed job as succeeded.
+-- Notes:
+--      Only the worker holding the lease can finish the job; a worker whose
+--      lease expired and was reclaimed changes nothing.
+
+CREATE OR REPLACE PROCEDURE sp_worker_complete_job(
+    IN p_id BIGINT,
+    IN p_worker VARCHAR(64),
+    IN p_result LONGTEXT
+)
+BEGIN
+
+    UPDATE Jobs
+    SET status = 'succeeded',
+        result = p_result,
+        last_error = NULL,
+        locked_by = NULL,
+        locked_at = NULL,
+        finished_at = NOW()
+    WHERE id = p_id
+      AND status = 'running'
+      AND locked_by = p_worker;
+
+END //
+
+
+
+-- sp_worker_fail_job(p_id, p_worker, p_error, p_retry_seconds)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Record a failed attempt. The job is queued again p_retry_seconds from
+--      now, or marked dead once it has used max_attempts (or when
+--      p_retry_seconds is NULL, for errors retrying cannot fix).
+
+CREATE OR REPLACE PROCEDURE sp_worker_fail_job(
+    IN p_id BIGINT,
+    IN p_worker VARCHAR(64),
+    IN p_error TEXT,
+    IN p_retry_seconds INT
+)
+BEGIN
+
+    UPDATE Jobs
+    SET status = IF(p_retry_seconds IS NULL OR attempts >= max_attempts, 'dead', 'queued'),
+        run_after = NOW() + INTERVAL GREATEST(IFNULL(p_retry_seconds, 0), 0) SECOND,
+        last_error = p_error,
+        locked_by = NULL,
+        locked_at = NULL,
+        finished_at = IF(p_retry_seconds IS NULL OR attempts >= max_attempts, NOW(), NULL)
+    WHERE id = p_id
+      AND status = 'running'
+      AND locked_by = p_worker;
+
+END //
+
+
+
+-- sp_admin_fetch_jobs(p_status, p_limit, p_offset)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Fetch jobs for the admin panel, newest first, with per-status counts
+--      as a second result set.
+
+CREATE OR REPLACE PROCEDURE sp_admin_fetch_jobs(
+    IN p_status VARCHAR(20),
+    IN p_limit INT,
+    IN p_offset INT
+)
+BEGIN
+
+    DECLARE v_total INT DEFAULT 0;
+
+    IF p_limit > 100 THEN
+        SET p_limit = 100;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 25;
+    END IF;
+    IF p_offset IS NULL OR p_offset < 0 THEN
+        SET p_offset = 0;
+    END IF;
+
+    SET p_status = NULLIF(p_status, '');
+
+    SELECT COUNT(*) INTO v_total
+    FROM Jobs
+    WHERE p_status IS NULL OR status = p_status;
+
+    SELECT
+        id,
+        kind,
+        idempotency_key,
+        status,
+        attempts,
+        max_attempts,
+        run_after,
+        locked_by,
+        last_error,
+        created_at,
+        finished_at,
+        v_total AS total_records
+    FROM Jobs
+    WHERE p_status IS NULL OR status = p_status
+    ORDER BY created_at DESC, id DESC
+    LIMIT p_limit OFFSET p_offset;
+
+    SELECT
+        status,
+        COUNT(*) AS jobs
+    FROM Jobs
+    GROUP BY status;
+
+END //
+
+
+
+-- sp_admin_retry_job(p_id)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Give a dead job a fresh set of attempts, due now.
+
+CREATE OR REPLACE PROCEDURE sp_admin_retry_job(
+    IN p_id BIGINT
+)
+BEGIN
+
+    UPDATE Jobs
+    SET status = 'queued',
+        attempts = 0,
+        run_after = NOW(),
+        finished_at = NULL
+    WHERE id = p_id
+      AND status = 'dead';
+
+END //
+
+DELIMITER ;
+
+
+
+-- Permissions
+-- ----------------------------------------------------------------------------
+-- The worker connects with the admin role; jobs are admin side effects.
+
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_enqueue_job TO 'scav_admin'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_fetch_jobs TO 'scav_admin'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_retry_job TO 'scav_admin'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_worker_claim_job TO 'scav_admin'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_worker_complete_job TO 'scav_admin'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_worker_fail_job TO 'scav_admin'@'%';
@@ -0,0 +1,483 @@
+-- 006_bulk_admin_actions.sql - Set-based bulk admin actions on users and tickets
+-- Copyright (C) 2026 Aaron Reichenbach
+--
+-- This program is free software: you can redistribute it and/or modify
+-- it under the terms of the GNU Affero General Public License as
+-- published by the Free Software Foundation, either version 3 of the
+-- License, or (at your option) any later version.
+--
+-- This program is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+-- GNU Affero General Public License for more details.
+--
+-- You should have received a copy of the GNU Affero General Public License
+-- along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+-- Procedures
+-- ----------------------------------------------------------------------------
+-- Every bulk procedure takes its ids as a JSON array, acts on all of them
+-- with one statement per table inside one transaction, and returns one row
+-- per distinct id: (id, result). result is the action's past tense when the
+-- row changed, 'unchanged' when it was already in the target state,
+-- 'skipped' when its state does not allow the action (e.g. approving an
+-- active user) and 'not found' when there is no such (live) row.
+-- The UPDATE that classifies the ids share-locks the rows it joins, so no
+-- row changes state between being classified and being written.
+
+DELIMITER //
+
+-- sp_admin_bulk_load_ids(p_ids)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Load the distinct integer ids of a JSON array into tmp_bulk_ids, each
+--      with result 'not found'. Shared by the bulk procedures below.
+-- Notes:
+--      At most 1000 ids are taken; non-integer entries are ignored.
+
+CREATE OR REPLACE PROCEDURE sp_admin_bulk_load_ids(
+    IN p_ids JSON
+)
+BEGIN
+
+    DROP TEMPORARY TABLE IF EXISTS tmp_bulk_ids;
+    CREATE TEMPORARY TABLE tmp_bulk_ids (
+        id INT PRIMARY KEY,
+        result VARCHAR(20) NOT NULL DEFAULT 'not found'
+    ) ENGINE=MEMORY;
+
+    IF JSON_VALID(p_ids) THEN
+        INSERT IGNORE INTO tmp_bulk_ids (id)
+        SELECT j.id
+        FROM JSON_TABLE(p_ids, '$[*]' COLUMNS (id INT PATH '$' NULL ON ERROR)) AS j
+        WHERE j.id IS NOT NULL
+        LIMIT 1000;
+    END IF;
+
+END //
+
+
+
+-- sp_admin_approve_users(p_ids)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Approve every requested user in p_ids.
+-- Notes:
+--      Users who are already active come back 'unchanged' rather than
+--      'skipped': approving them again is not a failure.
+
+CREATE OR REPLACE PROCEDURE sp_admin_approve_users(
+    IN p_ids JSON
+)
+BEGIN
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    CALL sp_admin_bulk_load_ids(p_ids);
+
+    START TRANSACTION;
+
+    UPDATE tmp_bulk_ids b
+    JOIN Users u ON u.id = b.id
+    SET b.result = CASE u.status
+        WHEN 'requested' THEN 'approved'
+        WHEN 'active' THEN 'unchanged'
+        ELSE 'skipped'
+    END;
+
+    UPDATE Users u
+    JOIN tmp_bulk_ids b ON b.id = u.id
+    SET u.status = 'active'
+    WHERE b.result = 'approved'
+      AND u.status = 'requested';
+
+    COMMIT;
+
+    SELECT id, result FROM tmp_bulk_ids ORDER BY id;
+
+END //
+
+
+
+-- sp_admin_enqueue_jobs(p_kind, p_ids, p_id_field, p_max_attempts)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Queue one p_kind job per id in the JSON array p_ids, with payload
+--      {p_id_field: id} and idempotency key '<p_kind>:<id>' (the key
+--      jobs.enqueue uses for the same work). Returns queued (new jobs) and
+--      existing (ids that already had one).
+-- Notes:
+--      One INSERT for the whole set; INSERT IGNORE skips ids whose key is
+--      taken, so repeating a call is harmless. At most 1000 ids.
+
+CREATE OR REPLACE PROCEDURE sp_admin_enqueue_jobs(
+    IN p_kind VARCHAR(64),
+    IN p_ids JSON,
+    IN p_id_field VARCHAR(64),
+    IN p_max_attempts INT
+)
+BEGIN
+
+    DECLARE v_total INT DEFAULT 0;
+    DECLARE v_queued INT DEFAULT 0;
+
+    CALL sp_admin_bulk_load_ids(p_ids);
+
+    SELECT COUNT(*) INTO v_total FROM tmp_bulk_ids;
+
+    INSERT IGNORE INTO Jobs (kind, payload, idempotency_key, max_attempts)
+    SELECT
+        p_kind,
+        JSON_OBJECT(p_id_field, b.id),
+        CONCAT(p_kind, ':', b.id),
+        GREATEST(IFNULL(p_max_attempts, 5), 1)
+    FROM tmp_bulk_ids b
+    ORDER BY b.id;
+
+    SET v_queued = ROW_COUNT();
+
+    SELECT
+        v_queued AS queued,
+        v_total - v_queued AS existing;
+
+END //
+
+
+
+-- sp_admin_deny_users(p_ids)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Delete (deny) every requested user in p_ids.
+
+CREATE OR REPLACE PROCEDURE sp_admin_deny_users(
+    IN p_ids JSON
+)
+BEGIN
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    CALL sp_admin_bulk_load_ids(p_ids);
+
+    START TRANSACTION;
+
+    UPDATE tmp_bulk_ids b
+    JOIN Users u ON u.id = b.id
+    SET b.result = IF(u.status = 'requested', 'denied', 'skipped');
+
+    DELETE u
+    FROM Users u
+    JOIN tmp_bulk_ids b ON b.id = u.id
+    WHERE b.result = 'denied'
+      AND u.status = 'requested';
+
+    COMMIT;
+
+    SELECT id, result FROM tmp_bulk_ids ORDER BY id;
+
+END //
+
+
+
+-- sp_admin_suspend_users(p_ids, p_hours)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Suspend every active or suspended user in p_ids for p_hours from now.
+--      Requested and banned users are skipped.
+
+CREATE OR REPLACE PROCEDURE sp_admin_suspend_users(
+    IN p_ids JSON,
+    IN p_hours INT
+)
+BEGIN
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    CALL sp_admin_bulk_load_ids(p_ids);
+
+    START TRANSACTION;
+
+    UPDATE tmp_bulk_ids b
+    JOIN Users u ON u.id = b.id
+    SET b.result = IF(u.status IN ('active', 'suspended'), 'suspended', 'skipped');
+
+    UPDATE Users u
+    JOIN tmp_bulk_ids b ON b.id = u.id
+    SET u.status = 'suspended',
+        u.suspended_until = DATE_ADD(NOW(), INTERVAL GREATEST(IFNULL(p_hours, 24), 1) HOUR)
+    WHERE b.result = 'suspended';
+
+    COMMIT;
+
+    SELECT id, result FROM tmp_bulk_ids ORDER BY id;
+
+END //
+
+
+
+-- sp_admin_ban_users(p_ids)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Permanently ban every user in p_ids except pending requests.
+
+CREATE OR REPLACE PROCEDURE sp_admin_ban_users(
+    IN p_ids JSON
+)
+BEGIN
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    CALL sp_admin_bulk_load_ids(p_ids);
+
+    START TRANSACTION;
+
+    UPDATE tmp_bulk_ids b
+    JOIN Users u ON u.id = b.id
+    SET b.result = CASE
+        WHEN u.status = 'banned' THEN 'unchanged'
+        WHEN u.status = 'requested' THEN 'skipped'
+        ELSE 'banned'
+    END;
+
+    UPDATE Users u
+    JOIN tmp_bulk_ids b ON b.id = u.id
+    SET u.status = 'banned',
+        u.suspended_until = NULL
+    WHERE b.result = 'banned';
+
+    COMMIT;
+
+    SELECT id, result FROM tmp_bulk_ids ORDER BY id;
+
+END //
+
+
+
+-- sp_admin_reinstate_users(p_ids)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Restore every suspended or banned user in p_ids to active status.
+
+CREATE OR REPLACE PROCEDURE sp_admin_reinstate_users(
+    IN p_ids JSON
+)
+BEGIN
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    CALL sp_admin_bulk_load_ids(p_ids);
+
+    START TRANSACTION;
+
+    UPDATE tmp_bulk_ids b
+    JOIN Users u ON u.id = b.id
+    SET b.result = CASE
+        WHEN u.status = 'active' THEN 'unchanged'
+        WHEN u.status = 'requested' THEN 'skipped'
+        ELSE 'reinstated'
+    END;
+
+    UPDATE Users u
+    JOIN tmp_bulk_ids b ON b.id = u.id
+    SET u.status = 'active',
+        u.suspended_until = NULL
+    WHERE b.result = 'reinstated';
+
+    COMMIT;
+
+    SELECT id, result FROM tmp_bulk_ids ORDER BY id;
+
+END //
+
+
+
+-- sp_admin_delete_users(p_ids)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Permanently delete every user in p_ids.
+
+CREATE OR REPLACE PROCEDURE sp_admin_delete_users(
+    IN p_ids JSON
+)
+BEGIN
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    CALL sp_admin_bulk_load_ids(p_ids);
+
+    START TRANSACTION;
+
+    UPDATE tmp_bulk_ids b
+    JOIN Users u ON u.id = b.id
+    SET b.result = 'deleted';
+
+    DELETE u
+    FROM Users u
+    JOIN tmp_bulk_ids b ON b.id = u.id
+    WHERE b.result = 'deleted';
+
+    COMMIT;
+
+    SELECT id, result FROM tmp_bulk_ids ORDER BY id;
+
+END //
+
+
+
+-- sp_admin_update_tickets(p_ids, p_ticket_type, p_status, p_priority, p_changed_by_u_id, p_status_message)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Set status and/or priority (NULL = keep) on every live ticket of
+--      p_ticket_type in p_ids. Tickets whose status changes get a status
+--      history message, as a single-ticket status change does.
+-- Notes:
+--      Tickets of the other type count as 'not found', so a request status
+--      can never be written onto a report.
+
+CREATE OR REPLACE PROCEDURE sp_admin_update_tickets(
+    IN p_ids JSON,
+    IN p_ticket_type VARCHAR(20),
+    IN p_status VARCHAR(20),
+    IN p_priority VARCHAR(20),
+    IN p_changed_by_u_id INT,
+    IN p_status_message TEXT
+)
+BEGIN
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    SET p_status = NULLIF(p_status, '');
+    SET p_priority = NULLIF(p_priority, '');
+
+    CALL sp_admin_bulk_load_ids(p_ids);
+
+    START TRANSACTION;
+
+    UPDATE tmp_bulk_ids b
+    JOIN Tickets t ON t.id = b.id
+    SET b.result = IF(
+        t.status = COALESCE(p_status, t.status) AND t.priority = COALESCE(p_priority, t.priority),
+        'unchanged',
+        'updated'
+    )
+    WHERE t.ticket_type = p_ticket_type
+      AND t.is_deleted = FALSE;
+
+    IF p_status IS NOT NULL THEN
+        INSERT INTO TicketStatusMessages (
+            ticket_id,
+            changed_by_u_id,
+            old_status,
+            new_status,
+            status_message
+        )
+        SELECT
+            t.id,
+            p_changed_by_u_id,
+            t.status,
+            p_status,
+            IFNULL(NULLIF(p_status_message, ''), CONCAT('Status changed to ', p_status, '.'))
+        FROM Tickets t
+        JOIN tmp_bulk_ids b ON b.id = t.id
+        WHERE b.result = 'updated'
+          AND t.status <> p_status;
+    END IF;
+
+    UPDATE Tickets t
+    JOIN tmp_bulk_ids b ON b.id = t.id
+    SET t.status = COALESCE(p_status, t.status),
+        t.priority = COALESCE(p_priority, t.priority)
+    WHERE b.result = 'updated';
+
+    COMMIT;
+
+    SELECT id, result FROM tmp_bulk_ids ORDER BY id;
+
+END //
+
+
+
+-- sp_admin_delete_tickets(p_ids, p_ticket_type)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Soft delete every live ticket of p_ticket_type in p_ids.
+
+CREATE OR REPLACE PROCEDURE sp_admin_delete_tickets(
+    IN p_ids JSON,
+    IN p_ticket_type VARCHAR(20)
+)
+BEGIN
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    CALL sp_admin_bulk_load_ids(p_ids);
+
+    START TRANSACTION;
+
+    UPDATE tmp_bulk_ids b
+    JOIN Tickets t ON t.id = b.id
+    SET b.result = 'deleted'
+    WHERE t.ticket_type = p_ticket_type
+      AND t.is_deleted = FALSE;
+
+    UPDATE Tickets t
+    JOIN tmp_bulk_ids b ON b.id = t.id
+    SET t.is_deleted = TRUE,
+        t.deleted_at = CURRENT_TIMESTAMP
+    WHERE b.result = 'deleted';
+
+    COMMIT;
+
+    SELECT id, result FROM tmp_bulk_ids ORDER BY id;
+
+END //
+
+DELIMITER ;
+
+
+
+-- Permissions
+-- ----------------------------------------------------------------------------
+
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_approve_users TO 'scav_admin'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_enqueue_jobs TO 'scav_admin'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_deny_users TO 'scav_admin'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_suspend_users TO 'scav_admin'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_ban_users TO 'scav_admin'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_reinstate_users TO 'scav_admin'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_delete_users TO 'scav_admin'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_update_tickets TO 'scav_admin'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_delete_tickets TO 'scav_admin'@'%';
@@ -0,0 +1,188 @@
+-- 007_chat.sql - Chat channels and message log
+-- Copyright (C) 2026 Aaron Reichenbach
+--
+-- This program is free software: you can redistribute it and/or modify
+-- it under the terms of the GNU Affero General Public License as
+-- published by the Free Software Foundation, either version 3 of the
+-- License, or (at your option) any later version.
+--
+-- This program is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+-- GNU Affero General Public License for more details.
+--
+-- You should have received a copy of the GNU Affero General Public License
+-- along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+-- Tables
+-- ----------------------------------------------------------------------------
+-- Recent messages are served from the web containers' shared ring buffer
+-- (site/chat.py); this table is the durable log behind it, written in
+-- batches. Message ids are assigned by the ring buffer, not AUTO_INCREMENT,
+-- so a batch can be written again after a failed flush without duplicates.
+
+CREATE TABLE IF NOT EXISTS ChatChannels (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(32) NOT NULL,
+    topic VARCHAR(255) NULL,
+    is_deleted BOOLEAN NOT NULL DEFAULT FALSE,
+    deleted_at TIMESTAMP NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_chatchannels_name (name)
+);
+
+CREATE TABLE IF NOT EXISTS ChatMessages (
+    id BIGINT PRIMARY KEY,
+    channel_id INT NOT NULL,
+    u_id INT NOT NULL,
+    body TEXT NOT NULL,
+    is_deleted BOOLEAN NOT NULL DEFAULT FALSE,
+    deleted_at TIMESTAMP NULL,
+    created_at TIMESTAMP(3) NOT NULL,
+    CONSTRAINT fk_chatmessages_channel_id
+        FOREIGN KEY (channel_id)
+        REFERENCES ChatChannels (id)
+        ON DELETE CASCADE,
+    CONSTRAINT fk_chatmessages_u_id
+        FOREIGN KEY (u_id)
+        REFERENCES Users (id)
+        ON DELETE CASCADE,
+    INDEX idx_chatmessages_channel (channel_id, is_deleted, id)
+);
+
+INSERT IGNORE INTO ChatChannels (name, topic) VALUES ('general', 'Anything goes.');
+
+
+
+-- Procedures
+-- ----------------------------------------------------------------------------
+
+DELIMITER //
+
+-- sp_chat_fetch_channels()
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Fetch all live chat channels, by name.
+
+CREATE OR REPLACE PROCEDURE sp_chat_fetch_channels()
+BEGIN
+
+    SELECT
+        id,
+        name,
+        topic
+    FROM ChatChannels
+    WHERE is_deleted = FALSE
+    ORDER BY name;
+
+END //
+
+
+
+-- sp_chat_fetch_messages(p_channel_id, p_before_id, p_limit)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Fetch a page of a channel's history, newest first: the p_limit
+--      messages with id below p_before_id (NULL = the latest).
+-- Notes:
+--      Keyset pagination on (channel_id, is_deleted, id); created_ts is a
+--      unix timestamp so the rows match the ring buffer's.
+
+CREATE OR REPLACE PROCEDURE sp_chat_fetch_messages(
+    IN p_channel_id INT,
+    IN p_before_id BIGINT,
+    IN p_limit INT
+)
+BEGIN
+
+    IF p_limit > 100 THEN
+        SET p_limit = 100;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 50;
+    END IF;
+
+    SELECT
+        cm.id,
+        cm.channel_id,
+        cm.u_id,
+        u.username,
+        cm.body,
+        UNIX_TIMESTAMP(cm.created_at) AS created_ts
+    FROM ChatMessages cm
+    JOIN Users u ON cm.u_id = u.id
+    WHERE cm.channel_id = p_channel_id
+      AND cm.is_deleted = FALSE
+      AND (p_before_id IS NULL OR cm.id < p_before_id)
+    ORDER BY cm.id DESC
+    LIMIT p_limit;
+
+END //
+
+
+
+-- sp_chat_fetch_last_message_id()
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Highest message id ever stored (0 when empty), to seed the ring
+--      buffer's id sequence after a cold start.
+
+CREATE OR REPLACE PROCEDURE sp_chat_fetch_last_message_id()
+BEGIN
+
+    SELECT IFNULL(MAX(id), 0) AS last_id
+    FROM ChatMessages;
+
+END //
+
+
+
+-- sp_chat_save_messages(p_messages)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Persist a batch of messages from the ring buffer in one INSERT.
+--      p_messages is a JSON array of
+--      {"id", "channel_id", "u_id", "body", "created_ts"}.
+-- Notes:
+--      INSERT IGNORE makes a repeated batch a no-op and drops rows whose
+--      user or channel was deleted in the meantime.
+
+CREATE OR REPLACE PROCEDURE sp_chat_save_messages(
+    IN p_messages JSON
+)
+BEGIN
+
+    INSERT IGNORE INTO ChatMessages (id, channel_id, u_id, body, created_at)
+    SELECT
+        m.id,
+        m.channel_id,
+        m.u_id,
+        m.body,
+        FROM_UNIXTIME(m.created_ts)
+    FROM JSON_TABLE(p_messages, '$[*]' COLUMNS (
+        id BIGINT PATH '$.id',
+        channel_id INT PATH '$.channel_id',
+        u_id INT PATH '$.u_id',
+        body TEXT PATH '$.body',
+        created_ts DECIMAL(16, 3) PATH '$.created_ts'
+    )) AS m
+    WHERE m.id IS NOT NULL;
+
+    SELECT ROW_COUNT() AS saved;
+
+END //
+
+DELIMITER ;
+
+
+
+-- Permissions
+-- ----------------------------------------------------------------------------
+
+GRANT EXECUTE ON PROCEDURE scavengers.sp_chat_fetch_channels TO 'scav_social'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_chat_fetch_messages TO 'scav_social'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_chat_fetch_last_message_id TO 'scav_social'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_chat_save_messages TO 'scav_social'@'%';
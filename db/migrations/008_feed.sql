@@ -0,0 +1,275 @@
+-- 008_feed.sql - Feed posts, comments and one shared timeline
+-- Copyright (C) 2026 Aaron Reichenbach
+--
+-- This program is free software: you can redistribute it and/or modify
+-- it under the terms of the GNU Affero General Public License as
+-- published by the Free Software Foundation, either version 3 of the
+-- License, or (at your option) any later version.
+--
+-- This program is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+-- GNU Affero General Public License for more details.
+--
+-- You should have received a copy of the GNU Affero General Public License
+-- along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+-- Tables
+-- ----------------------------------------------------------------------------
+-- There is no follow graph, so every member sees the same feed: it is read
+-- straight from FeedPosts on idx_feedposts_live (is_deleted, id), one range
+-- read with no per-member fan-out on write. comment_count is maintained by
+-- sp_feed_create_comment; it is never counted per render.
+
+CREATE TABLE IF NOT EXISTS FeedPosts (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    u_id INT NOT NULL,
+    link VARCHAR(2048) NULL,
+    body VARCHAR(1000) NOT NULL,
+    comment_count INT NOT NULL DEFAULT 0,
+    is_deleted BOOLEAN NOT NULL DEFAULT FALSE,
+    deleted_at TIMESTAMP NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT fk_feedposts_u_id
+        FOREIGN KEY (u_id)
+        REFERENCES Users (id)
+        ON DELETE CASCADE,
+    INDEX idx_feedposts_live (is_deleted, id)
+);
+
+CREATE TABLE IF NOT EXISTS FeedComments (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    post_id INT NOT NULL,
+    u_id INT NOT NULL,
+    body VARCHAR(500) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_feedcomments_post_id
+        FOREIGN KEY (post_id)
+        REFERENCES FeedPosts (id)
+        ON DELETE CASCADE,
+    CONSTRAINT fk_feedcomments_u_id
+        FOREIGN KEY (u_id)
+        REFERENCES Users (id)
+        ON DELETE CASCADE,
+    INDEX idx_feedcomments_post (post_id, id)
+);
+
+
+
+-- Procedures
+-- ----------------------------------------------------------------------------
+
+DELIMITER //
+
+-- sp_feed_create_post(p_u_id, p_link, p_body)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Create a post. Returns the new post's id.
+
+CREATE OR REPLACE PROCEDURE sp_feed_create_post(
+    IN p_u_id INT,
+    IN p_link VARCHAR(2048),
+    IN p_body VARCHAR(1000)
+)
+BEGIN
+
+    INSERT INTO FeedPosts (u_id, link, body)
+    VALUES (p_u_id, NULLIF(p_link, ''), p_body);
+
+    SELECT LAST_INSERT_ID() AS id;
+
+END //
+
+
+
+-- sp_feed_fetch_timeline(p_before_id, p_limit)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      A page of the feed, newest first: the p_limit live posts with id
+--      below p_before_id (NULL = the latest).
+-- Notes:
+--      Range read on idx_feedposts_live (is_deleted, id); authors are joined
+--      by primary key, and comment_count comes from the post row.
+
+CREATE OR REPLACE PROCEDURE sp_feed_fetch_timeline(
+    IN p_before_id INT,
+    IN p_limit INT
+)
+BEGIN
+
+    IF p_limit > 100 THEN
+        SET p_limit = 100;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 20;
+    END IF;
+
+    SELECT
+        p.id,
+        p.u_id,
+        u.username,
+        p.link,
+        p.body,
+        p.comment_count,
+        p.created_at
+    FROM FeedPosts p
+    JOIN Users u ON u.id = p.u_id
+    WHERE p.is_deleted = FALSE
+      AND p.id < IFNULL(p_before_id, 2147483647)
+    ORDER BY p.id DESC
+    LIMIT p_limit;
+
+END //
+
+
+
+-- sp_feed_fetch_post(p_post_id)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Fetch one live post.
+
+CREATE OR REPLACE PROCEDURE sp_feed_fetch_post(
+    IN p_post_id INT
+)
+BEGIN
+
+    SELECT
+        p.id,
+        p.u_id,
+        u.username,
+        p.link,
+        p.body,
+        p.comment_count,
+        p.created_at
+    FROM FeedPosts p
+    JOIN Users u ON u.id = p.u_id
+    WHERE p.id = p_post_id
+      AND p.is_deleted = FALSE;
+
+END //
+
+
+
+-- sp_feed_fetch_comments(p_post_id, p_after_id, p_limit)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      A page of a post's comments, oldest first: the p_limit comments with
+--      id above p_after_id (NULL = from the start).
+-- Notes:
+--      Keyset pagination on idx_feedcomments_post (post_id, id).
+
+CREATE OR REPLACE PROCEDURE sp_feed_fetch_comments(
+    IN p_post_id INT,
+    IN p_after_id INT,
+    IN p_limit INT
+)
+BEGIN
+
+    IF p_limit > 100 THEN
+        SET p_limit = 100;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 50;
+    END IF;
+
+    SELECT
+        c.id,
+        c.u_id,
+        u.username,
+        c.body,
+        c.created_at
+    FROM FeedComments c
+    JOIN Users u ON u.id = c.u_id
+    WHERE c.post_id = p_post_id
+      AND (p_after_id IS NULL OR c.id > p_after_id)
+    ORDER BY c.id
+    LIMIT p_limit;
+
+END //
+
+
+
+-- sp_feed_create_comment(p_post_id, p_u_id, p_body)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Comment on a live post and bump its comment_count in the same
+--      transaction. Returns the new comment's id, or NULL if the post does
+--      not exist or was deleted.
+
+CREATE OR REPLACE PROCEDURE sp_feed_create_comment(
+    IN p_post_id INT,
+    IN p_u_id INT,
+    IN p_body VARCHAR(500)
+)
+BEGIN
+
+    DECLARE v_id INT DEFAULT NULL;
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    START TRANSACTION;
+
+    UPDATE FeedPosts
+    SET comment_count = comment_count + 1
+    WHERE id = p_post_id
+      AND is_deleted = FALSE;
+
+    IF ROW_COUNT() > 0 THEN
+        INSERT INTO FeedComments (post_id, u_id, body)
+        VALUES (p_post_id, p_u_id, p_body);
+
+        SET v_id = LAST_INSERT_ID();
+    END IF;
+
+    COMMIT;
+
+    SELECT v_id AS id;
+
+END //
+
+
+
+-- sp_feed_delete_post(p_post_id, p_u_id, p_is_admin)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Soft delete a post (its author, or any admin). Returns deleted =
+--      TRUE when a post was deleted.
+
+CREATE OR REPLACE PROCEDURE sp_feed_delete_post(
+    IN p_post_id INT,
+    IN p_u_id INT,
+    IN p_is_admin BOOLEAN
+)
+BEGIN
+
+    UPDATE FeedPosts
+    SET is_deleted = TRUE,
+        deleted_at = NOW()
+    WHERE id = p_post_id
+      AND is_deleted = FALSE
+      AND (u_id = p_u_id OR p_is_admin);
+
+    SELECT ROW_COUNT() > 0 AS deleted;
+
+END //
+
+DELIMITER ;
+
+
+
+-- Permissions
+-- ----------------------------------------------------------------------------
+
+GRANT EXECUTE ON PROCEDURE scavengers.sp_feed_create_post TO 'scav_social'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_feed_fetch_timeline TO 'scav_social'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_feed_fetch_post TO 'scav_social'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_feed_fetch_comments TO 'scav_social'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_feed_create_comment TO 'scav_social'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_feed_delete_post TO 'scav_social'@'%';
@@ -0,0 +1,381 @@
+-- 009_board.sql - Bulletin board categories, threads and posts
+-- Copyright (C) 2026 Aaron Reichenbach
+--
+-- This program is free software: you can redistribute it and/or modify
+-- it under the terms of the GNU Affero General Public License as
+-- published by the Free Software Foundation, either version 3 of the
+-- License, or (at your option) any later version.
+--
+-- This program is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+-- GNU Affero General Public License for more details.
+--
+-- You should have received a copy of the GNU Affero General Public License
+-- along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+-- Tables
+-- ----------------------------------------------------------------------------
+-- Strict three tiers: categories -> threads -> posts, no sub-forums.
+-- Thread and category statistics (post_count, last_post_at, last_poster,
+-- thread_count) are denormalised and maintained by the posting procedures in
+-- the same transaction as the post, so list views never aggregate posts.
+
+CREATE TABLE IF NOT EXISTS BoardCategories (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(64) NOT NULL,
+    description VARCHAR(255) NULL,
+    position INT NOT NULL DEFAULT 0,
+    thread_count INT NOT NULL DEFAULT 0,
+    post_count INT NOT NULL DEFAULT 0,
+    last_post_at TIMESTAMP NULL,
+    is_deleted BOOLEAN NOT NULL DEFAULT FALSE,
+    deleted_at TIMESTAMP NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_boardcategories_name (name)
+);
+
+CREATE TABLE IF NOT EXISTS BoardThreads (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    category_id INT NOT NULL,
+    u_id INT NOT NULL,
+    title VARCHAR(150) NOT NULL,
+    post_count INT NOT NULL DEFAULT 0,
+    last_post_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_post_u_id INT NULL,
+    last_poster VARCHAR(50) NULL,
+    is_deleted BOOLEAN NOT NULL DEFAULT FALSE,
+    deleted_at TIMESTAMP NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_boardthreads_category_id
+        FOREIGN KEY (category_id)
+        REFERENCES BoardCategories (id)
+        ON DELETE CASCADE,
+    CONSTRAINT fk_boardthreads_u_id
+        FOREIGN KEY (u_id)
+        REFERENCES Users (id)
+        ON DELETE CASCADE,
+    INDEX idx_boardthreads_category_activity (category_id, is_deleted, last_post_at, id)
+);
+
+CREATE TABLE IF NOT EXISTS BoardPosts (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    thread_id INT NOT NULL,
+    u_id INT NOT NULL,
+    body TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_boardposts_thread_id
+        FOREIGN KEY (thread_id)
+        REFERENCES BoardThreads (id)
+        ON DELETE CASCADE,
+    CONSTRAINT fk_boardposts_u_id
+        FOREIGN KEY (u_id)
+        REFERENCES Users (id)
+        ON DELETE CASCADE,
+    INDEX idx_boardposts_thread (thread_id, id)
+);
+
+INSERT IGNORE INTO BoardCategories (name, description) VALUES ('general', 'Anything that fits nowhere else.');
+
+
+
+-- Procedures
+-- ----------------------------------------------------------------------------
+
+DELIMITER //
+
+-- sp_board_fetch_index()
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Fetch every live category with its thread/post counts and latest
+--      activity, in display order.
+-- Notes:
+--      Reads only the category rows; the counts are maintained on write.
+
+CREATE OR REPLACE PROCEDURE sp_board_fetch_index()
+BEGIN
+
+    SELECT
+        id,
+        name,
+        description,
+        thread_count,
+        post_count,
+        last_post_at
+    FROM BoardCategories
+    WHERE is_deleted = FALSE
+    ORDER BY position, name;
+
+END //
+
+
+
+-- sp_board_fetch_threads(p_category_id, p_limit, p_offset)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      A page of a category's threads, most recently active first.
+-- Notes:
+--      Walks idx_boardthreads_category_activity backwards; post_count,
+--      last_post_at and last_poster come from the thread row. The page count
+--      comes from BoardCategories.thread_count, not a COUNT here.
+
+CREATE OR REPLACE PROCEDURE sp_board_fetch_threads(
+    IN p_category_id INT,
+    IN p_limit INT,
+    IN p_offset INT
+)
+BEGIN
+
+    IF p_limit > 100 THEN
+        SET p_limit = 100;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 25;
+    END IF;
+    IF p_offset IS NULL OR p_offset < 0 THEN
+        SET p_offset = 0;
+    END IF;
+
+    SELECT
+        t.id,
+        t.u_id,
+        u.username,
+        t.title,
+        t.post_count,
+        t.last_post_at,
+        t.last_poster
+    FROM BoardThreads t
+    JOIN Users u ON u.id = t.u_id
+    WHERE t.category_id = p_category_id
+      AND t.is_deleted = FALSE
+    ORDER BY t.last_post_at DESC, t.id DESC
+    LIMIT p_limit OFFSET p_offset;
+
+END //
+
+
+
+-- sp_board_fetch_thread(p_thread_id)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Fetch one live thread with its category.
+
+CREATE OR REPLACE PROCEDURE sp_board_fetch_thread(
+    IN p_thread_id INT
+)
+BEGIN
+
+    SELECT
+        t.id,
+        t.category_id,
+        c.name AS category_name,
+        t.u_id,
+        t.title,
+        t.post_count,
+        t.last_post_at,
+        t.last_poster
+    FROM BoardThreads t
+    JOIN BoardCategories c ON c.id = t.category_id
+    WHERE t.id = p_thread_id
+      AND t.is_deleted = FALSE
+      AND c.is_deleted = FALSE;
+
+END //
+
+
+
+-- sp_board_fetch_posts(p_thread_id, p_after_id, p_before_id, p_limit)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      A page of a thread's posts by keyset on (thread_id, id): with
+--      p_after_id, the p_limit posts after it, oldest first; with
+--      p_before_id, the p_limit posts before it, newest first (the caller
+--      reverses them). Neither: the first page.
+-- Notes:
+--      Both directions are a range read on idx_boardposts_thread, so the
+--      last page of a long thread costs the same as the first.
+
+CREATE OR REPLACE PROCEDURE sp_board_fetch_posts(
+    IN p_thread_id INT,
+    IN p_after_id INT,
+    IN p_before_id INT,
+    IN p_limit INT
+)
+BEGIN
+
+    IF p_limit > 100 THEN
+        SET p_limit = 100;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 25;
+    END IF;
+
+    IF p_before_id IS NOT NULL THEN
+        SELECT
+            p.id,
+            p.u_id,
+            u.username,
+            p.body,
+            p.created_at
+        FROM BoardPosts p
+        JOIN Users u ON u.id = p.u_id
+        WHERE p.thread_id = p_thread_id
+          AND p.id < p_before_id
+        ORDER BY p.id DESC
+        LIMIT p_limit;
+    ELSE
+        SELECT
+            p.id,
+            p.u_id,
+            u.username,
+            p.body,
+            p.created_at
+        FROM BoardPosts p
+        JOIN Users u ON u.id = p.u_id
+        WHERE p.thread_id = p_thread_id
+          AND p.id > IFNULL(p_after_id, 0)
+        ORDER BY p.id
+        LIMIT p_limit;
+    END IF;
+
+END //
+
+
+
+-- sp_board_create_thread(p_category_id, p_u_id, p_title, p_body)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Open a thread with its first post and update the thread and category
+--      statistics. Returns thread_id and post_id (both NULL if the category
+--      does not exist).
+
+CREATE OR REPLACE PROCEDURE sp_board_create_thread(
+    IN p_category_id INT,
+    IN p_u_id INT,
+    IN p_title VARCHAR(150),
+    IN p_body TEXT
+)
+BEGIN
+
+    DECLARE v_thread_id INT DEFAULT NULL;
+    DECLARE v_post_id INT DEFAULT NULL;
+    DECLARE v_username VARCHAR(50);
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    SELECT username INTO v_username
+    FROM Users
+    WHERE id = p_u_id;
+
+    START TRANSACTION;
+
+    UPDATE BoardCategories
+    SET thread_count = thread_count + 1,
+        post_count = post_count + 1,
+        last_post_at = NOW()
+    WHERE id = p_category_id
+      AND is_deleted = FALSE;
+
+    IF ROW_COUNT() > 0 THEN
+        INSERT INTO BoardThreads (category_id, u_id, title, post_count, last_post_at, last_post_u_id, last_poster)
+        VALUES (p_category_id, p_u_id, p_title, 1, NOW(), p_u_id, v_username);
+
+        SET v_thread_id = LAST_INSERT_ID();
+
+        INSERT INTO BoardPosts (thread_id, u_id, body)
+        VALUES (v_thread_id, p_u_id, p_body);
+
+        SET v_post_id = LAST_INSERT_ID();
+    END IF;
+
+    COMMIT;
+
+    SELECT v_thread_id AS thread_id, v_post_id AS post_id;
+
+END //
+
+
+
+-- sp_board_create_post(p_thread_id, p_u_id, p_body)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Reply to a live thread and update its post_count, last_post_at and
+--      last_poster, and its category's post_count and last_post_at. Returns
+--      post_id (NULL if the thread does not exist).
+-- Notes:
+--      The thread UPDATE comes first and takes the row lock, so concurrent
+--      replies to one thread serialise and the counts stay exact.
+
+CREATE OR REPLACE PROCEDURE sp_board_create_post(
+    IN p_thread_id INT,
+    IN p_u_id INT,
+    IN p_body TEXT
+)
+BEGIN
+
+    DECLARE v_post_id INT DEFAULT NULL;
+    DECLARE v_category_id INT DEFAULT NULL;
+    DECLARE v_username VARCHAR(50);
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    SELECT username INTO v_username
+    FROM Users
+    WHERE id = p_u_id;
+
+    START TRANSACTION;
+
+    UPDATE BoardThreads
+    SET post_count = post_count + 1,
+        last_post_at = NOW(),
+        last_post_u_id = p_u_id,
+        last_poster = v_username
+    WHERE id = p_thread_id
+      AND is_deleted = FALSE;
+
+    IF ROW_COUNT() > 0 THEN
+        SELECT category_id INTO v_category_id
+        FROM BoardThreads
+        WHERE id = p_thread_id;
+
+        INSERT INTO BoardPosts (thread_id, u_id, body)
+        VALUES (p_thread_id, p_u_id, p_body);
+
+        SET v_post_id = LAST_INSERT_ID();
+
+        UPDATE BoardCategories
+        SET post_count = post_count + 1,
+            last_post_at = NOW()
+        WHERE id = v_category_id;
+    END IF;
+
+    COMMIT;
+
+    SELECT v_post_id AS post_id;
+
+END //
+
+DELIMITER ;
+
+
+
+-- Permissions
+-- ----------------------------------------------------------------------------
+
+GRANT EXECUTE ON PROCEDURE scavengers.sp_board_fetch_index TO 'scav_user'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_board_fetch_threads TO 'scav_user'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_board_fetch_thread TO 'scav_user'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_board_fetch_posts TO 'scav_user'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_board_create_thread TO 'scav_user'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_board_create_post TO 'scav_user'@'%';
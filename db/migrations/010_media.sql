@@ -0,0 +1,122 @@
+-- 010_media.sql - Media library files
+-- Copyright (C) 2026 Aaron Reichenbach
+--
+-- This program is free software: you can redistribute it and/or modify
+-- it under the terms of the GNU Affero General Public License as
+-- published by the Free Software Foundation, either version 3 of the
+-- License, or (at your option) any later version.
+--
+-- This program is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+-- GNU Affero General Public License for more details.
+--
+-- You should have received a copy of the GNU Affero General Public License
+-- along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+-- Tables
+-- ----------------------------------------------------------------------------
+-- storage_path is relative to the media root (MEDIA_ROOT in the app, an
+-- internal location in nginx); the database never holds absolute paths, so
+-- the files can move between hosts without touching the rows.
+
+CREATE TABLE IF NOT EXISTS Media (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    u_id INT NOT NULL,
+    media_type ENUM('audio', 'video', 'print', 'image') NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    file_name VARCHAR(255) NOT NULL,
+    storage_path VARCHAR(512) NOT NULL,
+    content_type VARCHAR(127) NOT NULL DEFAULT 'application/octet-stream',
+    size_bytes BIGINT NOT NULL,
+    sha256 CHAR(64) NOT NULL,
+    is_deleted BOOLEAN NOT NULL DEFAULT FALSE,
+    deleted_at TIMESTAMP NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT fk_media_u_id
+        FOREIGN KEY (u_id)
+        REFERENCES Users (id)
+        ON DELETE CASCADE,
+    INDEX idx_media_created (is_deleted, created_at, id),
+    INDEX idx_media_sha256 (sha256)
+);
+
+
+
+-- Procedures
+-- ----------------------------------------------------------------------------
+
+DELIMITER //
+
+-- sp_media_fetch_latest(p_limit)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Fetch the newest live media items.
+
+CREATE OR REPLACE PROCEDURE sp_media_fetch_latest(
+    IN p_limit INT
+)
+BEGIN
+
+    IF p_limit > 100 THEN
+        SET p_limit = 100;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 50;
+    END IF;
+
+    SELECT
+        id,
+        media_type,
+        title,
+        file_name,
+        content_type,
+        size_bytes,
+        created_at
+    FROM Media
+    WHERE is_deleted = FALSE
+    ORDER BY created_at DESC, id DESC
+    LIMIT p_limit;
+
+END //
+
+
+
+-- sp_media_fetch_file(p_media_id)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Everything needed to deliver one live media file.
+
+CREATE OR REPLACE PROCEDURE sp_media_fetch_file(
+    IN p_media_id INT
+)
+BEGIN
+
+    SELECT
+        id,
+        media_type,
+        title,
+        file_name,
+        storage_path,
+        content_type,
+        size_bytes,
+        sha256,
+        updated_at
+    FROM Media
+    WHERE id = p_media_id
+      AND is_deleted = FALSE;
+
+END //
+
+DELIMITER ;
+
+
+
+-- Permissions
+-- ----------------------------------------------------------------------------
+
+GRANT EXECUTE ON PROCEDURE scavengers.sp_media_fetch_latest TO 'scav_user'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_media_fetch_file TO 'scav_user'@'%';
@@ -0,0 +1,327 @@
+-- 011_media_uploads.sql - Chunked, resumable media uploads
+-- Copyright (C) 2026 Aaron Reichenbach
+--
+-- This program is free software: you can redistribute it and/or modify
+-- it under the terms of the GNU Affero General Public License as
+-- published by the Free Software Foundation, either version 3 of the
+-- License, or (at your option) any later version.
+--
+-- This program is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+-- GNU Affero General Public License for more details.
+--
+-- You should have received a copy of the GNU Affero General Public License
+-- along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+-- Tables
+-- ----------------------------------------------------------------------------
+-- One row per upload session. The bytes received so far live in a partial
+-- file under the media root; its size, not received_bytes, is authoritative
+-- for resuming (received_bytes is informational and refreshes updated_at,
+-- which drives expiry of abandoned uploads).
+
+CREATE TABLE IF NOT EXISTS MediaUploads (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    u_id INT NOT NULL,
+    media_type ENUM('audio', 'video', 'print', 'image') NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    file_name VARCHAR(255) NOT NULL,
+    content_type VARCHAR(127) NOT NULL,
+    size_bytes BIGINT NOT NULL,
+    received_bytes BIGINT NOT NULL DEFAULT 0,
+    status ENUM('open', 'complete', 'aborted', 'expired') NOT NULL DEFAULT 'open',
+    media_id INT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT fk_mediauploads_u_id
+        FOREIGN KEY (u_id)
+        REFERENCES Users (id)
+        ON DELETE CASCADE,
+    CONSTRAINT fk_mediauploads_media_id
+        FOREIGN KEY (media_id)
+        REFERENCES Media (id)
+        ON DELETE SET NULL,
+    INDEX idx_mediauploads_user_status (u_id, status, updated_at),
+    INDEX idx_mediauploads_status (status, updated_at)
+);
+
+
+
+-- Procedures
+-- ----------------------------------------------------------------------------
+
+DELIMITER //
+
+-- sp_media_upload_begin(p_u_id, p_media_type, p_title, p_file_name,
+--                       p_content_type, p_size_bytes, p_max_open, p_expire_hours)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Open an upload session. Returns upload_id, NULL when the user already
+--      has p_max_open open uploads.
+-- Notes:
+--      The user row is locked for the count, so concurrent begins by one
+--      user cannot both slip under the limit. Open uploads untouched for
+--      p_expire_hours no longer count (they are purged separately).
+
+CREATE OR REPLACE PROCEDURE sp_media_upload_begin(
+    IN p_u_id INT,
+    IN p_media_type VARCHAR(10),
+    IN p_title VARCHAR(255),
+    IN p_file_name VARCHAR(255),
+    IN p_content_type VARCHAR(127),
+    IN p_size_bytes BIGINT,
+    IN p_max_open INT,
+    IN p_expire_hours INT
+)
+BEGIN
+
+    DECLARE v_upload_id INT DEFAULT NULL;
+    DECLARE v_open INT DEFAULT 0;
+    DECLARE v_user INT DEFAULT NULL;
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    START TRANSACTION;
+
+    SELECT id INTO v_user
+    FROM Users
+    WHERE id = p_u_id
+    FOR UPDATE;
+
+    SELECT COUNT(*) INTO v_open
+    FROM MediaUploads
+    WHERE u_id = p_u_id
+      AND status = 'open'
+      AND updated_at >= NOW() - INTERVAL GREATEST(IFNULL(p_expire_hours, 24), 1) HOUR;
+
+    IF v_user IS NOT NULL AND v_open < GREATEST(IFNULL(p_max_open, 1), 1) THEN
+        INSERT INTO MediaUploads (u_id, media_type, title, file_name, content_type, size_bytes)
+        VALUES (p_u_id, p_media_type, p_title, p_file_name, p_content_type, p_size_bytes);
+
+        SET v_upload_id = LAST_INSERT_ID();
+    END IF;
+
+    COMMIT;
+
+    SELECT v_upload_id AS upload_id;
+
+END //
+
+
+
+-- sp_media_upload_fetch(p_upload_id, p_u_id)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      One of the user's open upload sessions (no row otherwise).
+
+CREATE OR REPLACE PROCEDURE sp_media_upload_fetch(
+    IN p_upload_id INT,
+    IN p_u_id INT
+)
+BEGIN
+
+    SELECT
+        id,
+        media_type,
+        title,
+        file_name,
+        content_type,
+        size_bytes,
+        received_bytes,
+        updated_at
+    FROM MediaUploads
+    WHERE id = p_upload_id
+      AND u_id = p_u_id
+      AND status = 'open';
+
+END //
+
+
+
+-- sp_media_upload_progress(p_upload_id, p_received_bytes)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Record the bytes received so far; keeps the session from expiring.
+
+CREATE OR REPLACE PROCEDURE sp_media_upload_progress(
+    IN p_upload_id INT,
+    IN p_received_bytes BIGINT
+)
+BEGIN
+
+    UPDATE MediaUploads
+    SET received_bytes = p_received_bytes,
+        updated_at = NOW()
+    WHERE id = p_upload_id
+      AND status = 'open';
+
+END //
+
+
+
+-- sp_media_upload_finalize(p_upload_id, p_u_id, p_sha256, p_storage_path)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Close an upload whose bytes are complete and hashed. Returns media_id
+--      and is_duplicate: when a live item with the same content already
+--      exists its id is returned and no new item is created. media_id is
+--      NULL if the session is not open (or not the user's).
+-- Notes:
+--      Storage is content addressed, so a duplicate's file is the file of
+--      the existing item.
+
+CREATE OR REPLACE PROCEDURE sp_media_upload_finalize(
+    IN p_upload_id INT,
+    IN p_u_id INT,
+    IN p_sha256 CHAR(64),
+    IN p_storage_path VARCHAR(512)
+)
+BEGIN
+
+    DECLARE v_media_id INT DEFAULT NULL;
+    DECLARE v_duplicate BOOLEAN DEFAULT FALSE;
+    DECLARE v_size BIGINT DEFAULT NULL;
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    START TRANSACTION;
+
+    SELECT size_bytes INTO v_size
+    FROM MediaUploads
+    WHERE id = p_upload_id
+      AND u_id = p_u_id
+      AND status = 'open'
+    FOR UPDATE;
+
+    IF v_size IS NOT NULL THEN
+        SELECT id INTO v_media_id
+        FROM Media
+        WHERE sha256 = p_sha256
+          AND size_bytes = v_size
+          AND is_deleted = FALSE
+        ORDER BY id
+        LIMIT 1;
+
+        IF v_media_id IS NOT NULL THEN
+            SET v_duplicate = TRUE;
+        ELSE
+            INSERT INTO Media (u_id, media_type, title, file_name, storage_path, content_type, size_bytes, sha256)
+            SELECT u_id, media_type, title, file_name, p_storage_path, content_type, size_bytes, p_sha256
+            FROM MediaUploads
+            WHERE id = p_upload_id;
+
+            SET v_media_id = LAST_INSERT_ID();
+        END IF;
+
+        UPDATE MediaUploads
+        SET status = 'complete',
+            received_bytes = size_bytes,
+            media_id = v_media_id
+        WHERE id = p_upload_id;
+    END IF;
+
+    COMMIT;
+
+    SELECT v_media_id AS media_id, v_duplicate AS is_duplicate;
+
+END //
+
+
+
+-- sp_media_upload_abort(p_upload_id, p_u_id)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Cancel one of the user's open uploads. Returns aborted (0/1).
+
+CREATE OR REPLACE PROCEDURE sp_media_upload_abort(
+    IN p_upload_id INT,
+    IN p_u_id INT
+)
+BEGIN
+
+    UPDATE MediaUploads
+    SET status = 'aborted'
+    WHERE id = p_upload_id
+      AND u_id = p_u_id
+      AND status = 'open';
+
+    SELECT ROW_COUNT() AS aborted;
+
+END //
+
+
+
+-- sp_admin_media_expire_uploads(p_hours, p_limit)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Mark a batch of open uploads untouched for p_hours as expired and
+--      return their ids, so the caller can delete the partial files.
+
+CREATE OR REPLACE PROCEDURE sp_admin_media_expire_uploads(
+    IN p_hours INT,
+    IN p_limit INT
+)
+BEGIN
+
+    DECLARE v_cutoff TIMESTAMP;
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    IF p_limit > 1000 THEN
+        SET p_limit = 1000;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 100;
+    END IF;
+
+    SET v_cutoff = NOW() - INTERVAL GREATEST(IFNULL(p_hours, 24), 1) HOUR;
+
+    START TRANSACTION;
+
+    SELECT id
+    FROM MediaUploads
+    WHERE status = 'open'
+      AND updated_at < v_cutoff
+    ORDER BY updated_at, id
+    LIMIT p_limit
+    FOR UPDATE;
+
+    UPDATE MediaUploads
+    SET status = 'expired'
+    WHERE status = 'open'
+      AND updated_at < v_cutoff
+    ORDER BY updated_at, id
+    LIMIT p_limit;
+
+    COMMIT;
+
+END //
+
+DELIMITER ;
+
+
+
+-- Permissions
+-- ----------------------------------------------------------------------------
+
+GRANT EXECUTE ON PROCEDURE scavengers.sp_media_upload_begin TO 'scav_user'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_media_upload_fetch TO 'scav_user'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_media_upload_progress TO 'scav_user'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_media_upload_finalize TO 'scav_user'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_media_upload_abort TO 'scav_user'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_media_expire_uploads TO 'scav_admin'@'%';
@@ -0,0 +1,66 @@
+-- 012_media_thumbs.sql - Media thumbnail backfill
+-- Copyright (C) 2026 Aaron Reichenbach
+--
+-- This program is free software: you can redistribute it and/or modify
+-- it under the terms of the GNU Affero General Public License as
+-- published by the Free Software Foundation, either version 3 of the
+-- License, or (at your option) any later version.
+--
+-- This program is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+-- GNU Affero General Public License for more details.
+--
+-- You should have received a copy of the GNU Affero General Public License
+-- along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+-- Procedures
+-- ----------------------------------------------------------------------------
+-- Thumbnails live on disk keyed by content hash (no table); the backfill
+-- walks Media by id and lets the renderer skip hashes already done.
+
+DELIMITER //
+
+-- sp_admin_media_fetch_sources(p_after_id, p_limit)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Keyset page of live media originals (id > p_after_id), for
+--      `flask thumbnails`.
+
+CREATE OR REPLACE PROCEDURE sp_admin_media_fetch_sources(
+    IN p_after_id INT,
+    IN p_limit INT
+)
+BEGIN
+
+    IF p_limit > 1000 THEN
+        SET p_limit = 1000;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 100;
+    END IF;
+
+    SELECT
+        id,
+        media_type,
+        storage_path,
+        content_type,
+        sha256
+    FROM Media
+    WHERE id > IFNULL(p_after_id, 0)
+      AND is_deleted = FALSE
+    ORDER BY id
+    LIMIT p_limit;
+
+END //
+
+DELIMITER ;
+
+
+
+-- Permissions
+-- ----------------------------------------------------------------------------
+
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_media_fetch_sources TO 'scav_admin'@'%';
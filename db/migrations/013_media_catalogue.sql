@@ -0,0 +1,222 @@
+-- 013_media_catalogue.sql - Media metadata and browse by type
+-- Copyright (C) 2026 Aaron Reichenbach
+--
+-- This program is free software: you can redistribute it and/or modify
+-- it under the terms of the GNU Affero General Public License as
+-- published by the Free Software Foundation, either version 3 of the
+-- License, or (at your option) any later version.
+--
+-- This program is distributed in the hope that it will be useful,
+-- but WITHOUT ANY WARRANTY; without even the implied warranty of
+-- MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+-- GNU Affero General Public License for more details.
+--
+-- You should have received a copy of the GNU Affero General Public License
+-- along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+-- Tables
+-- ----------------------------------------------------------------------------
+-- Metadata is read from the file once, by the job worker after ingest
+-- (metadata_at stays NULL until then). duration_ms is NOT NULL (0 =
+-- unknown or not timed media) because it is a sort key and keyset paging
+-- needs a total order. Every browse order has a (media_type, is_deleted,
+-- sort key, id) index, so a page is a range read wherever it starts.
+
+ALTER TABLE Media
+    ADD COLUMN IF NOT EXISTS duration_ms INT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS width INT NULL,
+    ADD COLUMN IF NOT EXISTS height INT NULL,
+    ADD COLUMN IF NOT EXISTS page_count INT NULL,
+    ADD COLUMN IF NOT EXISTS metadata_at TIMESTAMP NULL,
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE Media
+    ADD INDEX IF NOT EXISTS idx_media_type_created (media_type, is_deleted, created_at, id),
+    ADD INDEX IF NOT EXISTS idx_media_type_title (media_type, is_deleted, title, id),
+    ADD INDEX IF NOT EXISTS idx_media_type_size (media_type, is_deleted, size_bytes, id),
+    ADD INDEX IF NOT EXISTS idx_media_type_duration (media_type, is_deleted, duration_ms, id),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+
+
+-- Procedures
+-- ----------------------------------------------------------------------------
+
+DELIMITER //
+
+-- sp_media_browse(p_media_type, p_sort, p_after_value, p_after_id, p_limit)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      A keyset page of live media. p_sort is 'newest' (default), 'title'
+--      (A-Z), 'largest' or 'longest'; the next page starts after the last
+--      row's (sort value, id), passed as p_after_value / p_after_id (both
+--      NULL for the first page). Without p_media_type only 'newest' is
+--      available (idx_media_created).
+-- Notes:
+--      A missing cursor becomes a sentinel past either end of the order,
+--      so the first page uses the same range read as the others.
+
+CREATE OR REPLACE PROCEDURE sp_media_browse(
+    IN p_media_type VARCHAR(10),
+    IN p_sort VARCHAR(10),
+    IN p_after_value VARCHAR(255),
+    IN p_after_id INT,
+    IN p_limit INT
+)
+BEGIN
+
+    DECLARE v_created TIMESTAMP;
+    DECLARE v_number BIGINT;
+    DECLARE v_title VARCHAR(255);
+
+    IF p_limit > 100 THEN
+        SET p_limit = 100;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 50;
+    END IF;
+
+    IF p_media_type IS NULL OR p_sort NOT IN ('title', 'largest', 'longest') OR p_sort IS NULL THEN
+        SET p_sort = 'newest';
+    END IF;
+
+    IF p_sort = 'title' THEN
+        SET v_title = IFNULL(p_after_value, '');
+        SET p_after_id = IFNULL(p_after_id, 0);
+    ELSEIF p_sort = 'newest' THEN
+        SET v_created = IFNULL(CAST(p_after_value AS DATETIME), '2038-01-19 03:14:07');
+        SET p_after_id = IFNULL(p_after_id, 2147483647);
+    ELSE
+        SET v_number = IFNULL(CAST(p_after_value AS SIGNED), 9223372036854775807);
+        SET p_after_id = IFNULL(p_after_id, 2147483647);
+    END IF;
+
+    IF p_media_type IS NULL THEN
+        SELECT
+            id, media_type, title, file_name, content_type, size_bytes, sha256,
+            duration_ms, width, height, page_count, created_at
+        FROM Media
+        WHERE is_deleted = FALSE
+          AND (created_at < v_created OR (created_at = v_created AND id < p_after_id))
+        ORDER BY created_at DESC, id DESC
+        LIMIT p_limit;
+    ELSEIF p_sort = 'newest' THEN
+        SELECT
+            id, media_type, title, file_name, content_type, size_bytes, sha256,
+            duration_ms, width, height, page_count, created_at
+        FROM Media
+        WHERE media_type = p_media_type
+          AND is_deleted = FALSE
+          AND (created_at < v_created OR (created_at = v_created AND id < p_after_id))
+        ORDER BY created_at DESC, id DESC
+        LIMIT p_limit;
+    ELSEIF p_sort = 'title' THEN
+        SELECT
+            id, media_type, title, file_name, content_type, size_bytes, sha256,
+            duration_ms, width, height, page_count, created_at
+        FROM Media
+        WHERE media_type = p_media_type
+          AND is_deleted = FALSE
+          AND (title > v_title OR (title = v_title AND id > p_after_id))
+        ORDER BY title, id
+        LIMIT p_limit;
+    ELSEIF p_sort = 'largest' THEN
+        SELECT
+            id, media_type, title, file_name, content_type, size_bytes, sha256,
+            duration_ms, width, height, page_count, created_at
+        FROM Media
+        WHERE media_type = p_media_type
+          AND is_deleted = FALSE
+          AND (size_bytes < v_number OR (size_bytes = v_number AND id < p_after_id))
+        ORDER BY size_bytes DESC, id DESC
+        LIMIT p_limit;
+    ELSE
+        SELECT
+            id, media_type, title, file_name, content_type, size_bytes, sha256,
+            duration_ms, width, height, page_count, created_at
+        FROM Media
+        WHERE media_type = p_media_type
+          AND is_deleted = FALSE
+          AND (duration_ms < v_number OR (duration_ms = v_number AND id < p_after_id))
+        ORDER BY duration_ms DESC, id DESC
+        LIMIT p_limit;
+    END IF;
+
+END //
+
+
+
+-- sp_admin_media_set_metadata(p_sha256, p_duration_ms, p_width, p_height, p_page_count)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Store the metadata read from a file on every item with its content.
+--      Returns updated (row count).
+
+CREATE OR REPLACE PROCEDURE sp_admin_media_set_metadata(
+    IN p_sha256 CHAR(64),
+    IN p_duration_ms INT,
+    IN p_width INT,
+    IN p_height INT,
+    IN p_page_count INT
+)
+BEGIN
+
+    UPDATE Media
+    SET duration_ms = IFNULL(p_duration_ms, 0),
+        width = p_width,
+        height = p_height,
+        page_count = p_page_count,
+        metadata_at = NOW()
+    WHERE sha256 = p_sha256;
+
+    SELECT ROW_COUNT() AS updated;
+
+END //
+
+
+
+-- sp_admin_media_fetch_sources(p_after_id, p_limit)
+-- ----------------------------------------------------------------------------
+-- Desc:
+--      Keyset page of live media originals (id > p_after_id), for
+--      `flask thumbnails` and `flask media-metadata`.
+
+CREATE OR REPLACE PROCEDURE sp_admin_media_fetch_sources(
+    IN p_after_id INT,
+    IN p_limit INT
+)
+BEGIN
+
+    IF p_limit > 1000 THEN
+        SET p_limit = 1000;
+    END IF;
+    IF p_limit IS NULL OR p_limit <= 0 THEN
+        SET p_limit = 100;
+    END IF;
+
+    SELECT
+        id,
+        media_type,
+        storage_path,
+        content_type,
+        sha256,
+        metadata_at
+    FROM Media
+    WHERE id > IFNULL(p_after_id, 0)
+      AND is_deleted = FALSE
+    ORDER BY id
+    LIMIT p_limit;
+
+END //
+
+DELIMITER ;
+
+
+
+-- Permissions
+-- ----------------------------------------------------------------------------
+
+GRANT EXECUTE ON PROCEDURE scavengers.sp_media_browse TO 'scav_user'@'%';
+GRANT EXECUTE ON PROCEDURE scavengers.sp_admin_media_set_metadata TO 'scav_admin'@'%';
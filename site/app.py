@@ -23,6 +23,12 @@ from werkzeug.middleware.proxy_fix import ProxyFix
 
 from db import close_dbs
 from extensions import limiter
+import chat
+import commands
+import devapps
+import health
+import metrics
+import profiling
 
 csrf = CSRFProtect()
 
@@ -35,7 +41,9 @@ def create_app():
         PERMANENT_SESSION_LIFETIME=timedelta(minutes=60),
         SESSION_COOKIE_SECURE=os.environ.get('FLASK_ENV') == 'production',
         SESSION_COOKIE_HTTPONLY=True,
-        SESSION_COOKIE_SAMESITE='Lax'
+        SESSION_COOKIE_SAMESITE='Lax',
+        SERVER_TIMING=os.environ.get('FLASK_SERVER_TIMING') == '1',
+        RATELIMIT_ENABLED=os.environ.get('FLASK_RATELIMIT_ENABLED', '1') == '1'
     )
 
     # Trust X-forwarded-for headers (so limiter targets the right IP address) 
@@ -44,6 +52,24 @@ def create_app():
     # Database Teardown
     app.teardown_appcontext(close_dbs)
 
+    # Request timing breakdown (Server-Timing headers for admins)
+    profiling.init_app(app)
+
+    # Request/status/limiter counters for /admin/metrics
+    metrics.init_app(app)
+
+    # Background /proc sampler and active-user tracking for /admin/health
+    health.init_app(app)
+
+    # Background health checks of the dev sandbox apps for /users/dev
+    devapps.init_app(app)
+
+    # Chat ring buffer flusher (batched writes to ChatMessages)
+    chat.init_app(app)
+
+    # Maintenance CLI (flask archive-tickets, ...)
+    commands.init_app(app)
+
     # Jinja2 loves whitespace... So let's try to not.
     app.jinja_env.trim_blocks = True
     #app.jinja_env.lstrip_blocks = True
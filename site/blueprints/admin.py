@@ -21,17 +21,114 @@ import secrets
 import string
 import math
 
-from flask import Blueprint, render_template, flash, redirect, url_for, request, session
+from flask import Blueprint, render_template, flash, redirect, url_for, request, session, make_response
+from flask_wtf import FlaskForm
+from wtforms import StringField, HiddenField, SelectField, IntegerField
+from wtforms.validators import Length, Optional, NumberRange
 from argon2 import PasswordHasher
-from middleware import check_access
+from middleware import check_access, check_scraper
+from utils import build_search_query, get_pagination_metadata
 
 import db
+import health
+import metrics
+import push
+from extensions import limiter
+from components.widgets import WidgetStatCard, WidgetTable, WidgetText, WidgetForm, WidgetButton
+from components.containers import ContainerGrid, ContainerPanel, ContainerStack
+from factory import build_page
+from profiling import timed_build
 
 bp = Blueprint('admin', __name__, url_prefix='/admin')
 ph = PasswordHasher()
 
+USERS_PER_PAGE = 25
+TICKETS_PER_PAGE = 25
+JOBS_PER_PAGE = 25
+
+JOB_STATUS_CHOICES = [
+    ('', 'all'),
+    ('queued', 'queued'),
+    ('running', 'running'),
+    ('succeeded', 'succeeded'),
+    ('dead', 'dead')
+]
+
+REQUEST_STATUS_CHOICES = [
+    ('', 'all statuses'),
+    ('pending', 'pending'),
+    ('in progress', 'in progress'),
+    ('completed', 'completed'),
+    ('rejected', 'rejected')
+]
+
+REPORT_STATUS_CHOICES = [
+    ('', 'all statuses'),
+    ('open', 'open'),
+    ('closed', 'closed'),
+    ('wontfix', 'wontfix')
+]
+
+# Bulk actions: ids ticked per submit, and per-id results that mean the
+# row was left alone (reported as errors; everything else succeeded).
+BULK_MAX_IDS = 500
+BULK_FAILED_RESULTS = ('skipped', 'not found')
+
+BULK_USER_ACTIONS = [
+    ('approve', 'approve'),
+    ('deny', 'deny'),
+    ('suspend', 'suspend'),
+    ('ban', 'ban'),
+    ('reinstate', 'reinstate'),
+    ('delete', 'delete')
+]
+
+BULK_TICKET_ACTIONS = [
+    ('update', 'set status / priority'),
+    ('delete', 'delete')
+]
+
+PRIORITY_CHOICES = [
+    ('', 'keep priority'),
+    ('very low', 'very low'),
+    ('low', 'low'),
+    ('medium', 'medium'),
+    ('high', 'high'),
+    ('very high', 'very high')
+]
+
+class BulkUserForm(FlaskForm):
+    action = SelectField('action', choices=BULK_USER_ACTIONS)
+    hours = IntegerField('suspend hours', default=24, validators=[Optional(), NumberRange(min=1, max=24 * 365)])
+
+class BulkTicketForm(FlaskForm):
+    action = SelectField('action', choices=BULK_TICKET_ACTIONS)
+    status = SelectField('status', choices=[])
+    priority = SelectField('priority', choices=PRIORITY_CHOICES)
+    status_message = StringField('status message', validators=[Optional(), Length(max=500)])
+
+    def __init__(self, status_choices, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.status.choices = [('', 'keep status')] + [choice for choice in status_choices if choice[0]]
+
+class TicketForm(FlaskForm):
+    status = SelectField('status', choices=[])
+    priority = SelectField('priority', choices=PRIORITY_CHOICES)
+    status_message = StringField('status message', validators=[Optional(), Length(max=500)])
+
+    def __init__(self, status_choices, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.status.choices = [('', 'keep status')] + [choice for choice in status_choices if choice[0]]
+
+class TicketSearchForm(FlaskForm):
+    q = StringField('search', validators=[Optional(), Length(max=100)])
+    status = HiddenField()
+
 @bp.before_request
 def restrict_access():
+    # the scrape endpoint has no session; it is gated on network and token
+    if request.endpoint == 'admin.metrics_export':
+        return check_scraper()
     return check_access(['admin'])
 
 @bp.route('/')
@@ -42,28 +139,10 @@ def dashboard():
 # User Management
 # ---------------------------------------------------------
 
-@bp.route('/users')
-@bp.route('/users/<int:selected_user_id>')
-def users(selected_user_id=None):
-    page = request.args.get('page', 1, type=int)
-    sort_col = request.args.get('sort', 'id')
-    sort_dir = request.args.get('dir', 'desc')
-    
-    # State dictionary for URL generation
-    current_state = {'page': page, 'sort': sort_col, 'dir': sort_dir}
-
-    # Validation
-    valid_cols = ['id', 'username', 'role', 'status']
-    if sort_col not in valid_cols: sort_col = 'id'
-    if sort_dir not in ['asc', 'desc']: sort_dir = 'desc'
+@timed_build
+def _build_users_scene(raw_users, pagination, sort_col, sort_dir, bulk_form, selected_user=None):
+    current_state = {'page': pagination['page'], 'sort': sort_col, 'dir': sort_dir}
 
-    per_page = 25
-    offset = (page - 1) * per_page
-    
-    # Fetch Data
-    raw_users = db.fetch_all_users(per_page, offset, sort_col, sort_dir)
-    
-    # Process Data for Table Component
     table_rows = []
     for user in raw_users:
         row = {
@@ -73,14 +152,12 @@ def users(selected_user_id=None):
             'status': user['status'],
             'actions': []
         }
-        
-        # Logic: Determine Actions based on Status
+
         if user['status'] == 'requested':
             row['actions'] = [
                 {
                     'label': 'Approve',
                     'icon': '&#10004;', # Checkmark
-                    # ADDED: **current_state to pass page/sort params
                     'href': url_for('admin.approve', user_id=user['id'], **current_state),
                     'method': 'POST',
                     'class': 'text-success'
@@ -88,7 +165,6 @@ def users(selected_user_id=None):
                 {
                     'label': 'Deny',
                     'icon': '&#10006;', # X
-                    # ADDED: **current_state
                     'href': url_for('admin.deny', user_id=user['id'], **current_state),
                     'method': 'POST',
                     'class': 'destructive',
@@ -100,85 +176,108 @@ def users(selected_user_id=None):
                 {
                     'label': 'Details',
                     'icon': '&#8505;', # i
-                    # ADDED: **current_state
                     'href': url_for('admin.users', selected_user_id=user['id'], **current_state),
                     'method': 'GET',
                     'class': ''
                 }
             ]
-        
+
         table_rows.append(row)
 
     # Column Definition with Sort Logic
-    base_columns = [
-        {'key': 'id', 'label': 'ID'},
-        {'key': 'username', 'label': 'Username'},
-        {'key': 'role', 'label': 'Role'},
-        {'key': 'status', 'label': 'Status'}
-    ]
-
     columns = []
-    for col in base_columns:
+    for key, label in [('id', 'ID'), ('username', 'Username'), ('role', 'Role'), ('status', 'Status')]:
         next_dir = 'desc'
-        label = col['label']
-
-        if col['key'] == sort_col:
+        if key == sort_col:
             next_dir = 'asc' if sort_dir == 'desc' else 'desc'
             label += ' ▼' if sort_dir == 'desc' else ' ▲'
-        
         columns.append({
-            'key': col['key'],
+            'key': key,
             'label': label,
-            'sort_href': url_for('admin.users', page=1, sort=col['key'], dir=next_dir)
+            'sort_href': url_for('admin.users', page=1, sort=key, dir=next_dir)
         })
 
-    # Modal Logic
-    modal_data = None
-    if selected_user_id:
-        user_details = db.fetch_user_details(selected_user_id)
-        if user_details:
-            modal_data = {
-                'title': f"User: {user_details['username']}",
-                'close_href': url_for('admin.users', page=page, sort=sort_col, dir=sort_dir),
-                'details': [
-                    {'key': 'ID', 'value': user_details['id']},
-                    {'key': 'Email', 'value': user_details['email']},
-                    {'key': 'Role', 'value': user_details['role']},
-                    {'key': 'Status', 'value': user_details['status']},
-                    {'key': 'Created', 'value': user_details['created_at']},
-                    {'key': 'Suspended Until', 'value': user_details['suspended_until'] if user_details['suspended_until'] else 'N/A'}
-                ],
-                'user': user_details
-            }
+    table = WidgetTable(columns=columns, rows=table_rows, select_form='users-bulk-form')
+    if not table_rows:
+        table = WidgetText(content='No users found.')
 
-    # Pagination Logic
-    total_records = 0
-    if raw_users:
-        total_records = raw_users[0]['total_records']
-    
-    total_pages = math.ceil(total_records / per_page) if per_page > 0 else 1
-    
-    pagination = {
-        'page': page,
-        'has_next': page < total_pages,
-        'has_prev': page > 1,
-        'next_href': url_for('admin.users', page=page + 1, sort=sort_col, dir=sort_dir),
-        'prev_href': url_for('admin.users', page=page - 1, sort=sort_col, dir=sort_dir),
-        'pages': total_pages,
-        'total_records': total_records,
-        # ADDED: Passing sort state to template so Modal actions can use it
-        'sort': sort_col,
-        'dir': sort_dir
-    }
+    bulk_widget = WidgetForm(
+        form=bulk_form,
+        buttons=[WidgetButton(label='apply to selected', button_type='submit', style='primary')],
+        action=url_for('admin.bulk_users', **current_state),
+        form_id='users-bulk-form'
+    )
 
-    return render_template(
-        'admin_users.html', 
+    nav_buttons = [
+        WidgetButton(
+            label='previous',
+            **{'class': ' wid-pagination-prev'},
+            href=pagination['prev_href'] if pagination['has_prev'] else None,
+            style='secondary',
+            attrs='' if pagination['has_prev'] else ' disabled'
+        ),
+        WidgetText(content=f"page {pagination['page']} of {pagination['pages']}", style='meta', **{'class': ' wid-pagination-center'}),
+        WidgetButton(
+            label='next',
+            **{'class': ' wid-pagination-next'},
+            href=pagination['next_href'] if pagination['has_next'] else None,
+            style='secondary',
+            attrs='' if pagination['has_next'] else ' disabled'
+        )
+    ]
+
+    panels = []
+    if selected_user:
+        panels.append(ContainerPanel(
+            title=f"user: {selected_user['username']}",
+            children=[
+                WidgetText(content=f"{key}: {value}")
+                for key, value in [
+                    ('ID', selected_user['id']),
+                    ('Email', selected_user['email']),
+                    ('Role', selected_user['role']),
+                    ('Status', selected_user['status']),
+                    ('Created', selected_user['created_at']),
+                    ('Suspended Until', selected_user['suspended_until'] or 'N/A')
+                ]
+            ],
+            footer=WidgetButton(label='close', href=url_for('admin.users', **current_state), style='secondary')
+        ))
+    panels.append(ContainerPanel(title='bulk actions', children=[bulk_widget]))
+    panels.append(ContainerPanel(
         title='users',
-        columns=columns,
-        rows=table_rows,
-        modal_data=modal_data,
-        pagination=pagination
-    )
+        children=[table],
+        footer=ContainerStack(
+            gap='small',
+            **{'class': ' wid-con-stack-row wid-pagination-bar'},
+            children=nav_buttons
+        )
+    ))
+
+    return build_page(content=[ContainerStack(gap='medium', children=panels)], title='users')
+
+@bp.route('/users')
+@bp.route('/users/<int:selected_user_id>')
+@limiter.exempt
+def users(selected_user_id=None):
+    page = request.args.get('page', 1, type=int)
+    page = page if page > 0 else 1
+    sort_col = request.args.get('sort', 'id')
+    sort_dir = request.args.get('dir', 'desc')
+
+    # Validation
+    valid_cols = ['id', 'username', 'role', 'status']
+    if sort_col not in valid_cols: sort_col = 'id'
+    if sort_dir not in ['asc', 'desc']: sort_dir = 'desc'
+
+    raw_users = db.admin_fetch_users(USERS_PER_PAGE, (page - 1) * USERS_PER_PAGE, sort_col, sort_dir)
+    total_records = raw_users[0]['total_records'] if raw_users else 0
+    pagination = get_pagination_metadata(page, USERS_PER_PAGE, total_records, 'admin.users', sort=sort_col, dir=sort_dir)
+
+    selected_user = db.admin_fetch_user(selected_user_id) if selected_user_id else None
+
+    scene = _build_users_scene(raw_users, pagination, sort_col, sort_dir, BulkUserForm(), selected_user)
+    return make_response(render_template(scene.template, this=scene))
 
 # --- Helper to extract state from request ---
 def get_state():
@@ -188,10 +287,59 @@ def get_state():
         'dir': request.args.get('dir', 'desc')
     }
 
+def _selected_ids():
+    """
+    Ids ticked in a WidgetTable select column, de-duplicated, in order.
+    """
+
+    return list(dict.fromkeys(request.form.getlist('ids', type=int)))[:BULK_MAX_IDS]
+
+def _flash_bulk_results(action, results):
+    """
+    Summarise per-id results of a bulk procedure: one success line with the
+    counts, one error line per kind of failure listing the ids it hit.
+    """
+
+    by_result = {}
+    for row in results:
+        by_result.setdefault(row['result'], []).append(row['id'])
+
+    failed = {result: ids for result, ids in by_result.items() if result in BULK_FAILED_RESULTS}
+    done = {result: ids for result, ids in by_result.items() if result not in BULK_FAILED_RESULTS}
+
+    if done:
+        flash(f"{action}: " + ', '.join(f"{len(ids)} {result}" for result, ids in done.items()), 'success')
+    for result, ids in failed.items():
+        shown = ', '.join(str(i) for i in ids[:20]) + (f" and {len(ids) - 20} more" if len(ids) > 20 else '')
+        flash(f"{action}: {len(ids)} {result} ({shown})", 'error')
+
+@bp.route('/users/bulk', methods=['POST'])
+def bulk_users():
+    form = BulkUserForm()
+    ids = _selected_ids()
+
+    if not form.validate_on_submit():
+        flash('Invalid bulk action.', 'error')
+    elif not ids:
+        flash('Select at least one user.', 'error')
+    else:
+        # never lock yourself out from a select-all
+        if form.action.data in ('deny', 'suspend', 'ban', 'delete') and session.get('user_id') in ids:
+            ids.remove(session.get('user_id'))
+            flash('Your own account was left out of the bulk action.', 'error')
+
+        try:
+            results = db.admin_bulk_update_users(form.action.data, ids, form.hours.data)
+            _flash_bulk_results(form.action.data, results)
+        except Exception as e:
+            flash(f"Bulk {form.action.data} error (nothing was changed): {e}", 'error')
+
+    return redirect(url_for('admin.users', **get_state()))
+
 @bp.route('/users/approve/<int:user_id>', methods=['POST'])
 def approve(user_id):
     try:
-        db.approve_user(user_id)
+        db.admin_approve_user(user_id)
         flash(f"UID {user_id} Approved")
     except Exception as e:
         flash(f"Approval error: {e}")
@@ -200,7 +348,7 @@ def approve(user_id):
 @bp.route('/users/deny/<int:user_id>', methods=['POST'])
 def deny(user_id):
     try:
-        db.deny_user(user_id)
+        db.admin_deny_user(user_id)
         flash(f"UID {user_id} Denied")
     except Exception as e:
         flash(f"Denial error: {e}")
@@ -209,7 +357,7 @@ def deny(user_id):
 @bp.route('/users/suspend/<int:user_id>/<int:duration>', methods=['POST'])
 def suspend_user(user_id, duration):
     try:
-        db.suspend_user(user_id, duration)
+        db.admin_suspend_user(user_id, duration)
         flash(f"User {user_id} suspended for {duration}h.")
     except Exception as e:
         flash(f"Error suspending: {e}")
@@ -219,7 +367,7 @@ def suspend_user(user_id, duration):
 @bp.route('/users/ban/<int:user_id>', methods=['POST'])
 def ban_user(user_id):
     try:
-        db.ban_user(user_id)
+        db.admin_ban_user(user_id)
         flash(f"User {user_id} BANNED.")
     except Exception as e:
         flash(f"Error banning: {e}")
@@ -228,7 +376,7 @@ def ban_user(user_id):
 @bp.route('/users/reinstate/<int:user_id>', methods=['POST'])
 def reinstate_user(user_id):
     try:
-        db.reinstate_user(user_id)
+        db.admin_reinstate_user(user_id)
         flash(f"User {user_id} reinstated.")
     except Exception as e:
         flash(f"Error reinstating: {e}")
@@ -237,7 +385,7 @@ def reinstate_user(user_id):
 @bp.route('/users/delete/<int:user_id>', methods=['POST'])
 def delete_user(user_id):
     try:
-        db.delete_user(user_id)
+        db.admin_delete_user(user_id)
         flash(f"User {user_id} DELETED.")
         # Don't maintain selection (user is gone), but maintain page state
         return redirect(url_for('admin.users', **get_state())) 
@@ -251,7 +399,7 @@ def reset_pass(user_id):
     new_pass = ''.join(secrets.choice(alphabet) for i in range(16))
     try:
         hashed_pw = ph.hash(new_pass)
-        db.reset_password(user_id, hashed_pw)
+        db.admin_reset_password(user_id, hashed_pw)
         flash(f"Password reset for User {user_id}. New Password: {new_pass}")
     except Exception as e:
         flash(f"Error resetting password: {e}")
@@ -278,11 +426,12 @@ def announce():
         else:
             try:
                 if edit_id:
-                    db.update_announcement(edit_id, title, subtitle, content, footnote, is_visible)
+                    db.admin_update_announcement(edit_id, title, subtitle, content, footnote, is_visible)
                     flash(f"Announcement '{title}' updated.")
                 else:
-                    db.create_announcement(session['uid'], title, subtitle, content, footnote, is_visible)
+                    db.admin_create_announcement(session['user_id'], title, subtitle, content, footnote, is_visible)
                     flash(f"Announcement '{title}' published.")
+                push.notify_announcements()
             except Exception as e:
                 flash(f"Error saving announcement: {e}")
         
@@ -302,7 +451,7 @@ def announce():
     # Fetch Data for Edit Form
     edit_data = None
     if edit_id:
-        edit_data = db.get_announcement(edit_id)
+        edit_data = db.admin_fetch_announcement(edit_id)
         if not edit_data:
             flash(f"Error: Could not fetch post ID {edit_id}")
 
@@ -310,7 +459,7 @@ def announce():
     per_page = 25
     offset = (page - 1) * per_page
     # Pass sort params to DB
-    posts = db.list_announcements_admin(per_page, offset, sort_col, sort_dir)
+    posts = db.admin_fetch_announcements(per_page, offset, sort_col, sort_dir)
     
     # 4. Prepare Table Data
     table_rows = []
@@ -394,8 +543,9 @@ def announce():
 @bp.route('/announce/delete/<int:post_id>', methods=['POST'])
 def delete_announce(post_id):
     try:
-        db.delete_announcement(post_id)
+        db.admin_delete_announcement(post_id)
         flash(f"Announcement deleted.")
+        push.notify_announcements()
     except Exception as e:
         flash(f"Error deleting: {e}")
     return redirect(url_for('admin.announce'))
@@ -404,302 +554,694 @@ def delete_announce(post_id):
 # Requests Management
 # ---------------------------------------------------------
 
-@bp.route('/requests', methods=['GET', 'POST'])
-def requests_list():
-    # 1. State Management
-    page = request.args.get('page', 1, type=int)
-
-    sort_col = request.args.get('sort', 'created_at')
-    sort_dir = request.args.get('dir', 'desc')
-    edit_id = request.args.get('edit_id')
-
-    # Validation
-    valid_cols = ['id', 'title', 'username', 'created_at', 'status']
-    if sort_col not in valid_cols: sort_col = 'created_at'
-    if sort_dir not in ['asc', 'desc']: sort_dir = 'desc'
-
-    # 2. Fetch Modal Data (if editing)
-    modal_data = None
-    if edit_id:
-        req = db.get_request(edit_id)
-        if req:
-            modal_data = {
-                'title': f"Request #{req['id']}",
-                'close_href': url_for('admin.requests_list', page=page, sort=sort_col, dir=sort_dir),
-                'details': [
-                    {'key': 'Title', 'value': req['title']},
-                    {'key': 'User', 'value': req['username']},
-                    {'key': 'Created', 'value': req['created_at']},
-                    {'key': 'Status', 'value': req['status']},
-                    {'key': 'Status Message', 'value': req['status_message'] if req['status_message'] else '-'},
-                    {'key': 'Description', 'value': req['description']},
-                    {'key': 'Reference 1', 'value': req['ref_1'] if req['ref_1'] else '-'},
-                    {'key': 'Reference 2', 'value': req['ref_2'] if req['ref_2'] else '-'},
-                    {'key': 'Reference 3', 'value': req['ref_3'] if req['ref_3'] else '-'}
-                ],
-                'request': req # Pass full object for form population
-            }
-        else:
-            flash(f"Error: Request ID {edit_id} not found.")
+@timed_build
+def _build_admin_tickets_scene(title, endpoint, bulk_endpoint, update_endpoint, delete_endpoint, search_form, bulk_form, ticket_form, tickets, pagination, status_filter, status_choices, archived=False, selected=None):
+    """
+    Shared list scene for admin.requests_list and admin.reports_list, over
+    the live tickets or (archived) the archive tables. selected is a ticket
+    bundle shown in a details panel above the list, with ticket_form to
+    change a live ticket's status, priority and status message.
+    """
+
+    current_state = {
+        'status': status_filter,
+        'q': search_form.q.data or '',
+        'page': pagination['page'],
+        'archived': '1' if archived else ''
+    }
 
-    # 3. Fetch List Data
-    per_page = 25
-    offset = (page - 1) * per_page
-    requests = db.list_requests_admin(per_page, offset, sort_col, sort_dir)
+    search_widget = WidgetForm(
+        form=search_form,
+        buttons=[
+            WidgetButton(label='search', button_type='submit', style='primary'),
+            WidgetButton(label='clear', href=url_for(endpoint, status=status_filter), style='secondary')
+        ],
+        action=url_for(endpoint),
+        method='GET',
+        form_id=f"{title}-search-form"
+    )
 
-    # 4. Prepare Table Rows
-    table_rows = []
-    for r in requests:
-        table_rows.append({
-            'id': r['id'],
-            'title': r['title'],
-            'username': r['username'],
-            'created_at': r['created_at'],
-            'status': r['status'],
-            'actions': [
-                {
-                    'label': 'Modify',
-                    'icon': '&#8505;', # i
-                    'href': url_for('admin.requests_list', edit_id=r['id'], page=page, sort=sort_col, dir=sort_dir),
-                    'method': 'GET',
-                    'class': ''
-                },
-                {
-                    'label': 'Delete',
-                    'icon': '&#10006;', # x
-                    'href': url_for('admin.delete_request', request_id=r['id']),
-                    'method': 'POST',
-                    'class': 'destructive',
-                    'confirm': f"Delete request #{r['id']}?"
-                }
-            ]
-        })
+    status_buttons = [
+        WidgetButton(
+            label=label,
+            href=url_for(endpoint, status=value, q=search_form.q.data or '', archived='1' if archived else ''),
+            style='primary' if value == status_filter else 'secondary'
+        )
+        for value, label in status_choices
+    ]
+    status_buttons.append(WidgetButton(
+        label='live' if archived else 'archive',
+        href=url_for(endpoint, status=status_filter, archived='' if archived else '1'),
+        style='primary' if archived else 'secondary'
+    ))
 
-    # 5. Build Sortable Columns
-    base_columns = [
+    columns = [
         {'key': 'id', 'label': 'ID'},
         {'key': 'title', 'label': 'Title'},
-        {'key': 'username', 'label': 'User'},
+        {'key': 'created_by_username', 'label': 'User'},
         {'key': 'created_at', 'label': 'Date'},
-        {'key': 'status', 'label': 'Status'}
+        {'key': 'status', 'label': 'Status'},
+        {'key': 'priority', 'label': 'Priority'}
     ]
+    if archived:
+        columns.append({'key': 'archived_at', 'label': 'Archived'})
 
-    columns = []
-    for col in base_columns:
-        next_dir = 'desc'
-        label = col['label']
-        if col['key'] == sort_col:
-            next_dir = 'asc' if sort_dir == 'desc' else 'desc'
-            label += ' ▼' if sort_dir == 'desc' else ' ▲'
-        
-        columns.append({
-            'key': col['key'],
-            'label': label,
-            'sort_href': url_for('admin.requests_list', page=1, sort=col['key'], dir=next_dir)
-        })
+    # archived tickets are read-only
+    bulk_form_id = '' if archived else f"{title}-bulk-form"
+    table = WidgetTable(
+        columns=columns,
+        rows=[
+            {
+                **ticket,
+                'actions': [
+                    {
+                        'label': 'Details',
+                        'icon': '&#8505;', # i
+                        'href': url_for(endpoint, selected_ticket_id=ticket['id'], **current_state),
+                        'method': 'GET',
+                        'class': ''
+                    },
+                    # archived tickets are read-only
+                    *([] if archived else [{
+                        'label': 'Delete',
+                        'icon': '&#10006;', # x
+                        'href': url_for(delete_endpoint, ticket_id=ticket['id'], **current_state),
+                        'method': 'POST',
+                        'class': 'destructive',
+                        'confirm': f"Delete {title[:-1]} #{ticket['id']}?"
+                    }])
+                ]
+            }
+            for ticket in tickets
+        ],
+        select_form=bulk_form_id
+    )
 
-    # Pagination
-    total_records = 0
-    if requests:
-        total_records = requests[0]['total_records']
-    total_pages = math.ceil(total_records / per_page) if total_records > 0 else 1
+    bulk_widget = WidgetForm(
+        form=bulk_form,
+        buttons=[WidgetButton(label='apply to selected', button_type='submit', style='primary')],
+        action=url_for(bulk_endpoint, status=status_filter, q=search_form.q.data or '', page=pagination['page']),
+        form_id=bulk_form_id
+    )
 
-    pagination = {
-        'page': page,
-        'has_next': page < total_pages,
-        'has_prev': page > 1,
-        'next_href': url_for('admin.requests_list', page=page + 1, sort=sort_col, dir=sort_dir),
-        'prev_href': url_for('admin.requests_list', page=page - 1, sort=sort_col, dir=sort_dir),
-        'pages': total_pages,
-        'total_records': total_records,
-        'sort': sort_col,
-        'dir': sort_dir
-    }
+    if not tickets:
+        table = WidgetText(content=f"No {title} match the current search." if search_form.q.data else f"No {title} found.")
+
+    nav_buttons = [
+        WidgetButton(
+            label='previous',
+            **{'class': ' wid-pagination-prev'},
+            href=pagination['prev_href'] if pagination['has_prev'] else None,
+            style='secondary',
+            attrs='' if pagination['has_prev'] else ' disabled'
+        ),
+        WidgetText(content=f"page {pagination['page']} of {pagination['pages']}", style='meta', **{'class': ' wid-pagination-center'}),
+        WidgetButton(
+            label='next',
+            **{'class': ' wid-pagination-next'},
+            href=pagination['next_href'] if pagination['has_next'] else None,
+            style='secondary',
+            attrs='' if pagination['has_next'] else ' disabled'
+        )
+    ]
 
-    return render_template(
-        'admin_requests.html',
-        title='requests',
-        columns=columns,
-        rows=table_rows,
-        modal_data=modal_data,
-        pagination=pagination
+    panels = []
+    if selected:
+        ticket = selected['ticket']
+        history = WidgetTable(
+            columns=[
+                {'key': 'created_at', 'label': 'Date'},
+                {'key': 'old_status', 'label': 'From'},
+                {'key': 'new_status', 'label': 'To'},
+                {'key': 'status_message', 'label': 'Message'},
+                {'key': 'changed_by_username', 'label': 'By'}
+            ],
+            rows=[{**message, 'actions': []} for message in selected['status_messages']]
+        )
+        panels.append(ContainerPanel(
+            title=f"{'archived ' if selected['archived'] else ''}{ticket['ticket_type']} #{ticket['id']}",
+            children=[
+                *[
+                    WidgetText(content=f"{key}: {value}")
+                    for key, value in [
+                        ('Title', ticket['title']),
+                        ('User', ticket['username']),
+                        ('Status', ticket['status']),
+                        ('Priority', ticket['priority']),
+                        ('Created', ticket['created_at']),
+                        ('Updated', ticket['updated_at']),
+                        *([('Archived', ticket['archived_at'])] if selected['archived'] else []),
+                        ('Tags', ', '.join(tag['name'] for tag in selected['tags']) or 'none'),
+                        ('Assigned', ', '.join(a['assigned_admin_username'] or 'deleted user' for a in selected['assignments']) or 'nobody')
+                    ]
+                ],
+                WidgetText(content=ticket['description']),
+                history if selected['status_messages'] else WidgetText(content='No status history.', style='meta'),
+                *([] if selected['archived'] else [WidgetForm(
+                    form=ticket_form,
+                    buttons=[WidgetButton(label='save', button_type='submit', style='primary')],
+                    action=url_for(update_endpoint, ticket_id=ticket['id'], **current_state),
+                    form_id=f"{title}-ticket-form"
+                )])
+            ],
+            footer=WidgetButton(label='close', href=url_for(endpoint, **current_state), style='secondary')
+        ))
+
+    stack = ContainerStack(
+        gap='medium',
+        children=[
+            *panels,
+            ContainerPanel(
+                title=f"archived {title}" if archived else title,
+                children=[
+                    # full-text search covers the live tables only
+                    *([] if archived else [search_widget]),
+                    ContainerStack(
+                        gap='small',
+                        **{'class': ' wid-con-stack-row wid-con-stack-wrap'},
+                        children=status_buttons
+                    )
+                ]
+            ),
+            *([] if archived or not tickets else [ContainerPanel(title='bulk actions', children=[bulk_widget])]),
+            ContainerPanel(
+                title='results',
+                children=[table],
+                footer=ContainerStack(
+                    gap='small',
+                    **{'class': ' wid-con-stack-row wid-pagination-bar'},
+                    children=nav_buttons
+                )
+            )
+        ]
     )
 
-@bp.route('/requests/update/<int:request_id>', methods=['POST'])
-def update_request(request_id):
-    # Retrieve form data
-    new_status = request.form.get('status')
-    new_message = request.form.get('status_message')
+    return build_page(content=[stack], title=title)
 
-    # Logic: Convert empty strings to None to trigger SQL COALESCE (No Change)
-    if not new_message or new_message.strip() == "":
-        new_message = None
-    
-    # We pass new_status directly. 
-    # If the dropdown matches current status, SQL updates to same value (No Change).
-    
-    try:
-        db.update_request(request_id, new_status, new_message)
-        flash(f"Request #{request_id} updated.")
-    except Exception as e:
-        flash(f"Error updating request: {e}")
+def _admin_ticket_list(ticket_type, endpoint, bulk_endpoint, update_endpoint, delete_endpoint, title, status_choices, selected_ticket_id=None):
+    """
+    List tickets of one type, newest first, or ranked by relevance when the
+    ?q= search box is used. ?archived=1 reads the archive tables instead.
+    With selected_ticket_id the ticket's details are shown above the list,
+    read through to the archive when it has been moved there.
+    """
 
-    # Return to list with state preserved
-    return redirect(url_for('admin.requests_list', **get_state()))
+    page = request.args.get('page', 1, type=int)
+    page = page if page > 0 else 1
+    offset = (page - 1) * TICKETS_PER_PAGE
+
+    status_filter = request.args.get('status', '')
+    if status_filter not in dict(status_choices):
+        status_filter = ''
+
+    archived = request.args.get('archived', '') == '1'
+
+    search_form = TicketSearchForm(request.args, meta={'csrf': False})
+    search_form.status.data = status_filter
+    search_query = '' if archived else build_search_query(search_form.q.data)
+    if search_form.q.data and not search_query:
+        if not archived:
+            flash('Search words must be at least 3 characters long.', 'error')
+        search_form.q.data = ''
+
+    if archived:
+        tickets = db.tickets.admin_fetch_archived_tickets(ticket_type, status_filter or None, TICKETS_PER_PAGE, offset)
+    elif search_query:
+        tickets = db.tickets.admin_search_tickets(search_query, ticket_type, status_filter or None, TICKETS_PER_PAGE, offset)
+    else:
+        tickets = db.tickets.admin_fetch_tickets(ticket_type, status_filter or None, None, None, TICKETS_PER_PAGE, offset)
+
+    total_records = tickets[0].get('total_records', 0) if tickets else 0
+    pagination = get_pagination_metadata(
+        page,
+        TICKETS_PER_PAGE,
+        total_records,
+        endpoint,
+        status=status_filter,
+        q=search_form.q.data or '',
+        archived='1' if archived else ''
+    )
+
+    selected = None
+    if selected_ticket_id:
+        selected = db.tickets.admin_fetch_ticket_bundle(selected_ticket_id)
+        if not selected or selected['ticket']['ticket_type'] != ticket_type:
+            flash(f"{ticket_type.capitalize()} #{selected_ticket_id} not found.", 'error')
+            selected = None
+
+    ticket_form = TicketForm(status_choices)
+    if selected:
+        ticket_form.priority.data = selected['ticket']['priority']
+
+    scene = _build_admin_tickets_scene(
+        title, endpoint, bulk_endpoint, update_endpoint, delete_endpoint,
+        search_form, BulkTicketForm(status_choices), ticket_form,
+        tickets, pagination, status_filter, status_choices, archived, selected
+    )
+    return make_response(render_template(scene.template, this=scene))
+
+def _admin_ticket_bulk(ticket_type, endpoint, status_choices):
+    """
+    Apply the bulk form to the ticked tickets in one transaction, then go
+    back to the list view the form was submitted from.
+    """
+
+    form = BulkTicketForm(status_choices)
+    ids = _selected_ids()
+
+    if not form.validate_on_submit():
+        flash('Invalid bulk action.', 'error')
+    elif not ids:
+        flash(f"Select at least one {ticket_type}.", 'error')
+    elif form.action.data == 'update' and not (form.status.data or form.priority.data):
+        flash('Choose a status or priority to set.', 'error')
+    else:
+        try:
+            if form.action.data == 'delete':
+                results = db.tickets.admin_bulk_delete_tickets(ids, ticket_type)
+            else:
+                results = db.tickets.admin_bulk_update_tickets(
+                    ids,
+                    ticket_type,
+                    form.status.data or None,
+                    form.priority.data or None,
+                    session.get('user_id'),
+                    form.status_message.data or None
+                )
+            _flash_bulk_results(form.action.data, results)
+        except Exception as e:
+            flash(f"Bulk {form.action.data} error (nothing was changed): {e}", 'error')
+
+    return redirect(url_for(
+        endpoint,
+        status=request.args.get('status', ''),
+        q=request.args.get('q', ''),
+        page=request.args.get('page', 1, type=int)
+    ))
+
+def _ticket_list_state():
+    """
+    Filters and page of the ticket list a per-ticket action was posted from.
+    """
+
+    return {
+        'status': request.args.get('status', ''),
+        'q': request.args.get('q', ''),
+        'page': request.args.get('page', 1, type=int),
+        'archived': request.args.get('archived', '')
+    }
+
+def _admin_ticket_update(ticket_type, endpoint, status_choices, ticket_id):
+    """
+    Apply the details panel form to one ticket. A status change goes through
+    the bulk procedure, which writes the status message with it; a message
+    with no status change is added to the history on its own.
+    """
+
+    form = TicketForm(status_choices)
+    ticket = db.tickets.admin_fetch_ticket(ticket_id)
+
+    if not form.validate_on_submit():
+        flash('Invalid ticket update.', 'error')
+    elif not ticket or ticket['ticket_type'] != ticket_type:
+        flash(f"{ticket_type.capitalize()} #{ticket_id} not found.", 'error')
+    else:
+        # fields left at the ticket's current value are not changes
+        status = form.status.data if form.status.data not in ('', ticket['status']) else None
+        priority = form.priority.data if form.priority.data not in ('', ticket['priority']) else None
+        message = (form.status_message.data or '').strip() or None
+        try:
+            if status or priority:
+                results = db.tickets.admin_bulk_update_tickets([ticket_id], ticket_type, status, priority, session.get('user_id'), message)
+                _flash_bulk_results(f"{ticket_type} #{ticket_id}", results)
+            if message and not status:
+                db.tickets.admin_create_ticket_status_message(ticket_id, session.get('user_id'), ticket['status'], ticket['status'], message)
+                flash(f"{ticket_type.capitalize()} #{ticket_id}: status message added.", 'success')
+            if not (status or priority or message):
+                flash('Nothing to change.', 'error')
+        except Exception as e:
+            flash(f"Error updating {ticket_type} #{ticket_id}: {e}", 'error')
+
+    # built for GET: during this POST the POST-capable bare list rule would win
+    return redirect(url_for(endpoint, _method='GET', selected_ticket_id=ticket_id, **_ticket_list_state()))
+
+def _admin_ticket_delete(ticket_type, endpoint, ticket_id):
+    """
+    Soft delete one ticket from its list row.
+    """
 
-@bp.route('/requests/delete/<int:request_id>', methods=['POST'])
-def delete_request(request_id):
     try:
-        db.delete_request(request_id)
-        flash(f"Request #{request_id} deleted.")
+        results = db.tickets.admin_bulk_delete_tickets([ticket_id], ticket_type)
+        _flash_bulk_results(f"{ticket_type} #{ticket_id}", results)
     except Exception as e:
-        flash(f"Error deleting request: {e}")
-    
-    return redirect(url_for('admin.requests_list', **get_state()))
+        flash(f"Error deleting {ticket_type} #{ticket_id}: {e}", 'error')
+
+    return redirect(url_for(endpoint, **_ticket_list_state()))
+
+@bp.route('/requests', methods=['GET', 'POST'])
+@bp.route('/requests/<int:selected_ticket_id>')
+def requests_list(selected_ticket_id=None):
+    return _admin_ticket_list('request', 'admin.requests_list', 'admin.requests_bulk', 'admin.update_request', 'admin.delete_request', 'requests', REQUEST_STATUS_CHOICES, selected_ticket_id)
+
+@bp.route('/requests/bulk', methods=['POST'])
+def requests_bulk():
+    return _admin_ticket_bulk('request', 'admin.requests_list', REQUEST_STATUS_CHOICES)
+
+@bp.route('/requests/<int:ticket_id>/update', methods=['POST'])
+def update_request(ticket_id):
+    return _admin_ticket_update('request', 'admin.requests_list', REQUEST_STATUS_CHOICES, ticket_id)
+
+@bp.route('/requests/<int:ticket_id>/delete', methods=['POST'])
+def delete_request(ticket_id):
+    return _admin_ticket_delete('request', 'admin.requests_list', ticket_id)
 
 # ---------------------------------------------------------
 # Reports Management
 # ---------------------------------------------------------
 
 @bp.route('/reports', methods=['GET', 'POST'])
-def reports_list():
-    page = request.args.get('page', 1, type=int)
-    sort_col = request.args.get('sort', 'created_at')
-    sort_dir = request.args.get('dir', 'desc')
-    edit_id = request.args.get('edit_id')
+@bp.route('/reports/<int:selected_ticket_id>')
+def reports_list(selected_ticket_id=None):
+    return _admin_ticket_list('report', 'admin.reports_list', 'admin.reports_bulk', 'admin.update_report', 'admin.delete_report', 'reports', REPORT_STATUS_CHOICES, selected_ticket_id)
 
-    # Validation
-    valid_cols = ['id', 'target', 'username', 'created_at', 'status']
-    if sort_col not in valid_cols: sort_col = 'created_at'
-    if sort_dir not in ['asc', 'desc']: sort_dir = 'desc'
+@bp.route('/reports/bulk', methods=['POST'])
+def reports_bulk():
+    return _admin_ticket_bulk('report', 'admin.reports_list', REPORT_STATUS_CHOICES)
 
-    # Fetch Modal Data (if editing)
-    modal_data = None
-    if edit_id:
-        rep = db.get_report(edit_id)
-        if rep:
-            modal_data = {
-                'title': f"Report #{rep['id']}",
-                'close_href': url_for('admin.reports_list', page=page, sort=sort_col, dir=sort_dir),
-                'details': [
-                    {'key': 'Target', 'value': rep['target']},
-                    {'key': 'Reporter', 'value': rep['username']},
-                    {'key': 'Created', 'value': rep['created_at']},
-                    {'key': 'Status', 'value': rep['status']},
-                    {'key': 'Status Message', 'value': rep['status_message'] if rep['status_message'] else '-'},
-                    {'key': 'Description', 'value': rep['description']}
-                ],
-                'report': rep
-            }
-        else:
-            flash(f"Error: Report ID {edit_id} not found.")
+@bp.route('/reports/<int:ticket_id>/update', methods=['POST'])
+def update_report(ticket_id):
+    return _admin_ticket_update('report', 'admin.reports_list', REPORT_STATUS_CHOICES, ticket_id)
 
-    # Fetch List Data
-    per_page = 25
-    offset = (page - 1) * per_page
-    reports = db.fetch_reports(per_page, offset, sort_col, sort_dir)
+@bp.route('/reports/<int:ticket_id>/delete', methods=['POST'])
+def delete_report(ticket_id):
+    return _admin_ticket_delete('report', 'admin.reports_list', ticket_id)
 
-    # Prepare Table Rows
-    table_rows = []
-    for r in reports:
-        table_rows.append({
-            'id': r['id'],
-            'target': r['target'],
-            'username': r['username'],
-            'created_at': r['created_at'],
-            'status': r['status'],
-            'actions': [
-                {
-                    'label': 'Modify',
-                    'icon': '&#8505;', # i
-                    'href': url_for('admin.reports_list', edit_id=r['id'], page=page, sort=sort_col, dir=sort_dir),
-                    'method': 'GET',
-                    'class': ''
-                },
-                {
-                    'label': 'Delete',
-                    'icon': '&#10006;', # x
-                    'href': url_for('admin.delete_report', report_id=r['id']),
-                    'method': 'POST',
-                    'class': 'destructive',
-                    'confirm': f"Delete report #{r['id']}?"
-                }
-            ]
-        })
+# ---------------------------------------------------------
+# System Health
+# ---------------------------------------------------------
 
-    # Build Sortable Columns
-    base_columns = [
-        {'key': 'id', 'label': 'ID'},
-        {'key': 'target', 'label': 'Target'},
-        {'key': 'username', 'label': 'Reporter'},
-        {'key': 'created_at', 'label': 'Date'},
-        {'key': 'status', 'label': 'Status'}
+@timed_build
+def _build_system_scene(snapshot):
+    responses = metrics.series_total(snapshot, 'scav_http_responses_total')
+    errors = sum(
+        value for values, value in snapshot.get('scav_http_responses_total', {}).get('series', [])
+        if values[1].startswith('5')
+    )
+    request_hist = metrics.series_histogram(snapshot, 'scav_http_request_duration_ms', phase='total')
+    db_hist = metrics.series_histogram(snapshot, 'scav_db_procedure_duration_ms', phase='total')
+    cache_hits = metrics.series_total(snapshot, 'scav_cache_requests_total', result='hit')
+    cache_lookups = metrics.series_total(snapshot, 'scav_cache_requests_total')
+
+    cards = [
+        WidgetStatCard(label='requests served', value=int(responses)),
+        WidgetStatCard(label='in flight', value=int(metrics.series_total(snapshot, 'scav_http_requests_in_flight'))),
+        WidgetStatCard(label='5xx rate', value=f"{(errors / responses * 100) if responses else 0:.1f}%"),
+        WidgetStatCard(label='request p95', value=f"{metrics.quantile(request_hist, 0.95):.0f} ms"),
+        WidgetStatCard(label='procedure calls', value=db_hist['count']),
+        WidgetStatCard(label='procedure p95', value=f"{metrics.quantile(db_hist, 0.95):.0f} ms"),
+        WidgetStatCard(label='slow procedure calls', value=int(metrics.series_total(snapshot, 'scav_db_slow_calls_total'))),
+        WidgetStatCard(label='db connections opened', value=int(metrics.series_total(snapshot, 'scav_db_connections_opened_total'))),
+        WidgetStatCard(label='rate limited', value=int(metrics.series_total(snapshot, 'scav_limiter_rejections_total'))),
+        WidgetStatCard(
+            label='cache hit rate',
+            value=f"{cache_hits / cache_lookups * 100:.0f}%" if cache_lookups else 'n/a'
+        )
     ]
 
-    columns = []
-    for col in base_columns:
-        next_dir = 'desc'
-        label = col['label']
-        if col['key'] == sort_col:
-            next_dir = 'asc' if sort_dir == 'desc' else 'desc'
-            label += ' ▼' if sort_dir == 'desc' else ' ▲'
-        
-        columns.append({
-            'key': col['key'],
-            'label': label,
-            'sort_href': url_for('admin.reports_list', page=1, sort=col['key'], dir=next_dir)
+    # slowest procedures by p95
+    procs = {}
+    for values, hist in snapshot.get('scav_db_procedure_duration_ms', {}).get('series', []):
+        proc_name, phase = values
+        if phase == 'total':
+            procs[proc_name] = hist
+
+    rows = []
+    for proc_name, hist in sorted(procs.items(), key=lambda item: metrics.quantile(item[1], 0.95), reverse=True)[:15]:
+        rows.append({
+            'proc': proc_name,
+            'calls': hist['count'],
+            'p50': f"{metrics.quantile(hist, 0.5):.1f}",
+            'p95': f"{metrics.quantile(hist, 0.95):.1f}",
+            'max': f"{hist['max']:.1f}",
+            'actions': []
         })
 
-    # Pagination
-    total_records = 0
-    if reports:
-        total_records = reports[0]['total_records']
-    total_pages = math.ceil(total_records / per_page) if total_records > 0 else 1
+    # connections per role across workers; in use = running a procedure
+    pool = {}
+    for (role, state), value in snapshot.get('scav_db_connections', {}).get('series', []):
+        pool.setdefault(role, {'role': role, 'open': 0, 'in_use': 0, 'actions': []})[state] = int(value)
+    pool_rows = [pool[role] for role in sorted(pool)]
+
+    pool_table = WidgetTable(
+        columns=[
+            {'key': 'role', 'label': 'role'},
+            {'key': 'open', 'label': 'open'},
+            {'key': 'in_use', 'label': 'in use'}
+        ],
+        rows=pool_rows
+    )
 
-    pagination = {
-        'page': page,
-        'has_next': page < total_pages,
-        'has_prev': page > 1,
-        'next_href': url_for('admin.reports_list', page=page + 1, sort=sort_col, dir=sort_dir),
-        'prev_href': url_for('admin.reports_list', page=page - 1, sort=sort_col, dir=sort_dir),
-        'pages': total_pages,
-        'total_records': total_records,
-        'sort': sort_col,
-        'dir': sort_dir
-    }
+    proc_table = WidgetTable(
+        columns=[
+            {'key': 'proc', 'label': 'procedure'},
+            {'key': 'calls', 'label': 'calls'},
+            {'key': 'p50', 'label': 'p50 ms'},
+            {'key': 'p95', 'label': 'p95 ms'},
+            {'key': 'max', 'label': 'max ms'}
+        ],
+        rows=rows
+    )
 
-    return render_template(
-        'admin_reports.html',
-        title='reports',
-        columns=columns,
-        rows=table_rows,
-        modal_data=modal_data,
-        pagination=pagination
+    stack = ContainerStack(
+        gap='medium',
+        children=[
+            ContainerPanel(title='system health', children=[ContainerGrid(cols=4, gap='small', children=cards)]),
+            ContainerPanel(
+                title='database connections',
+                children=[pool_table] if pool_rows else [WidgetText(content='No database connections recorded yet.')]
+            ),
+            ContainerPanel(
+                title='slowest procedures',
+                children=[proc_table] if rows else [WidgetText(content='No procedure calls recorded yet.')]
+            )
+        ]
     )
 
-@bp.route('/reports/update/<int:report_id>', methods=['POST'])
-def update_report(report_id):
-    new_status = request.form.get('status')
-    new_message = request.form.get('status_message')
+    return build_page(content=[stack], title='system')
 
-    # Convert empty input to None for SQL COALESCE
-    if not new_message or new_message.strip() == "":
-        new_message = None
-    
-    try:
-        db.update_report(report_id, new_status, new_message)
-        flash(f"Report #{report_id} updated.")
-    except Exception as e:
-        flash(f"Error updating report: {e}")
+@bp.route('/system')
+@limiter.exempt
+def system():
+    page = _build_system_scene(metrics.collect())
+    return make_response(render_template(page.template, this=page))
+
+@bp.route('/metrics')
+@limiter.exempt
+def metrics_export():
+    response = make_response(metrics.render_prometheus(metrics.collect()))
+    response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    return response
 
-    return redirect(url_for('admin.reports_list', **get_state()))
+# ---------------------------------------------------------
+
+@timed_build
+def _build_health_scene(history):
+    if not history:
+        notice = WidgetText(content='The health sampler has not taken a sample yet. Check back in a few seconds.')
+        return build_page(content=[ContainerPanel(title='server health', children=[notice])], title='health')
+
+    latest = history[-1]
+    workers = [w for w in latest['workers'] if w['role'] == 'worker']
+    load_1, load_5, load_15 = latest['load']
+
+    cards = [
+        WidgetStatCard(label='cpu', value=f"{latest['cpu_percent']:.1f}%"),
+        WidgetStatCard(label='memory', value=f"{latest['mem_percent']:.1f}%"),
+        WidgetStatCard(label='load (1/5/15)', value=f"{load_1:.2f} / {load_5:.2f} / {load_15:.2f}"),
+        WidgetStatCard(label='active users', value=latest['active_users']),
+        WidgetStatCard(label='workers', value=len(workers)),
+        WidgetStatCard(label='worker rss', value=f"{sum(w['rss_kb'] for w in workers) / 1024:.0f} MB"),
+        WidgetStatCard(label='open fds', value=sum(w['fds'] for w in latest['workers'])),
+        WidgetStatCard(label='memory used', value=f"{latest['mem_used_kb'] / 1024:.0f} / {latest['mem_total_kb'] / 1024:.0f} MB")
+    ]
+
+    worker_table = WidgetTable(
+        columns=[
+            {'key': 'pid', 'label': 'pid'},
+            {'key': 'role', 'label': 'role'},
+            {'key': 'rss', 'label': 'rss MB'},
+            {'key': 'fds', 'label': 'open fds'}
+        ],
+        rows=[{
+            'pid': w['pid'],
+            'role': w['role'],
+            'rss': f"{w['rss_kb'] / 1024:.1f}",
+            'fds': w['fds'],
+            'actions': []
+        } for w in latest['workers']]
+    )
+
+    # trend over the sampled window, thinned to ~10 rows, newest first
+    step = max(1, len(history) // 10)
+    history_table = WidgetTable(
+        columns=[
+            {'key': 'age', 'label': 'seconds ago'},
+            {'key': 'cpu', 'label': 'cpu %'},
+            {'key': 'mem', 'label': 'memory %'},
+            {'key': 'load', 'label': 'load 1m'},
+            {'key': 'users', 'label': 'active users'}
+        ],
+        rows=[{
+            'age': int(latest['time'] - sample['time']),
+            'cpu': sample['cpu_percent'],
+            'mem': sample['mem_percent'],
+            'load': f"{sample['load'][0]:.2f}",
+            'users': sample['active_users'],
+            'actions': []
+        } for sample in history[::-1][::step]]
+    )
+
+    stack = ContainerStack(
+        gap='medium',
+        children=[
+            ContainerPanel(title='server health', children=[ContainerGrid(cols=4, gap='small', children=cards)]),
+            ContainerPanel(title='processes', children=[worker_table]),
+            ContainerPanel(title='recent samples', children=[history_table])
+        ]
+    )
+
+    return build_page(content=[stack], title='health')
+
+@bp.route('/health', endpoint='health')
+@limiter.exempt
+def health_view():
+    page = _build_health_scene(health.read_history())
+    return make_response(render_template(page.template, this=page))
+
+# ---------------------------------------------------------
+# Background Jobs
+# ---------------------------------------------------------
 
-@bp.route('/reports/delete/<int:report_id>', methods=['POST'])
-def delete_report(report_id):
+@timed_build
+def _build_jobs_scene(job_rows, counts, pagination, status_filter):
+    cards = [WidgetStatCard(label=value, value=counts.get(value, 0)) for value, _ in JOB_STATUS_CHOICES if value]
+
+    status_buttons = [
+        WidgetButton(
+            label=label,
+            href=url_for('admin.jobs_list', status=value),
+            style='primary' if value == status_filter else 'secondary'
+        )
+        for value, label in JOB_STATUS_CHOICES
+    ]
+
+    rows = []
+    for job in job_rows:
+        actions = []
+        if job['status'] == 'dead':
+            actions.append({
+                'label': 'Retry',
+                'icon': '&#8635;', # clockwise arrow
+                'href': url_for('admin.retry_job', job_id=job['id'], status=status_filter, page=pagination['page']),
+                'method': 'POST',
+                'class': ''
+            })
+        rows.append({
+            'id': job['id'],
+            'kind': job['kind'],
+            'key': job['idempotency_key'] or '',
+            'status': job['status'],
+            'attempts': f"{job['attempts']} / {job['max_attempts']}",
+            'run_after': job['run_after'] if job['status'] == 'queued' else '',
+            'worker': job['locked_by'] or '',
+            'error': ' '.join((job['last_error'] or '').strip().splitlines()[-1:])[:120],
+            'created_at': job['created_at'],
+            'actions': actions
+        })
+
+    table = WidgetTable(
+        columns=[
+            {'key': 'id', 'label': 'ID'},
+            {'key': 'kind', 'label': 'Kind'},
+            {'key': 'key', 'label': 'Key'},
+            {'key': 'status', 'label': 'Status'},
+            {'key': 'attempts', 'label': 'Attempts'},
+            {'key': 'run_after', 'label': 'Next run'},
+            {'key': 'worker', 'label': 'Worker'},
+            {'key': 'error', 'label': 'Last error'},
+            {'key': 'created_at', 'label': 'Queued'}
+        ],
+        rows=rows
+    ) if rows else WidgetText(content='No jobs found.')
+
+    nav_buttons = [
+        WidgetButton(
+            label='previous',
+            **{'class': ' wid-pagination-prev'},
+            href=pagination['prev_href'] if pagination['has_prev'] else None,
+            style='secondary',
+            attrs='' if pagination['has_prev'] else ' disabled'
+        ),
+        WidgetText(content=f"page {pagination['page']} of {pagination['pages']}", style='meta', **{'class': ' wid-pagination-center'}),
+        WidgetButton(
+            label='next',
+            **{'class': ' wid-pagination-next'},
+            href=pagination['next_href'] if pagination['has_next'] else None,
+            style='secondary',
+            attrs='' if pagination['has_next'] else ' disabled'
+        )
+    ]
+
+    stack = ContainerStack(
+        gap='medium',
+        children=[
+            ContainerPanel(
+                title='background jobs',
+                children=[
+                    ContainerGrid(cols=4, gap='small', children=cards),
+                    ContainerStack(
+                        gap='small',
+                        **{'class': ' wid-con-stack-row wid-con-stack-wrap'},
+                        children=status_buttons
+                    )
+                ]
+            ),
+            ContainerPanel(
+                title='jobs',
+                children=[table],
+                footer=ContainerStack(
+                    gap='small',
+                    **{'class': ' wid-con-stack-row wid-pagination-bar'},
+                    children=nav_buttons
+                )
+            )
+        ]
+    )
+
+    return build_page(content=[stack], title='jobs')
+
+@bp.route('/jobs')
+@limiter.exempt
+def jobs_list():
+    page = request.args.get('page', 1, type=int)
+    page = page if page > 0 else 1
+
+    status_filter = request.args.get('status', '')
+    if status_filter not in dict(JOB_STATUS_CHOICES):
+        status_filter = ''
+
+    job_rows, counts = db.admin_fetch_jobs(status_filter or None, JOBS_PER_PAGE, (page - 1) * JOBS_PER_PAGE)
+    total_records = job_rows[0].get('total_records', 0) if job_rows else 0
+    pagination = get_pagination_metadata(page, JOBS_PER_PAGE, total_records, 'admin.jobs_list', status=status_filter)
+
+    scene = _build_jobs_scene(job_rows, counts, pagination, status_filter)
+    return make_response(render_template(scene.template, this=scene))
+
+@bp.route('/jobs/retry/<int:job_id>', methods=['POST'])
+def retry_job(job_id):
     try:
-        db.delete_report(report_id)
-        flash(f"Report #{report_id} deleted.")
+        db.admin_retry_job(job_id)
+        flash(f"Job {job_id} queued again.", 'success')
     except Exception as e:
-        flash(f"Error deleting report: {e}")
-    
-    return redirect(url_for('admin.reports_list', **get_state()))
\ No newline at end of file
+        flash(f"Error retrying job: {e}", 'error')
+    return redirect(url_for('admin.jobs_list', status=request.args.get('status', ''), page=request.args.get('page', 1, type=int)))
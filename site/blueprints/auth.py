@@ -41,6 +41,7 @@ from components.layout import LayoutThreeColumn
 from components.containers import ContainerPanel, ContainerStack
 from components.widgets import WidgetForm, WidgetButton, WidgetStatCard
 from factory import build_page
+from profiling import timed_build
 
 
 
@@ -141,6 +142,7 @@ def _check_account_status(user_data: dict) -> bool:
 # Scene Building
 # -----------------------------------------------------------------------------
 
+@timed_build
 def _build_login_scene(form):
     submit_button = WidgetButton(
         label = 'login',
@@ -167,6 +169,7 @@ def _build_login_scene(form):
         title = 'login'
     )
 
+@timed_build
 def _build_register_scene(form):
     submit_button = WidgetButton(
         label = 'request account',
@@ -17,20 +17,45 @@
 from flask import (
     Blueprint,
     render_template,
+    request,
     redirect,
     url_for,
     flash,
     session,
-    make_response
+    make_response,
+    jsonify,
+    Response
 )
 
+import time
+
+from flask_wtf import FlaskForm
+from markupsafe import escape
+from mysql.connector import Error
+from wtforms import StringField, TextAreaField
+from wtforms.validators import DataRequired, Length, Optional, Regexp, URL
+
+import chat
 import db.announcements
+import db.feed
+import push
+from config import (
+    CHAT_MESSAGE_MAX_LENGTH,
+    CHAT_LONGPOLL_TIMEOUT_SECONDS,
+    PUSH_WORKER,
+    FEED_PAGE_POSTS,
+    FEED_PAGE_COMMENTS,
+    FEED_POST_MAX_LENGTH,
+    FEED_COMMENT_MAX_LENGTH
+)
+from extensions import limiter
 from middleware import check_access
-from utils import format_post
+from utils import format_post, build_search_query
 
-from components.widgets import WidgetText
+from components.widgets import WidgetText, WidgetForm, WidgetButton
 from components.containers import ContainerPanel, ContainerStack
 from factory import build_page
+from profiling import timed_build
 
 # -----------------------------------------------------------------------------
 # Configuration
@@ -38,17 +63,65 @@ from factory import build_page
 
 bp = Blueprint('social', __name__, url_prefix='/social')
 
+# Search results shown at once; the feed itself is not paginated either.
+SEARCH_RESULTS = 25
+
+
+
+# -----------------------------------------------------------------------------
+# Forms
+# -----------------------------------------------------------------------------
+
+class AnnouncementSearchForm(FlaskForm):
+    q = StringField('search', validators=[Optional(), Length(max=100)])
+
+class ChatForm(FlaskForm):
+    body = StringField('message', validators=[DataRequired(), Length(max=CHAT_MESSAGE_MAX_LENGTH)])
+
+class FeedPostForm(FlaskForm):
+    body = TextAreaField('post', validators=[DataRequired(), Length(max=FEED_POST_MAX_LENGTH)])
+    link = StringField('link (optional)', validators=[
+        Optional(),
+        Length(max=2048),
+        URL(),
+        Regexp(r'^https?://', message='Link must start with http:// or https://.')
+    ])
+
+class FeedCommentForm(FlaskForm):
+    body = StringField('comment', validators=[DataRequired(), Length(max=FEED_COMMENT_MAX_LENGTH)])
+
+class FeedDeleteForm(FlaskForm):
+    pass
+
 
 
 # -----------------------------------------------------------------------------
 # Scene Building
 # -----------------------------------------------------------------------------
 
-def _build_announcement_scene(posts):
+@timed_build
+def _build_announcement_scene(posts, search_form=None):
     content = []
 
+    if search_form is not None:
+        content.append(ContainerPanel(
+            title='search announcements',
+            attrs=f' data-push-stream="{url_for("social.stream")}"',
+            children=[WidgetForm(
+                form=search_form,
+                buttons=[
+                    WidgetButton(label='search', button_type='submit', style='primary'),
+                    WidgetButton(label='clear', href=url_for('social.announcements'), style='secondary')
+                ],
+                action=url_for('social.announcements'),
+                method='GET',
+                form_id='announcement-search-form'
+            )]
+        ))
+
     if not posts:
-        msg = WidgetText('currently no announcements.')
+        searching = search_form is not None and search_form.q.data
+        msg = WidgetText('no announcements match the search.' if searching else 'currently no announcements.')
 
         panel = ContainerPanel(
             title = 'no announcements',
@@ -83,6 +156,179 @@ def _build_announcement_scene(posts):
 
     return build_page(content=[stack], title="announcements")
 
+# -----------------------------------------------------------------------------
+
+@timed_build
+def _build_chat_scene(channel, channels, messages, chat_form, before_id=None):
+    channel_buttons = [
+        WidgetButton(
+            label=f"#{c['name']}",
+            href=url_for('social.chat', channel=c['name']),
+            style='primary' if channel and c['id'] == channel['id'] else 'secondary'
+        )
+        for c in channels
+    ]
+
+    lines = [
+        WidgetText(
+            content=f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(m['created_ts']))}  {m['username']}: {m['body']}",
+            style='body'
+        )
+        for m in messages
+    ] or [WidgetText(content='no messages yet.' if before_id is None else 'no older messages.', **{'class': 'chat-empty'})]
+
+    nav_buttons = []
+    if messages:
+        nav_buttons.append(WidgetButton(
+            label='older',
+            href=url_for('social.chat', channel=channel['name'], before=messages[0]['id']),
+            style='secondary'
+        ))
+    if before_id is not None:
+        nav_buttons.append(WidgetButton(label='latest', href=url_for('social.chat', channel=channel['name']), style='secondary'))
+
+    panels = [
+        ContainerPanel(
+            title='channels',
+            children=[ContainerStack(gap='small', **{'class': ' wid-con-stack-row wid-con-stack-wrap'}, children=channel_buttons)]
+        )
+    ]
+    if channel:
+        # only the latest page follows the live stream
+        stream_attrs = ''
+        if before_id is None:
+            stream_url = url_for('social.stream', channel=channel['name'], last_id=messages[-1]['id'] if messages else None)
+            poll_url = url_for('social.chat_poll', channel=channel['name'])
+            stream_attrs = (
+                f' data-push-stream="{escape(stream_url)}" data-chat-lines="true"'
+                f' data-chat-poll="{escape(poll_url)}" data-last-id="{messages[-1]["id"] if messages else 0}"'
+            )
+
+        panels.append(ContainerPanel(
+            title=f"#{channel['name']}",
+            subtitle=channel.get('topic'),
+            attrs=stream_attrs,
+            children=lines,
+            footer=ContainerStack(gap='small', **{'class': ' wid-con-stack-row'}, children=nav_buttons) if nav_buttons else None
+        ))
+        panels.append(ContainerPanel(
+            title='say something',
+            children=[WidgetForm(
+                form=chat_form,
+                buttons=[WidgetButton(label='send', button_type='submit', style='primary')],
+                action=url_for('social.chat_post', channel=channel['name']),
+                form_id='chat-form'
+            )]
+        ))
+
+    return build_page(content=[ContainerStack(gap='medium', children=panels)], title='chat')
+
+# -----------------------------------------------------------------------------
+
+def _feed_post_panel(post, footer=None):
+    children = [WidgetText(content=post['body'], style='body')]
+    if post.get('link'):
+        children.append(WidgetButton(
+            label=post['link'] if len(post['link']) <= 60 else post['link'][:57] + '...',
+            href=post['link'],
+            style='secondary',
+            attrs=' rel="noopener nofollow noreferrer"'
+        ))
+
+    return ContainerPanel(
+        author=post['username'],
+        timestamp=post['created_at'],
+        children=children,
+        footer=footer
+    )
+
+@timed_build
+def _build_feed_scene(posts, post_form, before_id=None):
+    panels = [ContainerPanel(
+        title='share something',
+        collapsible=True,
+        start_collapsed=bool(posts),
+        children=[WidgetForm(
+            form=post_form,
+            buttons=[WidgetButton(label='post', button_type='submit', style='primary')],
+            action=url_for('social.feed_post'),
+            form_id='feed-post-form'
+        )]
+    )]
+
+    for post in posts:
+        count = post['comment_count']
+        panels.append(_feed_post_panel(post, footer=WidgetButton(
+            label=f"{count} comment{'' if count == 1 else 's'}",
+            href=url_for('social.feed_thread', post_id=post['id']),
+            style='secondary'
+        )))
+
+    if not posts:
+        panels.append(ContainerPanel(
+            title='nothing here',
+            children=[WidgetText(content='no posts yet.' if before_id is None else 'no older posts.')]
+        ))
+
+    nav_buttons = []
+    if len(posts) == FEED_PAGE_POSTS:
+        nav_buttons.append(WidgetButton(label='older', href=url_for('social.feed', before=posts[-1]['id']), style='secondary'))
+    if before_id is not None:
+        nav_buttons.append(WidgetButton(label='newest', href=url_for('social.feed'), style='secondary'))
+    if nav_buttons:
+        panels.append(ContainerStack(gap='small', **{'class': ' wid-con-stack-row'}, children=nav_buttons))
+
+    return build_page(content=[ContainerStack(gap='medium', children=panels)], title='feed')
+
+# -----------------------------------------------------------------------------
+
+@timed_build
+def _build_feed_thread_scene(post, comments, comment_form, delete_form=None, after_id=None):
+    footer = None
+    if delete_form is not None:
+        footer = WidgetForm(
+            form=delete_form,
+            buttons=[WidgetButton(label='delete post', button_type='submit', style='secondary')],
+            action=url_for('social.feed_delete', post_id=post['id']),
+            form_id='feed-delete-form'
+        )
+
+    lines = [
+        WidgetText(content=f"{c['created_at']:%Y-%m-%d %H:%M}  {c['username']}: {c['body']}", style='body')
+        for c in comments
+    ] or [WidgetText(content='no comments yet.' if after_id is None else 'no more comments.')]
+
+    nav_buttons = []
+    if after_id is not None:
+        nav_buttons.append(WidgetButton(label='first', href=url_for('social.feed_thread', post_id=post['id']), style='secondary'))
+    if len(comments) == FEED_PAGE_COMMENTS:
+        nav_buttons.append(WidgetButton(
+            label='more',
+            href=url_for('social.feed_thread', post_id=post['id'], after=comments[-1]['id']),
+            style='secondary'
+        ))
+
+    panels = [
+        WidgetButton(label='back to feed', href=url_for('social.feed'), style='secondary'),
+        _feed_post_panel(post, footer=footer),
+        ContainerPanel(
+            title=f"comments ({post['comment_count']})",
+            children=lines,
+            footer=ContainerStack(gap='small', **{'class': ' wid-con-stack-row'}, children=nav_buttons) if nav_buttons else None
+        ),
+        ContainerPanel(
+            title='comment',
+            children=[WidgetForm(
+                form=comment_form,
+                buttons=[WidgetButton(label='send', button_type='submit', style='primary')],
+                action=url_for('social.feed_comment', post_id=post['id']),
+                form_id='feed-comment-form'
+            )]
+        )
+    ]
+
+    return build_page(content=[ContainerStack(gap='medium', children=panels)], title='feed')
+
 
 # -----------------------------------------------------------------------------
 # Routes
@@ -105,28 +351,229 @@ def announcements():
     """
     Display the latest administrator announcements
     """
-    posts = db.announcements.fetch_announcements()
-    page = _build_announcement_scene(posts)
+    search_form = AnnouncementSearchForm(request.args, meta={'csrf': False})
+    search_query = build_search_query(search_form.q.data)
+
+    if search_query:
+        posts = db.announcements.search_announcements(search_query, SEARCH_RESULTS, 0)
+    else:
+        if search_form.q.data and search_form.q.data.strip():
+            flash('Search words must be at least 3 characters long.', 'error')
+        search_form.q.data = ''
+        posts = db.announcements.fetch_announcements()
+
+    page = _build_announcement_scene(posts, search_form)
 
     return make_response(render_template(page.template, this = page))
 
 # -----------------------------------------------------------------------------
 
 @bp.route('/feed')
+@limiter.exempt
 def feed():
     """
-    User's personal activity feed.
+    The activity feed: one range read on FeedPosts (is_deleted, id) per
+    page, comment counts from the posts.
+    """
+    before_id = request.args.get('before', type=int)
+    posts = db.feed.fetch_feed_timeline(before_id, FEED_PAGE_POSTS)
+
+    page = _build_feed_scene(posts, FeedPostForm(), before_id)
+    return make_response(render_template(page.template, this=page))
+
+@bp.route('/feed/post', methods=['POST'])
+@limiter.limit("10 per minute")
+def feed_post():
+    """
+    Create a post.
+    """
+    form = FeedPostForm()
+
+    if not form.validate_on_submit():
+        for field in (form.body, form.link):
+            for error in field.errors:
+                flash(f"{field.name.capitalize()}: {error}", 'error')
+    else:
+        try:
+            db.feed.create_feed_post(session.get('user_id'), form.link.data, form.body.data.strip())
+        except Error as e:
+            print(f"Feed post error: {e}")
+            flash('Error saving post.', 'error')
+
+    return redirect(url_for('social.feed'))
+
+@bp.route('/feed/<int:post_id>')
+@limiter.exempt
+def feed_thread(post_id):
+    """
+    One post with its comments (keyset pages via ?after=).
     """
-    return render_template('offline.html', title='feed')
+    post = db.feed.fetch_feed_post(post_id)
+    if not post:
+        flash('Post not found.', 'error')
+        return redirect(url_for('social.feed'))
+
+    after_id = request.args.get('after', type=int)
+    comments = db.feed.fetch_feed_comments(post_id, after_id, FEED_PAGE_COMMENTS)
+
+    can_delete = post['u_id'] == session.get('user_id') or session.get('role') == 'admin'
+    page = _build_feed_thread_scene(post, comments, FeedCommentForm(), FeedDeleteForm() if can_delete else None, after_id)
+    return make_response(render_template(page.template, this=page))
+
+@bp.route('/feed/<int:post_id>/comment', methods=['POST'])
+@limiter.limit("20 per minute")
+def feed_comment(post_id):
+    """
+    Comment on a post; its comment count is updated in the same transaction.
+    """
+    form = FeedCommentForm()
+
+    if not form.validate_on_submit():
+        for error in form.body.errors:
+            flash(f"Comment: {error}", 'error')
+    else:
+        try:
+            if db.feed.create_feed_comment(post_id, session.get('user_id'), form.body.data.strip()) is None:
+                flash('Post not found.', 'error')
+                return redirect(url_for('social.feed'))
+        except Error as e:
+            print(f"Feed comment error: {e}")
+            flash('Error saving comment.', 'error')
+
+    return redirect(url_for('social.feed_thread', post_id=post_id))
+
+@bp.route('/feed/<int:post_id>/delete', methods=['POST'])
+def feed_delete(post_id):
+    """
+    Delete a post (its author, or an admin).
+    """
+    form = FeedDeleteForm()
+
+    if form.validate_on_submit():
+        try:
+            if db.feed.delete_feed_post(post_id, session.get('user_id'), session.get('role') == 'admin'):
+                flash('Post deleted.', 'success')
+                return redirect(url_for('social.feed'))
+            flash('Post not found, or not yours to delete.', 'error')
+        except Error as e:
+            print(f"Feed delete error: {e}")
+            flash('Error deleting post.', 'error')
+
+    return redirect(url_for('social.feed_thread', post_id=post_id))
 
 # -----------------------------------------------------------------------------
 
-@bp.route('/chat')
-def chat():
+@bp.route('/chat', endpoint='chat')
+@limiter.exempt
+def chat_view():
+    """
+    Chat channels. The latest page (and older pages within the buffered
+    window) is read from the shared ring buffer, not the database.
+    """
+    channel = chat.channel_by_name(request.args.get('channel'))
+    before_id = request.args.get('before', type=int)
+
+    messages = []
+    if channel:
+        try:
+            messages = chat.history(channel['id'], before_id)
+        except chat.ChatUnavailable as e:
+            print(f"Chat unavailable: {e}")
+            flash('Chat is unavailable right now, try again shortly.', 'error')
+
+    page = _build_chat_scene(channel, chat.channels(), messages, ChatForm(), before_id)
+    return make_response(render_template(page.template, this=page))
+
+@bp.route('/chat/post', methods=['POST'])
+@limiter.limit("30 per minute")
+def chat_post():
+    """
+    Post a message, then return to the channel (post/redirect/get).
+    """
+    channel = chat.channel_by_name(request.args.get('channel'))
+    form = ChatForm()
+
+    if channel is None:
+        flash('No such channel.', 'error')
+    elif not form.validate_on_submit():
+        for error in form.body.errors:
+            flash(f"Message: {error}", 'error')
+    else:
+        try:
+            chat.post(channel['id'], session.get('user_id'), session.get('username', ''), form.body.data.strip())
+        except chat.ChatUnavailable as e:
+            print(f"Chat unavailable: {e}")
+            flash('Chat is unavailable right now, message not sent.', 'error')
+
+    return redirect(url_for('social.chat', channel=channel['name'] if channel else None))
+
+@bp.route('/chat/poll')
+@limiter.exempt
+def chat_poll():
     """
-    Real-time chat interface.
+    Long-poll for clients without Server-Sent Events. Waits up to
+    CHAT_LONGPOLL_TIMEOUT_SECONDS for messages after ?since= (or the ETag
+    sent back as If-None-Match) and answers from the ring buffer; 304 when
+    nothing arrived. Parked polls per worker are capped (chat.wait_since).
     """
-    return render_template('offline.html', title='chat')
+    channel = chat.channel_by_name(request.args.get('channel'))
+    if channel is None:
+        return jsonify(error='no such channel'), 404
+
+    since_id = request.args.get('since', type=int)
+    if since_id is None:
+        cursor = next(iter(request.if_none_match.as_set()), '')
+        since_id = int(cursor) if cursor.isdigit() else None
+    if since_id is None:
+        return jsonify(error='since is required'), 400
+
+    try:
+        messages, gap = chat.wait_since(channel['id'], since_id, CHAT_LONGPOLL_TIMEOUT_SECONDS)
+    except chat.ChatBusy:
+        return '', 503, {'Retry-After': '5'}
+    except chat.ChatUnavailable as e:
+        print(f"Chat unavailable: {e}")
+        return '', 503, {'Retry-After': '30'}
+
+    last_id = messages[-1]['id'] if messages else since_id
+    if messages or gap:
+        response = jsonify(
+            messages=[{key: m[key] for key in ('id', 'username', 'body', 'created_ts')} for m in messages],
+            last_id=last_id,
+            reset=gap
+        )
+    else:
+        response = make_response('', 304)
+
+    response.set_etag(str(last_id))
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@bp.route('/stream')
+@limiter.exempt
+def stream():
+    """
+    Server-Sent Events: new messages of ?channel= and announcement changes.
+    Served by the push service only (see push.py); a sync worker answers
+    204, which tells the browser not to reconnect.
+    """
+    if not PUSH_WORKER:
+        return '', 204
+
+    channel = chat.channel_by_name(request.args['channel']) if request.args.get('channel') else None
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    if last_event_id is None:
+        last_event_id = request.args.get('last_id', type=int)
+
+    try:
+        body = push.stream(channel['id'] if channel else None, last_event_id)
+    except push.PushFull:
+        return '', 503, {'Retry-After': '30'}
+
+    return Response(body, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 # -----------------------------------------------------------------------------
 
@@ -22,19 +22,47 @@ from flask import (
     url_for,
     flash,
     session,
-    make_response
+    make_response,
+    abort,
+    jsonify
 )
 from flask_wtf import FlaskForm
-from wtforms import StringField, TextAreaField, SelectField, BooleanField
+from wtforms import StringField, TextAreaField, SelectField, BooleanField, HiddenField, FileField
 from wtforms.validators import DataRequired, Length, Optional
+from mysql.connector import Error
 
+import re
+import time
+
+import db.board
+import db.media
 import db.tickets
+import devapps
+import jobs
+import media as media_files
+import metrics
+from config import (
+    MEDIA_PAGE_ITEMS,
+    MEDIA_UPLOAD_CHUNK_BYTES,
+    MEDIA_UPLOAD_FORM_MAX_BYTES,
+    MEDIA_UPLOAD_MAX_BYTES,
+    MEDIA_UPLOADS_PER_USER,
+    MEDIA_UPLOAD_EXPIRE_HOURS,
+    BOARD_INDEX_TTL_SECONDS,
+    BOARD_THREADS_PER_PAGE,
+    BOARD_POSTS_PER_PAGE,
+    BOARD_TITLE_MAX_LENGTH,
+    BOARD_POST_MAX_LENGTH,
+    DEV_HEALTH_INTERVAL_SECONDS
+)
+from extensions import limiter
 from middleware import check_access
-from utils import flash_form_errors, get_pagination_metadata
+from utils import flash_form_errors, get_pagination_metadata, build_search_query
 
-from components.widgets import WidgetText, WidgetForm, WidgetButton
+from components.widgets import WidgetText, WidgetForm, WidgetButton, WidgetTable
 from components.containers import ContainerPanel, ContainerStack
 from factory import build_page
+from profiling import timed_build
 
 
 # -----------------------------------------------------------------------------
@@ -51,8 +79,40 @@ REQUEST_STATUS_CHOICES = [
     ('rejected', 'rejected')
 ]
 
+TAG_MATCH_CHOICES = [
+    ('any', 'any selected tag'),
+    ('all', 'all selected tags')
+]
+
+# Most tags one filter may combine.
+MAX_FILTER_TAGS = 8
+
 PER_PAGE = 10
 
+MEDIA_SHA256 = re.compile(r'[0-9a-f]{64}')
+
+MEDIA_TYPE_CHOICES = [
+    ('', 'all'),
+    ('audio', 'audio'),
+    ('video', 'video'),
+    ('print', 'print'),
+    ('image', 'images')
+]
+
+# Browse orders (typed browse only; 'all' is always newest first).
+MEDIA_SORT_CHOICES = [
+    ('newest', 'newest'),
+    ('title', 'a-z'),
+    ('largest', 'largest'),
+    ('longest', 'longest')
+]
+
+# Past the last post id, for "latest page" links (before= is exclusive).
+BOARD_LATEST = 2 ** 31 - 1
+
+# Category index, cached per worker (see _board_index).
+_board_index_cache = {'loaded': 0.0, 'rows': []}
+
 
 # -----------------------------------------------------------------------------
 # Forms
@@ -79,15 +139,84 @@ class RequestForm(FlaskForm):
 
 
 class RequestFilterForm(FlaskForm):
-    tag = SelectField('tag', choices=[('', 'all tags')], validators=[Optional()])
+    tags = StringField('tags', validators=[Optional()])
+    match = SelectField('match', choices=TAG_MATCH_CHOICES, validators=[Optional()])
     status = SelectField('status', choices=REQUEST_STATUS_CHOICES, validators=[Optional()])
     my_requests = BooleanField('my requests only')
+    q = StringField('search', validators=[Optional(), Length(max=100)])
+
+
+class RequestSearchForm(FlaskForm):
+    """
+    GET search box; the hidden fields carry the active filters so a search
+    narrows the current view instead of resetting it.
+    """
+    q = StringField('search', validators=[Optional(), Length(max=100)])
+    status = HiddenField()
+    tags = HiddenField()
+    match = HiddenField()
+    my_requests = HiddenField()
+
+
+class BoardThreadForm(FlaskForm):
+    title = StringField('title', validators=[DataRequired(), Length(max=BOARD_TITLE_MAX_LENGTH)])
+    body = TextAreaField('post', validators=[DataRequired(), Length(max=BOARD_POST_MAX_LENGTH)])
+
+
+class BoardPostForm(FlaskForm):
+    body = TextAreaField('reply', validators=[DataRequired(), Length(max=BOARD_POST_MAX_LENGTH)])
+
+
+class MediaUploadForm(FlaskForm):
+    """
+    Starts an upload session. The file itself is not posted here: the page
+    script fills in the hidden fields from the chosen file, posts the form
+    without the file field and then sends the file in chunks to the
+    session URL. `file` is only the picker (the form is not multipart).
+    """
+    title = StringField('title', validators=[DataRequired(), Length(max=255)])
+    file = FileField('file')
+    file_name = HiddenField(validators=[DataRequired(), Length(max=255)])
+    content_type = HiddenField(validators=[DataRequired(), Length(max=127)])
+    size = HiddenField(validators=[DataRequired()])
 
 
 # -----------------------------------------------------------------------------
 # Scene Building
 # -----------------------------------------------------------------------------
 
+def _parse_tag_ids(value, tag_rows):
+    """
+    Turn the comma separated ?tags= value into a list of known tag IDs,
+    in the order given, without duplicates.
+    """
+
+    known = {tag['id'] for tag in tag_rows}
+    tag_ids = []
+    for part in (value or '').split(','):
+        part = part.strip()
+        if part.isdigit() and int(part) in known and int(part) not in tag_ids:
+            tag_ids.append(int(part))
+    return tag_ids[:MAX_FILTER_TAGS]
+
+
+def _filter_state(filter_form, **changes):
+    """
+    The query string describing the current filters, with overrides, for
+    building links that change one filter and keep the rest.
+    """
+
+    state = {
+        'status': filter_form.status.data or '',
+        'tags': filter_form.tags.data or '',
+        'match': filter_form.match.data or 'any',
+        'my_requests': '1' if filter_form.my_requests.data else '',
+        'q': filter_form.q.data or ''
+    }
+    state.update(changes)
+    return state
+
+
 def _build_ticket_panel(ticket, status_messages, fallback_author=None):
     content = [
         WidgetText(content=ticket.get('description', ''), style='body')
@@ -118,7 +247,8 @@ def _build_ticket_panel(ticket, status_messages, fallback_author=None):
     )
 
 
-def _build_requests_scene(request_form, filter_form, tickets, pagination, tag_rows):
+@timed_build
+def _build_requests_scene(request_form, filter_form, search_form, tickets, pagination, tag_rows, status_messages):
     form_widget = WidgetForm(
         form=request_form,
         buttons=[],
@@ -154,71 +284,86 @@ def _build_requests_scene(request_form, filter_form, tickets, pagination, tag_ro
     ticket_panels = []
     if tickets:
         for i, ticket in enumerate(tickets):
-            status_messages = db.tickets.fetch_ticket_status_messages(ticket['id'])
-            panel = _build_ticket_panel(ticket, status_messages, fallback_author=session.get('username'))
+            panel = _build_ticket_panel(
+                ticket,
+                status_messages.get(ticket['id'], []),
+                fallback_author=session.get('username')
+            )
             panel.start_collapsed = (i > 0)
             ticket_panels.append(panel)
     else:
         ticket_panels.append(
             ContainerPanel(
                 title='no requests',
-                children=[WidgetText(content='No requests match the current filters.')]
+                children=[WidgetText(
+                    content='No requests match the current search.' if filter_form.q.data
+                    else 'No requests match the current filters.'
+                )]
             )
         )
 
-    tag_buttons = []
+    selected_tags = [int(part) for part in (filter_form.tags.data or '').split(',') if part]
+
+    tag_buttons = [
+        WidgetButton(
+            label='all tags',
+            href=url_for('users.requests', page=1, **_filter_state(filter_form, tags='')),
+            style='primary' if not selected_tags else 'secondary'
+        )
+    ]
     for tag in tag_rows:
         tag_name = tag.get('name', '')
         if not tag_name:
             continue
 
-        href = url_for(
-            'users.requests',
-            page=1,
-            status=filter_form.status.data or '',
-            tag=tag_name,
-            my_requests='1' if filter_form.my_requests.data else ''
-        )
-        style = 'primary' if (filter_form.tag.data == tag_name) else 'secondary'
+        # each tag button toggles that tag in the selection
+        if tag['id'] in selected_tags:
+            toggled = [tag_id for tag_id in selected_tags if tag_id != tag['id']]
+        else:
+            toggled = selected_tags + [tag['id']]
+
+        href = url_for('users.requests', page=1, **_filter_state(filter_form, tags=','.join(map(str, toggled))))
+        style = 'primary' if tag['id'] in selected_tags else 'secondary'
         tag_buttons.append(WidgetButton(label=tag_name, href=href, style=style))
 
-    all_tags_href = url_for(
-        'users.requests',
-        page=1,
-        status=filter_form.status.data or '',
-        tag='',
-        my_requests='1' if filter_form.my_requests.data else ''
-    )
-    tag_buttons.insert(
-        0,
+    match_buttons = [
         WidgetButton(
-            label='all tags',
-            href=all_tags_href,
-            style='primary' if not filter_form.tag.data else 'secondary'
+            label=match_label,
+            href=url_for('users.requests', page=1, **_filter_state(filter_form, match=match_value)),
+            style='primary' if (filter_form.match.data or 'any') == match_value else 'secondary'
         )
-    )
+        for match_value, match_label in TAG_MATCH_CHOICES
+    ]
 
     status_buttons = []
     for status_value, status_label in REQUEST_STATUS_CHOICES:
-        href = url_for(
-            'users.requests',
-            page=1,
-            status=status_value,
-            tag=filter_form.tag.data or '',
-            my_requests='1' if filter_form.my_requests.data else ''
-        )
+        href = url_for('users.requests', page=1, **_filter_state(filter_form, status=status_value))
         style = 'primary' if (filter_form.status.data == status_value) else 'secondary'
         status_buttons.append(WidgetButton(label=status_label, href=href, style=style))
 
     my_requests_href = url_for(
         'users.requests',
         page=1,
-        status=filter_form.status.data or '',
-        tag=filter_form.tag.data or '',
-        my_requests='' if filter_form.my_requests.data else '1'
+        **_filter_state(filter_form, my_requests='' if filter_form.my_requests.data else '1')
+    )
+
+    search_widget = WidgetForm(
+        form=search_form,
+        buttons=[
+            WidgetButton(label='search', button_type='submit', style='primary'),
+            WidgetButton(
+                label='clear',
+                href=url_for('users.requests', **_filter_state(filter_form, q='')),
+                style='secondary'
+            )
+        ],
+        action=url_for('users.requests'),
+        method='GET',
+        form_id='request-search-form'
     )
 
     filter_content = [
+        search_widget,
         WidgetText(content='filter by status:', style='subtitle'),
         ContainerStack(
             gap='small',
@@ -239,6 +384,16 @@ def _build_requests_scene(request_form, filter_form, tickets, pagination, tag_ro
         )
     ]
 
+    if len(selected_tags) > 1:
+        filter_content += [
+            WidgetText(content='tickets matching:', style='subtitle'),
+            ContainerStack(
+                gap='small',
+                **{'class': ' wid-con-stack-row wid-con-stack-wrap'},
+                children=match_buttons
+            )
+        ]
+
     nav_buttons = [
         WidgetButton(
             label='previous',
@@ -276,6 +431,379 @@ def _build_requests_scene(request_form, filter_form, tickets, pagination, tag_ro
     return build_page(content=[stack], title='requests')
 
 
+def _board_index(refresh=False):
+    """
+    Live categories with their counts, cached per worker for
+    BOARD_INDEX_TTL_SECONDS. The rows are the denormalised category rows,
+    so a miss costs one O(categories) read.
+    """
+
+    fresh = time.time() - _board_index_cache['loaded'] <= BOARD_INDEX_TTL_SECONDS
+    hit = fresh and bool(_board_index_cache['rows']) and not refresh
+    metrics.record_cache('board_index', hit)
+
+    if not hit:
+        rows = db.board.fetch_board_index()
+        if rows:
+            _board_index_cache.update(loaded=time.time(), rows=rows)
+    return _board_index_cache['rows']
+
+
+def _board_category(category_id):
+    for category in _board_index():
+        if category['id'] == category_id:
+            return category
+
+    # created since the index was cached
+    for category in _board_index(refresh=True):
+        if category['id'] == category_id:
+            return category
+    return None
+
+
+@timed_build
+def _build_board_index_scene(categories):
+    rows = [
+        {
+            'id': category['id'],
+            'name': category['name'],
+            'description': category.get('description') or '',
+            'thread_count': category['thread_count'],
+            'post_count': category['post_count'],
+            'last_post_at': category.get('last_post_at') or '-',
+            'actions': [{
+                'label': 'Open',
+                'icon': '&#8594;',
+                'href': url_for('users.board_category', category_id=category['id']),
+                'method': 'GET',
+                'class': ''
+            }]
+        }
+        for category in categories
+    ]
+
+    panel = ContainerPanel(
+        title='board',
+        subtitle='categories',
+        children=[WidgetTable(
+            columns=[
+                {'key': 'name', 'label': 'Category'},
+                {'key': 'description', 'label': 'About'},
+                {'key': 'thread_count', 'label': 'Threads'},
+                {'key': 'post_count', 'label': 'Posts'},
+                {'key': 'last_post_at', 'label': 'Last Post'}
+            ],
+            rows=rows
+        )] if rows else [WidgetText(content='No categories yet.')]
+    )
+
+    return build_page(content=[ContainerStack(gap='medium', children=[panel])], title='board')
+
+
+@timed_build
+def _build_board_category_scene(category, threads, pagination, thread_form):
+    rows = [
+        {
+            'id': thread['id'],
+            'title': thread['title'],
+            'username': thread['username'],
+            'post_count': thread['post_count'],
+            'last_post_at': thread['last_post_at'],
+            'last_poster': thread.get('last_poster') or '-',
+            'actions': [{
+                'label': 'Open',
+                'icon': '&#8594;',
+                'href': url_for('users.board_thread', thread_id=thread['id']),
+                'method': 'GET',
+                'class': ''
+            }]
+        }
+        for thread in threads
+    ]
+
+    nav_buttons = [
+        WidgetButton(label='categories', href=url_for('users.board'), style='secondary'),
+        WidgetButton(
+            label='previous',
+            href=pagination['prev_href'] if pagination['has_prev'] else None,
+            style='secondary',
+            attrs='' if pagination['has_prev'] else ' disabled'
+        ),
+        WidgetText(content=f"page {pagination['page']} of {pagination['pages']}", style='meta'),
+        WidgetButton(
+            label='next',
+            href=pagination['next_href'] if pagination['has_next'] else None,
+            style='secondary',
+            attrs='' if pagination['has_next'] else ' disabled'
+        )
+    ]
+
+    panels = [
+        ContainerPanel(
+            title=category['name'],
+            subtitle=category.get('description'),
+            children=[WidgetTable(
+                columns=[
+                    {'key': 'title', 'label': 'Thread'},
+                    {'key': 'username', 'label': 'Started By'},
+                    {'key': 'post_count', 'label': 'Posts'},
+                    {'key': 'last_post_at', 'label': 'Last Post'},
+                    {'key': 'last_poster', 'label': 'By'}
+                ],
+                rows=rows
+            )] if rows else [WidgetText(content='No threads yet.')],
+            footer=ContainerStack(gap='small', **{'class': ' wid-con-stack-row wid-pagination-bar'}, children=nav_buttons)
+        ),
+        ContainerPanel(
+            title='new thread',
+            collapsible=True,
+            start_collapsed=bool(rows),
+            children=[WidgetForm(
+                form=thread_form,
+                buttons=[WidgetButton(label='post thread', button_type='submit', style='primary')],
+                action=url_for('users.board_new_thread', category_id=category['id']),
+                form_id='board-thread-form'
+            )]
+        )
+    ]
+
+    return build_page(content=[ContainerStack(gap='medium', children=panels)], title='board')
+
+
+@timed_build
+def _build_board_thread_scene(thread, posts, post_form, paged):
+    post_panels = [
+        ContainerPanel(
+            author=post['username'],
+            timestamp=post['created_at'],
+            children=[WidgetText(content=post['body'], style='body')]
+        )
+        for post in posts
+    ] or [ContainerPanel(title='no posts', children=[WidgetText(content='No posts on this page.')])]
+
+    nav_buttons = [
+        WidgetButton(label=thread['category_name'], href=url_for('users.board_category', category_id=thread['category_id']), style='secondary'),
+        WidgetButton(label='first', href=url_for('users.board_thread', thread_id=thread['id']), style='secondary')
+    ]
+    if posts and paged:
+        nav_buttons.append(WidgetButton(
+            label='previous',
+            href=url_for('users.board_thread', thread_id=thread['id'], before=posts[0]['id']),
+            style='secondary'
+        ))
+    if len(posts) == BOARD_POSTS_PER_PAGE:
+        nav_buttons.append(WidgetButton(
+            label='next',
+            href=url_for('users.board_thread', thread_id=thread['id'], after=posts[-1]['id']),
+            style='secondary'
+        ))
+    nav_buttons.append(WidgetButton(
+        label='latest',
+        href=url_for('users.board_thread', thread_id=thread['id'], before=BOARD_LATEST),
+        style='secondary'
+    ))
+
+    panels = [
+        ContainerPanel(
+            title=thread['title'],
+            subtitle=f"{thread['post_count']} posts, last by {thread.get('last_poster') or '-'}",
+            footer=ContainerStack(gap='small', **{'class': ' wid-con-stack-row wid-con-stack-wrap'}, children=nav_buttons)
+        ),
+        *post_panels,
+        ContainerPanel(
+            title='reply',
+            children=[WidgetForm(
+                form=post_form,
+                buttons=[WidgetButton(label='post reply', button_type='submit', style='primary')],
+                action=url_for('users.board_reply', thread_id=thread['id']),
+                form_id='board-reply-form'
+            )]
+        )
+    ]
+
+    return build_page(content=[ContainerStack(gap='medium', children=panels)], title='board')
+
+
+def _format_size(size_bytes):
+    size = float(size_bytes)
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def _format_duration(duration_ms):
+    if not duration_ms:
+        return '-'
+    minutes, seconds = divmod(duration_ms // 1000, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def _media_cursor(item, sort):
+    """
+    The (after, after_id) keyset cursor continuing a browse after item.
+    """
+    if sort == 'title':
+        value = item['title']
+    elif sort == 'largest':
+        value = item['size_bytes']
+    elif sort == 'longest':
+        value = item['duration_ms']
+    else:
+        value = item['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+    return value, item['id']
+
+
+@timed_build
+def _build_media_scene(items, upload_form, media_type, sort, next_href, first_href):
+    rows = [
+        {
+            'id': item['id'],
+            'title': item['title'],
+            'media_type': item['media_type'],
+            'size': _format_size(item['size_bytes']),
+            'duration': _format_duration(item['duration_ms']),
+            'dimensions': f"{item['width']} x {item['height']}" if item['width'] else '-',
+            'pages': item['page_count'] or '-',
+            'created_at': item['created_at'],
+            'actions': [
+                {
+                    'label': 'Open',
+                    'icon': '&#9654;',
+                    'href': url_for('users.media_file', media_id=item['id']),
+                    'method': 'GET',
+                    'class': ''
+                },
+                {
+                    'label': 'Download',
+                    'icon': '&#8595;',
+                    'href': url_for('users.media_file', media_id=item['id'], download=1),
+                    'method': 'GET',
+                    'class': ''
+                }
+            ]
+        }
+        for item in items
+    ]
+
+    columns = [{'key': 'title', 'label': 'Title'}]
+    if not media_type:
+        columns.append({'key': 'media_type', 'label': 'Type'})
+    if media_type in ('audio', 'video'):
+        columns.append({'key': 'duration', 'label': 'Length'})
+    if media_type in ('video', 'image'):
+        columns.append({'key': 'dimensions', 'label': 'Size (px)'})
+    if media_type == 'print':
+        columns.append({'key': 'pages', 'label': 'Pages'})
+    columns += [{'key': 'size', 'label': 'Size'}, {'key': 'created_at', 'label': 'Added'}]
+
+    type_buttons = [
+        WidgetButton(
+            label=label,
+            href=url_for('users.media', type=value or None, sort=sort if value and (sort != 'longest' or value in ('audio', 'video')) else None),
+            style='primary' if value == media_type else 'secondary'
+        )
+        for value, label in MEDIA_TYPE_CHOICES
+    ]
+    sort_buttons = [
+        WidgetButton(
+            label=label,
+            href=url_for('users.media', type=media_type, sort=value),
+            style='primary' if value == sort else 'secondary'
+        )
+        for value, label in MEDIA_SORT_CHOICES
+        if value != 'longest' or media_type in ('audio', 'video')
+    ] if media_type else []
+    nav_buttons = [
+        WidgetButton(
+            label='first',
+            href=first_href,
+            style='secondary',
+            attrs='' if first_href else ' disabled'
+        ),
+        WidgetButton(
+            label='next',
+            href=next_href,
+            style='secondary',
+            attrs='' if next_href else ' disabled'
+        )
+    ]
+
+    panel = ContainerPanel(
+        title='media',
+        subtitle=dict(MEDIA_TYPE_CHOICES)[media_type],
+        children=[
+            ContainerStack(gap='small', **{'class': ' wid-con-stack-row wid-con-stack-wrap'}, children=type_buttons + sort_buttons),
+            WidgetTable(columns=columns, rows=rows) if rows else WidgetText(content='No media here yet.')
+        ],
+        footer=ContainerStack(gap='small', **{'class': ' wid-con-stack-row wid-con-stack-wrap'}, children=nav_buttons)
+    )
+
+    upload_panel = ContainerPanel(
+        title='upload',
+        subtitle='resumes where it stopped if the connection drops',
+        collapsible=True,
+        start_collapsed=True,
+        children=[
+            WidgetForm(
+                form=upload_form,
+                buttons=[WidgetButton(label='upload', button_type='submit', style='primary')],
+                action=url_for('users.media_upload_begin'),
+                form_id='media-upload-form'
+            ),
+            WidgetText(content='', style='meta', **{'class': 'media-upload-status'})
+        ]
+    )
+
+    return build_page(content=[ContainerStack(gap='medium', children=[panel, upload_panel])], title='media')
+
+
+@timed_build
+def _build_dev_scene(apps):
+    now = time.time()
+    rows = [
+        {
+            'name': app['name'],
+            'description': app.get('description', ''),
+            'status': f"{app['status']} ({app['code']})" if app['code'] else app['status'],
+            'latency': app['latency_ms'] if app['latency_ms'] is not None else '-',
+            'checked': f"{int(now - app['checked'])}s ago" if app['checked'] else '-',
+            'detail': app['error'] or '',
+            'actions': [
+                {
+                    'label': 'Open',
+                    'icon': '&#9654;',
+                    'href': app['url'],
+                    'method': 'GET',
+                    'class': ''
+                }
+            ] if app.get('url') else []
+        }
+        for app in apps
+    ]
+
+    panel = ContainerPanel(
+        title='dev sandbox',
+        subtitle=f"checked every {DEV_HEALTH_INTERVAL_SECONDS}s",
+        children=[
+            WidgetTable(
+                columns=[
+                    {'key': 'name', 'label': 'App'},
+                    {'key': 'description', 'label': 'Description'},
+                    {'key': 'status', 'label': 'Status'},
+                    {'key': 'latency', 'label': 'Latency (ms)'},
+                    {'key': 'checked', 'label': 'Checked'},
+                    {'key': 'detail', 'label': 'Detail'}
+                ],
+                rows=rows
+            ) if rows else WidgetText(content='No sandbox apps configured.')
+        ]
+    )
+
+    return build_page(content=[panel], title='dev')
+
+
 # -----------------------------------------------------------------------------
 # Routes
 # -----------------------------------------------------------------------------
@@ -286,8 +814,205 @@ def restrict_access():
 
 
 @bp.route('/media')
+@limiter.exempt
 def media():
-    return render_template('offline.html', title='media')
+    """
+    Browse the library by type and order. Pages are keyset (after the last
+    row's sort value and id), so deep pages cost the same as the first.
+    """
+    media_type = request.args.get('type', '')
+    if media_type not in dict(MEDIA_TYPE_CHOICES):
+        media_type = ''
+    sort = request.args.get('sort', 'newest')
+    if not media_type or sort not in dict(MEDIA_SORT_CHOICES):
+        sort = 'newest'
+
+    after = request.args.get('after')
+    after_id = request.args.get('after_id', type=int)
+    if after_id is None:
+        after = None
+
+    items = db.media.fetch_media_browse(media_type or None, sort, after, after_id, MEDIA_PAGE_ITEMS)
+
+    next_href = None
+    if len(items) == MEDIA_PAGE_ITEMS:
+        next_after, next_after_id = _media_cursor(items[-1], sort)
+        next_href = url_for('users.media', type=media_type or None, sort=sort, after=next_after, after_id=next_after_id)
+    first_href = url_for('users.media', type=media_type or None, sort=sort) if after_id is not None else None
+
+    page = _build_media_scene(items, MediaUploadForm(), media_type, sort, next_href, first_href)
+    return make_response(render_template(page.template, this=page))
+
+
+@bp.route('/media/<int:media_id>/file')
+@limiter.exempt
+def media_file(media_id):
+    """
+    Deliver a media file. Access is checked above (restrict_access); the
+    bytes are streamed by nginx when MEDIA_ACCEL_PREFIX is set, otherwise
+    by send_file with Range and conditional request support.
+    """
+    item = db.media.fetch_media_file(media_id)
+    if item is None:
+        abort(404)
+    return media_files.file_response(item, download=request.args.get('download') == '1')
+
+
+@bp.route('/media/uploads', methods=['POST'])
+@limiter.limit("30 per hour")
+def media_upload_begin():
+    """
+    Open an upload session: {upload_id, url, offset, chunk_bytes}. The
+    client then PUTs the file in chunks of at most chunk_bytes to url.
+    """
+    # only the form fields belong here; refuse a body carrying the file
+    # before anything parses it
+    if request.content_length is None:
+        return jsonify(error='Content-Length required'), 411
+    if request.content_length > MEDIA_UPLOAD_FORM_MAX_BYTES:
+        return jsonify(error='post the form fields only; the file goes to the session URL'), 413
+
+    form = MediaUploadForm()
+
+    if not form.validate_on_submit():
+        field, errors = next(iter(form.errors.items()))
+        return jsonify(error=f"{field}: {errors[0]}"), 400
+
+    try:
+        size = int(form.size.data)
+    except ValueError:
+        return jsonify(error='size must be a number'), 400
+    if size <= 0 or size > MEDIA_UPLOAD_MAX_BYTES:
+        return jsonify(error=f"files must be between 1 byte and {_format_size(MEDIA_UPLOAD_MAX_BYTES)}"), 413
+
+    media_type = media_files.media_type_for(form.content_type.data)
+    if media_type is None:
+        return jsonify(error=f"{form.content_type.data} files are not accepted"), 415
+
+    try:
+        upload_id = db.media.begin_media_upload(
+            session['user_id'],
+            media_type,
+            form.title.data,
+            form.file_name.data,
+            form.content_type.data.split(';')[0].strip().lower(),
+            size,
+            MEDIA_UPLOADS_PER_USER,
+            MEDIA_UPLOAD_EXPIRE_HOURS
+        )
+    except Error as e:
+        print(f"Media upload error: {e}")
+        return jsonify(error='the upload could not be started'), 500
+
+    if upload_id is None:
+        return jsonify(error=f"at most {MEDIA_UPLOADS_PER_USER} uploads can be open at once"), 429
+
+    return jsonify(
+        upload_id=upload_id,
+        url=url_for('users.media_upload', upload_id=upload_id),
+        offset=0,
+        chunk_bytes=MEDIA_UPLOAD_CHUNK_BYTES
+    ), 201
+
+
+@bp.route('/media/uploads/<int:upload_id>', methods=['GET', 'PUT', 'DELETE'])
+@limiter.exempt
+def media_upload(upload_id):
+    """
+    GET: {offset, size}, where to resume. PUT: append the request body
+    (one chunk, Upload-Offset header = where it starts) and answer the new
+    offset; 409 with the real offset if they disagree. DELETE: abort.
+    """
+    upload = db.media.fetch_media_upload(upload_id, session['user_id'])
+    if upload is None:
+        return jsonify(error='no such upload'), 404
+
+    if request.method == 'GET':
+        return jsonify(offset=media_files.upload_offset(upload_id), size=upload['size_bytes'])
+
+    if request.method == 'DELETE':
+        try:
+            db.media.abort_media_upload(upload_id, session['user_id'])
+        except Error as e:
+            print(f"Media upload error: {e}")
+            return jsonify(error='the upload could not be cancelled'), 500
+        media_files.discard_upload(upload_id)
+        return '', 204
+
+    if request.content_length is None:
+        return jsonify(error='Content-Length is required'), 411
+    offset = request.headers.get('Upload-Offset', type=int)
+    if offset is None:
+        return jsonify(error='Upload-Offset is required'), 400
+
+    try:
+        received = media_files.write_chunk(upload, offset, request.stream, request.content_length)
+    except media_files.UploadConflict as e:
+        return jsonify(error='offset mismatch', offset=e.offset), 409
+    except media_files.UploadTooLarge:
+        return jsonify(error=f"chunks are at most {MEDIA_UPLOAD_CHUNK_BYTES} bytes and end at the file size"), 413
+
+    try:
+        db.media.record_media_upload_progress(upload_id, received)
+    except Error as e:
+        print(f"Media upload progress error: {e}")  # the partial file stays authoritative
+
+    return jsonify(offset=received, size=upload['size_bytes'])
+
+
+@bp.route('/media/uploads/<int:upload_id>/complete', methods=['POST'])
+@limiter.exempt
+def media_upload_complete(upload_id):
+    """
+    Finish a fully received upload: {media_id, duplicate, url}. duplicate
+    is true when the same content was already in the library (its item is
+    returned and no second copy is stored).
+    """
+    upload = db.media.fetch_media_upload(upload_id, session['user_id'])
+    if upload is None:
+        return jsonify(error='no such upload'), 404
+
+    try:
+        sha256, storage_path = media_files.complete_upload(upload)
+    except media_files.UploadConflict as e:
+        return jsonify(error='the upload is not complete', offset=e.offset), 409
+
+    try:
+        media_id, duplicate = db.media.finalize_media_upload(upload_id, session['user_id'], sha256, storage_path)
+    except Error as e:
+        print(f"Media upload finalize error: {e}")
+        return jsonify(error='the upload could not be finished, try again'), 500
+
+    if media_id is None:
+        return jsonify(error='no such upload'), 404
+
+    media_files.discard_upload(upload_id)
+
+    payload = {
+        'sha256': sha256,
+        'storage_path': storage_path,
+        'media_type': upload['media_type'],
+        'content_type': upload['content_type']
+    }
+    for kind in ('media.metadata', 'media.thumbnails'):
+        try:
+            jobs.enqueue(kind, payload, key=f"{kind}:{sha256}")
+        except Error as e:
+            print(f"Media ingest job error: {e}")  # `flask media-metadata` / `flask thumbnails` catch up
+
+    return jsonify(media_id=media_id, duplicate=duplicate, url=url_for('users.media_file', media_id=media_id))
+
+
+@bp.route('/media/thumbs/<sha256>/<int:size>.webp')
+@limiter.exempt
+def media_thumb(sha256, size):
+    """
+    A rendered thumbnail. The URL holds the content hash, so the response
+    is marked immutable and a gallery page costs no requests once cached.
+    """
+    if not MEDIA_SHA256.fullmatch(sha256):
+        abort(404)
+    return media_files.thumb_response(sha256, size)
 
 
 @bp.route('/report', methods=['GET', 'POST'])
@@ -322,26 +1047,64 @@ def requests():
 
     filter_form = RequestFilterForm(request.args, meta={'csrf': False})
 
-    tag_rows = db.tickets.fetch_ticket_tag_list()
-    filter_form.tag.choices = [('', 'all tags')] + [
-        (tag.get('name', ''), tag.get('name', ''))
-        for tag in tag_rows if tag.get('name')
-    ]
+    tag_rows = [tag for tag in db.tickets.fetch_ticket_tag_list() if tag.get('name')]
+
+    # tag names are resolved to IDs here, once, from the list already fetched
+    # for the tag buttons; the older single ?tag=<name> links still work
+    tag_ids = _parse_tag_ids(request.args.get('tags', ''), tag_rows)
+    legacy_tag = request.args.get('tag', '')
+    if not tag_ids and legacy_tag:
+        tag_ids = [tag['id'] for tag in tag_rows if tag['name'] == legacy_tag]
 
-    selected_tag = request.args.get('tag', '')
     selected_status = request.args.get('status', '')
+    selected_match = request.args.get('match', 'any')
     my_requests = request.args.get('my_requests', '') in ['1', 'true', 'on', 'yes']
 
-    filter_form.tag.data = selected_tag if selected_tag in dict(filter_form.tag.choices) else ''
+    filter_form.tags.data = ','.join(map(str, tag_ids))
+    filter_form.match.data = selected_match if selected_match in dict(TAG_MATCH_CHOICES) else 'any'
     filter_form.status.data = selected_status if selected_status in dict(filter_form.status.choices) else ''
     filter_form.my_requests.data = my_requests
+    match_all = filter_form.match.data == 'all'
+
+    raw_query = request.args.get('q', '').strip()
+    search_query = build_search_query(raw_query)
+    if raw_query and not search_query:
+        flash('Search words must be at least 3 characters long.', 'error')
+    filter_form.q.data = raw_query if search_query else ''
 
-    if my_requests:
+    search_form = RequestSearchForm(meta={'csrf': False}, data=_filter_state(filter_form))
+
+    # one tag (any or all is the same) takes the indexed single-tag path of
+    # sp_fetch_tickets; only 2+ tags need the grouped multi-tag procedure
+    tag_name = next(tag['name'] for tag in tag_rows if tag['id'] == tag_ids[0]) if len(tag_ids) == 1 else None
+
+    if search_query:
+        rows = db.tickets.search_tickets(
+            query=search_query,
+            u_id=session.get('user_id') if my_requests else None,
+            ticket_type='request',
+            status=filter_form.status.data or None,
+            tag_ids=tag_ids,
+            match_all=match_all,
+            limit=PER_PAGE,
+            offset=offset
+        )
+    elif len(tag_ids) > 1:
+        rows = db.tickets.fetch_tickets_by_tags(
+            u_id=session.get('user_id') if my_requests else None,
+            ticket_type='request',
+            status=filter_form.status.data or None,
+            tag_ids=tag_ids,
+            match_all=match_all,
+            limit=PER_PAGE,
+            offset=offset
+        )
+    elif my_requests:
         rows = db.tickets.fetch_tickets_by_user(
             u_id=session.get('user_id'),
             ticket_type='request',
             status=filter_form.status.data or None,
-            tag_name=filter_form.tag.data or None,
+            tag_name=tag_name,
             limit=PER_PAGE,
             offset=offset
         )
@@ -349,39 +1112,142 @@ def requests():
         rows = db.tickets.fetch_tickets(
             ticket_type='request',
             status=filter_form.status.data or None,
-            tag_name=filter_form.tag.data or None,
+            tag_name=tag_name,
             limit=PER_PAGE,
             offset=offset
         )
 
     total_records = rows[0].get('total_records', 0) if rows else 0
 
+    # one call for the whole page instead of one per ticket
+    status_messages = db.tickets.fetch_ticket_status_messages_batch([row['id'] for row in rows])
+
     pagination = get_pagination_metadata(
         page,
         PER_PAGE,
         total_records,
         'users.requests',
-        status=filter_form.status.data or '',
-        tag=filter_form.tag.data or '',
-        my_requests='1' if filter_form.my_requests.data else ''
+        **_filter_state(filter_form)
     )
 
     page_obj = _build_requests_scene(
         request_form=request_form,
         filter_form=filter_form,
+        search_form=search_form,
         tickets=rows,
         pagination=pagination,
-        tag_rows=tag_rows
+        tag_rows=tag_rows,
+        status_messages=status_messages
     )
 
     return make_response(render_template(page_obj.template, this=page_obj))
 
 
 @bp.route('/dev')
+@limiter.exempt
 def dev():
-    return redirect(url_for('users.requests'))
+    """
+    Status of the dev sandbox apps, from the checker's last round
+    (devapps.py); rendering never waits on a probe.
+    """
+
+    page = _build_dev_scene(devapps.read_status())
+    return make_response(render_template(page.template, this=page))
 
 
 @bp.route('/board')
+@limiter.exempt
 def board():
-    return redirect(url_for('users.requests'))
+    """
+    Board index: one row per category, counts from the category rows.
+    """
+    page = _build_board_index_scene(_board_index())
+    return make_response(render_template(page.template, this=page))
+
+
+@bp.route('/board/<int:category_id>')
+@limiter.exempt
+def board_category(category_id):
+    """
+    A category's threads by latest activity. Page count comes from the
+    category's thread_count; thread stats from the thread rows.
+    """
+    category = _board_category(category_id)
+    if category is None:
+        flash('Category not found.', 'error')
+        return redirect(url_for('users.board'))
+
+    page = request.args.get('page', 1, type=int)
+    page = page if page > 0 else 1
+    threads = db.board.fetch_board_threads(category_id, BOARD_THREADS_PER_PAGE, (page - 1) * BOARD_THREADS_PER_PAGE)
+    pagination = get_pagination_metadata(page, BOARD_THREADS_PER_PAGE, category['thread_count'], 'users.board_category', category_id=category_id)
+
+    page_obj = _build_board_category_scene(category, threads, pagination, BoardThreadForm())
+    return make_response(render_template(page_obj.template, this=page_obj))
+
+
+@bp.route('/board/<int:category_id>/new', methods=['POST'])
+def board_new_thread(category_id):
+    form = BoardThreadForm()
+
+    if not form.validate_on_submit():
+        flash_form_errors(form)
+        return redirect(url_for('users.board_category', category_id=category_id))
+
+    try:
+        thread_id, _ = db.board.create_board_thread(category_id, session.get('user_id'), form.title.data.strip(), form.body.data.strip())
+    except Error as e:
+        print(f"Board thread error: {e}")
+        flash('An error occurred while creating the thread.', 'error')
+        return redirect(url_for('users.board_category', category_id=category_id))
+
+    if thread_id is None:
+        flash('Category not found.', 'error')
+        return redirect(url_for('users.board'))
+
+    _board_index_cache['loaded'] = 0.0
+    return redirect(url_for('users.board_thread', thread_id=thread_id))
+
+
+@bp.route('/board/thread/<int:thread_id>')
+@limiter.exempt
+def board_thread(thread_id):
+    """
+    A thread's posts, paged by keyset on (thread_id, id): ?after=<id> for the
+    next page, ?before=<id> for the previous one.
+    """
+    thread = db.board.fetch_board_thread(thread_id)
+    if thread is None:
+        flash('Thread not found.', 'error')
+        return redirect(url_for('users.board'))
+
+    after_id = request.args.get('after', type=int)
+    before_id = request.args.get('before', type=int)
+    posts = db.board.fetch_board_posts(thread_id, after_id, before_id, BOARD_POSTS_PER_PAGE)
+
+    page = _build_board_thread_scene(thread, posts, BoardPostForm(), paged=after_id is not None or before_id is not None)
+    return make_response(render_template(page.template, this=page))
+
+
+@bp.route('/board/thread/<int:thread_id>/reply', methods=['POST'])
+def board_reply(thread_id):
+    form = BoardPostForm()
+
+    if not form.validate_on_submit():
+        flash_form_errors(form)
+        return redirect(url_for('users.board_thread', thread_id=thread_id, before=BOARD_LATEST))
+
+    try:
+        post_id = db.board.create_board_post(thread_id, session.get('user_id'), form.body.data.strip())
+    except Error as e:
+        print(f"Board reply error: {e}")
+        flash('An error occurred while posting the reply.', 'error')
+        return redirect(url_for('users.board_thread', thread_id=thread_id, before=BOARD_LATEST))
+
+    if post_id is None:
+        flash('Thread not found.', 'error')
+        return redirect(url_for('users.board'))
+
+    _board_index_cache['loaded'] = 0.0
+    # the page ending with the new post
+    return redirect(url_for('users.board_thread', thread_id=thread_id, before=post_id + 1))
@@ -0,0 +1,636 @@
+# chat.py - Shared chat ring buffer with batched persistence
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+The most recent CHAT_BUFFER_MESSAGES messages of every channel live in one
+memory-mapped file under RUNTIME_DIR, shared by all workers in the
+container. Posting writes a fixed-size slot; reading the latest messages,
+polling for new ones and paging back through the buffered window never
+touch the database. ChatMessages is the durable log behind it, filled in
+batches by a flusher thread (and inline when a batch is full).
+
+Message ids come from a sequence in the file header, seeded from the
+highest stored id when the file is created, so they are global, increasing
+and usable as cursors. Messages posted within the last CHAT_FLUSH_SECONDS
+are lost if the container (not just a worker) dies. A slot is never
+overwritten before its message is persisted: while the database is down,
+a channel takes CHAT_BUFFER_MESSAGES more posts and then refuses them
+(ChatBacklog) until a flush succeeds.
+
+File layout:
+    header      magic, slots per channel, channels, slot size, next id,
+                persisted id
+    channels    CHAT_MAX_CHANNELS x (channel id, flags, messages written)
+    slots       CHAT_MAX_CHANNELS x CHAT_BUFFER_MESSAGES fixed-size slots,
+                written round-robin
+"""
+
+import atexit
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from flask import Flask
+from mysql.connector import Error
+
+import db.chat
+from config import (
+    RUNTIME_DIR,
+    PUSH_WORKER,
+    CHAT_BUFFER_MESSAGES,
+    CHAT_MAX_CHANNELS,
+    CHAT_MESSAGE_MAX_LENGTH,
+    CHAT_PAGE_MESSAGES,
+    CHAT_FLUSH_SECONDS,
+    CHAT_FLUSH_BATCH,
+    CHAT_CHANNELS_TTL_SECONDS,
+    CHAT_LONGPOLL_TICK_SECONDS,
+    CHAT_LONGPOLL_MAX_PARKED
+)
+
+CHAT_DIR = os.path.join(RUNTIME_DIR, 'chat')
+RING_PATH = os.path.join(CHAT_DIR, 'ring.bin')
+RING_LOCK_PATH = os.path.join(CHAT_DIR, 'ring.lock')
+FLUSH_LOCK_PATH = os.path.join(CHAT_DIR, 'flush.lock')
+
+MAGIC = b'SCAVCHT1'
+HEADER = struct.Struct('<8sIIIQQ')
+CHANNEL = struct.Struct('<iIQ')
+SLOT_HEAD = struct.Struct('<QdiHH')
+
+USERNAME_BYTES = 128
+BODY_BYTES = CHAT_MESSAGE_MAX_LENGTH * 4
+SLOT_SIZE = SLOT_HEAD.size + USERNAME_BYTES + BODY_BYTES
+
+# channel flag: the buffer was warmed with the channel's whole history
+FLAG_COMPLETE = 1
+
+# pause between non-blocking flock attempts in the push service
+RING_LOCK_RETRY_SECONDS = 0.001
+
+class ChatUnavailable(Exception):
+    """
+    The buffer could not be created or warmed (database unreachable).
+    """
+
+class ChatBacklog(ChatUnavailable):
+    """
+    The channel's oldest buffered message is not persisted yet, so there is
+    no slot to write to (the database has been unreachable for a while).
+    """
+
+class ChatBusy(Exception):
+    """
+    CHAT_LONGPOLL_MAX_PARKED long-polls are already waiting in this worker.
+    """
+
+
+
+# -----------------------------------------------------------------------------
+# Ring Buffer
+# -----------------------------------------------------------------------------
+
+def _encode(text: str, limit: int) -> bytes:
+    return text.encode('utf-8')[:limit].decode('utf-8', 'ignore').encode('utf-8')
+
+class ChatRing:
+    """
+    Fixed-size, memory-mapped message ring shared across processes. Writers
+    hold an exclusive flock, readers a shared one; a thread lock serialises
+    threads of one process, which share the flock. The flock is only ever
+    held for memory copies, never across a database call.
+    """
+
+    def __init__(self, path: str = RING_PATH, lock_path: str = RING_LOCK_PATH):
+        self.path = path
+        self.lock_path = lock_path
+        self._thread_lock = threading.RLock()
+        self._pid = None
+        self._lock_file = None
+        self._mm = None
+        self._channels_offset = HEADER.size
+        self._slots_offset = HEADER.size + CHAT_MAX_CHANNELS * CHANNEL.size
+        self._size = self._slots_offset + CHAT_MAX_CHANNELS * CHAT_BUFFER_MESSAGES * SLOT_SIZE
+
+    # --- mapping ---
+
+    def _valid(self, mm: mmap.mmap) -> bool:
+        magic, slots, channels, slot_size, _, _ = HEADER.unpack_from(mm, 0)
+        return (magic, slots, channels, slot_size) == (MAGIC, CHAT_BUFFER_MESSAGES, CHAT_MAX_CHANNELS, SLOT_SIZE)
+
+    def _map(self, last_id: Optional[int]) -> bool:
+        """
+        Map the file in this process. If it is missing or was written with a
+        different geometry, create it when last_id (the highest stored
+        message id) is given, else return False. Called with the flock held
+        exclusively.
+        """
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size == self._size:
+                mm = mmap.mmap(fd, self._size)
+                if self._valid(mm):
+                    self._mm = mm
+                    return True
+                mm.close()
+
+            if last_id is None:
+                return False
+
+            # new buffer: continue the id sequence after the stored messages
+            os.ftruncate(fd, 0)
+            os.ftruncate(fd, self._size)
+            mm = mmap.mmap(fd, self._size)
+            HEADER.pack_into(mm, 0, MAGIC, CHAT_BUFFER_MESSAGES, CHAT_MAX_CHANNELS, SLOT_SIZE, last_id + 1, last_id)
+            self._mm = mm
+            return True
+        finally:
+            os.close(fd)
+
+    def _flock(self, operation: int) -> None:
+        """
+        flock is a plain syscall that gevent cannot make cooperative: in the
+        push service a blocking wait would stall every stream, so there it
+        polls with LOCK_NB and yields between tries.
+        """
+
+        if not PUSH_WORKER:
+            fcntl.flock(self._lock_file, operation)
+            return
+        while True:
+            try:
+                fcntl.flock(self._lock_file, operation | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                time.sleep(RING_LOCK_RETRY_SECONDS)
+
+    def _attach(self) -> None:
+        """
+        Map the buffer in this process. Creating it needs the highest stored
+        id, which is read with the flock released: no database call ever
+        runs while the ring is locked.
+        """
+
+        self._flock(fcntl.LOCK_EX)
+        try:
+            if self._map(None):
+                return
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+        try:
+            last_id = db.chat.fetch_chat_last_message_id()
+        except (Error, ValueError) as e:
+            raise ChatUnavailable(f"cannot seed chat ids: {e}")
+
+        # another process may have created it meanwhile; then theirs is used
+        self._flock(fcntl.LOCK_EX)
+        try:
+            self._map(last_id)
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[mmap.mmap]:
+        with self._thread_lock:
+            if self._pid != os.getpid():
+                # first use in this process (gunicorn forks after import)
+                os.makedirs(CHAT_DIR, exist_ok=True)
+                self._lock_file = open(self.lock_path, 'a')
+                self._mm = None
+                self._pid = os.getpid()
+
+            if self._mm is None:
+                self._attach()
+
+            self._flock(fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield self._mm
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    # --- layout helpers (flock held) ---
+
+    def _header(self, mm) -> Tuple[int, int]:
+        """(next id, persisted id)"""
+        return HEADER.unpack_from(mm, 0)[4:6]
+
+    def _set_header(self, mm, next_id: int, persisted_id: int) -> None:
+        magic, slots, channels, slot_size, _, _ = HEADER.unpack_from(mm, 0)
+        HEADER.pack_into(mm, 0, magic, slots, channels, slot_size, next_id, persisted_id)
+
+    def _channel(self, mm, index: int) -> Tuple[int, int, int]:
+        """(channel id, flags, messages written)"""
+        return CHANNEL.unpack_from(mm, self._channels_offset + index * CHANNEL.size)
+
+    def _set_channel(self, mm, index: int, channel_id: int, flags: int, written: int) -> None:
+        CHANNEL.pack_into(mm, self._channels_offset + index * CHANNEL.size, channel_id, flags, written)
+
+    def _find(self, mm, channel_id: int) -> Optional[int]:
+        for index in range(CHAT_MAX_CHANNELS):
+            if self._channel(mm, index)[0] == channel_id:
+                return index
+        return None
+
+    def _write_slot(self, mm, index: int, position: int, message: Dict[str, Any]) -> None:
+        offset = self._slots_offset + (index * CHAT_BUFFER_MESSAGES + position % CHAT_BUFFER_MESSAGES) * SLOT_SIZE
+        username = _encode(message['username'], USERNAME_BYTES)
+        body = _encode(message['body'], BODY_BYTES)
+        SLOT_HEAD.pack_into(mm, offset, message['id'], message['created_ts'], message['u_id'], len(username), len(body))
+        offset += SLOT_HEAD.size
+        mm[offset:offset + len(username)] = username
+        offset += USERNAME_BYTES
+        mm[offset:offset + len(body)] = body
+
+    def _read_slot(self, mm, index: int, position: int, channel_id: int) -> Dict[str, Any]:
+        offset = self._slots_offset + (index * CHAT_BUFFER_MESSAGES + position % CHAT_BUFFER_MESSAGES) * SLOT_SIZE
+        message_id, created_ts, u_id, username_len, body_len = SLOT_HEAD.unpack_from(mm, offset)
+        offset += SLOT_HEAD.size
+        username = mm[offset:offset + username_len].decode('utf-8')
+        offset += USERNAME_BYTES
+        return {
+            'id': message_id,
+            'channel_id': channel_id,
+            'u_id': u_id,
+            'username': username,
+            'body': mm[offset:offset + body_len].decode('utf-8'),
+            'created_ts': created_ts
+        }
+
+    def _newest_first(self, mm, index: int) -> Iterator[Dict[str, Any]]:
+        channel_id, _, written = self._channel(mm, index)
+        for position in range(written - 1, max(written - CHAT_BUFFER_MESSAGES, 0) - 1, -1):
+            yield self._read_slot(mm, index, position, channel_id)
+
+    def _known(self, channel_id: int) -> bool:
+        with self._locked(exclusive=False) as mm:
+            return self._find(mm, channel_id) is not None
+
+    def _ensure_channel(self, channel_id: int) -> None:
+        """
+        Assign a channel its slots on first use, warmed with its stored
+        history. The history is read before the flock is taken; if another
+        process assigned the channel meanwhile, its copy wins. Nothing can
+        be posted to a channel before it has slots, so the stored history
+        is complete.
+        """
+
+        if self._known(channel_id):
+            return
+
+        try:
+            stored = db.chat.fetch_chat_messages(channel_id, None, CHAT_BUFFER_MESSAGES)
+        except (Error, ValueError) as e:
+            raise ChatUnavailable(f"cannot load chat history: {e}")
+
+        with self._locked(exclusive=True) as mm:
+            if self._find(mm, channel_id) is not None:
+                return
+            index = self._find(mm, 0)
+            if index is None:
+                raise ChatUnavailable('no free chat channel slots (raise CHAT_MAX_CHANNELS)')
+
+            for position, message in enumerate(reversed(stored)):
+                self._write_slot(mm, index, position, {**message, 'created_ts': float(message['created_ts'])})
+            flags = FLAG_COMPLETE if len(stored) < CHAT_BUFFER_MESSAGES else 0
+            self._set_channel(mm, index, channel_id, flags, len(stored))
+
+    # --- public ---
+
+    def append(self, channel_id: int, u_id: int, username: str, body: str) -> Tuple[Dict[str, Any], int]:
+        """
+        Store a new message. Returns it with its id, and how many messages
+        are waiting to be persisted.
+
+        :raises ChatBacklog: If the slot to be reused holds a message that
+                             is not persisted yet.
+        """
+
+        self._ensure_channel(channel_id)
+        with self._locked(exclusive=True) as mm:
+            index = self._find(mm, channel_id)
+            _, flags, written = self._channel(mm, index)
+            next_id, persisted_id = self._header(mm)
+
+            if written >= CHAT_BUFFER_MESSAGES and self._read_slot(mm, index, written, channel_id)['id'] > persisted_id:
+                raise ChatBacklog(f"{CHAT_BUFFER_MESSAGES} messages in channel {channel_id} are waiting to be persisted")
+
+            message = {
+                'id': next_id,
+                'channel_id': channel_id,
+                'u_id': u_id,
+                'username': username,
+                'body': body[:CHAT_MESSAGE_MAX_LENGTH],
+                'created_ts': round(time.time(), 3)
+            }
+            self._write_slot(mm, index, written, message)
+            self._set_channel(mm, index, channel_id, flags, written + 1)
+            self._set_header(mm, next_id + 1, persisted_id)
+
+        return message, next_id - persisted_id
+
+    def latest(self, channel_id: int, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Up to limit newest messages, oldest first, and whether older
+        messages may exist outside the buffer.
+        """
+
+        return self.before(channel_id, None, limit)
+
+    def before(self, channel_id: int, before_id: Optional[int], limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Up to limit messages with id below before_id, oldest first, and
+        whether older messages may exist outside the buffer.
+        """
+
+        self._ensure_channel(channel_id)
+
+        messages = []
+        with self._locked(exclusive=False) as mm:
+            index = self._find(mm, channel_id)
+            _, flags, written = self._channel(mm, index)
+            for message in self._newest_first(mm, index):
+                if before_id is not None and message['id'] >= before_id:
+                    continue
+                if len(messages) == limit:
+                    break
+                messages.append(message)
+
+        complete = flags & FLAG_COMPLETE and written <= CHAT_BUFFER_MESSAGES
+        return messages[::-1], len(messages) < limit and not complete
+
+    def since(self, channel_id: int, since_id: int) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Messages with id above since_id, oldest first, and whether some in
+        between have already left the buffer (the client should reload).
+        Cheap when nothing is new: one slot is read.
+        """
+
+        messages = []
+        reached = False
+        with self._locked(exclusive=False) as mm:
+            index = self._find(mm, channel_id)
+            if index is None:
+                return [], False
+            _, flags, written = self._channel(mm, index)
+            for message in self._newest_first(mm, index):
+                if message['id'] <= since_id:
+                    reached = True
+                    break
+                messages.append(message)
+
+        evicted = written > CHAT_BUFFER_MESSAGES or not flags & FLAG_COMPLETE
+        return messages[::-1], bool(messages) and not reached and evicted
+
+    def last_id(self) -> int:
+        """
+        Id of the newest message in any channel (0 if none).
+        """
+
+        with self._locked(exclusive=False) as mm:
+            return self._header(mm)[0] - 1
+
+    def pending(self) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Messages not yet persisted (oldest first) and the id they run up to.
+        """
+
+        with self._locked(exclusive=False) as mm:
+            next_id, persisted_id = self._header(mm)
+            messages = []
+            for index in range(CHAT_MAX_CHANNELS):
+                if self._channel(mm, index)[0] == 0:
+                    continue
+                for message in self._newest_first(mm, index):
+                    if message['id'] <= persisted_id:
+                        break
+                    messages.append(message)
+
+        return sorted(messages, key=lambda m: m['id']), next_id - 1
+
+    def mark_persisted(self, upto_id: int) -> None:
+        with self._locked(exclusive=True) as mm:
+            next_id, persisted_id = self._header(mm)
+            if upto_id > persisted_id:
+                self._set_header(mm, next_id, upto_id)
+
+
+
+# -----------------------------------------------------------------------------
+# Persistence
+# -----------------------------------------------------------------------------
+
+ring = ChatRing()
+
+def flush(wait: bool = False) -> int:
+    """
+    Write every unpersisted message to ChatMessages in one call. Only one
+    process flushes at a time; others return at once, or with wait, queue
+    behind it. Returns the number of messages written.
+    """
+
+    os.makedirs(CHAT_DIR, exist_ok=True)
+    with open(FLUSH_LOCK_PATH, 'a') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return 0
+
+        messages, upto_id = ring.pending()
+        if not messages:
+            ring.mark_persisted(upto_id)
+            return 0
+
+        try:
+            db.chat.save_chat_messages([
+                {key: m[key] for key in ('id', 'channel_id', 'u_id', 'body', 'created_ts')}
+                for m in messages
+            ])
+        except (Error, ValueError) as e:
+            print(f"Chat flush error ({len(messages)} messages kept for retry): {e}")
+            return 0
+
+        ring.mark_persisted(upto_id)
+        return len(messages)
+
+# -----------------------------------------------------------------------------
+
+class Flusher:
+    """
+    A flusher thread per worker; whichever gets the flush lock writes the
+    batch, so the interval holds with any number of workers.
+    """
+
+    def __init__(self):
+        self._pid = None
+
+    def ensure_running(self) -> None:
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+
+        def run():
+            while True:
+                time.sleep(CHAT_FLUSH_SECONDS)
+                try:
+                    flush()
+                except (OSError, ChatUnavailable) as e:
+                    print(f"Chat flusher error: {e}")
+
+        threading.Thread(target=run, name='chat-flusher', daemon=True).start()
+
+flusher = Flusher()
+
+@atexit.register
+def _flush_at_exit() -> None:
+    if ring._pid == os.getpid() and not PUSH_WORKER:
+        try:
+            flush()
+        except (OSError, ChatUnavailable):
+            pass
+
+
+
+# -----------------------------------------------------------------------------
+# Channels
+# -----------------------------------------------------------------------------
+
+_channels: Dict[str, Any] = {'loaded': 0.0, 'rows': []}
+
+def channels() -> List[Dict[str, Any]]:
+    """
+    Live channels, cached per worker for CHAT_CHANNELS_TTL_SECONDS.
+    """
+
+    if time.time() - _channels['loaded'] > CHAT_CHANNELS_TTL_SECONDS or not _channels['rows']:
+        rows = db.chat.fetch_chat_channels()
+        if rows:
+            _channels.update(loaded=time.time(), rows=rows[:CHAT_MAX_CHANNELS])
+    return _channels['rows']
+
+def channel_by_name(name: Optional[str]) -> Optional[Dict[str, Any]]:
+    rows = channels()
+    for channel in rows:
+        if channel['name'] == name:
+            return channel
+    return rows[0] if rows and not name else None
+
+
+
+# -----------------------------------------------------------------------------
+# Messages
+# -----------------------------------------------------------------------------
+
+# woken by post() in this worker; other workers' posts are seen on the tick
+_new_message = threading.Condition()
+_parked = threading.BoundedSemaphore(CHAT_LONGPOLL_MAX_PARKED)
+
+def post(channel_id: int, u_id: int, username: str, body: str) -> Dict[str, Any]:
+    """
+    Add a message to a channel; flushes inline once a batch is waiting.
+
+    :raises ChatBacklog: If the channel's buffer is full of unpersisted
+                         messages and a flush cannot make room.
+    """
+
+    try:
+        message, waiting = ring.append(channel_id, u_id, username, body)
+    except ChatBacklog:
+        flush(wait=True)
+        message, waiting = ring.append(channel_id, u_id, username, body)
+    with _new_message:
+        _new_message.notify_all()
+    if waiting >= CHAT_FLUSH_BATCH:
+        flush()
+    return message
+
+# -----------------------------------------------------------------------------
+
+def history(channel_id: int, before_id: Optional[int] = None, limit: int = CHAT_PAGE_MESSAGES) -> List[Dict[str, Any]]:
+    """
+    A page of messages oldest first: the newest ones, or those older than
+    before_id. Served from the buffer; the database is only read for pages
+    reaching past it.
+    """
+
+    messages, may_have_older = ring.before(channel_id, before_id, limit)
+    if not may_have_older:
+        return messages
+
+    # everything that has left the buffer was persisted before it left
+    oldest = messages[0]['id'] if messages else before_id
+    try:
+        stored = db.chat.fetch_chat_messages(channel_id, oldest, limit - len(messages))
+    except (Error, ValueError):
+        return messages
+    return [{**m, 'created_ts': float(m['created_ts'])} for m in reversed(stored)] + messages
+
+# -----------------------------------------------------------------------------
+
+def wait_since(channel_id: int, since_id: int, timeout: float) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Messages after since_id as ring.since(), waiting up to timeout seconds
+    for the first one. Returns at once when something is already there.
+    While waiting only the ring's newest slot is read, once per tick.
+
+    :raises ChatBusy: If the poll would have to wait and this worker already
+                      has CHAT_LONGPOLL_MAX_PARKED polls waiting.
+    """
+
+    messages, gap = ring.since(channel_id, since_id)
+    if messages or gap or timeout <= 0:
+        return messages, gap
+
+    if not _parked.acquire(blocking=False):
+        raise ChatBusy()
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return [], False
+            with _new_message:
+                _new_message.wait(min(remaining, CHAT_LONGPOLL_TICK_SECONDS))
+            messages, gap = ring.since(channel_id, since_id)
+            if messages or gap:
+                return messages, gap
+    finally:
+        _parked.release()
+
+
+
+# -----------------------------------------------------------------------------
+# Flask Integration
+# -----------------------------------------------------------------------------
+
+def init_app(app: Flask) -> None:
+    """
+    Start the flusher in each web worker. Not in the push service: nothing
+    is posted there, and a database call would stall its gevent hub.
+    """
+
+    if PUSH_WORKER:
+        return
+
+    @app.before_request
+    def chat_flusher():
+        flusher.ensure_running()
@@ -0,0 +1,237 @@
+# commands.py - Flask CLI maintenance commands
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Maintenance commands run with `flask --app app <command>`, typically from
+cron via `docker compose exec web ...`.
+"""
+
+import signal
+import time
+
+import click
+from mysql.connector import Error
+
+import db.media
+import db.tickets
+import jobs
+import media
+import mediainfo
+import thumbs
+from config import (
+    ARCHIVE_DELETED_AFTER_DAYS,
+    ARCHIVE_CLOSED_AFTER_DAYS,
+    ARCHIVE_BATCH_SIZE,
+    JOBS_POLL_SECONDS,
+    MEDIA_UPLOAD_EXPIRE_HOURS
+)
+
+
+
+# -----------------------------------------------------------------------------
+# Ticket Archive
+# -----------------------------------------------------------------------------
+
+@click.command('archive-tickets')
+@click.option('--deleted-days', type=int, default=ARCHIVE_DELETED_AFTER_DAYS, show_default=True,
+              help='Archive rows soft deleted more than this many days ago.')
+@click.option('--closed-days', type=int, default=ARCHIVE_CLOSED_AFTER_DAYS, show_default=True,
+              help='Archive tickets in a final status not updated for this many days.')
+@click.option('--keep-closed', is_flag=True, help='Only archive deleted rows, never closed tickets.')
+@click.option('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, show_default=True,
+              help='Tickets moved per transaction.')
+@click.option('--max-batches', type=int, default=0, help='Stop after this many batches (0 = until done).')
+@click.option('--pause', type=float, default=0.1, show_default=True,
+              help='Seconds to sleep between batches so live traffic gets the locks.')
+def archive_tickets(deleted_days, closed_days, keep_closed, batch_size, max_batches, pause):
+    """
+    Move old deleted and closed tickets into the archive tables.
+    """
+
+    totals = {'tickets': 0, 'status_messages': 0, 'tag_links': 0, 'assignments': 0}
+    batches = 0
+    started = time.perf_counter()
+
+    while not max_batches or batches < max_batches:
+        try:
+            moved = db.tickets.admin_archive_tickets(deleted_days, None if keep_closed else closed_days, batch_size)
+        except Error as e:
+            raise click.ClickException(f"Archive batch failed (earlier batches are kept): {e}")
+
+        batches += 1
+        for key in totals:
+            totals[key] += int(moved.get(key) or 0)
+        if not any(moved.get(key) for key in totals):
+            break
+        click.echo(f"batch {batches}: " + ', '.join(f"{key} {moved.get(key) or 0}" for key in totals))
+        time.sleep(pause)
+
+    click.echo(
+        f"Archived {totals['tickets']} tickets, {totals['status_messages']} status messages, "
+        f"{totals['tag_links']} tag links and {totals['assignments']} assignments "
+        f"in {time.perf_counter() - started:.1f}s."
+    )
+
+
+
+# -----------------------------------------------------------------------------
+# Media
+# -----------------------------------------------------------------------------
+
+@click.command('purge-uploads')
+@click.option('--hours', type=int, default=MEDIA_UPLOAD_EXPIRE_HOURS, show_default=True,
+              help='Expire open uploads untouched for this many hours.')
+@click.option('--batch-size', type=int, default=100, show_default=True,
+              help='Uploads expired per transaction.')
+def purge_uploads(hours, batch_size):
+    """
+    Expire abandoned uploads and delete their partial files.
+    """
+
+    purged = 0
+    while True:
+        try:
+            upload_ids = db.media.admin_expire_media_uploads(hours, batch_size)
+        except Error as e:
+            raise click.ClickException(f"Expiring uploads failed (earlier batches are kept): {e}")
+
+        for upload_id in upload_ids:
+            media.discard_upload(upload_id)
+        purged += len(upload_ids)
+        if len(upload_ids) < batch_size:
+            break
+
+    click.echo(f"Purged {purged} abandoned upload(s).")
+
+
+
+@click.command('thumbnails')
+@click.option('--batch-size', type=int, default=100, show_default=True,
+              help='Media rows read per query.')
+def thumbnails(batch_size):
+    """
+    Render missing media thumbnails across the process pool.
+    """
+
+    rendered = failed = 0
+    after_id = 0
+    started = time.perf_counter()
+
+    while True:
+        try:
+            items = db.media.admin_fetch_media_sources(after_id, batch_size)
+        except Error as e:
+            raise click.ClickException(f"Fetching media failed: {e}")
+        if not items:
+            break
+        after_id = items[-1]['id']
+
+        try:
+            for item, sizes, error in thumbs.generate_many(items):
+                if error:
+                    failed += 1
+                    click.echo(f"media {item['id']}: {error}")
+                elif sizes:
+                    rendered += 1
+        except Exception as e:
+            # a decoder crashed or hung the pool; the rest of the batch is
+            # picked up by the next run
+            failed += 1
+            click.echo(f"batch after media {items[0]['id'] - 1}: {type(e).__name__} {e}")
+
+    click.echo(f"Rendered thumbnails for {rendered} file(s), {failed} failed, in {time.perf_counter() - started:.1f}s.")
+
+
+
+@click.command('media-metadata')
+@click.option('--all', 'refresh_all', is_flag=True, help='Read every file again, not only those never read.')
+@click.option('--batch-size', type=int, default=100, show_default=True,
+              help='Media rows read per query.')
+def media_metadata(refresh_all, batch_size):
+    """
+    Read missing catalogue metadata (duration, dimensions, pages) from media files.
+    """
+
+    updated = failed = 0
+    after_id = 0
+    seen = set()
+    started = time.perf_counter()
+
+    while True:
+        try:
+            items = db.media.admin_fetch_media_sources(after_id, batch_size)
+        except Error as e:
+            raise click.ClickException(f"Fetching media failed: {e}")
+        if not items:
+            break
+        after_id = items[-1]['id']
+
+        for item in items:
+            if item['sha256'] in seen or (item['metadata_at'] and not refresh_all):
+                continue
+            seen.add(item['sha256'])
+            try:
+                path = thumbs.source_path(item['storage_path'])
+                info = mediainfo.probe(path, item['media_type'], item['content_type'])
+                db.media.admin_set_media_metadata(item['sha256'], info['duration_ms'], info['width'], info['height'], info['page_count'])
+                updated += 1
+            except (FileNotFoundError, Error) as e:
+                failed += 1
+                click.echo(f"media {item['id']}: {type(e).__name__} {e}")
+
+    click.echo(f"Read metadata of {updated} file(s), {failed} failed, in {time.perf_counter() - started:.1f}s.")
+
+
+
+# -----------------------------------------------------------------------------
+# Job Worker
+# -----------------------------------------------------------------------------
+
+@click.command('worker')
+@click.option('--once', is_flag=True, help='Run every job that is due now, then exit.')
+@click.option('--poll', type=float, default=JOBS_POLL_SECONDS, show_default=True,
+              help='Seconds to wait between polls while the queue is empty.')
+def worker(once, poll):
+    """
+    Run queued background jobs until stopped (SIGTERM finishes the current job).
+    """
+
+    job_worker = jobs.Worker()
+
+    if once:
+        ran = 0
+        while job_worker.run_once():
+            ran += 1
+        click.echo(f"Ran {ran} job(s).")
+        return
+
+    signal.signal(signal.SIGTERM, job_worker.stop)
+    signal.signal(signal.SIGINT, job_worker.stop)
+    click.echo(f"Worker {job_worker.name} polling every {poll}s ({', '.join(sorted(jobs.HANDLERS))})")
+    job_worker.run(poll)
+
+
+
+# -----------------------------------------------------------------------------
+# Registration
+# -----------------------------------------------------------------------------
+
+def init_app(app) -> None:
+    app.cli.add_command(archive_tickets)
+    app.cli.add_command(purge_uploads)
+    app.cli.add_command(thumbnails)
+    app.cli.add_command(media_metadata)
+    app.cli.add_command(worker)
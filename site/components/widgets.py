@@ -41,16 +41,20 @@ class WidgetStatCard(Component):
 
 class WidgetTable(Component):
     """
-    A data table with named columns and row actions.
+    A data table with named columns and row actions. With select_form set,
+    each row gets an 'ids' checkbox (value row['id']) submitted with the form
+    of that id, for bulk actions.
     """
     def __init__(self,
     columns: List[Dict[str, str]],
     rows: List[Dict[str, Any]],
+    select_form: str = '',
     **kwargs
     ):
         super().__init__(**kwargs)
         self.columns = columns # [{'key': 'id', 'label': 'ID'}, ...]
         self.rows = rows       # [{'id': 1, 'username': 'admin', 'actions': [...]}, ...]
+        self.select_form = select_form
 
     @property
     def template(self) -> str:
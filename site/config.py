@@ -14,6 +14,10 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import json
+import os
+import tempfile
+
 
 
 # -----------------------------------------------------------------------------
@@ -53,6 +57,280 @@ USER_DETAIL_LIMITS = {
     'email-max-length': 100
 }
 
+# Full-text search input. Words shorter than InnoDB's innodb_ft_min_token_size
+# (3) are never indexed, so requiring them would match nothing; the term cap
+# bounds the work of one MATCH.
+SEARCH_LIMITS = {
+    'min-term-length': 3,
+    'max-terms': 8,
+    'max-query-length': 100
+}
+
+
+
+# -----------------------------------------------------------------------------
+# Instrumentation
+# -----------------------------------------------------------------------------
+
+# Upper bounds (milliseconds) for latency histograms. Anything slower than the
+# last bound is counted in an overflow bucket.
+METRICS_LATENCY_BUCKETS_MS = [1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+# Upper bounds for the rows-returned histogram of stored procedure calls.
+METRICS_ROW_COUNT_BUCKETS = [0, 1, 5, 10, 25, 50, 100, 250, 1000]
+
+# Stored procedure calls taking longer than this (connect + execute + fetch,
+# milliseconds) are written to the slow-call log.
+DB_SLOW_CALL_MS = 250
+
+# How often (seconds) each worker writes its metrics snapshot for the other
+# workers to read.
+METRICS_FLUSH_SECONDS = 5
+
+# Networks allowed to reach internal-only routes such as /admin/metrics
+# (the WireGuard VPN, the docker bridge and loopback).
+INTERNAL_NETWORKS = [
+    '127.0.0.0/8',
+    '10.0.0.0/8',
+    '172.16.0.0/12',
+    '192.168.0.0/16',
+    '::1/128'
+]
+
+# Bearer token the Prometheus scraper must send to /admin/metrics, on top of
+# coming from INTERNAL_NETWORKS. Empty = network check only.
+METRICS_TOKEN = os.environ.get('SCAV_METRICS_TOKEN', '')
+
+# Background sampler behind the admin health view: seconds between /proc
+# samples, and how many samples are kept (120 x 5s = the last 10 minutes).
+HEALTH_SAMPLE_SECONDS = 5
+HEALTH_HISTORY_LENGTH = 120
+
+# A user counts as active if they made a request within this many seconds.
+HEALTH_ACTIVE_WINDOW_SECONDS = 15 * 60
+
+
+
+
+# -----------------------------------------------------------------------------
+# Dev Sandbox
+# -----------------------------------------------------------------------------
+
+# Sandbox applications, as JSON in SCAV_DEV_APPS: a list of
+#   {"name": ..., "description": ..., "url": <link for users>,
+#    "health": <probe: http(s)://host:port/path, or tcp://host:port>}
+DEV_APPS = json.loads(os.environ.get('SCAV_DEV_APPS', '[]'))
+
+# Every app is probed concurrently this often; each probe starts after a
+# random delay of up to DEV_HEALTH_JITTER_SECONDS so the apps are not hit in
+# lockstep, and counts as offline after DEV_HEALTH_TIMEOUT_SECONDS.
+DEV_HEALTH_INTERVAL_SECONDS = 15
+DEV_HEALTH_JITTER_SECONDS = 2
+DEV_HEALTH_TIMEOUT_SECONDS = 3
+
+# A status older than this (the checker is not running) is shown as unknown.
+DEV_HEALTH_STALE_SECONDS = 60
+
+
+
+# -----------------------------------------------------------------------------
+# Chat
+# -----------------------------------------------------------------------------
+
+# Most recent messages kept per channel in the shared ring buffer; history
+# pages and polls inside this window never touch the database.
+CHAT_BUFFER_MESSAGES = 200
+
+# Channel slots in the ring buffer (channels beyond this are not served).
+CHAT_MAX_CHANNELS = 16
+
+# Longest message accepted (characters).
+CHAT_MESSAGE_MAX_LENGTH = 500
+
+# Messages shown per chat page.
+CHAT_PAGE_MESSAGES = 50
+
+# New messages are written to ChatMessages in one batch every this many
+# seconds, or as soon as this many are waiting (whichever comes first). The
+# batch size must stay well below CHAT_BUFFER_MESSAGES so no message leaves
+# the buffer before it is stored.
+CHAT_FLUSH_SECONDS = 2
+CHAT_FLUSH_BATCH = 50
+
+# Seconds each worker caches the channel list.
+CHAT_CHANNELS_TTL_SECONDS = 60
+
+# Long-polls (/social/chat/poll) wait up to this long for a new message...
+CHAT_LONGPOLL_TIMEOUT_SECONDS = 25
+
+# ...checking the ring this often for messages posted by other workers
+# (posts in the same worker wake the poll at once).
+CHAT_LONGPOLL_TICK_SECONDS = 0.25
+
+# Long-polls parked at once per worker; more are refused with 503 and
+# Retry-After. Keep it below the web workers' --threads so page requests
+# always find a free thread.
+CHAT_LONGPOLL_MAX_PARKED = 4
+
+
+
+# -----------------------------------------------------------------------------
+# Feed
+# -----------------------------------------------------------------------------
+
+# Posts per feed page, comments per post page.
+FEED_PAGE_POSTS = 20
+FEED_PAGE_COMMENTS = 50
+
+# Longest post and comment accepted (characters, matching the columns).
+FEED_POST_MAX_LENGTH = 1000
+FEED_COMMENT_MAX_LENGTH = 500
+
+
+# -----------------------------------------------------------------------------
+# Board
+# -----------------------------------------------------------------------------
+
+# Seconds each worker caches the category index (counts come from the
+# denormalised category rows, so a stale index is only slightly behind).
+BOARD_INDEX_TTL_SECONDS = 30
+
+# Threads per category page, posts per thread page.
+BOARD_THREADS_PER_PAGE = 25
+BOARD_POSTS_PER_PAGE = 25
+
+# Longest thread title and post accepted (characters).
+BOARD_TITLE_MAX_LENGTH = 150
+BOARD_POST_MAX_LENGTH = 10000
+
+
+# -----------------------------------------------------------------------------
+# Media
+# -----------------------------------------------------------------------------
+
+# Where media files live; Media.storage_path is relative to this.
+MEDIA_ROOT = os.environ.get('SCAV_MEDIA_ROOT', '/srv/media')
+
+# Internal nginx location aliasing MEDIA_ROOT (e.g. '/_media/'). When set,
+# downloads are authorised here and handed to nginx with X-Accel-Redirect;
+# when empty (standalone) they are sent by the worker itself.
+MEDIA_ACCEL_PREFIX = os.environ.get('SCAV_MEDIA_ACCEL_PREFIX', '')
+
+# Browser cache lifetime of a delivered file (private: behind login).
+MEDIA_CACHE_SECONDS = 3600
+
+# Items per media browse page.
+MEDIA_PAGE_ITEMS = 50
+
+# Uploads arrive in chunks of at most this many bytes (the last may be
+# shorter), each streamed to a partial file under MEDIA_ROOT.
+MEDIA_UPLOAD_CHUNK_BYTES = 8 * 1024 * 1024
+
+# Largest request that opens an upload session (form fields, no file).
+MEDIA_UPLOAD_FORM_MAX_BYTES = 16 * 1024
+
+# Largest file one upload may declare.
+MEDIA_UPLOAD_MAX_BYTES = 8 * 1024 ** 3
+
+# Open upload sessions per user; more are refused until one finishes.
+MEDIA_UPLOADS_PER_USER = 3
+
+# An open upload not touched for this many hours no longer counts towards
+# the limit and is removed by `flask purge-uploads`.
+MEDIA_UPLOAD_EXPIRE_HOURS = 24
+
+# In-progress SHA-256 states kept per worker (least recently used dropped;
+# a dropped state is rebuilt from the partial file).
+MEDIA_UPLOAD_HASHERS = 64
+
+# Thumbnail sizes (longest edge in px), rendered as WebP by the job worker
+# and stored by content hash, so each file is decoded once per size set.
+MEDIA_THUMB_SIZES = (160, 320, 640)
+MEDIA_THUMB_QUALITY = 80
+
+# Decoder processes per worker; a file that crashes or hangs a decoder
+# (or ffmpeg/pdftoppm) is given up on after the timeout.
+MEDIA_THUMB_PROCESSES = 2
+MEDIA_THUMB_TIMEOUT_SECONDS = 120
+
+# Thumbnail URLs contain the content hash, so browsers may keep them.
+MEDIA_THUMB_CACHE_SECONDS = 365 * 24 * 3600
+
+# Longest ffprobe/pdfinfo may take reading a file's metadata.
+MEDIA_PROBE_TIMEOUT_SECONDS = 30
+
+
+# -----------------------------------------------------------------------------
+# Push (Server-Sent Events)
+# -----------------------------------------------------------------------------
+
+# Set in the `push` service (gevent worker). Sync workers answer the stream
+# endpoint with 204 so a browser that reaches them stops reconnecting.
+PUSH_WORKER = os.environ.get('SCAV_PUSH_WORKER') == '1'
+
+# How often the publisher checks the chat ring and the announcement stamp.
+PUSH_TICK_SECONDS = 0.25
+
+# Idle streams get a comment line this often so proxies keep them open.
+PUSH_HEARTBEAT_SECONDS = 15
+
+# Events queued for one slow connection before it is dropped (the browser
+# reconnects and resumes from the ring with Last-Event-ID).
+PUSH_QUEUE_EVENTS = 32
+
+# Open streams per push process.
+PUSH_MAX_CONNECTIONS = 2000
+
+
+
+# -----------------------------------------------------------------------------
+# Retention
+# -----------------------------------------------------------------------------
+
+# `flask archive-tickets` moves tickets (and ticket child rows) soft deleted
+# more than this many days ago into the archive tables...
+ARCHIVE_DELETED_AFTER_DAYS = 30
+
+# ...and tickets in a final status not updated for this many days.
+ARCHIVE_CLOSED_AFTER_DAYS = 365
+
+# Tickets moved per transaction; each batch holds its locks briefly.
+ARCHIVE_BATCH_SIZE = 500
+
+
+
+# -----------------------------------------------------------------------------
+# Background Jobs
+# -----------------------------------------------------------------------------
+
+# Seconds an idle `flask worker` waits before polling the Jobs table again.
+JOBS_POLL_SECONDS = 2
+
+# A running job whose worker has not finished it within this many seconds is
+# assumed lost (worker killed) and is queued again.
+JOBS_LEASE_SECONDS = 300
+
+# Attempts before a failing job is marked dead and left for an admin.
+JOBS_MAX_ATTEMPTS = 5
+
+# Retry delay after the n-th failed attempt: base * 2^(n-1), capped, with
+# jitter so jobs that failed together do not retry together.
+JOBS_BACKOFF_BASE_SECONDS = 10
+JOBS_BACKOFF_MAX_SECONDS = 3600
+
+
+
+# -----------------------------------------------------------------------------
+# Runtime State
+# -----------------------------------------------------------------------------
+
+# Scratch directory shared by every worker process in the container (metrics
+# snapshots, samplers). tmpfs-backed when /dev/shm is available.
+RUNTIME_DIR = os.environ.get(
+    'SCAV_RUNTIME_DIR',
+    '/dev/shm/scavengers' if os.path.isdir('/dev/shm') else os.path.join(tempfile.gettempdir(), 'scavengers')
+)
+
 
 
 # -----------------------------------------------------------------------------
@@ -75,5 +353,8 @@ CSS_DEFAULT_SHEETS = [
 
 JS_DEFAULT_SCRIPTS = [
     '/static/js/flashmodal.js',
-    '/static/js/togglepanel.js'
+    '/static/js/togglepanel.js',
+    '/static/js/tableselect.js',
+    '/static/js/pushstream.js',
+    '/static/js/mediaupload.js'
 ]
\ No newline at end of file
@@ -17,11 +17,14 @@
 from .core import (
     get_db,
     close_dbs,
-    execute_procedure
+    execute_procedure,
+    execute_procedure_sets,
+    execute_batch
 )
 
 from .announcements import (
     fetch_announcements,
+    search_announcements,
     admin_create_announcement,
     admin_update_announcement,
     admin_delete_announcement,
@@ -43,19 +46,27 @@ from .users import (
     admin_ban_user,
     admin_reinstate_user,
     admin_delete_user,
-    admin_reset_password
+    admin_reset_password,
+    admin_bulk_update_users
 )
 
 from .tickets import (
     create_ticket,
     fetch_tickets,
     fetch_tickets_by_user,
+    fetch_tickets_by_tags,
+    search_tickets,
     fetch_ticket,
     fetch_ticket_status_messages,
+    fetch_ticket_status_messages_batch,
     fetch_ticket_tags,
     fetch_ticket_tag_list,
     admin_fetch_tickets,
+    admin_search_tickets,
+    admin_fetch_archived_tickets,
+    admin_archive_tickets,
     admin_fetch_ticket,
+    admin_fetch_ticket_bundle,
     admin_update_ticket,
     admin_create_ticket_status_message,
     admin_update_ticket_status_message,
@@ -66,5 +77,55 @@ from .tickets import (
     admin_assign_ticket,
     admin_unassign_ticket,
     admin_fetch_ticket_assignments,
-    admin_delete_ticket
+    admin_delete_ticket,
+    admin_bulk_update_tickets,
+    admin_bulk_delete_tickets
+)
+
+from .jobs import (
+    admin_enqueue_job,
+    admin_enqueue_jobs,
+    admin_fetch_jobs,
+    admin_retry_job,
+    worker_claim_job,
+    worker_complete_job,
+    worker_fail_job
+)
+
+from .chat import (
+    fetch_chat_channels,
+    fetch_chat_messages,
+    fetch_chat_last_message_id,
+    save_chat_messages
+)
+
+from .feed import (
+    fetch_feed_timeline,
+    fetch_feed_post,
+    fetch_feed_comments,
+    create_feed_post,
+    create_feed_comment,
+    delete_feed_post
+)
+
+from .board import (
+    fetch_board_index,
+    fetch_board_threads,
+    fetch_board_thread,
+    fetch_board_posts,
+    create_board_thread,
+    create_board_post
+)
+
+from .media import (
+    fetch_media_browse,
+    fetch_media_file,
+    begin_media_upload,
+    fetch_media_upload,
+    record_media_upload_progress,
+    finalize_media_upload,
+    abort_media_upload,
+    admin_expire_media_uploads,
+    admin_set_media_metadata,
+    admin_fetch_media_sources
 )
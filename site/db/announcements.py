@@ -41,6 +41,28 @@ def fetch_announcements() -> List[Dict[str, Any]]:
             conn.close()
     return posts
 
+# -----------------------------------------------------------------------------
+
+def search_announcements(query: str, limit: int, offset: int) -> List[Dict[str, Any]]:
+    """
+    Full-text search over visible announcements, most relevant first.
+    Calls: sp_search_announcements
+
+    :param query: BOOLEAN MODE expression from utils.build_search_query
+    """
+
+    conn = None
+    posts = []
+    try:
+        conn = get_connection('social')
+        posts = execute_procedure(conn, 'sp_search_announcements', [query, limit, offset])
+    except Error:
+        pass
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+    return posts
+
 
 
 # -----------------------------------------------------------------------------
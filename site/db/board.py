@@ -0,0 +1,152 @@
+# db.board.py - Database routines for the Bulletin Board (User)
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import List, Dict, Any, Optional, Tuple
+
+from mysql.connector import Error
+from .core import get_connection, execute_procedure
+
+# -----------------------------------------------------------------------------
+# User
+# -----------------------------------------------------------------------------
+
+def fetch_board_index() -> List[Dict[str, Any]]:
+    """
+    Fetch all live categories with their denormalised counts.
+    Calls: sp_board_fetch_index
+    """
+
+    conn = None
+    categories = []
+    try:
+        conn = get_connection('user')
+        categories = execute_procedure(conn, 'sp_board_fetch_index')
+    except Error:
+        pass
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+    return categories
+
+# -----------------------------------------------------------------------------
+
+def fetch_board_threads(category_id: int, limit: int, offset: int) -> List[Dict[str, Any]]:
+    """
+    Fetch a page of a category's threads, most recently active first.
+    Calls: sp_board_fetch_threads
+    """
+
+    conn = None
+    threads = []
+    try:
+        conn = get_connection('user')
+        threads = execute_procedure(conn, 'sp_board_fetch_threads', [category_id, limit, offset])
+    except Error:
+        pass
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+    return threads
+
+# -----------------------------------------------------------------------------
+
+def fetch_board_thread(thread_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Fetch one live thread with its category name.
+    Calls: sp_board_fetch_thread
+    """
+
+    conn = None
+    thread = None
+    try:
+        conn = get_connection('user')
+        rows = execute_procedure(conn, 'sp_board_fetch_thread', [thread_id])
+        if rows:
+            thread = rows[0]
+    except Error:
+        pass
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+    return thread
+
+# -----------------------------------------------------------------------------
+
+def fetch_board_posts(
+    thread_id: int,
+    after_id: Optional[int],
+    before_id: Optional[int],
+    limit: int
+) -> List[Dict[str, Any]]:
+    """
+    Fetch a keyset page of a thread's posts, oldest first.
+    Calls: sp_board_fetch_posts
+
+    :param after_id: Page starting after this post id.
+    :param before_id: Page ending before this post id (takes precedence).
+    """
+
+    conn = None
+    posts = []
+    try:
+        conn = get_connection('user')
+        posts = execute_procedure(conn, 'sp_board_fetch_posts', [thread_id, after_id, before_id, limit])
+    except Error:
+        pass
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+
+    # the procedure returns before_id pages newest first
+    return posts[::-1] if before_id is not None else posts
+
+# -----------------------------------------------------------------------------
+
+def create_board_thread(category_id: int, u_id: int, title: str, body: str) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Open a thread with its first post.
+    Calls: sp_board_create_thread
+
+    :return: (thread id, post id), both None if the category is gone.
+    """
+
+    conn = None
+    try:
+        conn = get_connection('user')
+        rows = execute_procedure(conn, 'sp_board_create_thread', [category_id, u_id, title, body], commit=True)
+        return (rows[0]['thread_id'], rows[0]['post_id']) if rows else (None, None)
+    except Error: raise
+    finally:
+        if conn and conn.is_connected(): conn.close()
+
+# -----------------------------------------------------------------------------
+
+def create_board_post(thread_id: int, u_id: int, body: str) -> Optional[int]:
+    """
+    Reply to a thread, updating thread and category statistics.
+    Calls: sp_board_create_post
+
+    :return: The new post's id, or None if the thread is gone.
+    """
+
+    conn = None
+    try:
+        conn = get_connection('user')
+        rows = execute_procedure(conn, 'sp_board_create_post', [thread_id, u_id, body], commit=True)
+        return rows[0]['post_id'] if rows else None
+    except Error: raise
+    finally:
+        if conn and conn.is_connected(): conn.close()
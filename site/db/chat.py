@@ -0,0 +1,107 @@
+# db.chat.py - Database routines for Chat (Social)
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+from typing import List, Dict, Any, Optional
+
+from mysql.connector import Error
+from .core import get_connection, execute_procedure
+
+# -----------------------------------------------------------------------------
+# Social
+# -----------------------------------------------------------------------------
+
+def fetch_chat_channels() -> List[Dict[str, Any]]:
+    """
+    Fetch all live chat channels.
+    Calls: sp_chat_fetch_channels
+    """
+
+    conn = None
+    channels = []
+    try:
+        conn = get_connection('social')
+        channels = execute_procedure(conn, 'sp_chat_fetch_channels')
+    except Error:
+        pass
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+    return channels
+
+# -----------------------------------------------------------------------------
+
+def fetch_chat_messages(channel_id: int, before_id: Optional[int], limit: int) -> List[Dict[str, Any]]:
+    """
+    Fetch persisted messages of a channel older than before_id, newest first.
+    Calls: sp_chat_fetch_messages
+
+    :raises Error: The ring buffer warms from this and must not mistake an
+                   outage for an empty channel, so errors propagate.
+    """
+
+    conn = None
+    try:
+        conn = get_connection('social')
+        return execute_procedure(conn, 'sp_chat_fetch_messages', [channel_id, before_id, limit])
+    except Error:
+        raise
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+
+# -----------------------------------------------------------------------------
+
+def fetch_chat_last_message_id() -> int:
+    """
+    Highest persisted message id (0 when there are none).
+    Calls: sp_chat_fetch_last_message_id
+
+    :raises Error: The id sequence must never be guessed, so errors propagate.
+    """
+
+    conn = None
+    try:
+        conn = get_connection('social')
+        rows = execute_procedure(conn, 'sp_chat_fetch_last_message_id')
+        return int(rows[0]['last_id']) if rows else 0
+    except Error:
+        raise
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+
+# -----------------------------------------------------------------------------
+
+def save_chat_messages(messages: List[Dict[str, Any]]) -> int:
+    """
+    Persist a batch of ring buffer messages in one call.
+    Calls: sp_chat_save_messages
+
+    :param messages: [{'id', 'channel_id', 'u_id', 'body', 'created_ts'}, ...]
+    :return: Number of rows inserted (repeats are ignored).
+    """
+
+    conn = None
+    try:
+        conn = get_connection('social')
+        rows = execute_procedure(conn, 'sp_chat_save_messages', [json.dumps(messages)], commit=True)
+        return int(rows[0]['saved']) if rows else 0
+    except Error:
+        raise
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
@@ -15,16 +15,31 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import os
-from typing import List, Dict, Any, Optional, Union
+import json
+import logging
+import time
+import weakref
+from typing import List, Dict, Any, Optional, Union, Sequence, Tuple
 
 import mysql.connector
 from mysql.connector import Error
 from flask import g
 
+from config import DB_SLOW_CALL_MS, PUSH_WORKER
+from metrics import (
+    DB_PROCEDURE_DURATION,
+    DB_PROCEDURE_ROWS,
+    DB_SLOW_CALLS,
+    DB_CONNECTIONS_OPENED,
+    DB_CONNECTIONS
+)
+from profiling import record_db
+
 # -----------------------------------------------------------------------------
 # Configuration
 # -----------------------------------------------------------------------------
-DB_HOST = "db"
+DB_HOST = os.environ.get("DB_HOST", "db")
+DB_PORT = int(os.environ.get("DB_PORT", 3306))
 DB_NAME = "scavengers"
 
 ROLE_MAP = {
@@ -34,6 +49,8 @@ ROLE_MAP = {
     'user': 'DB_PASS_USER'
 }
 
+slow_log = logging.getLogger('scavengers.db.slow')
+
 # -----------------------------------------------------------------------------
 # Connection Logic
 # -----------------------------------------------------------------------------
@@ -55,12 +72,26 @@ def get_connection(role: str) -> mysql.connector.connection.MySQLConnection:
         raise ValueError(f"Password for '{role}' not found in env vars.")
 
     try:
+        started = time.perf_counter()
         conn = mysql.connector.connect(
             host = DB_HOST,
+            port = DB_PORT,
             database = DB_NAME,
             user = f"scav_{role}",
-            password = password
+            password = password,
+            # the C extension's socket I/O is invisible to gevent and would
+            # stall every stream in the push service; the pure driver uses
+            # the patched socket module
+            use_pure = PUSH_WORKER
         )
+        connect_ms = (time.perf_counter() - started) * 1000
+
+        # Remembered on the connection so the first procedure call made on it
+        # can report the handshake as part of its own timings.
+        conn.scav_role = role
+        conn.scav_connect_ms = connect_ms
+        DB_CONNECTIONS_OPENED.labels(role).inc()
+        _track_open(conn, role)
         return conn
     except Error as e:
         print(f"Error connecting to database as {role}: {e}")
@@ -68,6 +99,26 @@ def get_connection(role: str) -> mysql.connector.connection.MySQLConnection:
 
 # -----------------------------------------------------------------------------
 
+def _track_open(conn: mysql.connector.connection.MySQLConnection, role: str) -> None:
+    """
+    Count conn in the open connections gauge until it is closed. The count
+    is released once: by close(), by close_dbs for a connection that was
+    already dropped, or, for one that was never closed, when it is collected.
+    """
+
+    DB_CONNECTIONS.labels(role, 'open').inc()
+    release = weakref.finalize(conn, DB_CONNECTIONS.labels(role, 'open').dec)
+    close = conn.close
+
+    def tracked_close() -> None:
+        release()
+        close()
+
+    conn.scav_release = release
+    conn.close = tracked_close
+
+# -----------------------------------------------------------------------------
+
 def get_db(role: str = 'UNDEFINED_ROLE') -> mysql.connector.connection.MySQLConnection:
     """
     Retrieve a database connection for the current Flask application context.
@@ -99,7 +150,74 @@ def close_dbs(e: Optional[BaseException] = None) -> None:
     if db_conns:
         for role, conn in db_conns.items():
             if conn.is_connected():
-                conn.close()    
+                conn.close()
+            else:
+                conn.scav_release()
+
+
+
+# -----------------------------------------------------------------------------
+# Instrumentation
+# -----------------------------------------------------------------------------
+
+def _arg_shape(args: Sequence[Any]) -> List[str]:
+    """
+    Describe procedure arguments by type (and length for strings) so the slow
+    log never contains values such as password hashes or user content.
+    """
+
+    shape = []
+    for arg in args:
+        if arg is None:
+            shape.append('null')
+        elif isinstance(arg, (str, bytes)):
+            shape.append(f"{type(arg).__name__}({len(arg)})")
+        else:
+            shape.append(type(arg).__name__)
+    return shape
+
+# -----------------------------------------------------------------------------
+
+def _record_call(
+    conn: mysql.connector.connection.MySQLConnection,
+    proc_name: str,
+    args: Sequence[Any],
+    execute_ms: float,
+    fetch_ms: float,
+    rows: int
+) -> None:
+    """
+    Record timings for one procedure call and write a slow-call log entry if
+    it exceeded DB_SLOW_CALL_MS.
+    """
+
+    # Connect time is only charged to the first call made on a connection.
+    connect_ms = getattr(conn, 'scav_connect_ms', 0.0)
+    conn.scav_connect_ms = 0.0
+    total_ms = connect_ms + execute_ms + fetch_ms
+
+    if connect_ms:
+        DB_PROCEDURE_DURATION.labels(proc_name, 'connect').observe(connect_ms)
+    DB_PROCEDURE_DURATION.labels(proc_name, 'execute').observe(execute_ms)
+    DB_PROCEDURE_DURATION.labels(proc_name, 'fetch').observe(fetch_ms)
+    DB_PROCEDURE_DURATION.labels(proc_name, 'total').observe(total_ms)
+    DB_PROCEDURE_ROWS.labels(proc_name).observe(rows)
+
+    record_db(getattr(conn, 'scav_role', 'unknown'), total_ms)
+
+    if total_ms >= DB_SLOW_CALL_MS:
+        DB_SLOW_CALLS.labels(proc_name).inc()
+        slow_log.warning(json.dumps({
+            'event': 'slow_procedure',
+            'proc': proc_name,
+            'role': getattr(conn, 'scav_role', 'unknown'),
+            'args': _arg_shape(args),
+            'connect_ms': round(connect_ms, 2),
+            'execute_ms': round(execute_ms, 2),
+            'fetch_ms': round(fetch_ms, 2),
+            'total_ms': round(total_ms, 2),
+            'rows': rows
+        }))
 
 
 
@@ -122,24 +240,90 @@ def execute_procedure(
     :param commit: If True, commits the transaction after execution.
     :return: A list of dictionaries representing the rows returned by the procedure.
     """
-    
-    cursor = conn.cursor(dictionary=True)
+
     results = []
+    for rows in execute_procedure_sets(conn, proc_name, args, commit=commit):
+        results.extend(rows)
+
+    return results
+
+# -----------------------------------------------------------------------------
+
+def execute_procedure_sets(
+    conn: mysql.connector.connection.MySQLConnection,
+    proc_name: str,
+    args: tuple = (),
+    commit: bool = False
+) -> List[List[Dict[str, Any]]]:
+    """
+    Execute a stored procedure and return every result set it produces,
+    kept separate. Used by composite procedures (e.g. sp_admin_fetch_ticket_bundle)
+    that SELECT several related row sets in a single call.
+
+    :param conn: The active database connection.
+    :param proc_name: The name of the stored procedure to call.
+    :param args: A tuple of arguments to pass to the procedure.
+    :param commit: If True, commits the transaction after execution.
+    :return: One list of row dictionaries per result set, in SELECT order.
+    """
+
+    cursor = conn.cursor(dictionary=True)
+    in_use = DB_CONNECTIONS.labels(getattr(conn, 'scav_role', 'unknown'), 'in_use')
+    in_use.inc()
+    result_sets = []
     try:
+        started = time.perf_counter()
         cursor.callproc(proc_name, args)
-        
+
         if commit:
             conn.commit()
-        
+        executed = time.perf_counter()
+
         for result in cursor.stored_results():
-            rows = result.fetchall()
-            if rows:
-                results.extend(rows)
+            result_sets.append(result.fetchall())
+        fetched = time.perf_counter()
+
+        _record_call(
+            conn,
+            proc_name,
+            args,
+            execute_ms = (executed - started) * 1000,
+            fetch_ms = (fetched - executed) * 1000,
+            rows = sum(len(rows) for rows in result_sets)
+        )
 
     except Error as e:
         print(f"Procedure execution error ({proc_name}): {e}")
         raise
     finally:
         cursor.close()
+        in_use.dec()
+
+    return result_sets
+
+# -----------------------------------------------------------------------------
+
+def execute_batch(
+    conn: mysql.connector.connection.MySQLConnection,
+    calls: Sequence[Tuple[str, tuple]],
+    commit: bool = False
+) -> List[List[List[Dict[str, Any]]]]:
+    """
+    Execute several stored procedures back to back on one connection.
+    Saves a connect/auth handshake per call compared to opening a connection
+    for each procedure. Prefer a set-based or composite procedure where one
+    exists: each call here is still its own round-trip.
+
+    :param conn: The active database connection.
+    :param calls: Sequence of (proc_name, args) pairs, executed in order.
+    :param commit: If True, commits once after every call has succeeded.
+    :return: The result sets of each call (as execute_procedure_sets), in
+        the same order as calls.
+    """
+
+    results = [execute_procedure_sets(conn, proc_name, args) for proc_name, args in calls]
+
+    if commit:
+        conn.commit()
 
     return results
\ No newline at end of file
@@ -0,0 +1,141 @@
+# db.feed.py - Database routines for the Feed (Social)
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import List, Dict, Any, Optional
+
+from mysql.connector import Error
+from .core import get_connection, execute_procedure
+
+# -----------------------------------------------------------------------------
+# Social
+# -----------------------------------------------------------------------------
+
+def fetch_feed_timeline(before_id: Optional[int], limit: int) -> List[Dict[str, Any]]:
+    """
+    Fetch a page of the feed, newest first.
+    Calls: sp_feed_fetch_timeline
+    """
+
+    conn = None
+    posts = []
+    try:
+        conn = get_connection('social')
+        posts = execute_procedure(conn, 'sp_feed_fetch_timeline', [before_id, limit])
+    except Error:
+        pass
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+    return posts
+
+# -----------------------------------------------------------------------------
+
+def fetch_feed_post(post_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Fetch one live post.
+    Calls: sp_feed_fetch_post
+    """
+
+    conn = None
+    post = None
+    try:
+        conn = get_connection('social')
+        rows = execute_procedure(conn, 'sp_feed_fetch_post', [post_id])
+        if rows:
+            post = rows[0]
+    except Error:
+        pass
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+    return post
+
+# -----------------------------------------------------------------------------
+
+def fetch_feed_comments(post_id: int, after_id: Optional[int], limit: int) -> List[Dict[str, Any]]:
+    """
+    Fetch a page of a post's comments, oldest first.
+    Calls: sp_feed_fetch_comments
+    """
+
+    conn = None
+    comments = []
+    try:
+        conn = get_connection('social')
+        comments = execute_procedure(conn, 'sp_feed_fetch_comments', [post_id, after_id, limit])
+    except Error:
+        pass
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+    return comments
+
+# -----------------------------------------------------------------------------
+
+def create_feed_post(u_id: int, link: Optional[str], body: str) -> int:
+    """
+    Create a post.
+    Calls: sp_feed_create_post
+
+    :return: The new post's id.
+    """
+
+    conn = None
+    try:
+        conn = get_connection('social')
+        rows = execute_procedure(conn, 'sp_feed_create_post', [u_id, link, body], commit=True)
+        return rows[0]['id']
+    except Error: raise
+    finally:
+        if conn and conn.is_connected(): conn.close()
+
+# -----------------------------------------------------------------------------
+
+def create_feed_comment(post_id: int, u_id: int, body: str) -> Optional[int]:
+    """
+    Comment on a post, keeping its comment_count in step.
+    Calls: sp_feed_create_comment
+
+    :return: The new comment's id, or None if the post is gone.
+    """
+
+    conn = None
+    try:
+        conn = get_connection('social')
+        rows = execute_procedure(conn, 'sp_feed_create_comment', [post_id, u_id, body], commit=True)
+        return rows[0]['id'] if rows else None
+    except Error: raise
+    finally:
+        if conn and conn.is_connected(): conn.close()
+
+# -----------------------------------------------------------------------------
+
+def delete_feed_post(post_id: int, u_id: int, is_admin: bool) -> bool:
+    """
+    Soft delete a post (author or admin).
+    Calls: sp_feed_delete_post
+
+    :return: True if a post was deleted.
+    """
+
+    conn = None
+    try:
+        conn = get_connection('social')
+        rows = execute_procedure(conn, 'sp_feed_delete_post', [post_id, u_id, is_admin], commit=True)
+        return bool(rows and rows[0]['deleted'])
+    except Error: raise
+    finally:
+        if conn and conn.is_connected(): conn.close()
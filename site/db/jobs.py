@@ -0,0 +1,173 @@
+# db.jobs.py - Database routines for the Jobs queue (Admin + Worker)
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import List, Dict, Any, Optional, Tuple
+
+from mysql.connector import Error
+from .core import get_connection, execute_procedure, execute_procedure_sets
+
+
+
+# -----------------------------------------------------------------------------
+# Admin
+# -----------------------------------------------------------------------------
+
+def admin_enqueue_job(
+    kind: str,
+    payload: str,
+    idempotency_key: Optional[str],
+    max_attempts: int,
+    delay_seconds: int
+) -> Dict[str, Any]:
+    """
+    Queue a job, or return the existing job with the same idempotency key.
+    Calls: sp_admin_enqueue_job
+
+    :param payload: JSON text handed to the job handler.
+    :return: {'id', 'status', 'created'}
+    """
+
+    conn = None
+    try:
+        conn = get_connection('admin')
+        rows = execute_procedure(conn, 'sp_admin_enqueue_job', [kind, payload, idempotency_key, max_attempts, delay_seconds], commit=True)
+        return rows[0] if rows else {}
+    except Error:
+        raise
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+
+# -----------------------------------------------------------------------------
+
+def admin_enqueue_jobs(kind: str, ids: str, id_field: str, max_attempts: int) -> Dict[str, int]:
+    """
+    Queue one job per id in a single call, skipping ids that already have one.
+    Calls: sp_admin_enqueue_jobs
+
+    :param ids: JSON array of ids.
+    :param id_field: Payload key the id is stored under.
+    :return: {'queued', 'existing'}
+    """
+
+    conn = None
+    try:
+        conn = get_connection('admin')
+        rows = execute_procedure(conn, 'sp_admin_enqueue_jobs', [kind, ids, id_field, max_attempts], commit=True)
+        return rows[0] if rows else {'queued': 0, 'existing': 0}
+    except Error:
+        raise
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+
+# -----------------------------------------------------------------------------
+
+def admin_fetch_jobs(status: Optional[str], limit: int, offset: int) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Fetch a page of jobs, newest first, and the number of jobs per status.
+    Calls: sp_admin_fetch_jobs
+    """
+
+    conn = None
+    jobs, counts = [], {}
+    try:
+        conn = get_connection('admin')
+        jobs, count_rows = execute_procedure_sets(conn, 'sp_admin_fetch_jobs', [status, limit, offset])
+        counts = {row['status']: row['jobs'] for row in count_rows}
+    except (Error, ValueError):
+        pass
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+    return jobs, counts
+
+# -----------------------------------------------------------------------------
+
+def admin_retry_job(id: int) -> None:
+    """
+    Requeue a dead job with a fresh set of attempts.
+    Calls: sp_admin_retry_job
+    """
+
+    conn = None
+    try:
+        conn = get_connection('admin')
+        execute_procedure(conn, 'sp_admin_retry_job', [id], commit=True)
+    except Error:
+        raise
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+
+
+
+# -----------------------------------------------------------------------------
+# Worker
+# -----------------------------------------------------------------------------
+
+def worker_claim_job(worker: str, lease_seconds: int) -> Optional[Dict[str, Any]]:
+    """
+    Claim the next due job, or None when nothing is due.
+    Calls: sp_worker_claim_job
+    """
+
+    conn = None
+    try:
+        conn = get_connection('admin')
+        rows = execute_procedure(conn, 'sp_worker_claim_job', [worker, lease_seconds], commit=True)
+        return rows[0] if rows else None
+    except Error:
+        raise
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+
+# -----------------------------------------------------------------------------
+
+def worker_complete_job(id: int, worker: str, result: Optional[str]) -> None:
+    """
+    Mark a claimed job as succeeded.
+    Calls: sp_worker_complete_job
+    """
+
+    conn = None
+    try:
+        conn = get_connection('admin')
+        execute_procedure(conn, 'sp_worker_complete_job', [id, worker, result], commit=True)
+    except Error:
+        raise
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+
+# -----------------------------------------------------------------------------
+
+def worker_fail_job(id: int, worker: str, error: str, retry_seconds: Optional[int]) -> None:
+    """
+    Record a failed attempt; retry_seconds None marks the job dead at once.
+    Calls: sp_worker_fail_job
+    """
+
+    conn = None
+    try:
+        conn = get_connection('admin')
+        execute_procedure(conn, 'sp_worker_fail_job', [id, worker, error, retry_seconds], commit=True)
+    except Error:
+        raise
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
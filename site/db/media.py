@@ -0,0 +1,250 @@
+# db.media.py - Database routines for the Media Library (User)
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import List, Dict, Any, Optional, Tuple
+
+from mysql.connector import Error
+from .core import get_connection, execute_procedure
+
+# -----------------------------------------------------------------------------
+# User
+# -----------------------------------------------------------------------------
+
+def fetch_media_browse(
+    media_type: Optional[str],
+    sort: str,
+    after_value: Optional[str],
+    after_id: Optional[int],
+    limit: int
+) -> List[Dict[str, Any]]:
+    """
+    Fetch a keyset page of live media, optionally of one type.
+    Calls: sp_media_browse
+
+    :param sort: 'newest', 'title', 'largest' or 'longest' (typed browse only).
+    :param after_value: Sort value of the previous page's last row (None: first page).
+    :param after_id: Id of the previous page's last row.
+    """
+
+    conn = None
+    items = []
+    try:
+        conn = get_connection('user')
+        items = execute_procedure(conn, 'sp_media_browse', [media_type, sort, after_value, after_id, limit])
+    except Error:
+        pass
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+    return items
+
+# -----------------------------------------------------------------------------
+
+def fetch_media_file(media_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Fetch the storage details of one live media item.
+    Calls: sp_media_fetch_file
+    """
+
+    conn = None
+    item = None
+    try:
+        conn = get_connection('user')
+        rows = execute_procedure(conn, 'sp_media_fetch_file', [media_id])
+        if rows:
+            item = rows[0]
+    except Error:
+        pass
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+    return item
+
+# -----------------------------------------------------------------------------
+# Uploads
+# -----------------------------------------------------------------------------
+
+def begin_media_upload(
+    u_id: int,
+    media_type: str,
+    title: str,
+    file_name: str,
+    content_type: str,
+    size_bytes: int,
+    max_open: int,
+    expire_hours: int
+) -> Optional[int]:
+    """
+    Open an upload session.
+    Calls: sp_media_upload_begin
+
+    :return: The upload id, or None if the user has max_open open uploads.
+    """
+
+    conn = None
+    try:
+        conn = get_connection('user')
+        rows = execute_procedure(
+            conn,
+            'sp_media_upload_begin',
+            [u_id, media_type, title, file_name, content_type, size_bytes, max_open, expire_hours],
+            commit=True
+        )
+        return rows[0]['upload_id'] if rows else None
+    except Error: raise
+    finally:
+        if conn and conn.is_connected(): conn.close()
+
+# -----------------------------------------------------------------------------
+
+def fetch_media_upload(upload_id: int, u_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Fetch one of the user's open upload sessions.
+    Calls: sp_media_upload_fetch
+    """
+
+    conn = None
+    upload = None
+    try:
+        conn = get_connection('user')
+        rows = execute_procedure(conn, 'sp_media_upload_fetch', [upload_id, u_id])
+        if rows:
+            upload = rows[0]
+    except Error:
+        pass
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+    return upload
+
+# -----------------------------------------------------------------------------
+
+def record_media_upload_progress(upload_id: int, received_bytes: int) -> None:
+    """
+    Record the bytes received so far (keeps the session from expiring).
+    Calls: sp_media_upload_progress
+    """
+
+    conn = None
+    try:
+        conn = get_connection('user')
+        execute_procedure(conn, 'sp_media_upload_progress', [upload_id, received_bytes], commit=True)
+    except Error: raise
+    finally:
+        if conn and conn.is_connected(): conn.close()
+
+# -----------------------------------------------------------------------------
+
+def finalize_media_upload(upload_id: int, u_id: int, sha256: str, storage_path: str) -> Tuple[Optional[int], bool]:
+    """
+    Close a complete upload, creating its media item unless the content is
+    already in the library.
+    Calls: sp_media_upload_finalize
+
+    :return: (media id, is duplicate); media id is None if the session is gone.
+    """
+
+    conn = None
+    try:
+        conn = get_connection('user')
+        rows = execute_procedure(conn, 'sp_media_upload_finalize', [upload_id, u_id, sha256, storage_path], commit=True)
+        if not rows or rows[0]['media_id'] is None:
+            return None, False
+        return rows[0]['media_id'], bool(rows[0]['is_duplicate'])
+    except Error: raise
+    finally:
+        if conn and conn.is_connected(): conn.close()
+
+# -----------------------------------------------------------------------------
+
+def abort_media_upload(upload_id: int, u_id: int) -> bool:
+    """
+    Cancel one of the user's open uploads.
+    Calls: sp_media_upload_abort
+    """
+
+    conn = None
+    try:
+        conn = get_connection('user')
+        rows = execute_procedure(conn, 'sp_media_upload_abort', [upload_id, u_id], commit=True)
+        return bool(rows and rows[0]['aborted'])
+    except Error: raise
+    finally:
+        if conn and conn.is_connected(): conn.close()
+
+# -----------------------------------------------------------------------------
+# Admin
+# -----------------------------------------------------------------------------
+
+def admin_expire_media_uploads(hours: int, limit: int) -> List[int]:
+    """
+    Mark a batch of abandoned open uploads expired.
+    Calls: sp_admin_media_expire_uploads
+
+    :return: The expired upload ids (their partial files can be deleted).
+    """
+
+    conn = None
+    try:
+        conn = get_connection('admin')
+        rows = execute_procedure(conn, 'sp_admin_media_expire_uploads', [hours, limit], commit=True)
+        return [row['id'] for row in rows]
+    except Error: raise
+    finally:
+        if conn and conn.is_connected(): conn.close()
+
+# -----------------------------------------------------------------------------
+
+def admin_set_media_metadata(
+    sha256: str,
+    duration_ms: Optional[int],
+    width: Optional[int],
+    height: Optional[int],
+    page_count: Optional[int]
+) -> int:
+    """
+    Store metadata read from a file on every item with that content.
+    Calls: sp_admin_media_set_metadata
+
+    :return: Items updated.
+    """
+
+    conn = None
+    try:
+        conn = get_connection('admin')
+        rows = execute_procedure(conn, 'sp_admin_media_set_metadata', [sha256, duration_ms, width, height, page_count], commit=True)
+        return rows[0]['updated'] if rows else 0
+    except Error: raise
+    finally:
+        if conn and conn.is_connected(): conn.close()
+
+# -----------------------------------------------------------------------------
+
+def admin_fetch_media_sources(after_id: int, limit: int) -> List[Dict[str, Any]]:
+    """
+    Fetch a keyset page of live originals (for thumbnail backfill).
+    Calls: sp_admin_media_fetch_sources
+    """
+
+    conn = None
+    items = []
+    try:
+        conn = get_connection('admin')
+        items = execute_procedure(conn, 'sp_admin_media_fetch_sources', [after_id, limit])
+    except Error: raise
+    finally:
+        if conn and conn.is_connected(): conn.close()
+    return items
@@ -14,10 +14,11 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import List, Dict, Any, Optional
+import json
+from typing import List, Dict, Any, Optional, Sequence
 
 from mysql.connector import Error
-from .core import get_connection, execute_procedure
+from .core import get_connection, execute_procedure, execute_procedure_sets
 
 
 # -----------------------------------------------------------------------------
@@ -95,6 +96,65 @@ def fetch_tickets_by_user(
 
 # -----------------------------------------------------------------------------
 
+def fetch_tickets_by_tags(
+    u_id: Optional[int],
+    ticket_type: Optional[str],
+    status: Optional[str],
+    tag_ids: Sequence[int],
+    match_all: bool,
+    limit: int,
+    offset: int
+) -> List[Dict[str, Any]]:
+    """
+    Fetch tickets carrying all (match_all) or any of several tags, optionally
+    limited to one user's tickets.
+    Calls: sp_fetch_tickets_by_tags
+
+    :param tag_ids: Tag IDs (not names), as listed by fetch_ticket_tag_list
+    """
+
+    conn = None
+    tickets = []
+    try:
+        conn = get_connection('user')
+        tickets = execute_procedure(conn, 'sp_fetch_tickets_by_tags', [u_id, ticket_type, status, json.dumps(list(tag_ids)), match_all, limit, offset])
+    except Error: pass
+    finally:
+        if conn and conn.is_connected(): conn.close()
+    return tickets
+
+# -----------------------------------------------------------------------------
+
+def search_tickets(
+    query: str,
+    u_id: Optional[int],
+    ticket_type: Optional[str],
+    status: Optional[str],
+    tag_ids: Sequence[int],
+    match_all: bool,
+    limit: int,
+    offset: int
+) -> List[Dict[str, Any]]:
+    """
+    Full-text search over active tickets, most relevant first, with the same
+    filters as fetch_tickets_by_tags (an empty tag_ids means no tag filter).
+    Calls: sp_search_tickets
+
+    :param query: BOOLEAN MODE expression from utils.build_search_query
+    """
+
+    conn = None
+    tickets = []
+    try:
+        conn = get_connection('user')
+        tickets = execute_procedure(conn, 'sp_search_tickets', [query, u_id, ticket_type, status, json.dumps(list(tag_ids)), match_all, limit, offset])
+    except Error: pass
+    finally:
+        if conn and conn.is_connected(): conn.close()
+    return tickets
+
+# -----------------------------------------------------------------------------
+
 def fetch_ticket(id: int) -> Optional[Dict[str, Any]]:
     """
     Fetch a single ticket by ID.
@@ -133,7 +193,30 @@ def fetch_ticket_status_messages(ticket_id: int) -> List[Dict[str, Any]]:
 
 # -----------------------------------------------------------------------------
 
+def fetch_ticket_status_messages_batch(ticket_ids: Sequence[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Fetch status history for several tickets in one call.
+    Calls: sp_fetch_ticket_status_messages_batch
+
+    :return: {ticket_id: messages newest first}, with an empty list for
+        tickets without history.
+    """
+
+    conn = None
+    messages = {ticket_id: [] for ticket_id in ticket_ids}
+    if not ticket_ids:
+        return messages
+    try:
+        conn = get_connection('user')
+        rows = execute_procedure(conn, 'sp_fetch_ticket_status_messages_batch', [json.dumps(list(ticket_ids))])
+        for row in rows:
+            messages.setdefault(row['ticket_id'], []).append(row)
+    except Error: pass
+    finally:
+        if conn and conn.is_connected(): conn.close()
+    return messages
 
+# -----------------------------------------------------------------------------
 
 def fetch_ticket_tag_list() -> List[Dict[str, Any]]:
     """
@@ -200,6 +283,32 @@ def admin_fetch_tickets(
 
 # -----------------------------------------------------------------------------
 
+def admin_search_tickets(
+    query: str,
+    ticket_type: Optional[str],
+    status: Optional[str],
+    limit: int,
+    offset: int
+) -> List[Dict[str, Any]]:
+    """
+    Full-text search for admin ticket lists, most relevant first.
+    Calls: sp_admin_search_tickets
+
+    :param query: BOOLEAN MODE expression from utils.build_search_query
+    """
+
+    conn = None
+    tickets = []
+    try:
+        conn = get_connection('admin')
+        tickets = execute_procedure(conn, 'sp_admin_search_tickets', [query, ticket_type, status, limit, offset])
+    except Error: pass
+    finally:
+        if conn and conn.is_connected(): conn.close()
+    return tickets
+
+# -----------------------------------------------------------------------------
+
 def admin_fetch_ticket(id: int) -> Optional[Dict[str, Any]]:
     """
     Fetch one ticket by ID for admin views.
@@ -220,6 +329,84 @@ def admin_fetch_ticket(id: int) -> Optional[Dict[str, Any]]:
 
 # -----------------------------------------------------------------------------
 
+def admin_fetch_ticket_bundle(id: int) -> Optional[Dict[str, Any]]:
+    """
+    Fetch a ticket with its status history, tags and admin assignments in
+    one round-trip, falling back to the archive tables ('archived' is True
+    when the ticket came from there).
+    Calls: sp_admin_fetch_ticket_bundle, sp_admin_fetch_archived_ticket_bundle
+    """
+
+    conn = None
+    bundle = None
+    try:
+        conn = get_connection('admin')
+        ticket_rows, messages, tags, assignments = execute_procedure_sets(conn, 'sp_admin_fetch_ticket_bundle', [id])
+        archived = False
+        if not ticket_rows:
+            # read through to the archive for tickets moved out of the hot tables
+            ticket_rows, messages, tags, assignments = execute_procedure_sets(conn, 'sp_admin_fetch_archived_ticket_bundle', [id])
+            archived = True
+        if ticket_rows:
+            bundle = {
+                'ticket': ticket_rows[0],
+                'status_messages': messages,
+                'tags': tags,
+                'assignments': assignments,
+                'archived': archived
+            }
+    except (Error, ValueError): pass
+    finally:
+        if conn and conn.is_connected(): conn.close()
+    return bundle
+
+# -----------------------------------------------------------------------------
+
+def admin_fetch_archived_tickets(
+    ticket_type: Optional[str],
+    status: Optional[str],
+    limit: int,
+    offset: int
+) -> List[Dict[str, Any]]:
+    """
+    Fetch archived tickets for admin review, newest first.
+    Calls: sp_admin_fetch_archived_tickets
+    """
+
+    conn = None
+    tickets = []
+    try:
+        conn = get_connection('admin')
+        tickets = execute_procedure(conn, 'sp_admin_fetch_archived_tickets', [ticket_type, status, limit, offset])
+    except Error: pass
+    finally:
+        if conn and conn.is_connected(): conn.close()
+    return tickets
+
+# -----------------------------------------------------------------------------
+
+def admin_archive_tickets(deleted_days: int, closed_days: Optional[int], batch_size: int) -> Dict[str, int]:
+    """
+    Move one batch of old tickets and ticket rows into the archive tables.
+    Calls: sp_admin_archive_tickets
+
+    :param deleted_days: Archive rows soft deleted more than this many days ago.
+    :param closed_days: Archive tickets in a final status idle this long (None = never).
+    :param batch_size: Most tickets (and child rows per table) moved by this call.
+    :return: Rows moved per table; all zero once nothing is left to archive.
+    """
+
+    conn = None
+    try:
+        conn = get_connection('admin')
+        rows = execute_procedure(conn, 'sp_admin_archive_tickets', [deleted_days, closed_days, batch_size], commit=True)
+        return rows[0] if rows else {}
+    except Error: raise
+    finally:
+        if conn and conn.is_connected(): conn.close()
+
+# -----------------------------------------------------------------------------
+
 def admin_update_ticket(
     id: int,
     status: Optional[str],
@@ -410,3 +597,52 @@ def admin_delete_ticket(id: int) -> None:
     except Error: raise
     finally:
         if conn and conn.is_connected(): conn.close()
+
+# -----------------------------------------------------------------------------
+
+def admin_bulk_update_tickets(
+    ids: Sequence[int],
+    ticket_type: str,
+    status: Optional[str],
+    priority: Optional[str],
+    changed_by_u_id: int,
+    status_message: Optional[str]
+) -> List[Dict[str, Any]]:
+    """
+    Set status and/or priority on many tickets of one type in a single
+    transaction, writing a status message for each status change.
+    Calls: sp_admin_update_tickets
+
+    :return: One {'id', 'result'} row per distinct id.
+    """
+
+    conn = None
+    try:
+        conn = get_connection('admin')
+        return execute_procedure(
+            conn,
+            'sp_admin_update_tickets',
+            [json.dumps(list(ids)), ticket_type, status, priority, changed_by_u_id, status_message],
+            commit=True
+        )
+    except Error: raise
+    finally:
+        if conn and conn.is_connected(): conn.close()
+
+# -----------------------------------------------------------------------------
+
+def admin_bulk_delete_tickets(ids: Sequence[int], ticket_type: str) -> List[Dict[str, Any]]:
+    """
+    Soft delete many tickets of one type in a single transaction.
+    Calls: sp_admin_delete_tickets
+
+    :return: One {'id', 'result'} row per distinct id.
+    """
+
+    conn = None
+    try:
+        conn = get_connection('admin')
+        return execute_procedure(conn, 'sp_admin_delete_tickets', [json.dumps(list(ids)), ticket_type], commit=True)
+    except Error: raise
+    finally:
+        if conn and conn.is_connected(): conn.close()
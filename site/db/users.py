@@ -14,11 +14,22 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import List, Dict, Any, Optional
+import json
+from typing import List, Dict, Any, Optional, Sequence
 
 from mysql.connector import Error
 from .core import get_connection, execute_procedure
 
+# Bulk action -> set-based procedure taking a JSON array of user ids.
+BULK_USER_PROCEDURES = {
+    'approve': 'sp_admin_approve_users',
+    'deny': 'sp_admin_deny_users',
+    'suspend': 'sp_admin_suspend_users',
+    'ban': 'sp_admin_ban_users',
+    'reinstate': 'sp_admin_reinstate_users',
+    'delete': 'sp_admin_delete_users'
+}
+
 
 
 # -----------------------------------------------------------------------------
@@ -184,4 +195,32 @@ def admin_reset_password(id: int, password_hash: str) -> None:
         execute_procedure(conn, 'sp_admin_reset_password', [id, password_hash], commit=True)
     except Error: raise
     finally:
-        if conn and conn.is_connected(): conn.close()
\ No newline at end of file
+        if conn and conn.is_connected(): conn.close()
+
+# -----------------------------------------------------------------------------
+
+def admin_bulk_update_users(action: str, ids: Sequence[int], hours: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Apply one action to many users in a single transaction.
+    Calls: sp_admin_{approve,deny,suspend,ban,reinstate,delete}_users
+
+    :param action: A key of BULK_USER_PROCEDURES.
+    :param hours: Suspension length, used by 'suspend' only.
+    :return: One {'id', 'result'} row per distinct id.
+    :raises ValueError: If the action is unknown.
+    """
+
+    if action not in BULK_USER_PROCEDURES:
+        raise ValueError(f"Unknown bulk user action '{action}'")
+
+    args = [json.dumps(list(ids))]
+    if action == 'suspend':
+        args.append(hours)
+
+    conn = None
+    try:
+        conn = get_connection('admin')
+        return execute_procedure(conn, BULK_USER_PROCEDURES[action], args, commit=True)
+    except Error: raise
+    finally:
+        if conn and conn.is_connected(): conn.close()
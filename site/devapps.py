@@ -0,0 +1,248 @@
+# devapps.py - Background health checks for the dev sandbox applications
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+The dev page never probes anything itself. One checker thread per worker
+runs an asyncio loop, but, as with the health sampler, only the worker
+holding the leader lock probes: every app in DEV_APPS at once, each with a
+timeout and a little jitter, once per DEV_HEALTH_INTERVAL_SECONDS. The
+results are written to a status file under RUNTIME_DIR (tmpfs), which page
+views read. A page therefore costs one small file read however many apps
+there are or however slow they are.
+
+Probes need no HTTP client library: http(s) probes send a bare GET and
+read the status line; tcp probes only open a connection.
+"""
+
+import asyncio
+import fcntl
+import json
+import os
+import random
+import ssl
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from flask import Flask
+
+from config import (
+    RUNTIME_DIR,
+    PUSH_WORKER,
+    DEV_APPS,
+    DEV_HEALTH_INTERVAL_SECONDS,
+    DEV_HEALTH_JITTER_SECONDS,
+    DEV_HEALTH_TIMEOUT_SECONDS,
+    DEV_HEALTH_STALE_SECONDS
+)
+
+DEVAPPS_DIR = os.path.join(RUNTIME_DIR, 'devapps')
+STATUS_PATH = os.path.join(DEVAPPS_DIR, 'status.json')
+LEADER_LOCK_PATH = os.path.join(DEVAPPS_DIR, 'checker.lock')
+
+
+
+# -----------------------------------------------------------------------------
+# Probes
+# -----------------------------------------------------------------------------
+
+async def _request(url: str) -> Optional[int]:
+    """
+    Connect to a probe URL; for http(s), GET it and return the status code
+    (None for tcp).
+    """
+
+    parts = urlsplit(url or '')
+    if parts.scheme not in ('http', 'https', 'tcp') or not parts.hostname:
+        raise ValueError(f"unusable health URL {url!r}")
+    secure = parts.scheme == 'https'
+    port = parts.port or (443 if secure else 80)
+
+    reader, writer = await asyncio.open_connection(
+        parts.hostname,
+        port,
+        ssl=ssl.create_default_context() if secure else None
+    )
+    try:
+        if parts.scheme == 'tcp':
+            return None
+
+        path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        writer.write(
+            f"GET {path} HTTP/1.0\r\nHost: {parts.netloc}\r\nUser-Agent: scavengers-health\r\nConnection: close\r\n\r\n".encode()
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        try:
+            return int(status_line.split()[1])
+        except (IndexError, ValueError):
+            raise ConnectionError(f"not an HTTP response: {status_line[:40]!r}")
+    finally:
+        writer.close()
+
+# -----------------------------------------------------------------------------
+
+async def probe(app: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Probe one app after a random delay (up to DEV_HEALTH_JITTER_SECONDS).
+
+    :return: {'status': 'online' | 'error' | 'offline', 'latency_ms', 'code', 'error', 'checked'}
+    """
+
+    await asyncio.sleep(random.uniform(0, DEV_HEALTH_JITTER_SECONDS))
+
+    started = time.perf_counter()
+    code = None
+    error = None
+    try:
+        code = await asyncio.wait_for(_request(app.get('health')), timeout=DEV_HEALTH_TIMEOUT_SECONDS)
+        status = 'online' if code is None or code < 400 else 'error'
+    except asyncio.TimeoutError:
+        status, error = 'offline', f"no answer within {DEV_HEALTH_TIMEOUT_SECONDS}s"
+    except (OSError, ConnectionError, ValueError) as e:
+        status, error = 'offline', str(e) or type(e).__name__
+
+    return {
+        'status': status,
+        'latency_ms': round((time.perf_counter() - started) * 1000, 1),
+        'code': code,
+        'error': error,
+        'checked': time.time()
+    }
+
+async def probe_all(apps: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Probe every app concurrently; the round takes as long as the slowest
+    probe (bounded by jitter + timeout), not the sum of them. A probe that
+    raises marks its app offline instead of discarding the whole round.
+    """
+
+    results = await asyncio.gather(*(probe(app) for app in apps), return_exceptions=True)
+    return {
+        app['name']: result if not isinstance(result, BaseException) else {
+            'status': 'offline',
+            'latency_ms': None,
+            'code': None,
+            'error': f"{type(result).__name__}: {result}",
+            'checked': time.time()
+        }
+        for app, result in zip(apps, results)
+    }
+
+
+
+# -----------------------------------------------------------------------------
+# Checker
+# -----------------------------------------------------------------------------
+
+class Checker:
+    """
+    Background loop that keeps STATUS_PATH current. Started in every worker;
+    only the lock holder probes, and another worker takes over if it dies.
+    """
+
+    def __init__(self):
+        self._lock_file = None
+        self._pid = None
+
+    def _is_leader(self) -> bool:
+        if self._lock_file is not None:
+            return True
+        lock_file = open(LEADER_LOCK_PATH, 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    async def tick(self) -> None:
+        if not self._is_leader():
+            return
+
+        statuses = await probe_all(DEV_APPS)
+        with open(f"{STATUS_PATH}.tmp", 'w') as f:
+            json.dump(statuses, f)
+        os.replace(f"{STATUS_PATH}.tmp", STATUS_PATH)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                # any failure costs one round, never the checker thread
+                print(f"Dev app checker error: {type(e).__name__}: {e}")
+            await asyncio.sleep(DEV_HEALTH_INTERVAL_SECONDS + random.uniform(0, DEV_HEALTH_JITTER_SECONDS))
+
+    def ensure_running(self) -> None:
+        """
+        Start the checker thread for the current process (once per pid, as
+        gunicorn forks workers after import).
+        """
+
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._lock_file = None
+        os.makedirs(DEVAPPS_DIR, exist_ok=True)
+
+        threading.Thread(target=asyncio.run, args=(self.run(),), name='devapps-checker', daemon=True).start()
+
+# -----------------------------------------------------------------------------
+
+checker = Checker()
+
+def read_status() -> List[Dict[str, Any]]:
+    """
+    Every configured app with its last probe result, in DEV_APPS order.
+    Apps not probed within DEV_HEALTH_STALE_SECONDS are 'unknown'.
+    """
+
+    try:
+        with open(STATUS_PATH) as f:
+            statuses = json.load(f)
+    except (OSError, ValueError):
+        statuses = {}
+
+    cutoff = time.time() - DEV_HEALTH_STALE_SECONDS
+    apps = []
+    for app in DEV_APPS:
+        result = statuses.get(app['name'])
+        if not result or result['checked'] < cutoff:
+            result = {'status': 'unknown', 'latency_ms': None, 'code': None, 'error': None, 'checked': None}
+        apps.append({**app, **result})
+    return apps
+
+
+
+# -----------------------------------------------------------------------------
+# Flask Integration
+# -----------------------------------------------------------------------------
+
+def init_app(app: Flask) -> None:
+    """
+    Start the checker in each web worker. Not in the push service: its
+    gevent worker is for holding streams, not for running an event loop.
+    """
+
+    if not DEV_APPS or PUSH_WORKER:
+        return
+
+    @app.before_request
+    def devapps_start():
+        checker.ensure_running()
@@ -25,7 +25,10 @@ def build_page(content: List[Component], title: str) -> Page:
     ]
 
     links_admin = [
-        {'label': 'admin', 'href': url_for('admin.dashboard')}
+        {'label': 'admin', 'href': url_for('admin.dashboard')},
+        {'label': 'system', 'href': url_for('admin.system')},
+        {'label': 'health', 'href': url_for('admin.health')},
+        {'label': 'jobs', 'href': url_for('admin.jobs_list')}
     ]
 
     links_user = [
@@ -0,0 +1,321 @@
+# health.py - Background system sampler for the admin health dashboard
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import fcntl
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from flask import Flask, session
+
+from config import (
+    RUNTIME_DIR,
+    PUSH_WORKER,
+    HEALTH_SAMPLE_SECONDS,
+    HEALTH_HISTORY_LENGTH,
+    HEALTH_ACTIVE_WINDOW_SECONDS
+)
+
+HEALTH_DIR = os.path.join(RUNTIME_DIR, 'health')
+SNAPSHOT_PATH = os.path.join(HEALTH_DIR, 'snapshot.json')
+LEADER_LOCK_PATH = os.path.join(HEALTH_DIR, 'sampler.lock')
+SESSIONS_DIR = os.path.join(HEALTH_DIR, 'sessions')
+
+
+
+# -----------------------------------------------------------------------------
+# /proc Readers
+# -----------------------------------------------------------------------------
+
+def _read_cpu_times() -> Optional[tuple]:
+    """
+    Return (busy, total) jiffies from the aggregate line of /proc/stat.
+    """
+
+    try:
+        with open('/proc/stat') as f:
+            fields = [int(v) for v in f.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+
+    # user nice system idle iowait irq softirq steal ...
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+    total = sum(fields[:8])
+    return total - idle, total
+
+# -----------------------------------------------------------------------------
+
+def _read_meminfo() -> Dict[str, int]:
+    """
+    Return MemTotal / MemAvailable from /proc/meminfo in kB.
+    """
+
+    info = {}
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                key, value = line.split(':', 1)
+                if key in ('MemTotal', 'MemAvailable'):
+                    info[key] = int(value.split()[0])
+    except (OSError, ValueError):
+        pass
+    return info
+
+# -----------------------------------------------------------------------------
+
+def _read_loadavg() -> List[float]:
+    try:
+        with open('/proc/loadavg') as f:
+            return [float(v) for v in f.read().split()[:3]]
+    except (OSError, ValueError):
+        return [0.0, 0.0, 0.0]
+
+# -----------------------------------------------------------------------------
+
+def _read_process(pid: int) -> Optional[Dict[str, Any]]:
+    """
+    Return RSS (kB), open file descriptor count and parent pid for a process.
+    """
+
+    rss_kb = 0
+    ppid = 0
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    rss_kb = int(line.split()[1])
+                elif line.startswith('PPid:'):
+                    ppid = int(line.split()[1])
+        fds = len(os.listdir(f'/proc/{pid}/fd'))
+    except (OSError, ValueError):
+        return None
+
+    return {'pid': pid, 'ppid': ppid, 'rss_kb': rss_kb, 'fds': fds}
+
+# -----------------------------------------------------------------------------
+
+def _read_workers() -> List[Dict[str, Any]]:
+    """
+    Return the gunicorn master (our parent) and every worker it owns. When
+    running under the development server this is just the current process.
+    """
+
+    master = os.getppid()
+    workers = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        proc = _read_process(int(entry))
+        if proc and (proc['ppid'] == master or proc['pid'] == master):
+            proc['role'] = 'master' if proc['pid'] == master else 'worker'
+            workers.append(proc)
+
+    if not any(w['pid'] == os.getpid() for w in workers):
+        proc = _read_process(os.getpid())
+        if proc:
+            proc['role'] = 'worker'
+            workers = [proc]
+
+    return sorted(workers, key=lambda w: w['pid'])
+
+
+
+# -----------------------------------------------------------------------------
+# Active Sessions
+# -----------------------------------------------------------------------------
+
+# user_id -> last request time for this worker; request threads write it
+# while the sampler thread prunes and dumps it
+_last_seen: Dict[int, float] = {}
+_last_seen_lock = threading.Lock()
+
+def _note_active(user_id: int) -> None:
+    with _last_seen_lock:
+        _last_seen[user_id] = time.time()
+
+def _write_active_users() -> None:
+    """
+    Publish this worker's recently active users so the sampler can count
+    them across all workers.
+    """
+
+    cutoff = time.time() - HEALTH_ACTIVE_WINDOW_SECONDS
+    with _last_seen_lock:
+        for user_id in [user_id for user_id, seen in _last_seen.items() if seen < cutoff]:
+            del _last_seen[user_id]
+        seen = dict(_last_seen)
+
+    os.makedirs(SESSIONS_DIR, exist_ok=True)
+    path = os.path.join(SESSIONS_DIR, f"{os.getpid()}.json")
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(seen, f)
+    os.replace(f"{path}.tmp", path)
+
+# -----------------------------------------------------------------------------
+
+def _count_active_users() -> int:
+    cutoff = time.time() - HEALTH_ACTIVE_WINDOW_SECONDS
+    active = set()
+    for filename in os.listdir(SESSIONS_DIR):
+        if not filename.endswith('.json'):
+            continue
+        path = os.path.join(SESSIONS_DIR, filename)
+
+        # files from workers that have not written for a full window are dead
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                continue
+            with open(path) as f:
+                seen = json.load(f)
+        except (OSError, ValueError):
+            continue
+
+        active.update(user_id for user_id, ts in seen.items() if ts >= cutoff)
+    return len(active)
+
+
+
+# -----------------------------------------------------------------------------
+# Sampler
+# -----------------------------------------------------------------------------
+
+class Sampler:
+    """
+    One sampler thread runs per worker, but only the worker holding the
+    leader lock reads /proc; the others just publish their active users.
+    Samples go into a ring buffer that is written to SNAPSHOT_PATH, so page
+    views read a precomputed file instead of probing the system.
+    """
+
+    def __init__(self):
+        self.history = deque(maxlen=HEALTH_HISTORY_LENGTH)
+        self._prev_cpu = None
+        self._lock_file = None
+        self._pid = None
+
+    def _is_leader(self) -> bool:
+        if self._lock_file is not None:
+            return True
+        lock_file = open(LEADER_LOCK_PATH, 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def sample(self) -> Dict[str, Any]:
+        cpu_percent = 0.0
+        cpu = _read_cpu_times()
+        if cpu and self._prev_cpu:
+            busy = cpu[0] - self._prev_cpu[0]
+            total = cpu[1] - self._prev_cpu[1]
+            cpu_percent = (busy / total * 100) if total > 0 else 0.0
+        self._prev_cpu = cpu
+
+        mem = _read_meminfo()
+        mem_total = mem.get('MemTotal', 0)
+        mem_used = mem_total - mem.get('MemAvailable', mem_total)
+
+        return {
+            'time': time.time(),
+            'cpu_percent': round(cpu_percent, 1),
+            'mem_total_kb': mem_total,
+            'mem_used_kb': mem_used,
+            'mem_percent': round(mem_used / mem_total * 100, 1) if mem_total else 0.0,
+            'load': _read_loadavg(),
+            'workers': _read_workers(),
+            'active_users': _count_active_users()
+        }
+
+    def tick(self) -> None:
+        _write_active_users()
+        if not self._is_leader():
+            return
+
+        self.history.append(self.sample())
+        with open(f"{SNAPSHOT_PATH}.tmp", 'w') as f:
+            json.dump(list(self.history), f)
+        os.replace(f"{SNAPSHOT_PATH}.tmp", SNAPSHOT_PATH)
+
+    def ensure_running(self) -> None:
+        """
+        Start the sampler thread for the current process (once per pid, as
+        gunicorn forks workers after import).
+        """
+
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._lock_file = None
+        os.makedirs(SESSIONS_DIR, exist_ok=True)
+
+        def run():
+            while True:
+                # any error costs one sample, never the thread: it is
+                # not restarted in this worker
+                try:
+                    self.tick()
+                except Exception as e:
+                    print(f"Health sampler error: {type(e).__name__}: {e}")
+                time.sleep(HEALTH_SAMPLE_SECONDS)
+
+        threading.Thread(target=run, name='health-sampler', daemon=True).start()
+
+# -----------------------------------------------------------------------------
+
+sampler = Sampler()
+
+def read_history() -> List[Dict[str, Any]]:
+    """
+    Return the sampled history (oldest first) as last written by the leader.
+    Empty until the first sample has been taken.
+    """
+
+    try:
+        with open(SNAPSHOT_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+
+# -----------------------------------------------------------------------------
+# Flask Integration
+# -----------------------------------------------------------------------------
+
+def init_app(app: Flask) -> None:
+    """
+    Start the sampler in each web worker and note which users are active.
+    Not in the push service: it shares /dev/shm, so it could take the
+    sampler lock and report its own processes, and its per-pid session
+    files could clobber a web worker's. Its users are seen by web anyway.
+    """
+
+    if PUSH_WORKER:
+        return
+
+    @app.before_request
+    def health_track():
+        sampler.ensure_running()
+        user_id = session.get('user_id')
+        if user_id is not None:
+            _note_active(user_id)
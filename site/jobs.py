@@ -0,0 +1,242 @@
+# jobs.py - Background job handlers and the worker loop
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Slow side effects (thumbnails, media metadata, maintenance) are queued in the Jobs
+table by request handlers and run by `flask worker`, so a request only pays
+for one INSERT. Jobs are at-least-once: a handler may run again after a
+crash or an expired lease, so every handler must be safe to repeat.
+"""
+
+import json
+import os
+import random
+import socket
+import time
+import traceback
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from mysql.connector import Error
+
+import db.jobs
+import db.tickets
+import db.media
+import mediainfo
+import thumbs
+from config import (
+    ARCHIVE_DELETED_AFTER_DAYS,
+    ARCHIVE_CLOSED_AFTER_DAYS,
+    ARCHIVE_BATCH_SIZE,
+    JOBS_POLL_SECONDS,
+    JOBS_LEASE_SECONDS,
+    JOBS_MAX_ATTEMPTS,
+    JOBS_BACKOFF_BASE_SECONDS,
+    JOBS_BACKOFF_MAX_SECONDS
+)
+
+# kind -> handler(payload) returning a JSON-serialisable result (or None)
+HANDLERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+
+def handler(kind: str):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+class PermanentJobError(Exception):
+    """
+    Raised by a handler for failures retrying cannot fix (bad payload,
+    missing row); the job is marked dead at once.
+    """
+
+
+
+# -----------------------------------------------------------------------------
+# Queueing
+# -----------------------------------------------------------------------------
+
+def enqueue(
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    key: Optional[str] = None,
+    delay_seconds: int = 0,
+    max_attempts: int = JOBS_MAX_ATTEMPTS
+) -> Dict[str, Any]:
+    """
+    Queue a job for the worker.
+
+    :param key: Idempotency key; queueing the same key again returns the
+                existing job instead of adding a second one.
+    :return: {'id', 'status', 'created'}
+    :raises ValueError: If no handler is registered for kind.
+    """
+
+    if kind not in HANDLERS:
+        raise ValueError(f"No job handler registered for '{kind}'")
+    return db.jobs.admin_enqueue_job(kind, json.dumps(payload or {}), key, max_attempts, delay_seconds)
+
+def enqueue_many(
+    kind: str,
+    ids: Sequence[int],
+    id_field: str,
+    max_attempts: int = JOBS_MAX_ATTEMPTS
+) -> Dict[str, int]:
+    """
+    Queue one job per id in one database call, each with payload
+    {id_field: id} and key '<kind>:<id>', the key enqueue() callers use for
+    the same work, so the two never queue it twice.
+
+    :return: {'queued', 'existing'}
+    :raises ValueError: If no handler is registered for kind.
+    """
+
+    if kind not in HANDLERS:
+        raise ValueError(f"No job handler registered for '{kind}'")
+    if not ids:
+        return {'queued': 0, 'existing': 0}
+    return db.jobs.admin_enqueue_jobs(kind, json.dumps(list(ids)), id_field, max_attempts)
+
+# -----------------------------------------------------------------------------
+
+def retry_delay(attempts: int) -> int:
+    """
+    Seconds to wait before the next attempt after `attempts` failures.
+    """
+
+    delay = min(JOBS_BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0), JOBS_BACKOFF_MAX_SECONDS)
+    return int(delay * random.uniform(0.5, 1.0))
+
+
+
+# -----------------------------------------------------------------------------
+# Worker
+# -----------------------------------------------------------------------------
+
+class Worker:
+    """
+    Claims due jobs one at a time and runs their handlers. Several workers
+    (or several containers) can run side by side; claims never overlap.
+    """
+
+    def __init__(self, name: Optional[str] = None, lease_seconds: int = JOBS_LEASE_SECONDS):
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.running = True
+
+    def run_once(self) -> bool:
+        """
+        Run the next due job. Returns False when nothing was due.
+        """
+
+        job = db.jobs.worker_claim_job(self.name, self.lease_seconds)
+        if not job:
+            return False
+
+        started = time.perf_counter()
+        try:
+            func = HANDLERS.get(job['kind'])
+            if func is None:
+                raise PermanentJobError(f"no handler for '{job['kind']}'")
+            result = func(json.loads(job['payload']))
+
+        except PermanentJobError as e:
+            print(f"Job {job['id']} ({job['kind']}) failed permanently: {e}")
+            db.jobs.worker_fail_job(job['id'], self.name, str(e), None)
+
+        except Exception as e:
+            delay = retry_delay(job['attempts'])
+            print(f"Job {job['id']} ({job['kind']}) attempt {job['attempts']}/{job['max_attempts']} failed: {e}")
+            db.jobs.worker_fail_job(job['id'], self.name, traceback.format_exc(limit=5)[-4000:], delay)
+
+        else:
+            db.jobs.worker_complete_job(job['id'], self.name, json.dumps(result, default=str) if result is not None else None)
+            print(f"Job {job['id']} ({job['kind']}) done in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        return True
+
+    def run(self, poll_seconds: float = JOBS_POLL_SECONDS) -> None:
+        """
+        Work until stopped, sleeping only while the queue is empty. Database
+        outages are waited out rather than ending the process.
+        """
+
+        while self.running:
+            try:
+                if self.run_once():
+                    continue
+            except Error as e:
+                print(f"Job worker database error: {e}")
+            time.sleep(poll_seconds)
+
+    def stop(self, *args) -> None:
+        self.running = False
+
+
+
+# -----------------------------------------------------------------------------
+# Handlers
+# -----------------------------------------------------------------------------
+
+@handler('tickets.archive')
+def archive_tickets(payload: Dict[str, Any]) -> Dict[str, int]:
+    """
+    One batch of `flask archive-tickets`, for scheduling from the admin side.
+    """
+
+    return db.tickets.admin_archive_tickets(
+        payload.get('deleted_days', ARCHIVE_DELETED_AFTER_DAYS),
+        payload.get('closed_days', ARCHIVE_CLOSED_AFTER_DAYS),
+        payload.get('batch_size', ARCHIVE_BATCH_SIZE)
+    )
+
+@handler('media.thumbnails')
+def media_thumbnails(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Render a media file's thumbnails (queued when an upload completes, keyed
+    by content hash). Nothing happens if they already exist.
+    """
+
+    if not all(payload.get(key) for key in ('sha256', 'storage_path', 'media_type')):
+        raise PermanentJobError('payload needs sha256, storage_path and media_type')
+
+    try:
+        sizes = thumbs.generate(payload['sha256'], payload['storage_path'], payload['media_type'], payload.get('content_type') or '')
+    except FileNotFoundError as e:
+        raise PermanentJobError(f"original missing: {e}")
+    except thumbs.UnreadableMedia as e:
+        raise PermanentJobError(str(e))
+
+    return {'sha256': payload['sha256'], 'sizes': sizes}
+
+@handler('media.metadata')
+def media_metadata(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Read a media file's catalogue metadata (duration, dimensions, pages)
+    into every Media row with its content. Queued when an upload completes.
+    """
+
+    if not all(payload.get(key) for key in ('sha256', 'storage_path', 'media_type')):
+        raise PermanentJobError('payload needs sha256, storage_path and media_type')
+
+    try:
+        path = thumbs.source_path(payload['storage_path'])
+    except FileNotFoundError as e:
+        raise PermanentJobError(f"original missing: {e}")
+
+    info = mediainfo.probe(path, payload['media_type'], payload.get('content_type') or '')
+    updated = db.media.admin_set_media_metadata(payload['sha256'], info['duration_ms'], info['width'], info['height'], info['page_count'])
+
+    return {'sha256': payload['sha256'], 'updated': updated, **info}
@@ -0,0 +1,357 @@
+# media.py - Media library file delivery
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Media requests are authorised by the blueprint (check_access) and then
+either handed to nginx with X-Accel-Redirect, which streams the file, answers
+Range requests and frees the worker at once, or, without a proxy
+(MEDIA_ACCEL_PREFIX empty), sent by the worker through send_file:
+conditional requests and single Range requests are honoured, and full
+responses go out through wsgi.file_wrapper (sendfile under gunicorn).
+
+Uploads arrive as a series of chunk requests, each appended straight from
+the request stream to MEDIA_ROOT/.uploads/<id>.part under an exclusive
+lock; the partial file's size is the resume offset. The SHA-256 is computed
+while the bytes stream through. Chunks of one upload may reach different
+workers, so each worker keeps its own hash state per upload and, when it
+falls behind, first hashes the part of the file it has not seen; every
+worker reads each byte at most once. Completed files are stored by content
+hash (aa/bb/<sha256>), so identical uploads share one file.
+
+Thumbnails (rendered by thumbs.py in the job worker) sit beside them in
+.thumbs/aa/<sha256>-<size>.webp and are delivered the same way, with
+immutable cache headers: the URL changes whenever the content does.
+"""
+
+import fcntl
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from flask import Response, abort, send_file
+from werkzeug.security import safe_join
+
+import metrics
+from config import (
+    MEDIA_ROOT,
+    MEDIA_ACCEL_PREFIX,
+    MEDIA_CACHE_SECONDS,
+    MEDIA_UPLOAD_CHUNK_BYTES,
+    MEDIA_UPLOAD_HASHERS,
+    MEDIA_THUMB_SIZES,
+    MEDIA_THUMB_CACHE_SECONDS
+)
+
+# Partial uploads, under MEDIA_ROOT so completing one is a hard link.
+UPLOAD_DIR = '.uploads'
+
+# Rendered thumbnails, under MEDIA_ROOT so nginx serves them like the files.
+THUMB_DIR = '.thumbs'
+
+# Bytes moved per read while streaming or catching up a hash.
+READ_BLOCK = 1024 * 1024
+
+# Accepted content types by media type. Everything is served from this
+# origin, so nothing a browser would run (HTML, SVG, scripts) is accepted.
+MEDIA_CONTENT_TYPES = {
+    'audio': ('audio/',),
+    'video': ('video/',),
+    'image': ('image/png', 'image/jpeg', 'image/gif', 'image/webp', 'image/avif'),
+    'print': ('application/pdf', 'application/epub+zip')
+}
+
+_hashers = OrderedDict()
+_hashers_lock = threading.Lock()
+
+# -----------------------------------------------------------------------------
+# Exceptions
+# -----------------------------------------------------------------------------
+
+class UploadConflict(Exception):
+    """
+    The chunk does not start where the partial file ends (or the file is
+    not complete yet); offset is where it does end.
+    """
+
+    def __init__(self, offset: int):
+        super().__init__(f"upload is at byte {offset}")
+        self.offset = offset
+
+class UploadTooLarge(Exception):
+    """
+    The chunk is larger than MEDIA_UPLOAD_CHUNK_BYTES or runs past the
+    declared size.
+    """
+
+# -----------------------------------------------------------------------------
+# Delivery
+# -----------------------------------------------------------------------------
+
+def _content_disposition(file_name: str, download: bool) -> str:
+    """
+    Content-Disposition with an ASCII fallback and the RFC 5987 UTF-8 name.
+    """
+
+    fallback = ''.join(c for c in file_name if 32 <= ord(c) < 127 and c not in '"\\') or 'download'
+    kind = 'attachment' if download else 'inline'
+    return f"{kind}; filename=\"{fallback}\"; filename*=UTF-8''{quote(file_name)}"
+
+# -----------------------------------------------------------------------------
+
+def thumb_path(sha256: str, size: int) -> str:
+    """
+    Path of a thumbnail relative to MEDIA_ROOT.
+    """
+
+    return f"{THUMB_DIR}/{sha256[:2]}/{sha256}-{int(size)}.webp"
+
+# -----------------------------------------------------------------------------
+
+def file_response(item: Dict[str, Any], download: bool = False) -> Response:
+    """
+    Response delivering a media row from sp_media_fetch_file.
+
+    :param download: Send as an attachment instead of inline (playback).
+    """
+
+    path = safe_join(MEDIA_ROOT, item['storage_path'])
+    if path is None:
+        abort(404)
+
+    if MEDIA_ACCEL_PREFIX:
+        response = Response(content_type=item['content_type'])
+        response.headers['X-Accel-Redirect'] = MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + quote(item['storage_path'])
+        response.headers['Content-Disposition'] = _content_disposition(item['file_name'], download)
+        response.headers['Cache-Control'] = f"private, max-age={MEDIA_CACHE_SECONDS}"
+        return response
+
+    if not os.path.isfile(path):
+        abort(404)
+
+    response = send_file(
+        path,
+        mimetype=item['content_type'],
+        as_attachment=download,
+        download_name=item['file_name'],
+        conditional=True,
+        etag=item['sha256'],
+        last_modified=item.get('updated_at'),
+        max_age=MEDIA_CACHE_SECONDS
+    )
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
+
+# -----------------------------------------------------------------------------
+
+def thumb_response(sha256: str, size: int) -> Response:
+    """
+    Response delivering a rendered thumbnail, cacheable for good; 404 until
+    the worker has rendered it.
+    """
+
+    if size not in MEDIA_THUMB_SIZES:
+        abort(404)
+
+    relative = thumb_path(sha256, size)
+    cache_control = f"private, max-age={MEDIA_THUMB_CACHE_SECONDS}, immutable"
+
+    if MEDIA_ACCEL_PREFIX:
+        response = Response(content_type='image/webp')
+        response.headers['X-Accel-Redirect'] = MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + relative
+        response.headers['Cache-Control'] = cache_control
+        return response
+
+    path = os.path.join(MEDIA_ROOT, relative)
+    if not os.path.isfile(path):
+        abort(404)
+
+    response = send_file(path, mimetype='image/webp', conditional=True, etag=f"{sha256}-{size}", max_age=MEDIA_THUMB_CACHE_SECONDS)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+# -----------------------------------------------------------------------------
+# Uploads
+# -----------------------------------------------------------------------------
+
+def media_type_for(content_type: str) -> Optional[str]:
+    """
+    Media type for an accepted content type, None if it is not accepted.
+    """
+
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    for media_type, accepted in MEDIA_CONTENT_TYPES.items():
+        for prefix in accepted:
+            if content_type == prefix or (prefix.endswith('/') and content_type.startswith(prefix)):
+                return media_type
+    return None
+
+# -----------------------------------------------------------------------------
+
+def partial_path(upload_id: int) -> str:
+    return os.path.join(MEDIA_ROOT, UPLOAD_DIR, f"{int(upload_id)}.part")
+
+def storage_path_for(sha256: str) -> str:
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+def upload_offset(upload_id: int) -> int:
+    """
+    Bytes received so far (where the next chunk must start).
+    """
+
+    try:
+        return os.path.getsize(partial_path(upload_id))
+    except FileNotFoundError:
+        return 0
+
+# -----------------------------------------------------------------------------
+
+def _take_hasher(upload_id: int) -> List[Any]:
+    """
+    This worker's [sha256, bytes hashed] for an upload, removed from the
+    cache while in use.
+    """
+
+    with _hashers_lock:
+        state = _hashers.pop(upload_id, None)
+    return state or [hashlib.sha256(), 0]
+
+def _put_hasher(upload_id: int, state: List[Any]) -> None:
+    with _hashers_lock:
+        _hashers[upload_id] = state
+        while len(_hashers) > MEDIA_UPLOAD_HASHERS:
+            _hashers.popitem(last=False)
+
+def _catch_up(upload_id: int, handle: BinaryIO, offset: int) -> List[Any]:
+    """
+    Hash state for the first offset bytes of the partial file, reading only
+    the bytes this worker has not hashed yet.
+    """
+
+    state = _take_hasher(upload_id)
+    if state[1] > offset:
+        state = [hashlib.sha256(), 0]
+    metrics.record_cache('upload_hash', state[1] == offset)
+
+    handle.seek(state[1])
+    while state[1] < offset:
+        block = handle.read(min(READ_BLOCK, offset - state[1]))
+        if not block:
+            break
+        state[0].update(block)
+        state[1] += len(block)
+    return state
+
+# -----------------------------------------------------------------------------
+
+def write_chunk(upload: Dict[str, Any], offset: int, stream: BinaryIO, length: int) -> int:
+    """
+    Append one chunk from a request stream to the partial file, hashing it
+    on the way. Nothing beyond READ_BLOCK is held in memory.
+
+    :param upload: Row from sp_media_upload_fetch.
+    :param offset: Where the client says the chunk starts.
+    :param length: Chunk length (the request's Content-Length).
+    :return: Bytes received so far; less than offset + length if the client
+        went away mid-chunk.
+    """
+
+    if length > MEDIA_UPLOAD_CHUNK_BYTES or offset + length > upload['size_bytes']:
+        raise UploadTooLarge()
+
+    path = partial_path(upload['id'])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, 'a+b') as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        size = os.fstat(handle.fileno()).st_size
+        if size != offset:
+            raise UploadConflict(size)
+
+        state = _catch_up(upload['id'], handle, size)
+        try:
+            remaining = length
+            while remaining:
+                block = stream.read(min(READ_BLOCK, remaining))
+                if not block:
+                    break
+                handle.write(block)
+                state[0].update(block)
+                state[1] += len(block)
+                remaining -= len(block)
+        finally:
+            handle.flush()
+            # keep the state only if it matches the file (a failed write
+            # may have left part of a block behind)
+            if os.fstat(handle.fileno()).st_size == state[1]:
+                _put_hasher(upload['id'], state)
+
+    return state[1]
+
+# -----------------------------------------------------------------------------
+
+def complete_upload(upload: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Hash a fully received upload and link it into content-addressed
+    storage. The partial file stays until discard_upload, so a failed
+    finalize can be retried.
+
+    :return: (sha256, storage path relative to MEDIA_ROOT)
+    """
+
+    path = partial_path(upload['id'])
+    try:
+        handle = open(path, 'rb')
+    except FileNotFoundError:
+        raise UploadConflict(0)
+
+    with handle:
+        fcntl.flock(handle, fcntl.LOCK_SH)
+        size = os.fstat(handle.fileno()).st_size
+        if size != upload['size_bytes']:
+            raise UploadConflict(size)
+        state = _catch_up(upload['id'], handle, size)
+
+    _put_hasher(upload['id'], state)
+    sha256 = state[0].hexdigest()
+    storage_path = storage_path_for(sha256)
+
+    target = os.path.join(MEDIA_ROOT, storage_path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.link(path, target)
+    except FileExistsError:
+        pass  # same content already stored
+
+    return sha256, storage_path
+
+# -----------------------------------------------------------------------------
+
+def discard_upload(upload_id: int) -> None:
+    """
+    Forget an upload's hash state and delete its partial file.
+    """
+
+    with _hashers_lock:
+        _hashers.pop(upload_id, None)
+    try:
+        os.remove(partial_path(upload_id))
+    except FileNotFoundError:
+        pass
+
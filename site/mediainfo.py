@@ -0,0 +1,111 @@
+# mediainfo.py - Media metadata extraction
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Reads the catalogue metadata of a media file once, in the job worker after
+ingest (`media.metadata` job), so browsing never opens a file:
+
+    image   width/height from the header (Pillow, no pixel decode)
+    video   duration and frame size, via ffprobe
+    audio   duration, via ffprobe
+    print   PDF page count, via pdfinfo (poppler-utils)
+
+A missing tool or an unreadable file leaves the fields unknown (None).
+"""
+
+import json
+import re
+import shutil
+import subprocess
+from typing import Any, Dict, List, Optional
+
+from PIL import Image, UnidentifiedImageError
+
+from config import MEDIA_PROBE_TIMEOUT_SECONDS
+
+# EXIF orientations that rotate the picture by 90 degrees.
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+# -----------------------------------------------------------------------------
+# Probes
+# -----------------------------------------------------------------------------
+
+def _run(command: List[str]) -> Optional[str]:
+    if not shutil.which(command[0]):
+        return None
+    try:
+        result = subprocess.run(command, capture_output=True, timeout=MEDIA_PROBE_TIMEOUT_SECONDS, check=False)
+    except subprocess.TimeoutExpired:
+        return None
+    return result.stdout.decode('utf-8', 'replace') if result.returncode == 0 else None
+
+def _probe_image(path: str) -> Dict[str, Any]:
+    try:
+        with Image.open(path) as image:
+            width, height = image.size
+            if image.getexif().get(0x0112) in ROTATED_ORIENTATIONS:
+                width, height = height, width
+    except (UnidentifiedImageError, OSError):
+        return {}
+    return {'width': width, 'height': height}
+
+def _probe_av(path: str, media_type: str) -> Dict[str, Any]:
+    output = _run(['ffprobe', '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path])
+    if not output:
+        return {}
+    try:
+        probe = json.loads(output)
+    except ValueError:
+        return {}
+
+    info = {}
+    try:
+        info['duration_ms'] = int(float(probe.get('format', {}).get('duration')) * 1000)
+    except (TypeError, ValueError):
+        pass
+
+    if media_type == 'video':
+        for stream in probe.get('streams', []):
+            if stream.get('codec_type') == 'video' and stream.get('width'):
+                info['width'] = int(stream['width'])
+                info['height'] = int(stream['height'])
+                break
+    return info
+
+def _probe_pdf(path: str) -> Dict[str, Any]:
+    output = _run(['pdfinfo', path])
+    match = re.search(r'^Pages:\s+(\d+)', output or '', re.MULTILINE)
+    return {'page_count': int(match.group(1))} if match else {}
+
+# -----------------------------------------------------------------------------
+
+def probe(path: str, media_type: str, content_type: str) -> Dict[str, Optional[int]]:
+    """
+    Catalogue metadata of one file.
+
+    :return: {'duration_ms', 'width', 'height', 'page_count'}, None where
+        unknown or not applicable.
+    """
+
+    info = {}
+    if media_type == 'image':
+        info = _probe_image(path)
+    elif media_type in ('audio', 'video'):
+        info = _probe_av(path, media_type)
+    elif content_type == 'application/pdf':
+        info = _probe_pdf(path)
+
+    return {key: info.get(key) for key in ('duration_ms', 'width', 'height', 'page_count')}
@@ -0,0 +1,638 @@
+# metrics.py - Metrics registry shared across gunicorn workers
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import fcntl
+import json
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from flask import Flask, request
+
+from config import (
+    RUNTIME_DIR,
+    METRICS_FLUSH_SECONDS,
+    METRICS_LATENCY_BUCKETS_MS,
+    METRICS_ROW_COUNT_BUCKETS
+)
+
+# Each worker writes its own snapshot here; readers merge every file.
+METRICS_DIR = os.path.join(RUNTIME_DIR, 'metrics')
+
+# Snapshots are named <host>-<pid>.json: the push container shares /dev/shm
+# but has its own pid namespace, so a pid alone neither names a worker
+# uniquely nor can be checked for liveness from another container.
+HOST = socket.gethostname()
+
+# Totals of workers that have exited (not a pid, so always merged).
+RETIRED_PATH = os.path.join(METRICS_DIR, 'retired.json')
+RETIRE_LOCK_PATH = os.path.join(METRICS_DIR, 'retire.lock')
+
+
+
+# -----------------------------------------------------------------------------
+# Metric Values
+# -----------------------------------------------------------------------------
+
+class Histogram:
+    """
+    A fixed-bucket histogram. Each observation increments the first bucket
+    whose upper bound is >= the value; anything larger lands in the overflow
+    bucket. Cheap enough to call on every request.
+    """
+
+    def __init__(self, buckets: Sequence[float] = METRICS_LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """
+        Record a single observation.
+
+        :param value: The measured value (milliseconds for latency histograms).
+        """
+
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += value
+            if value > self.max:
+                self.max = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return a point-in-time copy safe to serialise or render.
+
+        :return: Dictionary of buckets, per-bucket counts, count, sum and max.
+        """
+
+        with self._lock:
+            return {
+                'buckets': list(self.buckets),
+                'counts': list(self.counts),
+                'count': self.count,
+                'sum': self.total,
+                'max': self.max
+            }
+
+# -----------------------------------------------------------------------------
+
+class Counter:
+    """
+    A monotonically increasing count.
+    """
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> float:
+        return self.value
+
+# -----------------------------------------------------------------------------
+
+class Gauge(Counter):
+    """
+    A value that can go up and down (e.g. requests currently in flight).
+    Gauges from different workers are summed when merged.
+    """
+
+    def dec(self, amount: float = 1) -> None:
+        self.inc(-amount)
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = value
+
+
+
+# -----------------------------------------------------------------------------
+# Registry
+# -----------------------------------------------------------------------------
+
+class MetricFamily:
+    """
+    A named metric with a fixed set of label names. Each distinct combination
+    of label values gets its own Counter, Gauge or Histogram.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Optional[Sequence[float]] = None
+    ):
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) if buckets else None
+        self._series: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: Any) -> Any:
+        """
+        Return the value object for a label combination, creating it on first
+        use.
+
+        :param values: One value per label name, in declaration order.
+        """
+
+        key = tuple(str(v) for v in values)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.get(key)
+                if series is None:
+                    if self.kind == 'histogram':
+                        series = Histogram(self.buckets)
+                    elif self.kind == 'gauge':
+                        series = Gauge()
+                    else:
+                        series = Counter()
+                    self._series[key] = series
+        return series
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            items = list(self._series.items())
+
+        return {
+            'kind': self.kind,
+            'help': self.help,
+            'labelnames': list(self.labelnames),
+            'series': [[list(key), series.snapshot()] for key, series in items]
+        }
+
+# -----------------------------------------------------------------------------
+
+class Registry:
+    """
+    Holds every metric family for this process and persists a snapshot to
+    METRICS_DIR so the scrape endpoint can aggregate all workers.
+    """
+
+    def __init__(self):
+        self.families: Dict[str, MetricFamily] = {}
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def _register(self, family: MetricFamily) -> MetricFamily:
+        with self._lock:
+            return self.families.setdefault(family.name, family)
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._register(MetricFamily('counter', name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._register(MetricFamily('gauge', name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = METRICS_LATENCY_BUCKETS_MS
+    ) -> MetricFamily:
+        return self._register(MetricFamily('histogram', name, help, labelnames, buckets))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            families = list(self.families.values())
+        return {family.name: family.snapshot() for family in families}
+
+    # -------------------------------------------------------------------------
+
+    def flush(self) -> None:
+        """
+        Atomically write this worker's snapshot to METRICS_DIR/<host>-<pid>.json.
+        """
+
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = os.path.join(METRICS_DIR, f"{HOST}-{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def ensure_flusher(self) -> None:
+        """
+        Start the background flush thread for the current process. Safe to
+        call on every request; gunicorn forks workers, so the check is per pid.
+        """
+
+        if self._flusher_pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+
+        def run():
+            while True:
+                time.sleep(METRICS_FLUSH_SECONDS)
+                try:
+                    self.flush()
+                except OSError as e:
+                    print(f"Metrics flush error: {e}")
+
+        threading.Thread(target=run, name='metrics-flush', daemon=True).start()
+
+# -----------------------------------------------------------------------------
+
+registry = Registry()
+
+
+
+# -----------------------------------------------------------------------------
+# Application Metrics
+# -----------------------------------------------------------------------------
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    'scav_http_request_duration_ms',
+    'Request time by endpoint and phase (db, build, render, total).',
+    ['endpoint', 'phase']
+)
+
+HTTP_RESPONSES = registry.counter(
+    'scav_http_responses_total',
+    'Responses sent by endpoint and status code.',
+    ['endpoint', 'status']
+)
+
+HTTP_IN_FLIGHT = registry.gauge(
+    'scav_http_requests_in_flight',
+    'Requests currently being handled (summed across workers).'
+)
+
+LIMITER_REJECTIONS = registry.counter(
+    'scav_limiter_rejections_total',
+    'Requests rejected by the rate limiter.',
+    ['endpoint']
+)
+
+DB_PROCEDURE_DURATION = registry.histogram(
+    'scav_db_procedure_duration_ms',
+    'Stored procedure time by procedure and phase (connect, execute, fetch, total).',
+    ['proc', 'phase']
+)
+
+DB_PROCEDURE_ROWS = registry.histogram(
+    'scav_db_procedure_rows',
+    'Rows returned per stored procedure call.',
+    ['proc'],
+    buckets=METRICS_ROW_COUNT_BUCKETS
+)
+
+DB_SLOW_CALLS = registry.counter(
+    'scav_db_slow_calls_total',
+    'Stored procedure calls slower than DB_SLOW_CALL_MS.',
+    ['proc']
+)
+
+DB_CONNECTIONS_OPENED = registry.counter(
+    'scav_db_connections_opened_total',
+    'Database connections opened, by role.',
+    ['role']
+)
+
+DB_CONNECTIONS = registry.gauge(
+    'scav_db_connections',
+    'Database connections by role and state: open, and in_use (running a procedure).',
+    ['role', 'state']
+)
+
+CACHE_REQUESTS = registry.counter(
+    'scav_cache_requests_total',
+    'Cache lookups by cache name and result (hit, miss).',
+    ['cache', 'result']
+)
+
+# -----------------------------------------------------------------------------
+
+def record_cache(cache: str, hit: bool) -> None:
+    """
+    Count a cache lookup so hit rates show up in the metrics endpoint.
+
+    :param cache: Short name of the cache (e.g. 'board_index').
+    :param hit: True if the value was served from the cache.
+    """
+
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+
+# -----------------------------------------------------------------------------
+# Aggregation
+# -----------------------------------------------------------------------------
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+# -----------------------------------------------------------------------------
+
+def _merge(merged: Dict[str, Any], snapshot: Dict[str, Any], skip_gauges: bool = False) -> None:
+    """
+    Add one snapshot into merged (series keyed by label tuple). Counters,
+    gauges and histogram buckets are summed; histogram max is the max.
+    """
+
+    for name, family in snapshot.items():
+        if skip_gauges and family['kind'] == 'gauge':
+            continue
+        target = merged.setdefault(name, {
+            'kind': family['kind'],
+            'help': family['help'],
+            'labelnames': family['labelnames'],
+            'series': {}
+        })
+        for labels, value in family['series']:
+            key = tuple(labels)
+            current = target['series'].get(key)
+            if current is None:
+                target['series'][key] = value
+            elif family['kind'] == 'histogram':
+                current['counts'] = [a + b for a, b in zip(current['counts'], value['counts'])]
+                current['count'] += value['count']
+                current['sum'] += value['sum']
+                current['max'] = max(current['max'], value['max'])
+            else:
+                target['series'][key] = current + value
+
+def _listed(merged: Dict[str, Any]) -> Dict[str, Any]:
+    for family in merged.values():
+        family['series'] = [[list(key), value] for key, value in family['series'].items()]
+    return merged
+
+def _read_snapshot(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+# -----------------------------------------------------------------------------
+
+def _retire_dead_workers() -> None:
+    """
+    Fold the snapshots of workers that have exited into RETIRED_PATH, so
+    counters and histograms keep their totals when gunicorn recycles a
+    worker instead of going backwards. Gauges of a dead worker (requests
+    in flight) are dropped. Serialised by a lock so two collectors never
+    fold the same file twice. Only this host's files are checked: another
+    container's pids mean nothing to os.kill here.
+    """
+
+    dead = []
+    prefix = f"{HOST}-"
+    for filename in os.listdir(METRICS_DIR):
+        pid = filename[len(prefix):-5]
+        if filename.startswith(prefix) and filename.endswith('.json') and pid.isdigit() and not _pid_alive(int(pid)):
+            dead.append(os.path.join(METRICS_DIR, filename))
+    if not dead:
+        return
+
+    with open(RETIRE_LOCK_PATH, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        retired: Dict[str, Any] = {}
+        _merge(retired, _read_snapshot(RETIRED_PATH) or {})
+        folded = []
+        for path in dead:
+            snapshot = _read_snapshot(path)
+            if snapshot is None:
+                # already folded by another collector, or unreadable
+                continue
+            _merge(retired, snapshot, skip_gauges=True)
+            folded.append(path)
+        if not folded:
+            return
+
+        with open(f"{RETIRED_PATH}.tmp", 'w') as f:
+            json.dump(_listed(retired), f)
+        os.replace(f"{RETIRED_PATH}.tmp", RETIRED_PATH)
+
+        for path in folded:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+# -----------------------------------------------------------------------------
+
+def collect() -> Dict[str, Any]:
+    """
+    Merge the snapshots of every live worker and the retained totals of
+    workers that have exited. Counters, gauges and histogram buckets are
+    summed; histogram max is the max across workers.
+
+    :return: Snapshot in the same shape as Registry.snapshot().
+    """
+
+    registry.flush()
+    _retire_dead_workers()
+
+    merged: Dict[str, Any] = {}
+    for filename in os.listdir(METRICS_DIR):
+        if not filename.endswith('.json'):
+            continue
+        snapshot = _read_snapshot(os.path.join(METRICS_DIR, filename))
+        if snapshot is not None:
+            _merge(merged, snapshot)
+
+    return _listed(merged)
+
+# -----------------------------------------------------------------------------
+
+def quantile(hist: Dict[str, Any], q: float) -> float:
+    """
+    Estimate a quantile from a histogram snapshot by linear interpolation
+    inside the bucket that contains it.
+
+    :param hist: A Histogram snapshot.
+    :param q: Quantile between 0 and 1 (e.g. 0.95).
+    :return: Estimated value, or 0.0 for an empty histogram.
+    """
+
+    if not hist['count']:
+        return 0.0
+
+    target = q * hist['count']
+    seen = 0
+    lower = 0.0
+    for i, count in enumerate(hist['counts']):
+        upper = hist['buckets'][i] if i < len(hist['buckets']) else hist['max']
+        if count and seen + count >= target:
+            return lower + (upper - lower) * ((target - seen) / count)
+        seen += count
+        lower = upper
+    return hist['max']
+
+# -----------------------------------------------------------------------------
+
+def _format_labels(names: List[str], values: List[str], extra: str = '') -> str:
+    pairs = [
+        '{}="{}"'.format(n, v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for n, v in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+# -----------------------------------------------------------------------------
+
+def render_prometheus(snapshot: Dict[str, Any]) -> str:
+    """
+    Render a merged snapshot in the Prometheus text exposition format.
+    """
+
+    lines = []
+    for name, family in sorted(snapshot.items()):
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['kind']}")
+        names = family['labelnames']
+
+        for values, value in family['series']:
+            if family['kind'] != 'histogram':
+                lines.append(f"{name}{_format_labels(names, values)} {value}")
+                continue
+
+            labels = _format_labels(names, values)
+            cumulative = 0
+            for bound, count in zip(value['buckets'], value['counts']):
+                cumulative += count
+                bucket_labels = _format_labels(names, values, 'le="%s"' % bound)
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            inf_labels = _format_labels(names, values, 'le="+Inf"')
+            lines.append(f"{name}_bucket{inf_labels} {value['count']}")
+            lines.append(f"{name}_sum{labels} {value['sum']}")
+            lines.append(f"{name}_count{labels} {value['count']}")
+
+    return '\n'.join(lines) + '\n'
+
+
+
+# -----------------------------------------------------------------------------
+# Flask Integration
+# -----------------------------------------------------------------------------
+
+def init_app(app: Flask) -> None:
+    """
+    Count in-flight requests, responses by status and limiter rejections.
+    Request latency is recorded by profiling, which already times each phase.
+    """
+
+    @app.before_request
+    def metrics_start():
+        registry.ensure_flusher()
+        HTTP_IN_FLIGHT.labels().inc()
+        request.environ['scav.metrics.in_flight'] = True
+
+    @app.after_request
+    def metrics_response(response):
+        endpoint = request.endpoint or 'unknown'
+        HTTP_RESPONSES.labels(endpoint, response.status_code).inc()
+        if response.status_code == 429:
+            LIMITER_REJECTIONS.labels(endpoint).inc()
+        return response
+
+    @app.teardown_request
+    def metrics_finish(e=None):
+        if request.environ.pop('scav.metrics.in_flight', False):
+            HTTP_IN_FLIGHT.labels().dec()
+
+
+
+# -----------------------------------------------------------------------------
+# Summaries
+# -----------------------------------------------------------------------------
+
+def series_total(snapshot: Dict[str, Any], name: str, **where: str) -> float:
+    """
+    Sum a counter or gauge (or a histogram's observation count) across every
+    series matching the label filters.
+
+    :param snapshot: A merged snapshot from collect().
+    :param name: Metric family name.
+    :param where: Label filters, e.g. phase='total'.
+    :return: The summed value (0 if the family has no data yet).
+    """
+
+    family = snapshot.get(name)
+    if not family:
+        return 0
+
+    total = 0
+    for values, value in family['series']:
+        labels = dict(zip(family['labelnames'], values))
+        if all(labels.get(k) == v for k, v in where.items()):
+            total += value['count'] if family['kind'] == 'histogram' else value
+    return total
+
+# -----------------------------------------------------------------------------
+
+def series_histogram(snapshot: Dict[str, Any], name: str, **where: str) -> Dict[str, Any]:
+    """
+    Merge every histogram series matching the label filters into one.
+
+    :param snapshot: A merged snapshot from collect().
+    :param name: Histogram family name.
+    :param where: Label filters, e.g. phase='total'.
+    :return: A histogram snapshot (empty if nothing matched).
+    """
+
+    merged = Histogram().snapshot()
+    family = snapshot.get(name)
+    if not family:
+        return merged
+
+    merged['buckets'] = None
+    for values, value in family['series']:
+        labels = dict(zip(family['labelnames'], values))
+        if not all(labels.get(k) == v for k, v in where.items()):
+            continue
+        if merged['buckets'] is None:
+            merged['buckets'] = value['buckets']
+            merged['counts'] = [0] * len(value['counts'])
+        merged['counts'] = [a + b for a, b in zip(merged['counts'], value['counts'])]
+        merged['count'] += value['count']
+        merged['sum'] += value['sum']
+        merged['max'] = max(merged['max'], value['max'])
+
+    if merged['buckets'] is None:
+        merged['buckets'] = list(METRICS_LATENCY_BUCKETS_MS)
+    return merged
@@ -14,7 +14,14 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from flask import session, redirect, url_for, render_template
+import hmac
+import ipaddress
+
+from flask import session, redirect, url_for, render_template, request, abort
+
+from config import INTERNAL_NETWORKS, METRICS_TOKEN
+
+_internal_networks = [ipaddress.ip_network(net) for net in INTERNAL_NETWORKS]
 
 def check_access(allowed_roles):
     # Return to login if not logged in
@@ -26,3 +33,28 @@ def check_access(allowed_roles):
         return render_template('unauthorized.html', title='unauthorized'), 403
 
     return None
+
+def check_internal():
+    # Refuse anything that did not arrive over the VPN / local network
+    try:
+        addr = ipaddress.ip_address(request.remote_addr or '')
+    except ValueError:
+        abort(403)
+
+    if not any(addr in net for net in _internal_networks):
+        abort(403)
+
+    return None
+
+def check_scraper():
+    # Machine clients (no session): internal network, plus the bearer token
+    # when one is configured
+    check_internal()
+
+    if METRICS_TOKEN and not hmac.compare_digest(
+        request.headers.get('Authorization', '').encode(),
+        f"Bearer {METRICS_TOKEN}".encode()
+    ):
+        abort(401)
+
+    return None
@@ -0,0 +1,232 @@
+# migrate.py - Apply versioned schema migrations from db/migrations
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Apply pending schema migrations to a live database.
+
+    python migrate.py             # apply everything pending
+    python migrate.py --status    # list applied / pending migrations
+    python migrate.py --dry-run   # show what would run
+
+Migrations are files named NNN_description.sql, applied in version order
+as root and recorded in SchemaMigrations with a checksum. MySQL commits DDL
+implicitly, so a migration cannot be rolled back: every statement must be
+safe to re-run (IF NOT EXISTS, CREATE OR REPLACE, ...) so a migration that
+failed half way can simply be applied again once fixed.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+import time
+from typing import List, Tuple
+
+import mysql.connector
+from mysql.connector import Error
+
+MIGRATIONS_DIR = os.environ.get(
+    'SCAV_MIGRATIONS_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'db', 'migrations')
+)
+
+MIGRATION_FILE = re.compile(r'^(\d+)_([\w-]+)\.sql$')
+
+# Held for the whole run so two runners never interleave.
+LOCK_NAME = 'scavengers.migrate'
+
+
+
+# -----------------------------------------------------------------------------
+# Parsing
+# -----------------------------------------------------------------------------
+
+def discover(directory: str) -> List[Tuple[int, str, str]]:
+    """
+    Return (version, name, path) for every migration file, sorted by version.
+
+    :raises ValueError: If two files share a version number.
+    """
+
+    found = {}
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in found:
+            raise ValueError(f"Duplicate migration version {version}: {found[version][1]} and {filename}")
+        found[version] = (version, filename, os.path.join(directory, filename))
+    return [found[v] for v in sorted(found)]
+
+# -----------------------------------------------------------------------------
+
+def split_statements(sql: str) -> List[str]:
+    """
+    Split a script into statements the way the mariadb client does for our
+    files: honour DELIMITER lines and end a statement at a line ending in the
+    current delimiter. Delimiters inside string literals at the end of a line
+    are not supported.
+    """
+
+    statements = []
+    delimiter = ';'
+    buffer = []
+
+    for line in sql.splitlines():
+        stripped = line.strip()
+
+        if stripped.upper().startswith('DELIMITER '):
+            delimiter = stripped.split(None, 1)[1]
+            continue
+
+        buffer.append(line)
+        if stripped.endswith(delimiter):
+            buffer[-1] = line.rstrip()[:-len(delimiter)]
+            statement = '\n'.join(buffer).strip()
+            buffer = []
+            if _has_code(statement):
+                statements.append(statement)
+
+    leftover = '\n'.join(buffer).strip()
+    if _has_code(leftover):
+        statements.append(leftover)
+
+    return statements
+
+def _has_code(statement: str) -> bool:
+    return any(line.strip() and not line.strip().startswith('--') for line in statement.splitlines())
+
+
+
+# -----------------------------------------------------------------------------
+# Database
+# -----------------------------------------------------------------------------
+
+def connect(retries: int = 60):
+    """
+    Connect as root, retrying while the database container starts up.
+    """
+
+    for attempt in range(retries):
+        try:
+            return mysql.connector.connect(
+                host=os.environ.get('DB_HOST', 'db'),
+                port=int(os.environ.get('DB_PORT', 3306)),
+                user='root',
+                password=os.environ['DB_PASS_ROOT'],
+                database='scavengers',
+                autocommit=True
+            )
+        except Error as e:
+            if attempt == retries - 1:
+                raise
+            print(f"Waiting for database ({e.msg})...")
+            time.sleep(2)
+
+# -----------------------------------------------------------------------------
+
+def ensure_table(cursor) -> None:
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS SchemaMigrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            duration_ms INT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+def applied_versions(cursor) -> dict:
+    cursor.execute("SELECT version, name, checksum FROM SchemaMigrations")
+    return {version: (name, checksum) for version, name, checksum in cursor.fetchall()}
+
+
+
+# -----------------------------------------------------------------------------
+# Entry Point
+# -----------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dir', default=MIGRATIONS_DIR, help='directory holding NNN_name.sql files')
+    parser.add_argument('--status', action='store_true', help='list migrations and exit')
+    parser.add_argument('--dry-run', action='store_true', help='print pending migrations without applying')
+    args = parser.parse_args()
+
+    migrations = discover(args.dir)
+    conn = connect()
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT GET_LOCK(%s, 60)", (LOCK_NAME,))
+    if cursor.fetchone()[0] != 1:
+        sys.exit("Another migration run holds the lock.")
+
+    try:
+        ensure_table(cursor)
+        applied = applied_versions(cursor)
+        pending = []
+
+        for version, filename, path in migrations:
+            with open(path, encoding='utf-8') as f:
+                sql = f.read()
+            checksum = hashlib.sha256(sql.encode('utf-8')).hexdigest()
+
+            if version in applied:
+                if applied[version][1] != checksum:
+                    sys.exit(f"{filename} was changed after it was applied; add a new migration instead.")
+                if args.status:
+                    print(f"  applied  {filename}")
+                continue
+
+            pending.append((version, filename, sql, checksum))
+            if args.status or args.dry_run:
+                print(f"  pending  {filename}")
+
+        if args.status or args.dry_run or not pending:
+            if not pending:
+                print("Schema is up to date.")
+            return
+
+        for version, filename, sql, checksum in pending:
+            print(f"Applying {filename}...")
+            started = time.perf_counter()
+            for statement in split_statements(sql):
+                try:
+                    cursor.execute(statement)
+                    if cursor.with_rows:
+                        cursor.fetchall()
+                except Error as e:
+                    print(f"Migration error in {filename}: {e}")
+                    print(statement)
+                    sys.exit(1)
+
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            cursor.execute(
+                "INSERT INTO SchemaMigrations (version, name, checksum, duration_ms) VALUES (%s, %s, %s, %s)",
+                (version, filename, checksum, duration_ms)
+            )
+            print(f"Applied {filename} in {duration_ms} ms")
+
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+        cursor.fetchall()
+        cursor.close()
+        conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+# profiling.py - Per-request timing breakdown and Server-Timing headers
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import time
+from functools import wraps
+from typing import Dict, Any, Callable
+
+from flask import Flask, g, request, session, has_app_context
+from flask import before_render_template, template_rendered
+
+from metrics import HTTP_REQUEST_DURATION
+
+
+
+# -----------------------------------------------------------------------------
+# Request Profile
+# -----------------------------------------------------------------------------
+
+class RequestProfile:
+    """
+    Accumulates where a single request spent its time. Stored on g for the
+    lifetime of the request.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db: Dict[str, Dict[str, float]] = {}   # role -> {'count', 'ms'}
+        self.build_ms = 0.0
+        self.render_ms = 0.0
+        self.render_started = None
+
+    def add_db(self, role: str, ms: float) -> None:
+        entry = self.db.setdefault(role, {'count': 0, 'ms': 0.0})
+        entry['count'] += 1
+        entry['ms'] += ms
+
+    @property
+    def db_ms(self) -> float:
+        return sum(entry['ms'] for entry in self.db.values())
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+# -----------------------------------------------------------------------------
+
+def _current() -> Any:
+    """
+    Return the RequestProfile for the active request, or None outside one.
+    """
+
+    if not has_app_context():
+        return None
+    return g.get('profile')
+
+# -----------------------------------------------------------------------------
+
+def record_db(role: str, ms: float) -> None:
+    """
+    Charge a stored procedure call to the current request. Called from
+    db.core for every procedure; a no-op outside of a request.
+
+    :param role: The database role the call was made as.
+    :param ms: Total time of the call (connect + execute + fetch).
+    """
+
+    profile = _current()
+    if profile is not None:
+        profile.add_db(role, ms)
+
+# -----------------------------------------------------------------------------
+
+def timed_build(func: Callable) -> Callable:
+    """
+    Decorator for scene builders. Time spent building the component tree is
+    charged to the request's 'build' phase.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile = _current()
+            if profile is not None:
+                profile.build_ms += (time.perf_counter() - started) * 1000
+
+    return wrapper
+
+
+
+# -----------------------------------------------------------------------------
+# Flask Integration
+# -----------------------------------------------------------------------------
+
+def _server_timing(profile: RequestProfile, total_ms: float) -> str:
+    """
+    Format a Server-Timing header value, e.g.
+        db-user;dur=4.1;desc="2 calls", build;dur=0.8, render;dur=3.2, total;dur=9.5
+    """
+
+    metrics = []
+    for role, entry in sorted(profile.db.items()):
+        calls = int(entry['count'])
+        metrics.append(f'db-{role};dur={entry["ms"]:.1f};desc="{calls} call{"" if calls == 1 else "s"}"')
+    metrics.append(f'build;dur={profile.build_ms:.1f}')
+    metrics.append(f'render;dur={profile.render_ms:.1f}')
+    metrics.append(f'total;dur={total_ms:.1f}')
+    return ', '.join(metrics)
+
+# -----------------------------------------------------------------------------
+
+def init_app(app: Flask) -> None:
+    """
+    Install the request profiler. Phase timings are recorded per endpoint in
+    the metrics registry; Server-Timing headers are sent to admins, or to
+    everyone when SERVER_TIMING is enabled in the app config.
+    """
+
+    @app.before_request
+    def start_profile():
+        g.profile = RequestProfile()
+
+    def render_started(sender, template, context, **extra):
+        profile = _current()
+        if profile is not None and profile.render_started is None:
+            profile.render_started = time.perf_counter()
+
+    def render_finished(sender, template, context, **extra):
+        profile = _current()
+        if profile is not None and profile.render_started is not None:
+            profile.render_ms += (time.perf_counter() - profile.render_started) * 1000
+            profile.render_started = None
+
+    before_render_template.connect(render_started, app, weak=False)
+    template_rendered.connect(render_finished, app, weak=False)
+
+    @app.after_request
+    def finish_profile(response):
+        profile = _current()
+        if profile is None:
+            return response
+
+        total_ms = profile.total_ms()
+        endpoint = request.endpoint or 'unknown'
+        HTTP_REQUEST_DURATION.labels(endpoint, 'db').observe(profile.db_ms)
+        HTTP_REQUEST_DURATION.labels(endpoint, 'build').observe(profile.build_ms)
+        HTTP_REQUEST_DURATION.labels(endpoint, 'render').observe(profile.render_ms)
+        HTTP_REQUEST_DURATION.labels(endpoint, 'total').observe(total_ms)
+
+        if app.config.get('SERVER_TIMING') or session.get('role') == 'admin':
+            response.headers['Server-Timing'] = _server_timing(profile, total_ms)
+
+        return response
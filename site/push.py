@@ -0,0 +1,263 @@
+# push.py - Server-Sent Events fan-out for chat and announcements
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Streams are served by the `push` service: the same app under a gevent
+worker (SCAV_PUSH_WORKER=1), sharing the web container's /dev/shm and so
+the chat ring buffer. Sync workers refuse streams; one open stream would
+hold a whole worker.
+
+One publisher thread per push process watches the ring's newest id and the
+announcement stamp file. Each new event is encoded once and the same bytes
+are handed to every subscriber, so a connection costs its greenlet, a
+Subscriber and a short queue of shared frames, not a copy of the traffic.
+
+Chat events carry the message id as the SSE id. A reconnecting browser
+sends Last-Event-ID and is replayed from the ring; if the gap has already
+left the buffer it gets a `reset` event and reloads the page instead.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, Optional, Set
+
+import chat
+from config import (
+    RUNTIME_DIR,
+    PUSH_TICK_SECONDS,
+    PUSH_HEARTBEAT_SECONDS,
+    PUSH_QUEUE_EVENTS,
+    PUSH_MAX_CONNECTIONS
+)
+
+PUSH_DIR = os.path.join(RUNTIME_DIR, 'push')
+ANNOUNCEMENTS_STAMP_PATH = os.path.join(PUSH_DIR, 'announcements.stamp')
+
+RETRY_FRAME = b'retry: 3000\n\n'
+HEARTBEAT_FRAME = b': ping\n\n'
+RESET_FRAME = b'event: reset\ndata: {}\n\n'
+ANNOUNCEMENTS_FRAME = b'event: announcements\ndata: {}\n\n'
+
+class PushFull(Exception):
+    """
+    PUSH_MAX_CONNECTIONS streams are already open in this process.
+    """
+
+
+
+# -----------------------------------------------------------------------------
+# Frames
+# -----------------------------------------------------------------------------
+
+def chat_frame(message: Dict[str, Any]) -> bytes:
+    data = json.dumps({
+        'id': message['id'],
+        'username': message['username'],
+        'body': message['body'],
+        'created_ts': message['created_ts']
+    }, separators=(',', ':'))
+    return f"id: {message['id']}\nevent: chat\ndata: {data}\n\n".encode('utf-8')
+
+# -----------------------------------------------------------------------------
+
+def notify_announcements() -> None:
+    """
+    Tell open streams that announcements changed. Called by the admin routes
+    after a create/update/delete; the publisher picks up the new mtime.
+    """
+
+    try:
+        os.makedirs(PUSH_DIR, exist_ok=True)
+        with open(ANNOUNCEMENTS_STAMP_PATH, 'a'):
+            pass
+        os.utime(ANNOUNCEMENTS_STAMP_PATH)
+    except OSError as e:
+        print(f"Push notify error: {e}")
+
+def _announcements_stamp() -> int:
+    try:
+        return os.stat(ANNOUNCEMENTS_STAMP_PATH).st_mtime_ns
+    except OSError:
+        return 0
+
+
+
+# -----------------------------------------------------------------------------
+# Hub
+# -----------------------------------------------------------------------------
+
+class Subscriber:
+    """
+    One open stream. Frames are (chat id or 0, bytes) shared with every
+    other subscriber; the queue is bounded by PUSH_QUEUE_EVENTS.
+    """
+
+    __slots__ = ('channel_id', 'frames', 'wake', 'dropped')
+
+    def __init__(self, channel_id: Optional[int]):
+        self.channel_id = channel_id
+        self.frames = deque()
+        self.wake = threading.Event()
+        self.dropped = False
+
+    def offer(self, chat_id: int, frame: bytes) -> None:
+        if len(self.frames) >= PUSH_QUEUE_EVENTS:
+            # too slow: end the stream, the browser resumes from the ring
+            self.dropped = True
+        else:
+            self.frames.append((chat_id, frame))
+        self.wake.set()
+
+class Hub:
+    """
+    Subscribers of this process by channel (None: announcements only), fed
+    by a single publisher thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[Optional[int], Set[Subscriber]] = {}
+        self._count = 0
+        self._pid = None
+        self._last_id = None
+        self._stamp = None
+
+    def subscribe(self, channel_id: Optional[int]) -> Subscriber:
+        self.ensure_running()
+        subscriber = Subscriber(channel_id)
+        with self._lock:
+            if self._count >= PUSH_MAX_CONNECTIONS:
+                raise PushFull()
+            self._subscribers.setdefault(channel_id, set()).add(subscriber)
+            self._count += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            group = self._subscribers.get(subscriber.channel_id)
+            if group and subscriber in group:
+                group.discard(subscriber)
+                self._count -= 1
+                if not group:
+                    del self._subscribers[subscriber.channel_id]
+
+    def connections(self) -> int:
+        return self._count
+
+    # --- publisher ---
+
+    def tick(self) -> None:
+        """
+        Fan out whatever is new since the last tick (the first tick only
+        takes the starting point). Reading the ring's newest id is one
+        header read; channels are only scanned when it moved.
+        """
+
+        with self._lock:
+            groups = {channel_id: list(group) for channel_id, group in self._subscribers.items()}
+
+        last_id = chat.ring.last_id()
+        if self._last_id is not None and last_id != self._last_id:
+            for channel_id, group in groups.items():
+                if channel_id is None:
+                    continue
+                messages, gap = chat.ring.since(channel_id, self._last_id)
+                frames = [(RESET_FRAME, 0)] if gap else [(chat_frame(m), m['id']) for m in messages]
+                for frame, chat_id in frames:
+                    for subscriber in group:
+                        subscriber.offer(chat_id, frame)
+            self._last_id = last_id
+
+        stamp = _announcements_stamp()
+        if self._stamp is not None and stamp != self._stamp:
+            for group in groups.values():
+                for subscriber in group:
+                    subscriber.offer(0, ANNOUNCEMENTS_FRAME)
+        self._stamp = stamp
+
+    def ensure_running(self) -> None:
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+
+        def run():
+            while True:
+                time.sleep(PUSH_TICK_SECONDS)
+                try:
+                    self.tick()
+                except (OSError, chat.ChatUnavailable) as e:
+                    print(f"Push publisher error: {e}")
+
+        threading.Thread(target=run, name='push-publisher', daemon=True).start()
+
+hub = Hub()
+
+
+
+# -----------------------------------------------------------------------------
+# Streams
+# -----------------------------------------------------------------------------
+
+def stream(channel_id: Optional[int], last_event_id: Optional[int]) -> Iterator[bytes]:
+    """
+    SSE body for one connection: a replay from last_event_id (when given),
+    then live events and heartbeats until the client goes away.
+
+    :raises PushFull: If the process is already at capacity.
+    """
+
+    if hub.connections() >= PUSH_MAX_CONNECTIONS:
+        raise PushFull()
+    return _frames(channel_id, last_event_id)
+
+def _frames(channel_id: Optional[int], last_event_id: Optional[int]) -> Iterator[bytes]:
+    # subscribed inside the generator, so the finally below always runs
+    try:
+        subscriber = hub.subscribe(channel_id)
+    except PushFull:
+        return
+
+    try:
+        yield RETRY_FRAME
+
+        # subscribed before the replay, so nothing posted meanwhile is
+        # missed; frames the replay already sent are skipped below
+        sent_id = last_event_id or 0
+        if channel_id is not None and last_event_id is not None:
+            messages, gap = chat.ring.since(channel_id, last_event_id)
+            if gap:
+                yield RESET_FRAME
+                return
+            for message in messages:
+                yield chat_frame(message)
+                sent_id = message['id']
+
+        while not subscriber.dropped:
+            if not subscriber.wake.wait(PUSH_HEARTBEAT_SECONDS):
+                yield HEARTBEAT_FRAME
+                continue
+            subscriber.wake.clear()
+            while subscriber.frames:
+                chat_id, frame = subscriber.frames.popleft()
+                if chat_id and chat_id <= sent_id:
+                    continue
+                sent_id = max(sent_id, chat_id)
+                yield frame
+    finally:
+        hub.unsubscribe(subscriber)
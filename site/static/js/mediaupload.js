@@ -0,0 +1,112 @@
+document.addEventListener('DOMContentLoaded', () => {
+    const form = document.getElementById('media-upload-form');
+    if (!form) return;
+
+    const fileInput = form.querySelector('input[type="file"]');
+    const status = form.parentElement.querySelector('.media-upload-status');
+    const csrf = form.querySelector('input[name="csrf_token"]').value;
+    const say = (text) => { if (status) status.textContent = text; };
+    const wait = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+    // the same file picked again (e.g. after a reload) resumes its session
+    const fileKey = (file) => `media-upload:${file.name}:${file.size}:${file.lastModified}`;
+
+    const resumeOffset = async (url) => {
+        const response = await fetch(url, { cache: 'no-store' });
+        if (!response.ok) return null;
+        return (await response.json()).offset;
+    };
+
+    const begin = async (file) => {
+        const saved = JSON.parse(localStorage.getItem(fileKey(file)) || 'null');
+        if (saved) {
+            const offset = await resumeOffset(saved.url).catch(() => null);
+            if (offset !== null) return { ...saved, offset };
+            localStorage.removeItem(fileKey(file));
+        }
+
+        form.querySelector('input[name="file_name"]').value = file.name;
+        form.querySelector('input[name="content_type"]').value = file.type || 'application/octet-stream';
+        form.querySelector('input[name="size"]').value = file.size;
+
+        // the fields only: the file itself goes in chunks to the session URL
+        const fields = new FormData(form);
+        fields.delete(fileInput.name);
+        const response = await fetch(form.action, { method: 'POST', body: fields });
+        const data = await response.json();
+        if (!response.ok) throw new Error(data.error || `upload refused (${response.status})`);
+
+        const session = { url: data.url, chunkBytes: data.chunk_bytes };
+        localStorage.setItem(fileKey(file), JSON.stringify(session));
+        return { ...session, offset: data.offset };
+    };
+
+    const send = async (file, session) => {
+        let offset = session.offset;
+        let failures = 0;
+
+        while (offset < file.size) {
+            say(`uploading ${file.name}: ${Math.floor((offset * 100) / file.size)}%`);
+            const end = Math.min(offset + session.chunkBytes, file.size);
+            let response = null;
+            try {
+                response = await fetch(session.url, {
+                    method: 'PUT',
+                    headers: {
+                        'Content-Type': 'application/octet-stream',
+                        'Upload-Offset': String(offset),
+                        'X-CSRFToken': csrf
+                    },
+                    body: file.slice(offset, end)
+                });
+            } catch (error) {
+                response = null;
+            }
+
+            if (response && (response.ok || response.status === 409)) {
+                offset = (await response.json()).offset;
+                failures = 0;
+                continue;
+            }
+            if (response && response.status < 500) {
+                const data = await response.json().catch(() => ({}));
+                throw new Error(data.error || `upload failed (${response.status})`);
+            }
+
+            // connection lost or server trouble: back off, then ask where to resume
+            failures += 1;
+            if (failures > 8) throw new Error('connection lost; pick the file again to resume');
+            say(`connection lost, retrying (${failures})...`);
+            await wait(Math.min(30000, 1000 * 2 ** failures));
+            const resumed = await resumeOffset(session.url).catch(() => null);
+            if (resumed !== null) offset = resumed;
+        }
+
+        const response = await fetch(`${session.url}/complete`, {
+            method: 'POST',
+            headers: { 'X-CSRFToken': csrf }
+        });
+        const data = await response.json();
+        if (!response.ok) throw new Error(data.error || `upload failed (${response.status})`);
+        return data;
+    };
+
+    form.addEventListener('submit', async (event) => {
+        event.preventDefault();
+        const file = fileInput && fileInput.files[0];
+        if (!file) {
+            say('choose a file first');
+            return;
+        }
+
+        try {
+            const session = await begin(file);
+            const result = await send(file, session);
+            localStorage.removeItem(fileKey(file));
+            say(result.duplicate ? 'already in the library' : 'upload complete');
+            window.location.reload();
+        } catch (error) {
+            say(error.message);
+        }
+    });
+});
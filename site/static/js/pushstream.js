@@ -0,0 +1,81 @@
+document.addEventListener('DOMContentLoaded', () => {
+    const panels = document.querySelectorAll('[data-push-stream]');
+
+    panels.forEach((panel) => {
+        const body = panel.querySelector('.wid-panel-body');
+        const chatLines = panel.dataset.chatLines === 'true';
+        let lastId = Number(panel.dataset.lastId || 0);
+
+        const pad = (n) => String(n).padStart(2, '0');
+        const stamp = (ts) => {
+            const d = new Date(ts * 1000);
+            return `${d.getFullYear()}-${pad(d.getMonth() + 1)}-${pad(d.getDate())} ${pad(d.getHours())}:${pad(d.getMinutes())}`;
+        };
+
+        const addLine = (message) => {
+            if (message.id <= lastId) return;
+            lastId = message.id;
+
+            const line = document.createElement('p');
+            line.className = 'wid-text wid-text-body';
+            line.textContent = `${stamp(message.created_ts)}  ${message.username}: ${message.body}`;
+
+            body.querySelectorAll('.chat-empty').forEach((empty) => empty.remove());
+            body.appendChild(line);
+        };
+
+        // long-poll fallback: no EventSource, or no push service behind the stream
+        const poll = async () => {
+            let retry = 0;
+            try {
+                const response = await fetch(`${panel.dataset.chatPoll}&since=${lastId}`, { cache: 'no-store' });
+                if (response.status === 200) {
+                    const data = await response.json();
+                    if (data.reset) {
+                        window.location.reload();
+                        return;
+                    }
+                    data.messages.forEach(addLine);
+                } else if (response.status !== 304) {
+                    retry = Number(response.headers.get('Retry-After') || 5) * 1000;
+                }
+            } catch (error) {
+                retry = 5000;
+            }
+            setTimeout(poll, retry);
+        };
+
+        if (!window.EventSource) {
+            if (chatLines && panel.dataset.chatPoll) poll();
+            return;
+        }
+
+        const source = new EventSource(panel.dataset.pushStream);
+
+        source.addEventListener('error', () => {
+            if (source.readyState === EventSource.CLOSED && chatLines && panel.dataset.chatPoll) poll();
+        });
+
+        if (chatLines) {
+            source.addEventListener('chat', (event) => addLine(JSON.parse(event.data)));
+        }
+
+        source.addEventListener('announcements', () => {
+            if (body.querySelector('.push-notice')) return;
+
+            const notice = document.createElement('p');
+            notice.className = 'wid-text wid-text-body push-notice';
+            const link = document.createElement('a');
+            link.href = '/social/announcements';
+            link.textContent = 'announcements were updated, reload to see them.';
+            notice.appendChild(link);
+            body.prepend(notice);
+        });
+
+        // the stream fell too far behind the buffer: start over
+        source.addEventListener('reset', () => {
+            source.close();
+            window.location.reload();
+        });
+    });
+});
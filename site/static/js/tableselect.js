@@ -0,0 +1,19 @@
+document.addEventListener('DOMContentLoaded', () => {
+    const toggles = document.querySelectorAll('.wid-table-select-all');
+
+    toggles.forEach((toggle) => {
+        const boxes = document.querySelectorAll(`.wid-table-select[form="${toggle.dataset.form}"]`);
+
+        toggle.addEventListener('change', () => {
+            boxes.forEach((box) => { box.checked = toggle.checked; });
+        });
+
+        boxes.forEach((box) => {
+            box.addEventListener('change', () => {
+                const checked = Array.from(boxes).filter((b) => b.checked).length;
+                toggle.checked = checked === boxes.length;
+                toggle.indeterminate = checked > 0 && checked < boxes.length;
+            });
+        });
+    });
+});
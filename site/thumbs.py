@@ -0,0 +1,254 @@
+# thumbs.py - Media thumbnail rendering
+# Copyright (C) 2026 Aaron Reichenbach
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Thumbnails are rendered off the request path: finishing an upload queues a
+`media.thumbnails` job, and the job worker decodes the original once in a
+process pool and writes every size in MEDIA_THUMB_SIZES as WebP, largest
+first (each smaller size is scaled from the previous one). Decoding runs in
+child processes so it uses every core and a file that crashes or hangs a
+decoder costs one pool, not the worker.
+
+Sources by media type:
+    image   Pillow (JPEG is decoded at reduced scale via draft())
+    video   a frame a few seconds in, via ffmpeg
+    audio   embedded cover art, via ffmpeg
+    print   first PDF page, via pdftoppm (poppler-utils)
+
+ffmpeg and pdftoppm are optional: without them those types simply get no
+thumbnail. Output is keyed by content hash (media.thumb_path), so a
+duplicate upload or a repeated job finds the work already done.
+"""
+
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from werkzeug.security import safe_join
+
+from config import (
+    MEDIA_ROOT,
+    MEDIA_THUMB_SIZES,
+    MEDIA_THUMB_QUALITY,
+    MEDIA_THUMB_PROCESSES,
+    MEDIA_THUMB_TIMEOUT_SECONDS
+)
+from media import thumb_path
+
+# Where in a video the poster frame is taken (from the start if shorter).
+VIDEO_POSTER_SECONDS = 5
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# -----------------------------------------------------------------------------
+# Exceptions
+# -----------------------------------------------------------------------------
+
+class UnreadableMedia(Exception):
+    """
+    The original cannot be decoded (corrupt, truncated, not what its
+    content type says, or over Pillow's decompression bomb limit). Trying
+    again will not help.
+    """
+
+# -----------------------------------------------------------------------------
+# Rendering (runs in the pool processes)
+# -----------------------------------------------------------------------------
+
+def _run(command: List[str]) -> Optional[bytes]:
+    """
+    stdout of a helper tool, None if it is missing, fails or produces nothing.
+    """
+
+    if not shutil.which(command[0]):
+        return None
+    try:
+        result = subprocess.run(command, capture_output=True, timeout=MEDIA_THUMB_TIMEOUT_SECONDS, check=False)
+    except subprocess.TimeoutExpired:
+        return None
+    return result.stdout if result.returncode == 0 and result.stdout else None
+
+def _ffmpeg_frame(path: str, seek: Optional[int]) -> Optional[bytes]:
+    edge = max(MEDIA_THUMB_SIZES)
+    command = ['ffmpeg', '-v', 'error', '-nostdin']
+    if seek:
+        command += ['-ss', str(seek)]
+    command += [
+        '-i', path,
+        '-map', '0:v:0', '-frames:v', '1',
+        '-vf', f"scale={edge}:{edge}:force_original_aspect_ratio=decrease",
+        '-f', 'image2pipe', '-vcodec', 'png', '-'
+    ]
+    return _run(command)
+
+def _open_source(path: str, media_type: str, content_type: str) -> Optional[Image.Image]:
+    """
+    The image to scale down for a media file, None if there is none.
+    """
+
+    edge = max(MEDIA_THUMB_SIZES)
+
+    if media_type == 'image':
+        image = Image.open(path)
+        image.draft('RGB', (edge, edge))
+        return ImageOps.exif_transpose(image)
+
+    if media_type == 'video':
+        data = _ffmpeg_frame(path, VIDEO_POSTER_SECONDS) or _ffmpeg_frame(path, None)
+    elif media_type == 'audio':
+        data = _ffmpeg_frame(path, None)
+    elif content_type == 'application/pdf':
+        data = _run(['pdftoppm', '-f', '1', '-l', '1', '-singlefile', '-png', '-scale-to', str(edge), path])
+    else:
+        data = None
+
+    return Image.open(BytesIO(data)) if data else None
+
+def render(path: str, media_type: str, content_type: str, sha256: str) -> List[int]:
+    """
+    Write every thumbnail size for one file.
+
+    :param path: Absolute path of the original.
+    :return: Sizes written, empty if the file has no usable image.
+    """
+
+    try:
+        image = _open_source(path, media_type, content_type)
+        if image is None:
+            return []
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError) as e:
+        raise UnreadableMedia(f"{type(e).__name__}: {e}")
+
+    written = []
+    for size in sorted(MEDIA_THUMB_SIZES, reverse=True):
+        image.thumbnail((size, size), Image.LANCZOS)
+        target = os.path.join(MEDIA_ROOT, thumb_path(sha256, size))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+
+        # write then rename, so a reader never sees half a file
+        temp = f"{target}.{os.getpid()}.tmp"
+        image.save(temp, 'WEBP', quality=MEDIA_THUMB_QUALITY, method=4)
+        os.replace(temp, target)
+        written.append(size)
+
+    return sorted(written)
+
+# -----------------------------------------------------------------------------
+# Scheduling (runs in the job worker)
+# -----------------------------------------------------------------------------
+
+def _executor() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=MEDIA_THUMB_PROCESSES)
+        return _pool
+
+def _reset_executor() -> None:
+    """
+    Replace a pool whose process died or hung (a bad file), killing what is
+    left of it.
+    """
+
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        for process in list(getattr(pool, '_processes', {}).values()):
+            process.kill()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+# -----------------------------------------------------------------------------
+
+def has_thumbnails(sha256: str) -> bool:
+    return all(os.path.isfile(os.path.join(MEDIA_ROOT, thumb_path(sha256, size))) for size in MEDIA_THUMB_SIZES)
+
+def source_path(storage_path: str) -> str:
+    """
+    Absolute path of an original.
+
+    :raises FileNotFoundError: If it is not on disk.
+    """
+
+    path = safe_join(MEDIA_ROOT, storage_path)
+    if path is None or not os.path.isfile(path):
+        raise FileNotFoundError(storage_path)
+    return path
+
+# -----------------------------------------------------------------------------
+
+def generate(sha256: str, storage_path: str, media_type: str, content_type: str) -> List[int]:
+    """
+    Render the thumbnails of one file in the pool, unless they exist.
+
+    :return: Sizes available.
+    :raises FileNotFoundError: If the original is missing.
+    :raises TimeoutError: If rendering took longer than MEDIA_THUMB_TIMEOUT_SECONDS.
+    """
+
+    if has_thumbnails(sha256):
+        return list(MEDIA_THUMB_SIZES)
+
+    path = source_path(storage_path)
+    future = _executor().submit(render, path, media_type, content_type, sha256)
+    try:
+        return future.result(timeout=MEDIA_THUMB_TIMEOUT_SECONDS)
+    except (TimeoutError, BrokenProcessPool):
+        _reset_executor()
+        raise
+
+# -----------------------------------------------------------------------------
+
+def generate_many(items: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], Optional[List[int]], Optional[str]]]:
+    """
+    Render the missing thumbnails of many files across the whole pool.
+
+    :param items: Rows with sha256, storage_path, media_type, content_type.
+    :return: (item, sizes, error) as each file finishes; error is None on
+        success, sizes None on failure.
+    """
+
+    futures = {}
+    for item in items:
+        if has_thumbnails(item['sha256']):
+            continue
+        try:
+            path = source_path(item['storage_path'])
+        except FileNotFoundError:
+            yield item, None, 'original missing'
+            continue
+        futures[_executor().submit(render, path, item['media_type'], item['content_type'], item['sha256'])] = item
+
+    try:
+        for future in as_completed(futures, timeout=MEDIA_THUMB_TIMEOUT_SECONDS * max(len(futures), 1)):
+            try:
+                yield futures[future], future.result(), None
+            except BrokenProcessPool:
+                _reset_executor()
+                raise
+            except Exception as e:
+                yield futures[future], None, str(e) or type(e).__name__
+    except TimeoutError:
+        _reset_executor()
+        raise
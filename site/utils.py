@@ -20,7 +20,7 @@ import math
 from flask import flash, url_for
 from markupsafe import Markup
 
-from config import PASSWORD_POLICY, PASSWORD_ALLOWED_SYMBOLS
+from config import PASSWORD_POLICY, PASSWORD_ALLOWED_SYMBOLS, SEARCH_LIMITS
 
 
 
@@ -163,6 +163,28 @@ def get_pagination_metadata(page: int, per_page: int, total_count: int, endpoint
 
 # -----------------------------------------------------------------------------
 
+def build_search_query(text: str) -> str:
+    """
+    Turn free text from a search box into a MariaDB BOOLEAN MODE expression
+    where every word is required and may be a prefix ("seas 2 dune" ->
+    "+seas* +dune*").
+
+    Only word characters survive, so user input can never inject boolean
+    operators. Returns '' when nothing searchable is left.
+
+    :param text: Raw search box input.
+    :return: Expression for the sp_*search* procedures, or ''.
+    """
+
+    text = (text or '')[:SEARCH_LIMITS['max-query-length']].lower()
+    terms = []
+    for word in re.findall(r'\w+', text):
+        if len(word) >= SEARCH_LIMITS['min-term-length'] and word not in terms:
+            terms.append(word)
+    return ' '.join(f"+{word}*" for word in terms[:SEARCH_LIMITS['max-terms']])
+
+# -----------------------------------------------------------------------------
+
 def flash_form_errors(form):
     """
     Iterate over a FlaskForm's errors and flash them to the user.